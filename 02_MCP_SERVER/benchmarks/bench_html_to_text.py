@@ -0,0 +1,89 @@
+"""
+Benchmark: conversion HTML → texte des contenus GLPI.
+
+Compare l'ancien _clean_html (balises → espace, six entités remplacées une
+à une, reproduit ci-dessous) à html_to_text (balises de bloc/en ligne,
+html.unescape complet, détection du contenu échappé) sur des corps de
+ticket synthétiques, en clair et échappés comme GLPI les stocke.
+
+Mesuré (Python 3.11, moyenne de 20 appels, 2 exécutions; machine bruitée):
+
+    100KB en clair    avant  6 ms       après  8-9 ms      x0.7-0.75
+    100KB échappé     avant  7 ms       après  8-10 ms     x0.7-1.0 (*)
+    500KB en clair    avant 28-32 ms    après 37-47 ms     x0.6-0.85
+    500KB échappé     avant 29-35 ms    après 50-52 ms     x0.55-0.7 (*)
+
+Régression connue: la nouvelle conversion est ~1.5x plus lente (500 KB:
+28 ms → 44-47 ms lors d'une première série de mesures): callback
+Python par balise et html.unescape complet. (*) Sur un contenu échappé,
+l'ancien code décodait &lt;p&gt; après avoir retiré les balises: le texte
+gardait les balises, la comparaison n'est donnée qu'à titre indicatif.
+
+    cd 02_MCP_SERVER && python -m benchmarks.bench_html_to_text
+"""
+
+import random
+import re
+import time
+
+from src.utils.html_text import html_to_text
+
+_WORDS = [
+    "bonjour", "le", "poste", "ne", "démarre", "plus", "erreur", "0x80070005",
+    "serveur", "été", "à", "résolu", "merci",
+]
+
+
+def _old_clean_html(text: str) -> str:
+    if not text:
+        return ""
+    text = re.sub(r"<[^>]+>", " ", text)
+    text = text.replace("&nbsp;", " ")
+    text = text.replace("&amp;", "&")
+    text = text.replace("&lt;", "<")
+    text = text.replace("&gt;", ">")
+    text = text.replace("&quot;", '"')
+    text = text.replace("&#39;", "'")
+    text = re.sub(r"\s+", " ", text)
+    return text.strip()
+
+
+def _body(kilobytes: int, escaped: bool) -> str:
+    rng = random.Random(0)
+    parts: list[str] = []
+    size = 0
+    while size < kilobytes * 1024:
+        paragraph = (
+            "<p>" + " ".join(rng.choice(_WORDS) for _ in range(12)) + " &eacute;&nbsp;&#233;</p>"
+            '<div><span style="color:#000">x</span><br/></div>'
+        )
+        parts.append(paragraph)
+        size += len(paragraph)
+    body = "".join(parts)
+    if escaped:
+        body = body.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+    return body
+
+
+def _mean_ms(fn, body: str, n: int = 20) -> float:
+    start = time.perf_counter()
+    for _ in range(n):
+        fn(body)
+    return (time.perf_counter() - start) / n * 1e3
+
+
+def main() -> None:
+    for kilobytes in (100, 500):
+        for escaped in (False, True):
+            body = _body(kilobytes, escaped)
+            before = _mean_ms(_old_clean_html, body)
+            after = _mean_ms(html_to_text, body)
+            label = "échappé " if escaped else "en clair"
+            print(
+                f"{kilobytes}KB {label}   avant {before:6.1f} ms   "
+                f"après {after:6.1f} ms   x{before / after:.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark: analyse par mots-clés des tickets (ENRICHISSEUR).
+
+Compare l'ancienne analyse (un test `keyword in text` par mot-clé pour la
+catégorie, les tags, les solutions vides et les actions, reproduite
+ci-dessous) à _scan_keywords (KeywordMatcher Aho-Corasick, un seul
+passage) sur des tickets synthétiques; DENSITY = part des mots du texte
+qui sont des mots-clés.
+
+Mesuré (Python 3.11, meilleur de 3 passages, 2 exécutions; machine
+bruitée, d'où les écarts):
+
+    mots/desc=   60 density=0.05   avant 17-19k tickets/s   après 34-36k   x1.9-2.0
+    mots/desc=   60 density=0.3    avant 29k                après 25-27k   x0.9
+    mots/desc=  400 density=0.05   avant  8k                après  9k      x1.0-1.1
+    mots/desc=  400 density=0.3    avant 13k                après  7k      x0.5-0.6
+    mots/desc= 4000 density=0.05   avant 2.0-2.4k           après 1.0-1.2k x0.4-0.6
+    mots/desc= 4000 density=0.3    avant  2k                après  0.8k    x0.4
+
+Régression connue: sur les gros textes (et d'autant plus qu'ils sont
+denses en mots-clés), l'automate en Python pur est ~2x plus lent que les
+`in` natifs en C. Le gain ne vaut que pour les tickets courts, cas le
+plus fréquent du lot.
+
+    cd 02_MCP_SERVER && python -m benchmarks.bench_keyword_scan
+"""
+
+import random
+import time
+
+from src.tools.enrichisseur_tools import (
+    _ACTION_VERBS,
+    _CATEGORY_KEYWORDS,
+    _TAG_KEYWORDS,
+    _USELESS_SOLUTIONS,
+    _scan_keywords,
+)
+
+_KEYWORDS = [
+    "vpn", "tunnel", "imprimante", "réseau", "wifi", "outlook", "email", "mail", "compte",
+    "ad", "active", "directory", "serveur", "vm", "backup", "virus", "logiciel", "pc",
+    "écran", "mot", "de", "passe", "bloqué", "teams", "windows", "win11", "urgent",
+    "bloquant", "connexion", "distante", "redémarrer", "vérifier", "installer", "fait",
+    "ok", "ras", "done",
+]
+_FILLER = [
+    "bonjour", "merci", "de", "bien", "vouloir", "regarder", "le", "poste", "du", "bureau",
+    "qui", "ne", "démarre", "plus", "depuis", "ce", "matin", "après", "la", "coupure",
+    "de", "courant", "les", "collaborateurs", "du", "service", "comptabilité", "signalent",
+    "aussi", "des", "lenteurs", "cordialement", "je", "reste", "disponible",
+]
+
+
+def _old_scan(title: str, description: str, solution: str) -> tuple[str, set[str], bool, bool]:
+    text = f"{title} {description} {solution}".lower()
+    category = next(
+        (name for name, keywords in _CATEGORY_KEYWORDS.items() if any(k in text for k in keywords)),
+        "Autre",
+    )
+    tags = {tag for tag, keywords in _TAG_KEYWORDS.items() if any(k in text for k in keywords)}
+    solution_lower = solution.lower()
+    useless = any(phrase in solution_lower for phrase in _USELESS_SOLUTIONS)
+    actionable = any(verb in solution_lower for verb in _ACTION_VERBS)
+    return category, tags, useless, actionable
+
+
+def _new_scan(title: str, description: str, solution: str) -> tuple[str, set[str], bool, bool]:
+    keywords = _scan_keywords(title, description, solution)
+    return keywords.category, set(keywords.tags), keywords.useless_solution, keywords.actionable_solution
+
+
+def _paragraph(rng: random.Random, words: int, density: float) -> str:
+    return " ".join(
+        rng.choice(_KEYWORDS) if rng.random() < density else rng.choice(_FILLER)
+        for _ in range(words)
+    )
+
+
+def _corpus(count: int, words: int, density: float) -> list[tuple[str, str, str]]:
+    rng = random.Random(1)
+    return [
+        (_paragraph(rng, 8, density), _paragraph(rng, words, density), _paragraph(rng, words // 3, density))
+        for _ in range(count)
+    ]
+
+
+def _best(fn, corpus: list[tuple[str, str, str]], rounds: int = 3) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for ticket in corpus:
+            fn(*ticket)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    for words, count in [(60, 3000), (400, 3000), (4000, 300)]:
+        for density in (0.05, 0.3):
+            corpus = _corpus(count, words, density)
+            assert all(_old_scan(*t) == _new_scan(*t) for t in corpus)
+            before = _best(_old_scan, corpus)
+            after = _best(_new_scan, corpus)
+            print(
+                f"mots/desc={words:>5} density={density:<4}   "
+                f"avant {count / before:7.0f} tickets/s   après {count / after:7.0f} tickets/s   "
+                f"x{before / after:.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmark: chiffrement / déchiffrement des secrets SAFEGUARD.
+
+Compare l'ancien comportement (Fernet reconstruit à chaque appel) au
+chiffreur construit une fois par SecureSecretStore, avec et sans ancienne
+clé (MultiFernet, pendant une rotation). Sans Redis: mesure _encrypt /
+_decrypt seuls.
+
+Mesuré (Python 3.11, cryptography 50, 20 000 opérations):
+
+    fernet par appel (avant)  encrypt 24.4 us  decrypt 23.6 us
+    store, clé unique         encrypt 21.6 us  decrypt 21.4 us
+    store, rotation           encrypt 21.9 us  decrypt 22.2 us
+
+Gain ~10%: le coût reste dominé par AES + HMAC, pas par la construction.
+
+    cd 02_MCP_SERVER && python -m benchmarks.bench_secret_cipher [-n 20000]
+"""
+
+import argparse
+import json
+import time
+
+from cryptography.fernet import Fernet
+
+from src.utils.secrets import SecureSecretStore, _derive_fernet_key
+
+PAYLOAD = {"password": "S3cr3t!" * 3, "nested": {"api_key": "abc" * 10}}
+KEY = "k" * 40
+
+
+def _per_call_fernet(n: int) -> tuple[float, float]:
+    """Ancien comportement: un Fernet construit par appel."""
+    fernet_key = _derive_fernet_key(KEY)
+
+    start = time.perf_counter()
+    tokens = [
+        Fernet(fernet_key).encrypt(json.dumps(PAYLOAD).encode("utf-8")) for _ in range(n)
+    ]
+    encrypt = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for token in tokens:
+        json.loads(Fernet(fernet_key).decrypt(token).decode("utf-8"))
+    decrypt = time.perf_counter() - start
+    return encrypt, decrypt
+
+
+def _store(store: SecureSecretStore, n: int) -> tuple[float, float]:
+    start = time.perf_counter()
+    tokens = [store._encrypt(PAYLOAD) for _ in range(n)]
+    encrypt = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for token in tokens:
+        store._decrypt(token)
+    decrypt = time.perf_counter() - start
+    return encrypt, decrypt
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-n", type=int, default=20000, help="Nombre d'opérations")
+    n = parser.parse_args().n
+
+    cases = {
+        "fernet par appel (avant)": lambda: _per_call_fernet(n),
+        "store, clé unique": lambda: _store(SecureSecretStore(KEY), n),
+        "store, rotation (MultiFernet)": lambda: _store(
+            SecureSecretStore(KEY, previous_keys=["p" * 40]), n
+        ),
+    }
+    for label, run in cases.items():
+        encrypt, decrypt = run()
+        print(
+            f"{label:32} encrypt {n / encrypt:>9,.0f} ops/s ({encrypt / n * 1e6:5.1f} us)"
+            f"  decrypt {n / decrypt:>9,.0f} ops/s ({decrypt / n * 1e6:5.1f} us)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark: détection / extraction des champs sensibles (SAFEGUARD).
+
+Compare l'ancien parcours (has_sensitive_fields puis
+extract_sensitive_fields, test `any(f in key_lower ...)` par clé, reproduit
+ci-dessous) à scan_sensitive_fields (un seul parcours, regex compilée,
+verdict par clé mémorisé) sur des payloads imbriqués.
+
+Mesuré (Python 3.11, meilleur de 5 x 300 appels, 3 exécutions; machine
+bruitée, d'où les écarts):
+
+    depth= 3 width=8   avant 105-115 us   après  52 us        x2.0-2.2
+    depth=10 width=8   avant 260-360 us   après 104-167 us    x2.1-2.5
+    depth=30 width=4   avant 360-640 us   après 286-464 us    x1.0-2.0
+
+    cd 02_MCP_SERVER && python -m benchmarks.bench_sensitive_scan
+"""
+
+import time
+from typing import Any
+
+from src.utils.secrets import REDACTED_VALUE, SENSITIVE_FIELD_NAMES, scan_sensitive_fields
+
+
+def _old_is_sensitive(key: str) -> bool:
+    key_lower = key.lower()
+    return key_lower in SENSITIVE_FIELD_NAMES or any(f in key_lower for f in SENSITIVE_FIELD_NAMES)
+
+
+def _old_has(data: dict[str, Any]) -> bool:
+    for key, value in data.items():
+        if _old_is_sensitive(key):
+            return True
+        if isinstance(value, dict) and _old_has(value):
+            return True
+        if isinstance(value, list):
+            for item in value:
+                if isinstance(item, dict) and _old_has(item):
+                    return True
+    return False
+
+
+def _old_extract(data: dict[str, Any]) -> tuple[dict[str, Any], dict[str, Any]]:
+    cleaned: dict[str, Any] = {}
+    found: dict[str, Any] = {}
+    for key, value in data.items():
+        if _old_is_sensitive(key):
+            cleaned[key] = REDACTED_VALUE
+            found[key] = value
+        elif isinstance(value, dict):
+            nested_clean, nested_secrets = _old_extract(value)
+            cleaned[key] = nested_clean
+            if nested_secrets:
+                found[key] = nested_secrets
+        else:
+            cleaned[key] = value
+    return cleaned, found
+
+
+def _nested(depth: int, width: int) -> dict[str, Any]:
+    if depth == 0:
+        return {"username": "john", "password": "x", "description": "lorem ipsum", "count": 3}
+    node: dict[str, Any] = {f"field_{i}": f"value_{i}" for i in range(width)}
+    node["child"] = _nested(depth - 1, width)
+    node["items"] = [_nested(0, width) for _ in range(3)]
+    node["api_key"] = "k"
+    return node
+
+
+def _best_us(fn, payload: dict[str, Any], n: int = 300, rounds: int = 5) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(n):
+            fn(payload)
+        best = min(best, (time.perf_counter() - start) / n)
+    return best * 1e6
+
+
+def main() -> None:
+    for depth, width in [(3, 8), (10, 8), (30, 4)]:
+        payload = _nested(depth, width)
+        before = _best_us(lambda d: (_old_has(d), _old_extract(d)), payload)
+        after = _best_us(scan_sensitive_fields, payload)
+        print(
+            f"depth={depth:>2} width={width}   avant {before:7.1f} us   "
+            f"après {after:7.1f} us   x{before / after:.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
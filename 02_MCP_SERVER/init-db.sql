@@ -7,6 +7,9 @@
 -- Activer l'extension pgvector
 CREATE EXTENSION IF NOT EXISTS vector;
 
+-- Recherche approximative (annuaire GLPI)
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
 -- Table de la base de connaissances
 CREATE TABLE IF NOT EXISTS widip_knowledge_base (
     id SERIAL PRIMARY KEY,
@@ -17,6 +20,12 @@ CREATE TABLE IF NOT EXISTS widip_knowledge_base (
     tags TEXT[] DEFAULT '{}',
     embedding vector(1024),  -- e5-multilingual-large génère des vecteurs de 1024 dimensions
     quality_score NUMERIC(3,2) DEFAULT 0.0,  -- Score de qualité 0.00-1.00
+    duplicate_ticket_ids TEXT[] NOT NULL DEFAULT '{}',  -- Quasi-doublons fusionnés (migration 008)
+    -- Recherche plein texte (migration 009): problème en poids A, solution en poids B
+    search_tsv tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('french', coalesce(problem_summary, '')), 'A')
+        || setweight(to_tsvector('french', coalesce(solution_summary, '')), 'B')
+    ) STORED,
     created_at TIMESTAMP DEFAULT NOW(),
     updated_at TIMESTAMP
 );
@@ -45,18 +54,24 @@ CREATE INDEX IF NOT EXISTS idx_safeguard_approval_id ON safeguard_pending_approv
 
 -- =============================================================================
 -- Table de logs d'audit SAFEGUARD
+-- Tables de logs partitionnees par mois (timestamp): les partitions mensuelles
+-- sont creees par le MCP Server au demarrage, les lignes hors partition vont
+-- dans <table>_default. Retention: POST /maintenance/retention
 -- =============================================================================
 CREATE TABLE IF NOT EXISTS safeguard_audit_log (
-    id SERIAL PRIMARY KEY,
-    timestamp TIMESTAMP DEFAULT NOW(),
+    id SERIAL,
+    timestamp TIMESTAMP NOT NULL DEFAULT NOW(),
     tool_name VARCHAR(100) NOT NULL,
     security_level VARCHAR(10) NOT NULL,
     action VARCHAR(20) NOT NULL,  -- allowed, blocked, approved, rejected
     caller_ip VARCHAR(50),
     workflow_id VARCHAR(100),
     approval_id VARCHAR(100),
-    details JSONB DEFAULT '{}'
-);
+    details JSONB DEFAULT '{}',
+    PRIMARY KEY (id, timestamp)
+) PARTITION BY RANGE (timestamp);
+
+CREATE TABLE IF NOT EXISTS safeguard_audit_log_default PARTITION OF safeguard_audit_log DEFAULT;
 
 CREATE INDEX IF NOT EXISTS idx_safeguard_audit_timestamp ON safeguard_audit_log (timestamp DESC);
 CREATE INDEX IF NOT EXISTS idx_safeguard_audit_tool ON safeguard_audit_log (tool_name);
@@ -78,6 +93,14 @@ ON widip_knowledge_base (ticket_id);
 CREATE INDEX IF NOT EXISTS idx_knowledge_tags
 ON widip_knowledge_base USING gin (tags);
 
+-- Index GIN pour retrouver le groupe d'un ticket fusionné
+CREATE INDEX IF NOT EXISTS idx_knowledge_duplicate_tickets
+ON widip_knowledge_base USING gin (duplicate_ticket_ids);
+
+-- Index GIN pour la recherche plein texte (recherche hybride)
+CREATE INDEX IF NOT EXISTS idx_knowledge_search_tsv
+ON widip_knowledge_base USING gin (search_tsv);
+
 -- Fonction pour mettre à jour updated_at automatiquement
 CREATE OR REPLACE FUNCTION update_updated_at_column()
 RETURNS TRIGGER AS $$
@@ -104,10 +127,10 @@ CREATE TRIGGER update_knowledge_updated_at
 -- Table des logs d'incidents (traçabilité complète)
 -- =============================================================================
 CREATE TABLE IF NOT EXISTS incident_logs (
-    id SERIAL PRIMARY KEY,
+    id SERIAL,
     incident_id VARCHAR(100) NOT NULL,
     ticket_id VARCHAR(50),
-    timestamp TIMESTAMP DEFAULT NOW(),
+    timestamp TIMESTAMP NOT NULL DEFAULT NOW(),
     event_type VARCHAR(50) NOT NULL,  -- detection, triage, diagnostic, action, resolution
     agent_name VARCHAR(50),  -- MONITOR, TRIAGE, SUPPORT, DIAG, etc.
     action_taken TEXT,
@@ -116,8 +139,11 @@ CREATE TABLE IF NOT EXISTS incident_logs (
     human_validated BOOLEAN DEFAULT FALSE,
     validation_by VARCHAR(100),
     validation_at TIMESTAMP,
-    notes TEXT
-);
+    notes TEXT,
+    PRIMARY KEY (id, timestamp)
+) PARTITION BY RANGE (timestamp);
+
+CREATE TABLE IF NOT EXISTS incident_logs_default PARTITION OF incident_logs DEFAULT;
 
 CREATE INDEX IF NOT EXISTS idx_incident_logs_incident_id ON incident_logs (incident_id);
 CREATE INDEX IF NOT EXISTS idx_incident_logs_ticket_id ON incident_logs (ticket_id);
@@ -129,8 +155,8 @@ CREATE INDEX IF NOT EXISTS idx_incident_logs_event_type ON incident_logs (event_
 -- Table des logs d'activité des agents WIDIP
 -- =============================================================================
 CREATE TABLE IF NOT EXISTS widip_agent_logs (
-    id SERIAL PRIMARY KEY,
-    timestamp TIMESTAMP DEFAULT NOW(),
+    id SERIAL,
+    timestamp TIMESTAMP NOT NULL DEFAULT NOW(),
     agent_name VARCHAR(50) NOT NULL,  -- MONITOR, TRIAGE, SUPPORT, DIAG, ONBOARD, HR
     session_id VARCHAR(100),
     action VARCHAR(100) NOT NULL,
@@ -141,17 +167,90 @@ CREATE TABLE IF NOT EXISTS widip_agent_logs (
     success BOOLEAN,
     error_message TEXT,
     duration_ms INTEGER,
-    metadata JSONB DEFAULT '{}'
-);
+    metadata JSONB DEFAULT '{}',
+    PRIMARY KEY (id, timestamp)
+) PARTITION BY RANGE (timestamp);
+
+CREATE TABLE IF NOT EXISTS widip_agent_logs_default PARTITION OF widip_agent_logs DEFAULT;
 
 CREATE INDEX IF NOT EXISTS idx_agent_logs_timestamp ON widip_agent_logs (timestamp DESC);
 CREATE INDEX IF NOT EXISTS idx_agent_logs_agent ON widip_agent_logs (agent_name);
 CREATE INDEX IF NOT EXISTS idx_agent_logs_session ON widip_agent_logs (session_id);
 CREATE INDEX IF NOT EXISTS idx_agent_logs_tool ON widip_agent_logs (tool_called);
 
+-- =============================================================================
+-- Annuaire local des utilisateurs GLPI (recherche de clients)
+-- =============================================================================
+CREATE TABLE IF NOT EXISTS glpi_user_directory (
+    id INTEGER PRIMARY KEY,
+    login VARCHAR(255),
+    firstname VARCHAR(255),
+    realname VARCHAR(255),
+    email TEXT,
+    phone TEXT,
+    phone_digits TEXT,
+    is_active BOOLEAN NOT NULL DEFAULT TRUE,
+    search_name TEXT NOT NULL DEFAULT '',
+    date_mod TIMESTAMP,
+    synced_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_glpi_user_directory_name_trgm
+    ON glpi_user_directory USING GIN (search_name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_glpi_user_directory_email_trgm
+    ON glpi_user_directory USING GIN (email gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_glpi_user_directory_phone_trgm
+    ON glpi_user_directory USING GIN (phone_digits gin_trgm_ops);
+
+CREATE TABLE IF NOT EXISTS glpi_sync_state (
+    name VARCHAR(50) PRIMARY KEY,
+    last_date_mod TIMESTAMP,
+    last_sync_at TIMESTAMP WITH TIME ZONE,
+    last_full_sync_at TIMESTAMP WITH TIME ZONE
+);
+
+-- Curseurs du flux de tickets GLPI (watermark par consommateur, voir migration 006)
+CREATE TABLE IF NOT EXISTS glpi_feed_cursors (
+    consumer VARCHAR(100) NOT NULL,
+    feed VARCHAR(20) NOT NULL,
+    last_date TIMESTAMP NOT NULL,
+    last_id INTEGER NOT NULL DEFAULT 0,
+    lease_id UUID,
+    leased_until TIMESTAMP WITH TIME ZONE,
+    pending_date TIMESTAMP,
+    pending_id INTEGER,
+    pending_count INTEGER NOT NULL DEFAULT 0,
+    delivered BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (consumer, feed)
+);
+
+-- Outbox des notifications (livraison asynchrone, voir migration 007)
+CREATE TABLE IF NOT EXISTS notification_outbox (
+    id BIGSERIAL PRIMARY KEY,
+    channel VARCHAR(20) NOT NULL,
+    payload JSONB NOT NULL,
+    context JSONB,
+    status VARCHAR(20) NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    locked_until TIMESTAMP WITH TIME ZONE,
+    last_error TEXT,
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    sent_at TIMESTAMP WITH TIME ZONE
+);
+
+CREATE INDEX IF NOT EXISTS idx_notification_outbox_due
+    ON notification_outbox(next_attempt_at)
+    WHERE status IN ('pending', 'sending');
+CREATE INDEX IF NOT EXISTS idx_notification_outbox_dead
+    ON notification_outbox(created_at DESC)
+    WHERE status = 'dead';
+
 COMMENT ON TABLE widip_knowledge_base IS 'Base de connaissances RAG pour les agents IA WIDIP';
 COMMENT ON COLUMN widip_knowledge_base.embedding IS 'Vecteur embedding généré par e5-multilingual-large (1024 dim)';
 COMMENT ON TABLE safeguard_pending_approvals IS 'File d''attente des actions L3 en attente de validation humaine';
 COMMENT ON TABLE safeguard_audit_log IS 'Journal d''audit de toutes les actions SAFEGUARD';
 COMMENT ON TABLE incident_logs IS 'Traçabilité complète des incidents traités par les agents WIDIP';
 COMMENT ON TABLE widip_agent_logs IS 'Logs d''activité et métriques des agents IA WIDIP';
+COMMENT ON TABLE glpi_user_directory IS 'Réplique locale des utilisateurs GLPI pour la recherche de clients';
@@ -0,0 +1,77 @@
+-- =============================================================================
+-- Migration 003: Compteurs materialises par statut pour SAFEGUARD
+-- Les stats (/safeguard/stats, /safeguard/deferred/stats) lisent ces compteurs
+-- au lieu d'un GROUP BY status sur tout l'historique
+-- =============================================================================
+
+-- Table des compteurs (scope = approvals | deferred)
+CREATE TABLE IF NOT EXISTS safeguard_status_counters (
+    scope VARCHAR(20) NOT NULL,
+    status VARCHAR(20) NOT NULL,
+    count BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (scope, status)
+);
+
+-- Fonction trigger partagee (scope passe en argument du trigger)
+CREATE OR REPLACE FUNCTION safeguard_count_status()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD.status IS NOT DISTINCT FROM NEW.status THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE safeguard_status_counters
+        SET count = count - 1
+        WHERE scope = TG_ARGV[0] AND status = COALESCE(OLD.status, 'unknown');
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO safeguard_status_counters (scope, status, count)
+        VALUES (TG_ARGV[0], COALESCE(NEW.status, 'unknown'), 1)
+        ON CONFLICT (scope, status)
+        DO UPDATE SET count = safeguard_status_counters.count + 1;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE 'plpgsql';
+
+-- Installation des triggers + initialisation des compteurs depuis l'existant
+DO $$
+BEGIN
+    IF to_regclass('safeguard_approvals') IS NOT NULL
+       AND NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'trigger_safeguard_approvals_status_counters') THEN
+        LOCK TABLE safeguard_approvals IN SHARE ROW EXCLUSIVE MODE;
+
+        CREATE TRIGGER trigger_safeguard_approvals_status_counters
+            AFTER INSERT OR UPDATE OF status OR DELETE ON safeguard_approvals
+            FOR EACH ROW
+            EXECUTE FUNCTION safeguard_count_status('approvals');
+
+        DELETE FROM safeguard_status_counters WHERE scope = 'approvals';
+        INSERT INTO safeguard_status_counters (scope, status, count)
+        SELECT 'approvals', COALESCE(status, 'unknown'), COUNT(*)
+        FROM safeguard_approvals
+        GROUP BY COALESCE(status, 'unknown');
+    END IF;
+
+    IF to_regclass('safeguard_deferred_actions') IS NOT NULL
+       AND NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'trigger_safeguard_deferred_actions_status_counters') THEN
+        LOCK TABLE safeguard_deferred_actions IN SHARE ROW EXCLUSIVE MODE;
+
+        CREATE TRIGGER trigger_safeguard_deferred_actions_status_counters
+            AFTER INSERT OR UPDATE OF status OR DELETE ON safeguard_deferred_actions
+            FOR EACH ROW
+            EXECUTE FUNCTION safeguard_count_status('deferred');
+
+        DELETE FROM safeguard_status_counters WHERE scope = 'deferred';
+        INSERT INTO safeguard_status_counters (scope, status, count)
+        SELECT 'deferred', COALESCE(status, 'unknown'), COUNT(*)
+        FROM safeguard_deferred_actions
+        GROUP BY COALESCE(status, 'unknown');
+    END IF;
+END $$;
+
+-- Commentaires
+COMMENT ON TABLE safeguard_status_counters IS 'Compteurs par statut maintenus par trigger (stats SAFEGUARD en temps constant)';
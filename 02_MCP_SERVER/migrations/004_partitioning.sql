@@ -0,0 +1,158 @@
+-- =============================================================================
+-- Migration 004: Partitionnement mensuel des tables SAFEGUARD et des logs
+-- Convertit les tables existantes en tables partitionnees (RANGE par mois):
+--   safeguard_approvals, safeguard_deferred_actions  -> created_at
+--   safeguard_audit_log, incident_logs, widip_agent_logs -> timestamp
+-- Les partitions expirees sont archivees (CSV gzip) puis supprimees par
+-- POST /maintenance/retention (voir src/mcp/retention.py)
+-- A executer apres 003_safeguard_status_counters.sql, MCP Server arrete.
+-- =============================================================================
+
+BEGIN;
+
+-- Conversion generique: renomme la table, recree la parente partitionnee,
+-- cree les partitions couvrant les donnees existantes, recopie, recree les index
+CREATE OR REPLACE FUNCTION widip_convert_to_partitioned(p_table TEXT, p_column TEXT)
+RETURNS VOID AS $$
+DECLARE
+    v_legacy TEXT := p_table || '_legacy';
+    v_seq TEXT;
+    v_month DATE;
+    v_last DATE := (date_trunc('month', NOW()) + INTERVAL '2 months')::DATE;
+    v_index RECORD;
+BEGIN
+    IF to_regclass(p_table) IS NULL THEN
+        RAISE NOTICE 'Table % absente, ignoree', p_table;
+        RETURN;
+    END IF;
+
+    IF EXISTS (
+        SELECT 1 FROM pg_partitioned_table pt
+        JOIN pg_class c ON c.oid = pt.partrelid
+        WHERE c.relname = p_table
+    ) THEN
+        RAISE NOTICE 'Table % deja partitionnee', p_table;
+        RETURN;
+    END IF;
+
+    EXECUTE format('ALTER TABLE %I RENAME TO %I', p_table, v_legacy);
+    EXECUTE format('UPDATE %I SET %I = NOW() WHERE %I IS NULL', v_legacy, p_column, p_column);
+
+    EXECUTE format(
+        'CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS INCLUDING CONSTRAINTS) PARTITION BY RANGE (%I)',
+        p_table, v_legacy, p_column
+    );
+    EXECUTE format('ALTER TABLE %I ALTER COLUMN %I SET NOT NULL', p_table, p_column);
+    -- La cle inclut la colonne de partition (contrainte PostgreSQL): l'unicite
+    -- de id seul vient de sa generation (sequence, UUIDv7 / deferred_id cote
+    -- application) et les recherches par id filtrent aussi sur created_at
+    -- pour ne parcourir qu'une partition (voir src/mcp/safeguard_queue.py)
+    EXECUTE format('ALTER TABLE %I ADD PRIMARY KEY (id, %I)', p_table, p_column);
+
+    -- La sequence SERIAL appartient a l'ancienne table: la rattacher a la nouvelle
+    v_seq := pg_get_serial_sequence(v_legacy, 'id');
+    IF v_seq IS NOT NULL THEN
+        EXECUTE format('ALTER SEQUENCE %s OWNED BY %I.id', v_seq, p_table);
+    END IF;
+
+    -- Partitions mensuelles: du plus ancien mois present jusqu'a M+2
+    EXECUTE format('SELECT date_trunc(''month'', MIN(%I))::DATE FROM %I', p_column, v_legacy)
+        INTO v_month;
+    v_month := LEAST(COALESCE(v_month, v_last), date_trunc('month', NOW())::DATE);
+
+    WHILE v_month <= v_last LOOP
+        EXECUTE format(
+            'CREATE TABLE IF NOT EXISTS %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+            p_table || '_p' || to_char(v_month, 'YYYYMM'),
+            p_table,
+            v_month,
+            (v_month + INTERVAL '1 month')::DATE
+        );
+        v_month := (v_month + INTERVAL '1 month')::DATE;
+    END LOOP;
+
+    EXECUTE format('CREATE TABLE IF NOT EXISTS %I PARTITION OF %I DEFAULT', p_table || '_default', p_table);
+
+    EXECUTE format('INSERT INTO %I SELECT * FROM %I', p_table, v_legacy);
+
+    -- Index secondaires (hors cle primaire / contraintes uniques, recreees a part)
+    CREATE TEMP TABLE IF NOT EXISTS widip_legacy_indexes (indexdef TEXT) ON COMMIT DROP;
+    DELETE FROM widip_legacy_indexes;
+    INSERT INTO widip_legacy_indexes
+        SELECT i.indexdef
+        FROM pg_indexes i
+        JOIN pg_class ic ON ic.relname = i.indexname
+        JOIN pg_index ix ON ix.indexrelid = ic.oid
+        WHERE i.tablename = v_legacy AND NOT ix.indisunique;
+
+    EXECUTE format('DROP TABLE %I', v_legacy);
+
+    FOR v_index IN SELECT indexdef FROM widip_legacy_indexes LOOP
+        EXECUTE regexp_replace(
+            v_index.indexdef,
+            ' ON (\S+\.)?' || v_legacy || ' USING ',
+            ' ON \1' || p_table || ' USING '
+        );
+    END LOOP;
+END;
+$$ LANGUAGE 'plpgsql';
+
+SELECT widip_convert_to_partitioned('safeguard_approvals', 'created_at');
+SELECT widip_convert_to_partitioned('safeguard_deferred_actions', 'created_at');
+SELECT widip_convert_to_partitioned('safeguard_audit_log', 'timestamp');
+SELECT widip_convert_to_partitioned('incident_logs', 'timestamp');
+SELECT widip_convert_to_partitioned('widip_agent_logs', 'timestamp');
+
+DROP FUNCTION widip_convert_to_partitioned(TEXT, TEXT);
+
+-- Unicite de deferred_id (doit inclure la cle de partition)
+DO $$
+BEGIN
+    IF to_regclass('safeguard_deferred_actions') IS NOT NULL AND NOT EXISTS (
+        SELECT 1 FROM pg_constraint WHERE conname = 'safeguard_deferred_actions_deferred_id_created_at_key'
+    ) THEN
+        ALTER TABLE safeguard_deferred_actions
+            ADD CONSTRAINT safeguard_deferred_actions_deferred_id_created_at_key
+            UNIQUE (deferred_id, created_at);
+    END IF;
+END $$;
+
+-- Triggers supprimes avec les anciennes tables: les recreer sur les parentes
+DO $$
+BEGIN
+    IF to_regclass('safeguard_deferred_actions') IS NOT NULL THEN
+        DROP TRIGGER IF EXISTS trigger_deferred_updated_at ON safeguard_deferred_actions;
+        CREATE TRIGGER trigger_deferred_updated_at
+            BEFORE UPDATE ON safeguard_deferred_actions
+            FOR EACH ROW
+            EXECUTE FUNCTION update_deferred_updated_at();
+
+        DROP TRIGGER IF EXISTS trigger_safeguard_deferred_actions_status_counters ON safeguard_deferred_actions;
+        CREATE TRIGGER trigger_safeguard_deferred_actions_status_counters
+            AFTER INSERT OR UPDATE OF status OR DELETE ON safeguard_deferred_actions
+            FOR EACH ROW
+            EXECUTE FUNCTION safeguard_count_status('deferred');
+
+        DELETE FROM safeguard_status_counters WHERE scope = 'deferred';
+        INSERT INTO safeguard_status_counters (scope, status, count)
+        SELECT 'deferred', COALESCE(status, 'unknown'), COUNT(*)
+        FROM safeguard_deferred_actions
+        GROUP BY COALESCE(status, 'unknown');
+    END IF;
+
+    IF to_regclass('safeguard_approvals') IS NOT NULL THEN
+        DROP TRIGGER IF EXISTS trigger_safeguard_approvals_status_counters ON safeguard_approvals;
+        CREATE TRIGGER trigger_safeguard_approvals_status_counters
+            AFTER INSERT OR UPDATE OF status OR DELETE ON safeguard_approvals
+            FOR EACH ROW
+            EXECUTE FUNCTION safeguard_count_status('approvals');
+
+        DELETE FROM safeguard_status_counters WHERE scope = 'approvals';
+        INSERT INTO safeguard_status_counters (scope, status, count)
+        SELECT 'approvals', COALESCE(status, 'unknown'), COUNT(*)
+        FROM safeguard_approvals
+        GROUP BY COALESCE(status, 'unknown');
+    END IF;
+END $$;
+
+COMMIT;
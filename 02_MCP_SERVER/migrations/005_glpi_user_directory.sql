@@ -0,0 +1,40 @@
+-- =============================================================================
+-- Migration 005: Annuaire local des utilisateurs GLPI
+-- Replique de search/User servie localement (recherche de clients,
+-- creation de tickets). Synchronisation incrementale sur date_mod par
+-- GLPIClient.sync_user_directory (voir src/clients/glpi_directory.py)
+-- =============================================================================
+
+-- Recherche approximative (trigrammes)
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE TABLE IF NOT EXISTS glpi_user_directory (
+    id INTEGER PRIMARY KEY,                  -- ID utilisateur GLPI
+    login VARCHAR(255),
+    firstname VARCHAR(255),
+    realname VARCHAR(255),
+    email TEXT,                              -- Emails en minuscules, separes par un espace
+    phone TEXT,
+    phone_digits TEXT,                       -- 9 derniers chiffres (telephone, mobile)
+    is_active BOOLEAN NOT NULL DEFAULT TRUE,
+    search_name TEXT NOT NULL DEFAULT '',    -- login | prenom nom | nom prenom
+    date_mod TIMESTAMP,                      -- date_mod GLPI (curseur de synchro)
+    synced_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_glpi_user_directory_name_trgm
+    ON glpi_user_directory USING GIN (search_name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_glpi_user_directory_email_trgm
+    ON glpi_user_directory USING GIN (email gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_glpi_user_directory_phone_trgm
+    ON glpi_user_directory USING GIN (phone_digits gin_trgm_ops);
+
+-- Etat des synchronisations (name = 'users')
+CREATE TABLE IF NOT EXISTS glpi_sync_state (
+    name VARCHAR(50) PRIMARY KEY,
+    last_date_mod TIMESTAMP,
+    last_sync_at TIMESTAMP WITH TIME ZONE,
+    last_full_sync_at TIMESTAMP WITH TIME ZONE
+);
+
+COMMENT ON TABLE glpi_user_directory IS 'Replique locale des utilisateurs GLPI pour la recherche de clients';
@@ -0,0 +1,22 @@
+-- =============================================================================
+-- Migration 006: Curseurs du flux de tickets GLPI
+-- Watermark (date, id) par consommateur et par flux (new, resolved):
+-- chaque workflow ne recoit un ticket qu'une fois. Un lot livre est
+-- "en attente" (pending_*) sous bail jusqu'a l'ack du consommateur
+-- (voir src/clients/glpi_feed.py)
+-- =============================================================================
+
+CREATE TABLE IF NOT EXISTS glpi_feed_cursors (
+    consumer VARCHAR(100) NOT NULL,          -- Workflow consommateur (proactif, enrichisseur...)
+    feed VARCHAR(20) NOT NULL,               -- new | resolved
+    last_date TIMESTAMP NOT NULL,            -- Watermark: date GLPI du dernier ticket valide
+    last_id INTEGER NOT NULL DEFAULT 0,      -- Departage les tickets de meme date
+    lease_id UUID,                           -- Bail du lot en cours
+    leased_until TIMESTAMP WITH TIME ZONE,
+    pending_date TIMESTAMP,                  -- Curseur applique a l'ack
+    pending_id INTEGER,
+    pending_count INTEGER NOT NULL DEFAULT 0,
+    delivered BIGINT NOT NULL DEFAULT 0,     -- Tickets valides depuis la creation
+    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (consumer, feed)
+);
@@ -0,0 +1,30 @@
+-- =============================================================================
+-- Migration 007: Outbox des notifications
+-- Les tools de notification inserent un envoi par canal et rendent la main;
+-- les workers de NotificationOutbox livrent (FOR UPDATE SKIP LOCKED),
+-- avec retries et dead letters (voir src/clients/notification_outbox.py)
+-- =============================================================================
+
+CREATE TABLE IF NOT EXISTS notification_outbox (
+    id BIGSERIAL PRIMARY KEY,
+    channel VARCHAR(20) NOT NULL,            -- email | teams | slack
+    payload JSONB NOT NULL,                  -- Arguments de livraison du canal
+    context JSONB,                           -- Ticket, type de notification...
+    status VARCHAR(20) NOT NULL DEFAULT 'pending',  -- pending | sending | sent | dead
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    locked_until TIMESTAMP WITH TIME ZONE,   -- Reservation d'un worker
+    last_error TEXT,
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    sent_at TIMESTAMP WITH TIME ZONE
+);
+
+-- Envois a livrer (file de travail des workers)
+CREATE INDEX IF NOT EXISTS idx_notification_outbox_due
+    ON notification_outbox(next_attempt_at)
+    WHERE status IN ('pending', 'sending');
+
+-- Dead letters (consultation / relance)
+CREATE INDEX IF NOT EXISTS idx_notification_outbox_dead
+    ON notification_outbox(created_at DESC)
+    WHERE status = 'dead';
@@ -0,0 +1,14 @@
+-- =============================================================================
+-- Migration 008: Deduplication semantique de la base de connaissances
+-- Avant insertion, une connaissance proche d'une connaissance existante
+-- (similarite cosinus >= MEMORY_DEDUP_THRESHOLD, plus proche voisin via
+-- l'index HNSW) y est fusionnee: la ligne garde le contenu du meilleur
+-- quality_score et liste les autres tickets (voir src/clients/memory.py)
+-- =============================================================================
+
+ALTER TABLE widip_knowledge_base
+    ADD COLUMN IF NOT EXISTS duplicate_ticket_ids TEXT[] NOT NULL DEFAULT '{}';
+
+-- Ticket fusionne -> ligne de son groupe (deduplication, memory_check_exists)
+CREATE INDEX IF NOT EXISTS idx_knowledge_duplicate_tickets
+    ON widip_knowledge_base USING gin (duplicate_ticket_ids);
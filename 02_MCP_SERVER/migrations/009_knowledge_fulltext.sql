@@ -0,0 +1,20 @@
+-- =============================================================================
+-- Migration 009: Recherche hybride (plein texte + vectorielle) dans la base
+-- de connaissances
+-- Les identifiants exacts (hostnames, IP, codes d'erreur, numeros KB) sont
+-- mal servis par la seule similarite cosinus: memory_search_similar_cases
+-- (mode hybrid) fusionne le classement plein texte et le classement HNSW par
+-- reciprocal rank fusion (voir src/clients/memory.py)
+-- =============================================================================
+
+-- Configuration 'french': les identifiants (srv-dc01, 192.168.1.10,
+-- 0x80070005, kb5034441) restent des lexemes entiers, le texte est racinise.
+-- Probleme en poids A, solution en poids B
+ALTER TABLE widip_knowledge_base
+    ADD COLUMN IF NOT EXISTS search_tsv tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('french', coalesce(problem_summary, '')), 'A')
+        || setweight(to_tsvector('french', coalesce(solution_summary, '')), 'B')
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_knowledge_search_tsv
+    ON widip_knowledge_base USING gin (search_tsv);
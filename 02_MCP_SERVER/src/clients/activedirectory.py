@@ -44,13 +44,69 @@ from ldap3 import (
     SUBTREE,
     Tls,
 )
-from ldap3.core.exceptions import LDAPException
+from ldap3.core.exceptions import (
+    LDAPCommunicationError,
+    LDAPException,
+    LDAPResponseTimeoutError,
+    LDAPSocketOpenError,
+)
 
 from ..config import settings
+from ..utils.circuit_breaker import CircuitBreaker, CircuitOpenError, get_circuit_breaker
 
 logger = structlog.get_logger(__name__)
 
 
+def _ldap_breaker() -> CircuitBreaker:
+    """Circuit breaker "ldap": erreurs réseau et timeouts de réponse."""
+    return get_circuit_breaker(
+        "ldap",
+        is_failure=lambda e: isinstance(
+            e, (LDAPCommunicationError, LDAPResponseTimeoutError, OSError)
+        ),
+    )
+
+
+class _GuardedConnection(Connection):
+    """
+    Connexion LDAP dont chaque opération passe par le circuit breaker "ldap".
+
+    Un AD qui ne répond plus (receive_timeout) compte comme un échec; circuit
+    ouvert: l'opération échoue immédiatement (LDAPSocketOpenError). Les
+    lectures faites pendant le bind (schéma, auto_bind) ne sont pas gardées:
+    le bind l'est déjà par _get_connection.
+    """
+
+    guarded = False
+
+    def _guarded(self, operation, *args: Any, **kwargs: Any) -> Any:
+        if not self.guarded:
+            return operation(*args, **kwargs)
+        try:
+            with _ldap_breaker().guard():
+                return operation(*args, **kwargs)
+        except CircuitOpenError as e:
+            raise LDAPSocketOpenError(str(e)) from e
+
+    def search(self, *args: Any, **kwargs: Any) -> Any:
+        return self._guarded(super().search, *args, **kwargs)
+
+    def add(self, *args: Any, **kwargs: Any) -> Any:
+        return self._guarded(super().add, *args, **kwargs)
+
+    def delete(self, *args: Any, **kwargs: Any) -> Any:
+        return self._guarded(super().delete, *args, **kwargs)
+
+    def modify(self, *args: Any, **kwargs: Any) -> Any:
+        return self._guarded(super().modify, *args, **kwargs)
+
+    def modify_dn(self, *args: Any, **kwargs: Any) -> Any:
+        return self._guarded(super().modify_dn, *args, **kwargs)
+
+    def extended(self, *args: Any, **kwargs: Any) -> Any:
+        return self._guarded(super().extended, *args, **kwargs)
+
+
 class ActiveDirectoryClient:
     """
     Client pour Active Directory via LDAP3.
@@ -95,19 +151,34 @@ class ActiveDirectoryClient:
                 use_ssl=settings.ldap_use_ssl,
                 tls=tls_config,
                 get_info=ALL,
+                connect_timeout=settings.ldap_connect_timeout,
             )
         return self._server
 
     def _get_connection(self) -> Connection:
-        """Retourne une connexion LDAP authentifiée."""
+        """
+        Retourne une connexion LDAP authentifiée.
+
+        La (re)connexion et chaque opération (_GuardedConnection) passent par
+        le circuit breaker "ldap": si l'AD est injoignable ou ne répond plus
+        (LDAP_RECEIVE_TIMEOUT), les appels suivants échouent immédiatement
+        (erreur LDAPSocketOpenError, gérée comme les autres erreurs LDAP).
+        """
         if self._connection is None or self._connection.closed:
-            self._connection = Connection(
-                self._get_server(),
-                user=settings.ldap_bind_user,
-                password=settings.ldap_bind_pass.get_secret_value(),
-                authentication=NTLM,
-                auto_bind=True,
-            )
+            try:
+                with _ldap_breaker().guard():
+                    connection = _GuardedConnection(
+                        self._get_server(),
+                        user=settings.ldap_bind_user,
+                        password=settings.ldap_bind_pass.get_secret_value(),
+                        authentication=NTLM,
+                        auto_bind=True,
+                        receive_timeout=settings.ldap_receive_timeout,
+                    )
+            except CircuitOpenError as e:
+                raise LDAPSocketOpenError(str(e)) from e
+            connection.guarded = True
+            self._connection = connection
             logger.info("ldap_connection_established")
         return self._connection
 
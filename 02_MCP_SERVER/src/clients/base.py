@@ -4,17 +4,26 @@ Client HTTP de base pour les appels API.
 Fournit une abstraction commune pour tous les clients API avec:
 - Gestion des sessions HTTP
 - Retry automatique
-- Logging structuré
+- Circuit breaker par service
+- Logging structuré et temps de réponse par endpoint
 - Gestion des erreurs
 """
 
+import re
+import time
 from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from typing import Any, Optional
+from urllib.parse import urlsplit
 
 import httpx
 import structlog
 
-from ..utils.retry import with_retry
+from ..config import settings
+from ..utils.circuit_breaker import get_circuit_breaker
+from ..utils.retry import RetryPolicy, get_retry_budget
+from .http_pool import http_pool
 
 logger = structlog.get_logger(__name__)
 
@@ -27,10 +36,12 @@ class APIError(Exception):
         message: str,
         status_code: Optional[int] = None,
         response_body: Optional[str] = None,
+        retry_after: Optional[float] = None,
     ):
         super().__init__(message)
         self.status_code = status_code
         self.response_body = response_body
+        self.retry_after = retry_after
 
 
 class AuthenticationError(APIError):
@@ -51,6 +62,58 @@ class RateLimitError(APIError):
     pass
 
 
+# Segments numériques remplacés pour regrouper les timings (Ticket/123 -> Ticket/{id})
+_ID_SEGMENT_RE = re.compile(r"/\d+(?=/|$)")
+
+# Temps de réponse par service puis par "METHODE endpoint"
+_endpoint_timings: dict[str, dict[str, dict[str, float]]] = {}
+
+
+def _record_timing(service: str, key: str, elapsed: float, error: bool) -> None:
+    """Cumule le temps d'un appel (retries inclus) pour son endpoint."""
+    timing = _endpoint_timings.setdefault(service, {}).setdefault(
+        key, {"calls": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0}
+    )
+    elapsed_ms = elapsed * 1000
+    timing["calls"] += 1
+    timing["errors"] += int(error)
+    timing["total_ms"] += elapsed_ms
+    timing["max_ms"] = max(timing["max_ms"], elapsed_ms)
+
+
+def endpoint_timing_stats() -> dict[str, Any]:
+    """Temps de réponse par service et endpoint (pour /metrics)."""
+    return {
+        service: {
+            key: {
+                "calls": int(t["calls"]),
+                "errors": int(t["errors"]),
+                "avg_ms": round(t["total_ms"] / t["calls"], 2),
+                "max_ms": round(t["max_ms"], 2),
+            }
+            for key, t in endpoints.items()
+        }
+        for service, endpoints in _endpoint_timings.items()
+    }
+
+
+def _parse_retry_after(response: httpx.Response) -> Optional[float]:
+    """Retry-After en secondes (format délai ou date HTTP), None si absent."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
 class BaseClient(ABC):
     """
     Client HTTP de base abstrait.
@@ -63,6 +126,7 @@ class BaseClient(ABC):
         base_url: str,
         timeout: float = 30.0,
         max_retries: int = 3,
+        service_name: Optional[str] = None,
     ):
         """
         Initialise le client.
@@ -71,28 +135,32 @@ class BaseClient(ABC):
             base_url: URL de base de l'API
             timeout: Timeout des requêtes en secondes
             max_retries: Nombre de retries sur erreur
+            service_name: Nom du service (pool HTTP partagé, métriques)
         """
         self.base_url = base_url.rstrip("/")
         self.timeout = timeout
         self.max_retries = max_retries
-        self._client: Optional[httpx.AsyncClient] = None
+        self.service_name = service_name or urlsplit(self.base_url).hostname or "default"
+        self.retry_policy = RetryPolicy(
+            max_attempts=max_retries,
+            base_delay=settings.retry_base_delay,
+            max_delay=settings.retry_max_delay,
+            budget=get_retry_budget(self.service_name),
+        )
+        self.circuit_breaker = get_circuit_breaker(self.service_name)
 
     @property
     def client(self) -> httpx.AsyncClient:
-        """Retourne le client HTTP (lazy initialization)."""
-        if self._client is None or self._client.is_closed:
-            self._client = httpx.AsyncClient(
-                base_url=self.base_url,
-                timeout=httpx.Timeout(self.timeout),
-                follow_redirects=True,
-            )
-        return self._client
+        """Retourne le client HTTP partagé du service (voir http_pool)."""
+        return http_pool.get_client(
+            self.service_name,
+            base_url=self.base_url,
+            timeout=self.timeout,
+        )
 
     async def close(self) -> None:
-        """Ferme le client HTTP."""
-        if self._client and not self._client.is_closed:
-            await self._client.aclose()
-            self._client = None
+        """Ferme le client HTTP (pool partagé: fermé à l'arrêt du serveur)."""
+        return None
 
     @abstractmethod
     def _get_headers(self) -> dict[str, str]:
@@ -135,15 +203,81 @@ class BaseClient(ABC):
                 "Rate limit exceeded",
                 status_code=status,
                 response_body=body,
+                retry_after=_parse_retry_after(response),
             )
         else:
             raise APIError(
                 f"API error {status}: {body}",
                 status_code=status,
                 response_body=body,
+                retry_after=_parse_retry_after(response),
+            )
+
+    async def _send(
+        self,
+        method: str,
+        url: str,
+        headers: Optional[dict[str, str]] = None,
+        **kwargs: Any,
+    ) -> httpx.Response:
+        """
+        Envoie une requête (une tentative) et lève APIError si échec HTTP.
+
+        Circuit ouvert: CircuitOpenError levée avant tout accès au pool.
+        """
+        with self.circuit_breaker.guard():
+            response = await self.client.request(
+                method,
+                url,
+                headers={**self._get_headers(), **(headers or {})},
+                **kwargs,
+            )
+            self._handle_error(response)
+        return response
+
+    async def _request(
+        self,
+        method: str,
+        endpoint: str,
+        idempotent: Optional[bool] = None,
+        **kwargs: Any,
+    ) -> httpx.Response:
+        """
+        Effectue une requête HTTP avec la politique de retry du client.
+
+        Args:
+            method: Méthode HTTP
+            endpoint: Endpoint relatif
+            idempotent: Retry autorisé sur erreurs ambiguës (défaut: tout sauf POST)
+            **kwargs: Arguments httpx (params, json, data, headers...)
+
+        Returns:
+            Réponse HTTP (succès)
+        """
+        endpoint = endpoint.lstrip("/")
+        url = f"{self.base_url}/{endpoint}"
+        logger.debug("http_request", method=method, url=url)
+
+        if idempotent is None:
+            idempotent = method.upper() != "POST"
+
+        timing_key = f"{method.upper()} {_ID_SEGMENT_RE.sub('/{id}', '/' + endpoint)[1:]}"
+        start = time.perf_counter()
+        error = True
+        try:
+            response = await self.retry_policy.run(
+                self._send,
+                method,
+                url,
+                idempotent=idempotent,
+                operation=f"{self.service_name}.{method.lower()}",
+                **kwargs,
             )
+            error = False
+            return response
+        finally:
+            _record_timing(self.service_name, timing_key, time.perf_counter() - start, error)
 
-    @with_retry(max_attempts=3)
     async def _get(
         self,
         endpoint: str,
@@ -159,19 +293,9 @@ class BaseClient(ABC):
         Returns:
             Réponse JSON
         """
-        url = f"{self.base_url}/{endpoint.lstrip('/')}"
-        logger.debug("http_get", url=url, params=params)
-
-        response = await self.client.get(
-            url,
-            params=params,
-            headers=self._get_headers(),
-        )
-
-        self._handle_error(response)
+        response = await self._request("GET", endpoint, params=params)
         return response.json()
 
-    @with_retry(max_attempts=3)
     async def _post(
         self,
         endpoint: str,
@@ -189,17 +313,7 @@ class BaseClient(ABC):
         Returns:
             Réponse JSON
         """
-        url = f"{self.base_url}/{endpoint.lstrip('/')}"
-        logger.debug("http_post", url=url)
-
-        response = await self.client.post(
-            url,
-            data=data,
-            json=json_data,
-            headers=self._get_headers(),
-        )
-
-        self._handle_error(response)
+        response = await self._request("POST", endpoint, data=data, json=json_data)
 
         # Certaines APIs retournent du vide sur succès
         if not response.text:
@@ -207,37 +321,18 @@ class BaseClient(ABC):
 
         return response.json()
 
-    @with_retry(max_attempts=3)
     async def _put(
         self,
         endpoint: str,
         json_data: Optional[dict[str, Any]] = None,
     ) -> Any:
         """Effectue une requête PUT."""
-        url = f"{self.base_url}/{endpoint.lstrip('/')}"
-        logger.debug("http_put", url=url)
-
-        response = await self.client.put(
-            url,
-            json=json_data,
-            headers=self._get_headers(),
-        )
-
-        self._handle_error(response)
+        response = await self._request("PUT", endpoint, json=json_data)
         return response.json() if response.text else {"success": True}
 
-    @with_retry(max_attempts=3)
     async def _delete(self, endpoint: str) -> Any:
         """Effectue une requête DELETE."""
-        url = f"{self.base_url}/{endpoint.lstrip('/')}"
-        logger.debug("http_delete", url=url)
-
-        response = await self.client.delete(
-            url,
-            headers=self._get_headers(),
-        )
-
-        self._handle_error(response)
+        response = await self._request("DELETE", endpoint)
         return response.json() if response.text else {"success": True}
 
     async def __aenter__(self) -> "BaseClient":
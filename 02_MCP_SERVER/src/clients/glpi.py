@@ -5,18 +5,274 @@ GLPI (Gestionnaire Libre de Parc Informatique) est utilisé pour:
 - Gestion des tickets de support
 - Base de données clients
 - Inventaire informatique
+
+Tous les appels passent par BaseClient._request (via _get/_post/_put):
+session ouverte à la demande et renouvelée si GLPI la rejette (401),
+retries, circuit breaker, temps de réponse par endpoint et erreurs
+APIError portant le code GLPI (ex: ERROR_ITEM_NOT_FOUND).
 """
 
-from typing import Any, Optional
+import asyncio
+from datetime import datetime, timedelta
+from itertools import combinations
+from typing import Any, AsyncIterator, Optional
 
+import httpx
 import structlog
 
 from ..config import settings
-from .base import BaseClient, NotFoundError
+from ..utils.html_text import html_to_text
+from .base import APIError, AuthenticationError, BaseClient, NotFoundError
+from .glpi_directory import directory_record, glpi_directory, parse_glpi_datetime
 
 logger = structlog.get_logger(__name__)
 
 
+# Champs de recherche GLPI (search options) de l'itemtype User
+USER_FIELD_LOGIN = 1
+USER_FIELD_ID = 2
+USER_FIELD_EMAIL = 5
+USER_FIELD_PHONE = 6
+USER_FIELD_IS_ACTIVE = 8
+USER_FIELD_FIRSTNAME = 9
+USER_FIELD_MOBILE = 11
+USER_FIELD_DATE_MOD = 19
+USER_FIELD_REALNAME = 34
+
+# Taille des lots d'écriture lors de la synchronisation de l'annuaire
+_DIRECTORY_BATCH_SIZE = 500
+
+# Champs de recherche GLPI de l'itemtype Ticket
+TICKET_FIELD_TITLE = 1
+TICKET_FIELD_ID = 2
+TICKET_FIELD_STATUS = 12
+TICKET_FIELD_DATE = 15
+TICKET_FIELD_SOLVEDATE = 17
+TICKET_FIELD_DATE_MOD = 19
+TICKET_FIELD_CONTENT = 21
+
+# Champs retournés par get_tickets_details (projection possible)
+TICKET_DETAIL_FIELDS: tuple[str, ...] = (
+    "title",
+    "description",
+    "status",
+    "priority",
+    "urgency",
+    "impact",
+    "date_creation",
+    "date_modification",
+    "followups",
+    "solution",
+    "history",
+)
+
+# Nombre maximum de tickets par appel à get_tickets_details
+_MAX_BATCH_TICKETS = 50
+
+# Plafond d'entrées par requête Ticket/<id>/Log
+_HISTORY_MAX_PAGE_SIZE = 1000
+
+# Flux de tickets: nom -> champ date servant de watermark
+# - new: création du ticket (quel que soit son statut actuel)
+# - resolved: résolution/clôture (statut Solved ou Closed)
+TICKET_FEEDS: dict[str, int] = {
+    "new": TICKET_FIELD_DATE,
+    "resolved": TICKET_FIELD_SOLVEDATE,
+}
+
+
+class GLPISearchQuery:
+    """
+    Constructeur de requêtes pour l'API de recherche GLPI (search/<itemtype>).
+
+    Gère les critères multiples (liens AND/OR, groupes imbriqués), les
+    projections forcedisplay, le tri et la pagination par range.
+
+    Usage:
+        query = (
+            GLPISearchQuery("Ticket")
+            .where(17, since, "morethan")
+            .where_group(
+                GLPISearchQuery("Ticket")
+                .where(12, 5, "equals")
+                .or_where(12, 6, "equals")
+            )
+            .display(2, 1, 12)
+        )
+        params = query.to_params(start=0, limit=50)
+    """
+
+    def __init__(self, itemtype: str) -> None:
+        self.itemtype = itemtype
+        self._criteria: list[dict[str, Any]] = []
+        self._display: list[int] = []
+        self._sort: Optional[tuple[int, str]] = None
+
+    def where(
+        self,
+        field: int,
+        value: Any,
+        searchtype: str = "contains",
+        link: str = "AND",
+    ) -> "GLPISearchQuery":
+        """Ajoute un critère (lien ignoré par GLPI pour le premier)."""
+        self._criteria.append({
+            "link": link,
+            "field": field,
+            "searchtype": searchtype,
+            "value": value,
+        })
+        return self
+
+    def or_where(
+        self,
+        field: int,
+        value: Any,
+        searchtype: str = "contains",
+    ) -> "GLPISearchQuery":
+        """Ajoute un critère lié par OR."""
+        return self.where(field, value, searchtype, link="OR")
+
+    def where_group(self, group: "GLPISearchQuery", link: str = "AND") -> "GLPISearchQuery":
+        """Ajoute un groupe de critères entre parenthèses."""
+        if group._criteria:
+            self._criteria.append({"link": link, "criteria": list(group._criteria)})
+        return self
+
+    def display(self, *fields: int) -> "GLPISearchQuery":
+        """Champs à retourner (forcedisplay), en plus des colonnes par défaut."""
+        for field in fields:
+            if field not in self._display:
+                self._display.append(field)
+        return self
+
+    def sort(self, field: int, order: str = "ASC") -> "GLPISearchQuery":
+        """Tri des résultats."""
+        self._sort = (field, order.upper())
+        return self
+
+    @property
+    def has_criteria(self) -> bool:
+        """Indique si au moins un critère est défini."""
+        return bool(self._criteria)
+
+    def to_params(self, start: int = 0, limit: int = 50) -> dict[str, Any]:
+        """
+        Paramètres de requête GLPI pour une page de résultats.
+
+        Args:
+            start: Index du premier résultat
+            limit: Nombre de résultats de la page
+
+        Returns:
+            Paramètres criteria[...], forcedisplay[...], sort, range
+        """
+        params: dict[str, Any] = {}
+        _flatten_criteria(self._criteria, "criteria", params)
+
+        for index, field in enumerate(self._display):
+            params[f"forcedisplay[{index}]"] = field
+
+        if self._sort:
+            params["sort"], params["order"] = self._sort
+
+        params["range"] = f"{start}-{start + max(1, limit) - 1}"
+        return params
+
+
+def _format_ticket(ticket: dict[str, Any]) -> dict[str, Any]:
+    """Champs d'un ticket GLPI (Ticket/<id>) exposés aux agents."""
+    return {
+        "found": True,
+        "ticket_id": ticket.get("id"),
+        "title": ticket.get("name"),
+        "description": ticket.get("content"),
+        "status": ticket.get("status"),
+        "priority": ticket.get("priority"),
+        "urgency": ticket.get("urgency"),
+        "impact": ticket.get("impact"),
+        "date_creation": ticket.get("date"),
+        "date_modification": ticket.get("date_mod"),
+    }
+
+
+def _pick_requester(
+    client_info: dict[str, Any],
+) -> tuple[Optional[int], list[dict[str, Any]]]:
+    """
+    Demandeur d'un ticket d'après le résultat de search_client.
+
+    Attribué seulement si la correspondance est sans ambiguïté: un seul
+    candidat exact (login, "prénom nom", email...), ou à défaut un seul
+    candidat au-dessus de GLPI_REQUESTER_MIN_SIMILARITY.
+
+    Returns:
+        (ID du demandeur ou None, candidats à proposer si non attribué)
+    """
+    if not client_info.get("found"):
+        return None, []
+
+    candidates = [client_info, *client_info.get("candidates", [])]
+    exact = [c for c in candidates if c.get("exact_match")]
+    if not exact:
+        exact = [
+            c for c in candidates
+            if (c.get("similarity") or 0) >= settings.glpi_requester_min_similarity
+        ]
+    if len(exact) == 1:
+        return exact[0]["client_id"], []
+
+    return None, [
+        {
+            "client_id": c.get("client_id"),
+            "client_name": c.get("client_name"),
+            "client_realname": c.get("client_realname"),
+            "client_firstname": c.get("client_firstname"),
+            "client_email": c.get("client_email"),
+        }
+        for c in candidates
+    ]
+
+
+def _format_log_entry(log: dict[str, Any]) -> dict[str, Any]:
+    """Entrée d'historique (Ticket/<id>/Log) exposée aux agents."""
+    return {
+        "id": log.get("id"),
+        "date": log.get("date_mod") or log.get("date_creation"),
+        "user": log.get("user_name"),
+        "field": log.get("id_search_option"),
+        "old_value": log.get("old_value"),
+        "new_value": log.get("new_value"),
+    }
+
+
+def _parse_content_range_total(value: Optional[str]) -> Optional[int]:
+    """Total d'un en-tête Content-Range GLPI ("0-49/1234")."""
+    if not value or "/" not in value:
+        return None
+    total = value.rsplit("/", 1)[1].strip()
+    return int(total) if total.isdigit() else None
+
+
+def _flatten_criteria(
+    criteria: list[dict[str, Any]],
+    prefix: str,
+    params: dict[str, Any],
+) -> None:
+    """Aplatit les critères (et groupes) au format criteria[i][...] de GLPI."""
+    for index, criterion in enumerate(criteria):
+        key = f"{prefix}[{index}]"
+        if index > 0:
+            params[f"{key}[link]"] = criterion["link"]
+
+        if "criteria" in criterion:
+            _flatten_criteria(criterion["criteria"], f"{key}[criteria]", params)
+        else:
+            params[f"{key}[field]"] = criterion["field"]
+            params[f"{key}[searchtype]"] = criterion["searchtype"]
+            params[f"{key}[value]"] = criterion["value"]
+
+
 class GLPIClient(BaseClient):
     """
     Client pour l'API REST GLPI.
@@ -28,8 +284,12 @@ class GLPIClient(BaseClient):
         super().__init__(
             base_url=settings.glpi_url,
             timeout=30.0,
+            service_name="glpi",
         )
         self._session_token: Optional[str] = None
+        self._session_lock = asyncio.Lock()
+        self._directory_sync_lock = asyncio.Lock()
+        self._directory_sync_task: Optional[asyncio.Task] = None
         self._app_token = settings.glpi_app_token.get_secret_value()
         self._user_token = settings.glpi_user_token.get_secret_value()
 
@@ -43,27 +303,79 @@ class GLPIClient(BaseClient):
             headers["Session-Token"] = self._session_token
         return headers
 
+    def _handle_error(self, response: httpx.Response) -> None:
+        """
+        Gère les erreurs HTTP en exposant le code d'erreur GLPI.
+
+        GLPI répond ["ERROR_CODE", "message"]: le message de l'APIError
+        devient "GLPI <status> ERROR_CODE: message".
+        """
+        try:
+            super()._handle_error(response)
+        except APIError as e:
+            try:
+                payload = response.json()
+            except ValueError:
+                payload = None
+
+            if isinstance(payload, list) and payload:
+                detail = ": ".join(str(part) for part in payload[:2])
+            else:
+                detail = e.response_body or ""
+            e.args = (f"GLPI {response.status_code} {detail}".strip(),)
+            raise
+
     async def _ensure_session(self) -> None:
-        """S'assure qu'une session est active."""
+        """S'assure qu'une session est active (une seule ouverture concurrente)."""
         if self._session_token:
             return
 
-        logger.info("glpi_init_session")
+        async with self._session_lock:
+            if self._session_token:
+                return
 
-        response = await self.client.get(
-            f"{self.base_url}/initSession",
-            headers={
-                "App-Token": self._app_token,
-                "Authorization": f"user_token {self._user_token}",
-            },
-        )
+            logger.info("glpi_init_session")
 
-        if not response.is_success:
-            raise Exception(f"GLPI session init failed: {response.status_code}")
+            response = await super()._request(
+                "GET",
+                "initSession",
+                headers={"Authorization": f"user_token {self._user_token}"},
+            )
 
-        data = response.json()
-        self._session_token = data.get("session_token")
-        logger.info("glpi_session_created", session_token=self._session_token[:10] + "...")
+            data = response.json()
+            self._session_token = data.get("session_token")
+            if not self._session_token:
+                raise APIError("GLPI session init failed: no session_token returned")
+            logger.info("glpi_session_created", session_token=self._session_token[:10] + "...")
+
+    async def _request(
+        self,
+        method: str,
+        endpoint: str,
+        idempotent: Optional[bool] = None,
+        **kwargs: Any,
+    ) -> httpx.Response:
+        """
+        Requête GLPI authentifiée.
+
+        Si GLPI rejette la session (401: expirée ou tuée côté serveur), une
+        nouvelle session est ouverte et la requête rejouée une fois. Le rejeu
+        est sûr même pour un POST: GLPI n'a rien traité.
+        """
+        await self._ensure_session()
+        session_token = self._session_token
+
+        try:
+            return await super()._request(method, endpoint, idempotent, **kwargs)
+        except AuthenticationError as e:
+            if e.status_code != 401:
+                raise
+
+            logger.info("glpi_session_expired", endpoint=endpoint)
+            if self._session_token == session_token:
+                self._session_token = None
+            await self._ensure_session()
+            return await super()._request(method, endpoint, idempotent, **kwargs)
 
     async def kill_session(self) -> None:
         """Termine la session GLPI."""
@@ -71,10 +383,7 @@ class GLPIClient(BaseClient):
             return
 
         try:
-            await self.client.get(
-                f"{self.base_url}/killSession",
-                headers=self._get_headers(),
-            )
+            await super()._request("GET", "killSession")
             logger.info("glpi_session_killed")
         except Exception as e:
             logger.warning("glpi_session_kill_failed", error=str(e))
@@ -85,97 +394,338 @@ class GLPIClient(BaseClient):
     # Opérations sur les clients/utilisateurs
     # =========================================================================
 
+    async def search(
+        self,
+        query: GLPISearchQuery,
+        start: int = 0,
+        limit: int = 50,
+    ) -> dict[str, Any]:
+        """
+        Exécute une page de recherche GLPI.
+
+        Args:
+            query: Requête de recherche
+            start: Index du premier résultat
+            limit: Taille de la page
+
+        Returns:
+            {"totalcount", "count", "start", "data"} (lignes indexées par n° de champ)
+        """
+        data = await self._get(f"search/{query.itemtype}", params=query.to_params(start, limit))
+        rows = data.get("data") or []
+        return {
+            "totalcount": int(data.get("totalcount", len(rows))),
+            "count": len(rows),
+            "start": start,
+            "data": rows,
+        }
+
+    async def iter_search(
+        self,
+        query: GLPISearchQuery,
+        page_size: Optional[int] = None,
+        max_items: Optional[int] = None,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """
+        Parcourt tous les résultats d'une recherche, page par page.
+
+        Les pages sont demandées au fil de la consommation: un gros résultat
+        n'est jamais chargé en entier en mémoire.
+
+        Args:
+            query: Requête de recherche
+            page_size: Résultats par requête (défaut: GLPI_SEARCH_PAGE_SIZE)
+            max_items: Nombre maximum de résultats à produire
+        """
+        page_size = page_size or settings.glpi_search_page_size
+        start = 0
+        produced = 0
+
+        while max_items is None or produced < max_items:
+            limit = page_size if max_items is None else min(page_size, max_items - produced)
+            page = await self.search(query, start=start, limit=limit)
+
+            for row in page["data"]:
+                yield row
+            produced += page["count"]
+            start += page["count"]
+
+            # GLPI répond 400 (ERROR_RANGE_EXCEED_TOTAL) au-delà du total
+            if page["count"] == 0 or start >= page["totalcount"]:
+                return
+
     async def search_client(
         self,
         name: Optional[str] = None,
         email: Optional[str] = None,
         phone: Optional[str] = None,
+        limit: int = 5,
     ) -> dict[str, Any]:
         """
         Recherche un client/utilisateur dans GLPI.
 
+        Servie par l'annuaire local (glpi_user_directory) quand il est
+        synchronisé: pas d'aller-retour GLPI. Sinon, ou si l'annuaire ne
+        trouve rien (utilisateur créé depuis la dernière synchro), GLPI est
+        interrogé par niveaux: d'abord tous les critères en AND, puis
+        chaque combinaison d'un critère de moins, jusqu'à un seul critère.
+        Les résultats sont classés par nombre de critères satisfaits: le
+        meilleur candidat est retourné, les suivants dans "candidates".
+
         Args:
-            name: Nom du client (recherche partielle)
+            name: Nom du client (login, nom ou prénom, recherche partielle)
             email: Email du client
             phone: Téléphone du client
+            limit: Nombre maximum de candidats retournés
 
         Returns:
-            Informations du client trouvé ou None
+            Informations du client trouvé et autres candidats
         """
-        await self._ensure_session()
-
-        # Construire les critères de recherche
-        criteria = []
+        # Critère -> champs GLPI où il peut apparaître
+        terms: list[tuple[str, tuple[int, ...]]] = []
         search_fields = []
 
         if name:
-            # Field 1 = name dans User
-            criteria.append({
-                "field": 1,
-                "searchtype": "contains",
-                "value": name,
-            })
+            terms.append((name, (USER_FIELD_LOGIN, USER_FIELD_REALNAME, USER_FIELD_FIRSTNAME)))
             search_fields.append(f"name={name}")
-
         if email:
-            # Field 5 = email dans User
-            criteria.append({
-                "field": 5,
-                "searchtype": "contains",
-                "value": email,
-            })
+            terms.append((email, (USER_FIELD_EMAIL,)))
             search_fields.append(f"email={email}")
-
         if phone:
-            # Field 6 = phone dans User
-            criteria.append({
-                "field": 6,
-                "searchtype": "contains",
-                "value": phone,
-            })
+            terms.append((phone, (USER_FIELD_PHONE,)))
             search_fields.append(f"phone={phone}")
 
-        if not criteria:
+        if not terms:
             return {"found": False, "error": "No search criteria provided"}
 
+        self._schedule_directory_sync()
+        try:
+            local = await glpi_directory.lookup(name=name, email=email, phone=phone, limit=limit)
+        except Exception as e:
+            logger.warning("glpi_directory_lookup_failed", error=str(e))
+            local = None
+
+        if local:
+            logger.info("glpi_search_client", criteria=search_fields, source="directory")
+            return {
+                "found": True,
+                **local[0],
+                "criteria_count": len(terms),
+                "candidates": local[1:],
+                "source": "directory",
+            }
+
+        # Un groupe par critère: (login OR nom OR prénom), (email), (téléphone)
+        groups = []
+        for value, fields in terms:
+            group = GLPISearchQuery("User")
+            for field in fields:
+                group.or_where(field, value)
+            groups.append(group)
+
         logger.info("glpi_search_client", criteria=search_fields)
 
-        # Effectuer la recherche
+        wanted = max(limit, 1)
+        found: dict[Any, dict[str, Any]] = {}
         try:
-            params = {
-                "criteria[0][field]": criteria[0]["field"],
-                "criteria[0][searchtype]": criteria[0]["searchtype"],
-                "criteria[0][value]": criteria[0]["value"],
-            }
+            # Chaque ligne du niveau `size` satisfait au moins `size` critères:
+            # une fois `limit` candidats réunis à la fin d'un niveau, aucun
+            # utilisateur non lu ne peut mieux se classer
+            for size in range(len(groups), 0, -1):
+                for combo in combinations(groups, size):
+                    query = GLPISearchQuery("User").display(
+                        USER_FIELD_LOGIN,
+                        USER_FIELD_ID,
+                        USER_FIELD_EMAIL,
+                        USER_FIELD_PHONE,
+                        USER_FIELD_FIRSTNAME,
+                        USER_FIELD_REALNAME,
+                    ).where(USER_FIELD_IS_ACTIVE, 1, "equals")
+                    for group in combo:
+                        query.where_group(group)
+                    async for row in self.iter_search(query, max_items=wanted):
+                        found.setdefault(row.get(str(USER_FIELD_ID)), row)
+                if len(found) >= wanted:
+                    break
+        except Exception as e:
+            logger.exception("glpi_search_client_error", error=str(e))
+            return {"found": False, "error": str(e)}
 
-            response = await self.client.get(
-                f"{self.base_url}/search/User",
-                params=params,
-                headers=self._get_headers(),
-            )
+        rows = list(found.values())
 
-            if not response.is_success:
-                return {"found": False, "error": f"Search failed: {response.status_code}"}
+        if not rows:
+            return {"found": False, "message": "No client found"}
 
-            data = response.json()
-            results = data.get("data", [])
+        def score(row: dict[str, Any]) -> int:
+            return sum(
+                any(value.lower() in str(row.get(str(field)) or "").lower() for field in fields)
+                for value, fields in terms
+            )
 
-            if not results:
-                return {"found": False, "message": "No client found"}
+        def exact_match(row: dict[str, Any]) -> bool:
+            """Login, "prénom nom", "nom prénom" ou email identique."""
+            first = str(row.get(str(USER_FIELD_FIRSTNAME)) or "")
+            real = str(row.get(str(USER_FIELD_REALNAME)) or "")
+            names = {str(row.get(str(USER_FIELD_LOGIN)) or ""), f"{first} {real}", f"{real} {first}"}
+            emails = str(row.get(str(USER_FIELD_EMAIL)) or "").split("$#$")
+            return bool(
+                (name and name.strip().lower() in {n.strip().lower() for n in names})
+                or (email and email.strip().lower() in {e.strip().lower() for e in emails})
+            )
 
-            # Prendre le premier résultat
-            client = results[0]
-            return {
-                "found": True,
-                "client_id": client.get("2"),  # ID
-                "client_name": client.get("1"),  # Name
-                "client_email": client.get("5", ""),  # Email
-                "client_phone": client.get("6", ""),  # Phone
+        ranked = sorted(rows, key=score, reverse=True)[:wanted]
+        candidates = [
+            {
+                "client_id": row.get(str(USER_FIELD_ID)),
+                "client_name": row.get(str(USER_FIELD_LOGIN)),
+                "client_realname": row.get(str(USER_FIELD_REALNAME)),
+                "client_firstname": row.get(str(USER_FIELD_FIRSTNAME)),
+                "client_email": row.get(str(USER_FIELD_EMAIL)) or "",
+                "client_phone": row.get(str(USER_FIELD_PHONE)) or "",
+                "matched_criteria": score(row),
+                "exact_match": exact_match(row),
             }
+            for row in ranked
+        ]
+
+        return {
+            "found": True,
+            **candidates[0],
+            "criteria_count": len(terms),
+            "candidates": candidates[1:],
+            "source": "glpi",
+        }
+
+    # =========================================================================
+    # Annuaire local des utilisateurs (glpi_user_directory)
+    # =========================================================================
+
+    async def sync_user_directory(self, full: bool = False) -> dict[str, Any]:
+        """
+        Synchronise l'annuaire local depuis GLPI.
+
+        Incrémentale par défaut: seuls les utilisateurs modifiés depuis la
+        dernière date_mod vue sont lus. La synchro complète relit tout et
+        purge les utilisateurs supprimés de GLPI.
+
+        Pagination par clé (date_mod) plutôt que par range: un utilisateur
+        modifié pendant la synchro passe en fin de tri et décalerait toutes
+        les pages suivantes (un utilisateur jamais lu, puis purgé). Chaque
+        page repart de la dernière date_mod vue; les IDs déjà lus à cette
+        seconde sont ignorés.
+
+        Args:
+            full: Synchronisation complète
+
+        Returns:
+            Nombre d'utilisateurs synchronisés / purgés
+        """
+        async with self._directory_sync_lock:
+            await glpi_directory.initialize()
+            started_at = await glpi_directory.db_now()
+            last_date_mod = None if full else glpi_directory.last_date_mod
+            page_size = settings.glpi_search_page_size
+
+            batch: list[tuple[Any, ...]] = []
+            synced = 0
+            # IDs lus à la date last_date_mod (ou sans date_mod, triés en tête)
+            seen: set[int] = set()
+            start = 0
+
+            while True:
+                page = await self.search(
+                    self._user_directory_query(last_date_mod), start=start, limit=page_size
+                )
+                advanced = False
+
+                for row in page["data"]:
+                    if not row.get(str(USER_FIELD_ID)):
+                        continue
+
+                    record = directory_record({
+                        "id": row.get(str(USER_FIELD_ID)),
+                        "login": row.get(str(USER_FIELD_LOGIN)),
+                        "firstname": row.get(str(USER_FIELD_FIRSTNAME)),
+                        "realname": row.get(str(USER_FIELD_REALNAME)),
+                        "email": row.get(str(USER_FIELD_EMAIL)),
+                        "phone": row.get(str(USER_FIELD_PHONE)),
+                        "mobile": row.get(str(USER_FIELD_MOBILE)),
+                        "is_active": row.get(str(USER_FIELD_IS_ACTIVE), 1),
+                        "date_mod": row.get(str(USER_FIELD_DATE_MOD)),
+                    })
+                    user_id, date_mod = record[0], record[-1]
+                    if date_mod and (last_date_mod is None or date_mod > last_date_mod):
+                        last_date_mod = date_mod
+                        seen = set()
+                        advanced = True
+                    elif user_id in seen:
+                        continue
+                    seen.add(user_id)
+
+                    batch.append(record)
+                    if len(batch) >= _DIRECTORY_BATCH_SIZE:
+                        synced += await glpi_directory.upsert_users(batch)
+                        batch = []
+
+                # GLPI répond 400 (ERROR_RANGE_EXCEED_TOTAL) au-delà du total
+                if page["count"] < page_size or start + page["count"] >= page["totalcount"]:
+                    break
+                # Nouvelle date_mod: la page suivante repart de là. Sinon la page
+                # entière partageait la même seconde (ou aucune date): décalage
+                start = 0 if advanced else start + page["count"]
+
+            synced += await glpi_directory.upsert_users(batch)
+            purged = await glpi_directory.record_sync(last_date_mod, started_at, full=full)
+
+        logger.info("glpi_directory_synced", full=full, synced=synced, purged=purged)
+
+        return {
+            "success": True,
+            "full": full,
+            "synced": synced,
+            "purged": purged,
+            "last_date_mod": last_date_mod.isoformat() if last_date_mod else None,
+        }
+
+    @staticmethod
+    def _user_directory_query(since: Optional[datetime]) -> GLPISearchQuery:
+        """Utilisateurs par date_mod croissante, à partir de la seconde `since`."""
+        query = GLPISearchQuery("User").display(
+            USER_FIELD_LOGIN,
+            USER_FIELD_ID,
+            USER_FIELD_EMAIL,
+            USER_FIELD_PHONE,
+            USER_FIELD_IS_ACTIVE,
+            USER_FIELD_FIRSTNAME,
+            USER_FIELD_MOBILE,
+            USER_FIELD_DATE_MOD,
+            USER_FIELD_REALNAME,
+        ).sort(USER_FIELD_DATE_MOD, "ASC")
+
+        if since:
+            # date_mod est à la seconde: "morethan" since - 1 s = ">= since"
+            query.where(
+                USER_FIELD_DATE_MOD,
+                (since - timedelta(seconds=1)).strftime("%Y-%m-%d %H:%M:%S"),
+                "morethan",
+            )
+        return query
 
+    def _schedule_directory_sync(self) -> None:
+        """Lance une synchro incrémentale en arrière-plan si l'annuaire est périmé."""
+        if not settings.glpi_directory_enabled or not glpi_directory.is_stale():
+            return
+        if self._directory_sync_task is not None and not self._directory_sync_task.done():
+            return
+
+        self._directory_sync_task = asyncio.create_task(self._background_directory_sync())
+
+    async def _background_directory_sync(self) -> None:
+        """Synchro d'arrière-plan (erreurs journalisées, jamais propagées)."""
+        try:
+            await self.sync_user_directory()
         except Exception as e:
-            logger.exception("glpi_search_client_error", error=str(e))
-            return {"found": False, "error": str(e)}
+            logger.warning("glpi_directory_sync_failed", error=str(e))
 
     # =========================================================================
     # Opérations sur les tickets
@@ -206,13 +756,11 @@ class GLPIClient(BaseClient):
         Returns:
             Informations du ticket créé
         """
-        await self._ensure_session()
-
         logger.info("glpi_create_ticket", title=title, client_name=client_name)
 
-        # Rechercher le client
+        # Rechercher le client (demandeur attribué seulement si non ambigu)
         client_info = await self.search_client(name=client_name)
-        requester_id = client_info.get("client_id") if client_info.get("found") else None
+        requester_id, requester_candidates = _pick_requester(client_info)
 
         # Préparer les données du ticket
         ticket_input: dict[str, Any] = {
@@ -232,27 +780,26 @@ class GLPIClient(BaseClient):
             ticket_input["itilcategories_id"] = category_id
 
         # Créer le ticket
-        response = await self.client.post(
-            f"{self.base_url}/Ticket",
-            json={"input": ticket_input},
-            headers=self._get_headers(),
-        )
-
-        if not response.is_success:
-            error_msg = response.text[:200] if response.text else "Unknown error"
-            logger.error("glpi_create_ticket_failed", error=error_msg)
-            return {"success": False, "error": error_msg}
+        try:
+            data = await self._post("Ticket", json_data={"input": ticket_input})
+        except APIError as e:
+            logger.error("glpi_create_ticket_failed", error=str(e))
+            return {"success": False, "error": str(e)}
 
-        data = response.json()
         ticket_id = data.get("id")
 
-        logger.info("glpi_ticket_created", ticket_id=ticket_id)
+        logger.info("glpi_ticket_created", ticket_id=ticket_id, requester_id=requester_id)
 
-        return {
+        result: dict[str, Any] = {
             "success": True,
             "ticket_id": ticket_id,
+            "requester_id": requester_id,
             "message": f"Ticket #{ticket_id} créé avec succès",
         }
+        if requester_candidates:
+            # Plusieurs clients possibles: demandeur à choisir par l'appelant
+            result["requester_candidates"] = requester_candidates
+        return result
 
     async def get_ticket_details(self, ticket_id: int) -> dict[str, Any]:
         """
@@ -264,61 +811,119 @@ class GLPIClient(BaseClient):
         Returns:
             Détails du ticket
         """
-        await self._ensure_session()
-
         logger.info("glpi_get_ticket", ticket_id=ticket_id)
 
         try:
-            response = await self.client.get(
-                f"{self.base_url}/Ticket/{ticket_id}",
-                headers=self._get_headers(),
+            # Ticket et followups en parallèle
+            ticket, followups = await asyncio.gather(
+                self._get(f"Ticket/{ticket_id}"),
+                self._get_ticket_followups(ticket_id),
             )
+            return {**_format_ticket(ticket), "followups": followups}
 
-            if response.status_code == 404:
-                return {"found": False, "error": f"Ticket #{ticket_id} not found"}
+        except NotFoundError:
+            return {"found": False, "error": f"Ticket #{ticket_id} not found"}
+        except Exception as e:
+            logger.exception("glpi_get_ticket_error", error=str(e))
+            return {"found": False, "error": str(e)}
 
-            if not response.is_success:
-                return {"found": False, "error": f"Error: {response.status_code}"}
+    async def get_tickets_details(
+        self,
+        ticket_ids: list[int],
+        fields: Optional[list[str]] = None,
+    ) -> dict[str, Any]:
+        """
+        Récupère les détails de plusieurs tickets en parallèle.
 
-            ticket = response.json()
+        Ticket, followups, solution et historique de chaque ticket sont
+        demandés simultanément; un sémaphore commun plafonne le nombre de
+        requêtes GLPI en vol (GLPI_BATCH_CONCURRENCY). Les sous-ressources
+        absentes de la projection ne sont pas demandées.
 
-            # Récupérer aussi les followups
-            followups = await self._get_ticket_followups(ticket_id)
+        Args:
+            ticket_ids: IDs des tickets (doublons ignorés)
+            fields: Champs à retourner (défaut: tous, voir TICKET_DETAIL_FIELDS)
 
+        Returns:
+            Tickets dans l'ordre demandé, avec "found" par ticket
+        """
+        ids = list(dict.fromkeys(int(i) for i in ticket_ids))
+        if len(ids) > _MAX_BATCH_TICKETS:
             return {
-                "found": True,
-                "ticket_id": ticket.get("id"),
-                "title": ticket.get("name"),
-                "description": ticket.get("content"),
-                "status": ticket.get("status"),
-                "priority": ticket.get("priority"),
-                "urgency": ticket.get("urgency"),
-                "impact": ticket.get("impact"),
-                "date_creation": ticket.get("date"),
-                "date_modification": ticket.get("date_mod"),
-                "followups": followups,
+                "success": False,
+                "error": f"Trop de tickets ({len(ids)}), maximum {_MAX_BATCH_TICKETS} par appel",
             }
 
-        except Exception as e:
-            logger.exception("glpi_get_ticket_error", error=str(e))
-            return {"found": False, "error": str(e)}
+        wanted = set(fields or TICKET_DETAIL_FIELDS)
+        unknown = wanted - set(TICKET_DETAIL_FIELDS)
+        if unknown:
+            return {
+                "success": False,
+                "error": f"Champs inconnus: {', '.join(sorted(unknown))}",
+            }
 
-    async def _get_ticket_followups(self, ticket_id: int) -> list[dict[str, Any]]:
-        """Récupère les followups d'un ticket."""
-        try:
-            response = await self.client.get(
-                f"{self.base_url}/Ticket/{ticket_id}/ITILFollowup",
-                headers=self._get_headers(),
+        semaphore = asyncio.Semaphore(max(1, settings.glpi_batch_concurrency))
+
+        async def limited(coro: Any) -> Any:
+            async with semaphore:
+                return await coro
+
+        async def fetch_one(ticket_id: int) -> dict[str, Any]:
+            calls = {"ticket": self._get(f"Ticket/{ticket_id}")}
+            if "followups" in wanted:
+                calls["followups"] = self._get_ticket_followups(ticket_id)
+            if "solution" in wanted:
+                calls["solution"] = self._get_ticket_solution(ticket_id)
+            if "history" in wanted:
+                calls["history"] = self.get_ticket_history(ticket_id)
+
+            results = await asyncio.gather(
+                *(limited(coro) for coro in calls.values()),
+                return_exceptions=True,
             )
+            parts = dict(zip(calls, results, strict=True))
+
+            ticket = parts.pop("ticket")
+            if isinstance(ticket, NotFoundError):
+                return {"ticket_id": ticket_id, "found": False, "error": f"Ticket #{ticket_id} not found"}
+            if isinstance(ticket, BaseException):
+                return {"ticket_id": ticket_id, "found": False, "error": str(ticket)}
+
+            details = _format_ticket(ticket)
+            for name, value in parts.items():
+                if isinstance(value, BaseException):
+                    value = None
+                elif name == "history":
+                    value = value.get("history", []) if value.get("success") else None
+                details[name] = value
+
+            return {
+                key: value
+                for key, value in details.items()
+                if key in wanted or key in ("found", "ticket_id")
+            }
+
+        tickets = await asyncio.gather(*(fetch_one(ticket_id) for ticket_id in ids))
+        found = sum(1 for t in tickets if t.get("found"))
 
-            if not response.is_success:
-                return []
+        logger.info("glpi_get_tickets_details", requested=len(ids), found=found)
+
+        return {
+            "success": True,
+            "count": len(tickets),
+            "found": found,
+            "tickets": tickets,
+        }
 
-            followups = response.json()
+    async def _get_ticket_followups(self, ticket_id: int) -> list[dict[str, Any]]:
+        """Récupère les followups d'un ticket."""
+        try:
+            followups = await self._get(f"Ticket/{ticket_id}/ITILFollowup")
             return [
                 {
                     "id": f.get("id"),
-                    "content": f.get("content"),
+                    # Contenu GLPI (HTML échappé) rendu en texte lisible
+                    "content": html_to_text(f.get("content"), keep_newlines=True),
                     "date": f.get("date"),
                     "is_private": f.get("is_private", 0) == 1,
                 }
@@ -344,28 +949,23 @@ class GLPIClient(BaseClient):
         Returns:
             Résultat de l'ajout
         """
-        await self._ensure_session()
-
         logger.info("glpi_add_followup", ticket_id=ticket_id, is_private=is_private)
 
-        response = await self.client.post(
-            f"{self.base_url}/Ticket/{ticket_id}/ITILFollowup",
-            json={
-                "input": {
-                    "content": content,
-                    "is_private": 1 if is_private else 0,
-                    "itemtype": "Ticket",
-                    "items_id": ticket_id,
-                }
-            },
-            headers=self._get_headers(),
-        )
-
-        if not response.is_success:
-            error_msg = response.text[:200] if response.text else "Unknown error"
-            return {"success": False, "error": error_msg}
+        try:
+            data = await self._post(
+                f"Ticket/{ticket_id}/ITILFollowup",
+                json_data={
+                    "input": {
+                        "content": content,
+                        "is_private": 1 if is_private else 0,
+                        "itemtype": "Ticket",
+                        "items_id": ticket_id,
+                    }
+                },
+            )
+        except APIError as e:
+            return {"success": False, "error": str(e)}
 
-        data = response.json()
         followup_id = data.get("id")
 
         logger.info("glpi_followup_added", ticket_id=ticket_id, followup_id=followup_id)
@@ -391,8 +991,6 @@ class GLPIClient(BaseClient):
         Returns:
             Résultat de la mise à jour
         """
-        await self._ensure_session()
-
         status_names = {
             1: "New",
             2: "Assigned",
@@ -409,15 +1007,10 @@ class GLPIClient(BaseClient):
             status_name=status_names.get(status, "Unknown"),
         )
 
-        response = await self.client.put(
-            f"{self.base_url}/Ticket/{ticket_id}",
-            json={"input": {"status": status}},
-            headers=self._get_headers(),
-        )
-
-        if not response.is_success:
-            error_msg = response.text[:200] if response.text else "Unknown error"
-            return {"success": False, "error": error_msg}
+        try:
+            await self._put(f"Ticket/{ticket_id}", json_data={"input": {"status": status}})
+        except APIError as e:
+            return {"success": False, "error": str(e)}
 
         return {
             "success": True,
@@ -441,27 +1034,25 @@ class GLPIClient(BaseClient):
         Returns:
             Résultat de la clôture
         """
-        await self._ensure_session()
-
         logger.info("glpi_close_ticket", ticket_id=ticket_id)
 
         # Ajouter la solution
-        solution_response = await self.client.post(
-            f"{self.base_url}/Ticket/{ticket_id}/ITILSolution",
-            json={
-                "input": {
-                    "content": solution,
-                    "itemtype": "Ticket",
-                    "items_id": ticket_id,
-                    "status": 2,  # Accepted
-                }
-            },
-            headers=self._get_headers(),
-        )
-
-        if not solution_response.is_success:
-            error_msg = solution_response.text[:200] if solution_response.text else "Unknown error"
-            logger.warning("glpi_solution_failed", error=error_msg)
+        solution_added = True
+        try:
+            await self._post(
+                f"Ticket/{ticket_id}/ITILSolution",
+                json_data={
+                    "input": {
+                        "content": solution,
+                        "itemtype": "Ticket",
+                        "items_id": ticket_id,
+                        "status": 2,  # Accepted
+                    }
+                },
+            )
+        except APIError as e:
+            solution_added = False
+            logger.warning("glpi_solution_failed", error=str(e))
 
         # Mettre le statut à Closed
         status_result = await self.update_ticket_status(ticket_id, 6)
@@ -470,7 +1061,7 @@ class GLPIClient(BaseClient):
             "success": True,
             "ticket_id": ticket_id,
             "message": f"Ticket #{ticket_id} closed",
-            "solution_added": solution_response.is_success,
+            "solution_added": solution_added,
         }
 
     async def search_new_tickets(
@@ -488,37 +1079,20 @@ class GLPIClient(BaseClient):
         Returns:
             Liste des tickets récents
         """
-        await self._ensure_session()
-
         logger.info("glpi_search_new_tickets", minutes_since=minutes_since, limit=limit)
 
         from datetime import datetime, timedelta
 
         since = (datetime.utcnow() - timedelta(minutes=minutes_since)).strftime("%Y-%m-%d %H:%M:%S")
 
-        try:
-            params = {
-                "criteria[0][field]": 15,  # date de création
-                "criteria[0][searchtype]": "morethan",
-                "criteria[0][value]": since,
-                "criteria[1][field]": 12,  # status
-                "criteria[1][searchtype]": "equals",
-                "criteria[1][value]": 1,  # New
-                "criteria[1][link]": "AND",
-                "range": f"0-{limit - 1}",
-            }
-
-            response = await self.client.get(
-                f"{self.base_url}/search/Ticket",
-                params=params,
-                headers=self._get_headers(),
-            )
-
-            if not response.is_success:
-                return {"success": False, "tickets": [], "error": f"Error: {response.status_code}"}
+        query = (
+            GLPISearchQuery("Ticket")
+            .where(15, since, "morethan")  # date de création
+            .where(12, 1, "equals")  # status = New
+        )
 
-            data = response.json()
-            tickets = data.get("data", [])
+        try:
+            tickets = [row async for row in self.iter_search(query, max_items=limit)]
 
             return {
                 "success": True,
@@ -555,70 +1129,34 @@ class GLPIClient(BaseClient):
         Returns:
             Liste des tickets résolus avec leurs solutions
         """
-        await self._ensure_session()
-
         logger.info("glpi_get_resolved_tickets", hours_since=hours_since, limit=limit)
 
         from datetime import datetime, timedelta
 
         since = (datetime.utcnow() - timedelta(hours=hours_since)).strftime("%Y-%m-%d %H:%M:%S")
 
-        try:
-            # Rechercher les tickets résolus (status=5) ou clôturés (status=6)
-            params = {
-                "criteria[0][field]": 17,  # date de résolution/clôture
-                "criteria[0][searchtype]": "morethan",
-                "criteria[0][value]": since,
-                "criteria[1][field]": 12,  # status
-                "criteria[1][searchtype]": "equals",
-                "criteria[1][value]": 5,  # Solved
-                "criteria[1][link]": "AND",
-                "criteria[2][field]": 12,  # status
-                "criteria[2][searchtype]": "equals",
-                "criteria[2][value]": 6,  # Closed
-                "criteria[2][link]": "OR",
-                "range": f"0-{limit - 1}",
-                "forcedisplay[0]": 2,   # ID
-                "forcedisplay[1]": 1,   # Title
-                "forcedisplay[2]": 21,  # Content
-                "forcedisplay[3]": 12,  # Status
-                "forcedisplay[4]": 17,  # Solve date
-            }
-
-            response = await self.client.get(
-                f"{self.base_url}/search/Ticket",
-                params=params,
-                headers=self._get_headers(),
+        # Résolus (5) ou clôturés (6) depuis `since`: le OR est groupé, sinon
+        # GLPI évalue (date AND résolu) OR clôturé et remonte tout l'historique
+        query = (
+            GLPISearchQuery("Ticket")
+            .where(17, since, "morethan")  # date de résolution/clôture
+            .where_group(
+                GLPISearchQuery("Ticket")
+                .where(12, 5, "equals")  # Solved
+                .or_where(12, 6, "equals")  # Closed
             )
+            .display(2, 1, 21, 12, 17)  # ID, titre, contenu, statut, date de résolution
+        )
 
-            if not response.is_success:
-                return {"success": False, "tickets": [], "error": f"Error: {response.status_code}"}
-
-            data = response.json()
-            raw_tickets = data.get("data", [])
+        try:
+            raw_tickets = [row async for row in self.iter_search(query, max_items=limit)]
 
             # Récupérer les détails complets avec solutions pour chaque ticket
             enriched_tickets = []
             for t in raw_tickets:
-                ticket_id = t.get("2")
-                if not ticket_id:
+                if not t.get("2"):
                     continue
-
-                # Récupérer la solution du ticket
-                solution = await self._get_ticket_solution(int(ticket_id))
-
-                # Récupérer les détails complets
-                details = await self.get_ticket_details(int(ticket_id))
-
-                enriched_tickets.append({
-                    "id": ticket_id,
-                    "title": t.get("1", ""),
-                    "description": details.get("description", ""),
-                    "status": t.get("12"),
-                    "solve_date": t.get("17"),
-                    "solution": solution,
-                    "followups": details.get("followups", []),
-                })
+                enriched_tickets.append(await self._enrich_resolved_ticket(t))
 
             logger.info("glpi_resolved_tickets_found", count=len(enriched_tickets))
 
@@ -633,18 +1171,157 @@ class GLPIClient(BaseClient):
             logger.exception("glpi_get_resolved_tickets_error", error=str(e))
             return {"success": False, "tickets": [], "error": str(e)}
 
-    async def _get_ticket_solution(self, ticket_id: int) -> Optional[str]:
-        """Récupère la solution d'un ticket."""
-        try:
-            response = await self.client.get(
-                f"{self.base_url}/Ticket/{ticket_id}/ITILSolution",
-                headers=self._get_headers(),
+    async def _enrich_resolved_ticket(self, row: dict[str, Any]) -> dict[str, Any]:
+        """Complète une ligne de recherche (ticket résolu) avec solution et followups."""
+        ticket_id = row.get("2")
+
+        # Récupérer la solution du ticket
+        solution = await self._get_ticket_solution(int(ticket_id))
+
+        # Récupérer les détails complets
+        details = await self.get_ticket_details(int(ticket_id))
+
+        return {
+            "id": ticket_id,
+            "title": row.get("1", ""),
+            "description": details.get("description", ""),
+            "status": row.get("12"),
+            "solve_date": row.get("17"),
+            "solution": solution,
+            "followups": details.get("followups", []),
+        }
+
+    @staticmethod
+    def _ticket_feed_query(feed: str) -> GLPISearchQuery:
+        """Requête de base d'un flux (tickets résolus/clos seulement pour "resolved")."""
+        query = GLPISearchQuery("Ticket")
+        if feed == "resolved":
+            query.where_group(
+                GLPISearchQuery("Ticket")
+                .where(TICKET_FIELD_STATUS, 5, "equals")  # Solved
+                .or_where(TICKET_FIELD_STATUS, 6, "equals")  # Closed
             )
+        return query
+
+    async def latest_feed_date(self, feed: str) -> Optional[datetime]:
+        """
+        Date du ticket le plus récent d'un flux, dans l'heure de GLPI.
 
-            if not response.is_success:
-                return None
+        Sert de référence au curseur d'un nouveau consommateur: l'horloge
+        (et le fuseau) de PostgreSQL peuvent différer de ceux de GLPI.
 
-            solutions = response.json()
+        Args:
+            feed: Nom du flux (voir TICKET_FEEDS)
+
+        Returns:
+            Date la plus récente, ou None si le flux est vide
+        """
+        date_field = TICKET_FEEDS[feed]
+        query = (
+            self._ticket_feed_query(feed)
+            .display(TICKET_FIELD_ID, date_field)
+            .sort(date_field, "DESC")
+        )
+        page = await self.search(query, start=0, limit=1)
+        if not page["data"]:
+            return None
+        return parse_glpi_datetime(page["data"][0].get(str(date_field)))
+
+    async def fetch_ticket_changes(
+        self,
+        feed: str,
+        after_date: datetime,
+        after_id: int = 0,
+        limit: int = 50,
+        include_details: bool = False,
+    ) -> list[dict[str, Any]]:
+        """
+        Tickets d'un flux strictement après le curseur (date, id), dans l'ordre.
+
+        GLPI ne trie que sur un champ et ses dates sont à la seconde: la
+        recherche repart une seconde avant le curseur et l'ordre (date, id)
+        est appliqué ici. Les tickets partageant la date du dernier retenu
+        sont tous lus avant de tronquer, pour qu'aucun ne soit sauté.
+
+        Args:
+            feed: Nom du flux (voir TICKET_FEEDS)
+            after_date: Date du curseur
+            after_id: ID du dernier ticket livré à cette date
+            limit: Nombre maximum de tickets
+            include_details: Ajouter description, solution et followups
+
+        Returns:
+            Tickets avec "feed_date" (date du watermark) et "id"
+        """
+        date_field = TICKET_FEEDS[feed]
+        query = (
+            self._ticket_feed_query(feed)
+            .where(
+                date_field,
+                (after_date - timedelta(seconds=1)).strftime("%Y-%m-%d %H:%M:%S"),
+                "morethan",
+            )
+            .display(
+                TICKET_FIELD_ID,
+                TICKET_FIELD_TITLE,
+                TICKET_FIELD_STATUS,
+                TICKET_FIELD_DATE,
+                TICKET_FIELD_SOLVEDATE,
+                TICKET_FIELD_DATE_MOD,
+            )
+            .sort(date_field, "ASC")
+        )
+
+        cursor = (after_date, after_id)
+        rows: list[tuple[tuple[datetime, int], dict[str, Any]]] = []
+
+        async for row in self.iter_search(query):
+            feed_date = parse_glpi_datetime(row.get(str(date_field)))
+            ticket_id = row.get(str(TICKET_FIELD_ID))
+            if feed_date is None or not ticket_id:
+                continue
+
+            key = (feed_date, int(ticket_id))
+            if key <= cursor:
+                continue
+            if len(rows) >= limit and feed_date > rows[limit - 1][0][0]:
+                break
+            rows.append((key, row))
+            rows.sort(key=lambda item: item[0])
+
+        tickets = []
+        for (feed_date, ticket_id), row in rows[:limit]:
+            if include_details and feed == "resolved":
+                ticket = await self._enrich_resolved_ticket(row)
+            elif include_details:
+                details = await self.get_ticket_details(ticket_id)
+                ticket = {
+                    "id": ticket_id,
+                    "title": row.get(str(TICKET_FIELD_TITLE), ""),
+                    "status": row.get(str(TICKET_FIELD_STATUS)),
+                    "date": row.get(str(TICKET_FIELD_DATE)),
+                    "description": details.get("description", ""),
+                    "followups": details.get("followups", []),
+                }
+            else:
+                ticket = {
+                    "id": ticket_id,
+                    "title": row.get(str(TICKET_FIELD_TITLE), ""),
+                    "status": row.get(str(TICKET_FIELD_STATUS)),
+                    "date": row.get(str(TICKET_FIELD_DATE)),
+                    "solve_date": row.get(str(TICKET_FIELD_SOLVEDATE)),
+                    "date_mod": row.get(str(TICKET_FIELD_DATE_MOD)),
+                }
+            ticket["id"] = ticket_id
+            ticket["feed_date"] = feed_date.strftime("%Y-%m-%d %H:%M:%S")
+            tickets.append(ticket)
+
+        return tickets
+
+    async def _get_ticket_solution(self, ticket_id: int) -> Optional[str]:
+        """Récupère la solution d'un ticket."""
+        try:
+            solutions = await self._get(f"Ticket/{ticket_id}/ITILSolution")
             if solutions and isinstance(solutions, list) and len(solutions) > 0:
                 # Prendre la dernière solution (la plus récente)
                 return solutions[-1].get("content", "")
@@ -654,21 +1331,254 @@ class GLPIClient(BaseClient):
         except Exception:
             return None
 
-    async def get_ticket_categories(self) -> dict[str, Any]:
-        """Récupère les catégories de tickets disponibles."""
-        await self._ensure_session()
+    async def _get_ticket_log_page(
+        self,
+        ticket_id: int,
+        start: int,
+        limit: int,
+    ) -> tuple[list[dict[str, Any]], Optional[int]]:
+        """
+        Lit une page de Ticket/<id>/Log, du plus récent au plus ancien.
 
+        Returns:
+            (entrées brutes, total annoncé par Content-Range ou None)
+        """
         try:
-            response = await self.client.get(
-                f"{self.base_url}/ITILCategory",
-                params={"range": "0-100"},
-                headers=self._get_headers(),
+            response = await self._request(
+                "GET",
+                f"Ticket/{ticket_id}/Log",
+                params={
+                    "range": f"{start}-{start + max(1, limit) - 1}",
+                    "order": "DESC",
+                },
             )
+        except APIError as e:
+            # GLPI répond 400 (ERROR_RANGE_EXCEED_TOTAL) au-delà du total
+            if e.status_code == 400 and "ERROR_RANGE_EXCEED_TOTAL" in str(e):
+                return [], start
+            raise
+
+        logs = response.json()
+        if not isinstance(logs, list):
+            return [], 0
+        return logs, _parse_content_range_total(response.headers.get("Content-Range"))
+
+    async def iter_ticket_history(
+        self,
+        ticket_id: int,
+        page_size: Optional[int] = None,
+        max_items: Optional[int] = None,
+        offset: int = 0,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """
+        Parcourt l'historique d'un ticket page par page, du plus récent au plus ancien.
 
-            if not response.is_success:
-                return {"success": False, "categories": []}
+        Les pages sont demandées au fil de la consommation: un ticket avec des
+        milliers d'entrées n'est jamais chargé en entier.
 
-            categories = response.json()
+        Args:
+            ticket_id: ID du ticket
+            page_size: Entrées par requête (défaut: GLPI_SEARCH_PAGE_SIZE)
+            max_items: Nombre maximum d'entrées à produire
+            offset: Nombre d'entrées récentes à sauter
+        """
+        page_size = page_size or settings.glpi_search_page_size
+        start = offset
+        produced = 0
+
+        while max_items is None or produced < max_items:
+            limit = page_size if max_items is None else min(page_size, max_items - produced)
+            logs, total = await self._get_ticket_log_page(ticket_id, start, limit)
+
+            for log in logs:
+                yield _format_log_entry(log)
+            produced += len(logs)
+            start += len(logs)
+
+            if len(logs) < limit or (total is not None and start >= total):
+                return
+
+    async def get_ticket_history(
+        self,
+        ticket_id: int,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> dict[str, Any]:
+        """
+        Récupère l'historique des modifications d'un ticket (plus récent d'abord).
+
+        Seules les `limit` dernières entrées sont lues, GLPI_HISTORY_MAX_ENTRIES
+        au plus (défaut et plafond); next_offset permet de lire la suite.
+
+        Args:
+            ticket_id: ID du ticket
+            limit: Nombre maximum d'entrées (plafonné à GLPI_HISTORY_MAX_ENTRIES)
+            offset: Nombre d'entrées récentes à sauter
+
+        Returns:
+            Changements (statut, assignations...) du ticket
+        """
+        max_entries = settings.glpi_history_max_entries
+        limit = min(max(1, limit or max_entries), max_entries)
+        offset = max(0, offset)
+        history: list[dict[str, Any]] = []
+
+        try:
+            # Une entrée de plus pour savoir s'il reste des entrées plus anciennes
+            async for entry in self.iter_ticket_history(
+                ticket_id,
+                page_size=min(limit + 1, _HISTORY_MAX_PAGE_SIZE),
+                max_items=limit + 1,
+                offset=offset,
+            ):
+                history.append(entry)
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+        truncated = len(history) > limit
+        history = history[:limit]
+        return {
+            "success": True,
+            "ticket_id": ticket_id,
+            "count": len(history),
+            "offset": offset,
+            "truncated": truncated,
+            "next_offset": offset + len(history) if truncated else None,
+            "history": history,
+        }
+
+    async def assign_ticket(
+        self,
+        ticket_id: int,
+        user_id: Optional[int] = None,
+        group_id: Optional[int] = None,
+    ) -> dict[str, Any]:
+        """
+        Assigne un ticket à un technicien et/ou un groupe.
+
+        Args:
+            ticket_id: ID du ticket
+            user_id: ID du technicien
+            group_id: ID du groupe
+
+        Returns:
+            Assignations effectuées
+        """
+        if not user_id and not group_id:
+            return {"success": False, "error": "user_id ou group_id requis"}
+
+        assignments = []
+        errors = []
+
+        # type 2 = technicien
+        if user_id:
+            try:
+                await self._post(
+                    f"Ticket/{ticket_id}/Ticket_User",
+                    json_data={"input": {"tickets_id": ticket_id, "users_id": user_id, "type": 2}},
+                )
+                assignments.append({"type": "user", "id": user_id})
+            except Exception as e:
+                errors.append(str(e))
+
+        if group_id:
+            try:
+                await self._post(
+                    f"Ticket/{ticket_id}/Group_Ticket",
+                    json_data={"input": {"tickets_id": ticket_id, "groups_id": group_id, "type": 2}},
+                )
+                assignments.append({"type": "group", "id": group_id})
+            except Exception as e:
+                errors.append(str(e))
+
+        if not assignments:
+            return {"success": False, "error": "Échec de l'assignation", "details": errors}
+
+        return {
+            "success": True,
+            "ticket_id": ticket_id,
+            "assignments": assignments,
+            "message": "Ticket assigné avec succès",
+        }
+
+    # =========================================================================
+    # Opérations sur les utilisateurs GLPI
+    # =========================================================================
+
+    async def create_user(self, user_input: dict[str, Any]) -> dict[str, Any]:
+        """
+        Crée un utilisateur GLPI.
+
+        Args:
+            user_input: Champs GLPI de l'utilisateur (name, realname...)
+
+        Returns:
+            ID de l'utilisateur créé
+        """
+        try:
+            data = await self._post("User", json_data={"input": user_input})
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+        return {"success": True, "user_id": str(data.get("id"))}
+
+    async def get_user(self, user_id: int) -> dict[str, Any]:
+        """
+        Récupère un utilisateur GLPI (dropdowns développés).
+
+        Args:
+            user_id: ID de l'utilisateur
+
+        Returns:
+            Informations de l'utilisateur
+        """
+        try:
+            user = await self._get(f"User/{user_id}", params={"expand_dropdowns": "true"})
+        except NotFoundError:
+            return {"success": False, "error": "Utilisateur non trouvé"}
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+        return {
+            "success": True,
+            "user": {
+                "id": user.get("id"),
+                "login": user.get("name"),
+                "realname": user.get("realname"),
+                "firstname": user.get("firstname"),
+                "email": user.get("email"),
+                "phone": user.get("phone"),
+                "is_active": user.get("is_active") == 1,
+                "entities_id": user.get("entities_id"),
+                "profiles_id": user.get("profiles_id"),
+                "date_creation": user.get("date_creation"),
+                "date_mod": user.get("date_mod"),
+                "last_login": user.get("last_login"),
+            },
+        }
+
+    async def update_user(self, user_id: int, fields: dict[str, Any]) -> dict[str, Any]:
+        """
+        Met à jour un utilisateur GLPI.
+
+        Args:
+            user_id: ID de l'utilisateur
+            fields: Champs GLPI à modifier
+
+        Returns:
+            Résultat de la mise à jour
+        """
+        try:
+            await self._put(f"User/{user_id}", json_data={"input": {"id": user_id, **fields}})
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+        return {"success": True, "user_id": user_id}
+
+    async def get_ticket_categories(self) -> dict[str, Any]:
+        """Récupère les catégories de tickets disponibles."""
+        try:
+            categories = await self._get("ITILCategory", params={"range": "0-100"})
             return {
                 "success": True,
                 "categories": [
@@ -0,0 +1,420 @@
+"""
+Annuaire local des utilisateurs GLPI (réplique PostgreSQL).
+
+Les recherches de clients (glpi_search_client, create_ticket) sont servies
+depuis cette table au lieu de l'endpoint search/User de GLPI, lent:
+- Recherche approximative par nom (pg_trgm), email et téléphone, indexée
+- Synchronisation incrémentale sur date_mod (GLPIClient.sync_user_directory)
+- Synchronisation complète (purge des utilisateurs supprimés) via
+  POST /maintenance/glpi-directory/sync?full=true
+
+La table est remplie par GLPIClient: ce module ne fait aucun appel HTTP.
+"""
+
+import re
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+import asyncpg
+import structlog
+
+from ..config import settings
+
+logger = structlog.get_logger(__name__)
+
+# Séparateur GLPI des valeurs multiples (plusieurs emails d'un utilisateur)
+_GLPI_MULTI_SEPARATOR = "$#$"
+
+_NON_DIGITS_RE = re.compile(r"\D")
+
+# Comparaison sur les 9 derniers chiffres: 06 12.. == +33 6 12..
+_PHONE_SUFFIX_DIGITS = 9
+
+DIRECTORY_SQL = """
+    CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+    CREATE TABLE IF NOT EXISTS glpi_user_directory (
+        id INTEGER PRIMARY KEY,
+        login VARCHAR(255),
+        firstname VARCHAR(255),
+        realname VARCHAR(255),
+        email TEXT,
+        phone TEXT,
+        phone_digits TEXT,
+        is_active BOOLEAN NOT NULL DEFAULT TRUE,
+        search_name TEXT NOT NULL DEFAULT '',
+        date_mod TIMESTAMP,
+        synced_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+    );
+
+    CREATE INDEX IF NOT EXISTS idx_glpi_user_directory_name_trgm
+        ON glpi_user_directory USING GIN (search_name gin_trgm_ops);
+    CREATE INDEX IF NOT EXISTS idx_glpi_user_directory_email_trgm
+        ON glpi_user_directory USING GIN (email gin_trgm_ops);
+    CREATE INDEX IF NOT EXISTS idx_glpi_user_directory_phone_trgm
+        ON glpi_user_directory USING GIN (phone_digits gin_trgm_ops);
+
+    CREATE TABLE IF NOT EXISTS glpi_sync_state (
+        name VARCHAR(50) PRIMARY KEY,
+        last_date_mod TIMESTAMP,
+        last_sync_at TIMESTAMP WITH TIME ZONE,
+        last_full_sync_at TIMESTAMP WITH TIME ZONE
+    );
+"""
+
+UPSERT_SQL = """
+    INSERT INTO glpi_user_directory (
+        id, login, firstname, realname, email, phone, phone_digits,
+        is_active, search_name, date_mod, synced_at
+    )
+    VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, NOW())
+    ON CONFLICT (id) DO UPDATE SET
+        login = EXCLUDED.login,
+        firstname = EXCLUDED.firstname,
+        realname = EXCLUDED.realname,
+        email = EXCLUDED.email,
+        phone = EXCLUDED.phone,
+        phone_digits = EXCLUDED.phone_digits,
+        is_active = EXCLUDED.is_active,
+        search_name = EXCLUDED.search_name,
+        date_mod = EXCLUDED.date_mod,
+        synced_at = NOW()
+"""
+
+# Score = nombre de critères satisfaits, puis similarité trigramme du nom
+# (word_similarity / <%: tolère les fautes de frappe sur un mot du nom).
+# Chaque critère absent ($n IS NULL) est neutre. $1-$3: valeurs exactes,
+# $4-$6: motifs LIKE échappés (_like_pattern). Utilisateurs actifs seulement.
+# exact_match: login, "prénom nom", "nom prénom", email ou téléphone égal
+LOOKUP_SQL = r"""
+    SELECT
+        id, login, firstname, realname, email, phone,
+        (
+            CASE WHEN $1::text IS NOT NULL
+                 AND (search_name LIKE $4 ESCAPE '\' OR $1 <% search_name)
+                 THEN 1 ELSE 0 END
+          + CASE WHEN $2::text IS NOT NULL AND email LIKE $5 ESCAPE '\'
+                 THEN 1 ELSE 0 END
+          + CASE WHEN $3::text IS NOT NULL AND phone_digits LIKE $6 ESCAPE '\'
+                 THEN 1 ELSE 0 END
+        ) AS matched_criteria,
+        (
+            $1::text = ANY(string_to_array(search_name, ' | '))
+            OR $2::text = ANY(string_to_array(email, ' '))
+            OR $3::text = ANY(string_to_array(phone_digits, ' '))
+        ) IS TRUE AS exact_match,
+        CASE WHEN $1::text IS NOT NULL THEN word_similarity($1, search_name) ELSE 0 END AS similarity
+    FROM glpi_user_directory
+    WHERE is_active
+      AND (
+           ($1::text IS NOT NULL AND (search_name LIKE $4 ESCAPE '\' OR $1 <% search_name))
+        OR ($2::text IS NOT NULL AND email LIKE $5 ESCAPE '\')
+        OR ($3::text IS NOT NULL AND phone_digits LIKE $6 ESCAPE '\')
+      )
+    ORDER BY matched_criteria DESC, exact_match DESC, similarity DESC, id
+    LIMIT $7
+"""
+
+
+def _text(value: Any) -> Optional[str]:
+    """Valeur GLPI -> texte (None si vide)."""
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+def _like_pattern(value: Optional[str]) -> Optional[str]:
+    """Motif LIKE "contient" (%, _ et \\ de la saisie échappés)."""
+    if value is None:
+        return None
+    escaped = value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def _phone_digits(*phones: Optional[str]) -> Optional[str]:
+    """Chiffres des numéros (9 derniers, séparés par un espace)."""
+    digits = [
+        _NON_DIGITS_RE.sub("", phone)[-_PHONE_SUFFIX_DIGITS:]
+        for phone in phones
+        if phone
+    ]
+    digits = [d for d in digits if d]
+    return " ".join(digits) or None
+
+
+def parse_glpi_datetime(value: Any) -> Optional[datetime]:
+    """Parse une date GLPI ("YYYY-MM-DD HH:MM:SS")."""
+    text = _text(value)
+    if not text:
+        return None
+    try:
+        return datetime.strptime(text[:19], "%Y-%m-%d %H:%M:%S")
+    except ValueError:
+        return None
+
+
+def directory_record(user: dict[str, Any]) -> tuple[Any, ...]:
+    """
+    Convertit un utilisateur GLPI normalisé en ligne de l'annuaire.
+
+    Args:
+        user: {"id", "login", "firstname", "realname", "email", "phone",
+               "mobile", "is_active", "date_mod"}
+
+    Returns:
+        Paramètres de UPSERT_SQL
+    """
+    login = _text(user.get("login"))
+    firstname = _text(user.get("firstname"))
+    realname = _text(user.get("realname"))
+    emails = _text(user.get("email"))
+    if emails:
+        emails = " ".join(
+            e.strip().lower() for e in emails.split(_GLPI_MULTI_SEPARATOR) if e.strip()
+        )
+    phone = _text(user.get("phone"))
+    mobile = _text(user.get("mobile"))
+
+    # Login + "prénom nom" + "nom prénom": les deux ordres de saisie matchent
+    full_name = " ".join(part for part in (firstname, realname) if part)
+    reversed_name = " ".join(part for part in (realname, firstname) if part)
+    search_name = " | ".join(
+        part.lower() for part in (login, full_name, reversed_name) if part
+    )
+
+    is_active = str(user.get("is_active", 1)).strip().lower() in ("1", "true", "oui", "yes")
+
+    return (
+        int(user["id"]),
+        login,
+        firstname,
+        realname,
+        emails,
+        phone or mobile,
+        _phone_digits(phone, mobile),
+        is_active,
+        search_name,
+        parse_glpi_datetime(user.get("date_mod")),
+    )
+
+
+class GLPIUserDirectory:
+    """
+    Réplique locale des utilisateurs GLPI.
+
+    Les lookups ne bloquent jamais sur GLPI: si l'annuaire n'a jamais été
+    synchronisé (ou est désactivé), lookup() retourne None et l'appelant
+    interroge GLPI directement.
+    """
+
+    def __init__(self) -> None:
+        self._pool: Optional[asyncpg.Pool] = None
+        self._initialized = False
+        self.last_sync_at: Optional[datetime] = None
+        self.last_date_mod: Optional[datetime] = None
+
+    async def _get_pool(self) -> asyncpg.Pool:
+        """Retourne le pool de connexions PostgreSQL."""
+        if self._pool is None:
+            self._pool = await asyncpg.create_pool(
+                settings.postgres_dsn,
+                min_size=1,
+                max_size=3,
+            )
+        return self._pool
+
+    async def initialize(self) -> None:
+        """Crée les tables (et pg_trgm) si nécessaire et charge l'état de synchro."""
+        if self._initialized:
+            return
+
+        pool = await self._get_pool()
+        await pool.execute(DIRECTORY_SQL)
+
+        row = await pool.fetchrow(
+            "SELECT last_date_mod, last_sync_at FROM glpi_sync_state WHERE name = 'users'"
+        )
+        if row:
+            self.last_date_mod = row["last_date_mod"]
+            self.last_sync_at = row["last_sync_at"]
+
+        self._initialized = True
+        logger.info(
+            "glpi_directory_initialized",
+            last_sync_at=self.last_sync_at.isoformat() if self.last_sync_at else None,
+        )
+
+    @property
+    def is_ready(self) -> bool:
+        """Annuaire utilisable (activé et déjà synchronisé au moins une fois)."""
+        return settings.glpi_directory_enabled and self.last_sync_at is not None
+
+    def is_stale(self) -> bool:
+        """Indique si une synchronisation incrémentale est due."""
+        if self.last_sync_at is None:
+            return True
+        age = (datetime.now(timezone.utc) - self.last_sync_at).total_seconds()
+        return age >= settings.glpi_directory_sync_interval
+
+    async def db_now(self) -> datetime:
+        """Heure du serveur PostgreSQL (référence de synced_at)."""
+        await self.initialize()
+        pool = await self._get_pool()
+        return await pool.fetchval("SELECT NOW()")
+
+    async def upsert_users(self, records: list[tuple[Any, ...]]) -> int:
+        """
+        Insère ou met à jour un lot d'utilisateurs.
+
+        Args:
+            records: Lignes produites par directory_record()
+
+        Returns:
+            Nombre de lignes écrites
+        """
+        if not records:
+            return 0
+
+        await self.initialize()
+        pool = await self._get_pool()
+        async with pool.acquire() as conn:
+            await conn.executemany(UPSERT_SQL, records)
+        return len(records)
+
+    async def record_sync(
+        self,
+        last_date_mod: Optional[datetime],
+        started_at: datetime,
+        full: bool = False,
+    ) -> int:
+        """
+        Enregistre la fin d'une synchronisation.
+
+        Args:
+            last_date_mod: Plus grande date_mod vue (curseur de la prochaine synchro)
+            started_at: Début de la synchronisation
+            full: Synchro complète: purge des utilisateurs absents de GLPI
+
+        Returns:
+            Nombre d'utilisateurs purgés
+        """
+        await self.initialize()
+        pool = await self._get_pool()
+        purged = 0
+
+        async with pool.acquire() as conn, conn.transaction():
+            if full:
+                status = await conn.execute(
+                    "DELETE FROM glpi_user_directory WHERE synced_at < $1",
+                    started_at,
+                )
+                purged = int(status.split()[-1]) if status else 0
+
+            await conn.execute(
+                """
+                INSERT INTO glpi_sync_state (name, last_date_mod, last_sync_at, last_full_sync_at)
+                VALUES ('users', $1, NOW(), CASE WHEN $2 THEN NOW() END)
+                ON CONFLICT (name) DO UPDATE SET
+                    last_date_mod = GREATEST(
+                        glpi_sync_state.last_date_mod, EXCLUDED.last_date_mod
+                    ),
+                    last_sync_at = NOW(),
+                    last_full_sync_at = COALESCE(
+                        EXCLUDED.last_full_sync_at, glpi_sync_state.last_full_sync_at
+                    )
+                """,
+                last_date_mod,
+                full,
+            )
+
+        if last_date_mod and (self.last_date_mod is None or last_date_mod > self.last_date_mod):
+            self.last_date_mod = last_date_mod
+        self.last_sync_at = datetime.now(timezone.utc)
+        return purged
+
+    async def lookup(
+        self,
+        name: Optional[str] = None,
+        email: Optional[str] = None,
+        phone: Optional[str] = None,
+        limit: int = 5,
+    ) -> Optional[list[dict[str, Any]]]:
+        """
+        Recherche approximative dans l'annuaire local (utilisateurs actifs).
+
+        Args:
+            name: Login, prénom et/ou nom (tolère les fautes de frappe)
+            email: Email (recherche partielle)
+            phone: Téléphone (comparé sur les 9 derniers chiffres)
+            limit: Nombre maximum de candidats
+
+        Returns:
+            Candidats classés (meilleur en premier), ou None si l'annuaire
+            n'est pas utilisable
+        """
+        if not self.is_ready:
+            return None
+
+        name = name.strip().lower() if name and name.strip() else None
+        email = email.strip().lower() if email and email.strip() else None
+        phone_digits = _phone_digits(phone) if phone else None
+        pool = await self._get_pool()
+        rows = await pool.fetch(
+            LOOKUP_SQL,
+            name,
+            email,
+            phone_digits,
+            _like_pattern(name),
+            _like_pattern(email),
+            _like_pattern(phone_digits),
+            max(1, limit),
+        )
+
+        return [
+            {
+                "client_id": row["id"],
+                "client_name": row["login"],
+                "client_realname": row["realname"],
+                "client_firstname": row["firstname"],
+                "client_email": (row["email"] or "").split(" ")[0],
+                "client_phone": row["phone"] or "",
+                "matched_criteria": row["matched_criteria"],
+                "exact_match": row["exact_match"],
+                "similarity": round(float(row["similarity"]), 3),
+            }
+            for row in rows
+        ]
+
+    async def get_stats(self) -> dict[str, Any]:
+        """Taille et fraîcheur de l'annuaire."""
+        await self.initialize()
+        pool = await self._get_pool()
+        row = await pool.fetchrow(
+            """
+            SELECT
+                (SELECT COUNT(*) FROM glpi_user_directory) AS users,
+                s.last_date_mod, s.last_sync_at, s.last_full_sync_at
+            FROM (SELECT 1) AS one
+            LEFT JOIN glpi_sync_state s ON s.name = 'users'
+            """
+        )
+        return {
+            "enabled": settings.glpi_directory_enabled,
+            "users": row["users"],
+            "last_date_mod": row["last_date_mod"].isoformat() if row["last_date_mod"] else None,
+            "last_sync_at": row["last_sync_at"].isoformat() if row["last_sync_at"] else None,
+            "last_full_sync_at": (
+                row["last_full_sync_at"].isoformat() if row["last_full_sync_at"] else None
+            ),
+        }
+
+    async def close(self) -> None:
+        """Ferme le pool de connexions."""
+        if self._pool:
+            await self._pool.close()
+            self._pool = None
+
+
+# Instance singleton
+glpi_directory = GLPIUserDirectory()
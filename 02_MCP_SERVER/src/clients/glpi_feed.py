@@ -0,0 +1,411 @@
+"""
+Flux de changements des tickets GLPI (watermark par consommateur).
+
+Remplace les fenêtres glissantes (minutes_since / hours_since) des workflows
+proactif et enrichisseur: chaque consommateur a un curseur (date, id) stocké
+dans PostgreSQL et ne reçoit que les tickets postérieurs.
+
+Livraison exactement-une-fois par consommateur:
+1. fetch() prend un bail (lease) sur le curseur et retourne un lot
+   Un second appel concurrent (cron qui se chevauche) reçoit busy=true
+2. Le consommateur traite le lot puis appelle ack(lease_id):
+   le curseur avance et le bail est libéré
+3. Sans ack avant expiration du bail (crash), le même lot est relivré
+
+Le curseur d'un nouveau consommateur part de start_date si fournie, sinon
+du ticket le plus récent du flux moins GLPI_FEED_INITIAL_LOOKBACK_HOURS:
+toujours l'horloge de GLPI, jamais celle de PostgreSQL.
+"""
+
+from datetime import datetime, timedelta
+from typing import Any, Optional
+from uuid import UUID, uuid4
+
+import asyncpg
+import structlog
+
+from ..config import settings
+from .glpi import TICKET_FEEDS, glpi_client
+from .glpi_directory import parse_glpi_datetime
+
+logger = structlog.get_logger(__name__)
+
+FEED_CURSORS_SQL = """
+    CREATE TABLE IF NOT EXISTS glpi_feed_cursors (
+        consumer VARCHAR(100) NOT NULL,
+        feed VARCHAR(20) NOT NULL,
+        last_date TIMESTAMP NOT NULL,
+        last_id INTEGER NOT NULL DEFAULT 0,
+        lease_id UUID,
+        leased_until TIMESTAMP WITH TIME ZONE,
+        pending_date TIMESTAMP,
+        pending_id INTEGER,
+        pending_count INTEGER NOT NULL DEFAULT 0,
+        delivered BIGINT NOT NULL DEFAULT 0,
+        updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+        PRIMARY KEY (consumer, feed)
+    );
+"""
+
+
+class TicketFeed:
+    """
+    Curseurs des flux de tickets GLPI.
+
+    Les curseurs sont exprimés dans l'heure de GLPI (dates "YYYY-MM-DD
+    HH:MM:SS" sans fuseau), comme les tickets eux-mêmes.
+    """
+
+    def __init__(self) -> None:
+        self._pool: Optional[asyncpg.Pool] = None
+        self._initialized = False
+
+    async def _get_pool(self) -> asyncpg.Pool:
+        """Retourne le pool de connexions PostgreSQL."""
+        if self._pool is None:
+            self._pool = await asyncpg.create_pool(
+                settings.postgres_dsn,
+                min_size=1,
+                max_size=2,
+            )
+        return self._pool
+
+    async def initialize(self) -> None:
+        """Crée la table des curseurs si nécessaire."""
+        if self._initialized:
+            return
+
+        pool = await self._get_pool()
+        await pool.execute(FEED_CURSORS_SQL)
+        self._initialized = True
+
+    @staticmethod
+    async def _start_date(
+        feed: str,
+        start_date: Optional[str] = None,
+        hours_back: Optional[int] = None,
+    ) -> datetime:
+        """
+        Position de départ d'un curseur, dans l'heure de GLPI.
+
+        Args:
+            feed: Flux
+            start_date: Date explicite ("YYYY-MM-DD HH:MM:SS", heure GLPI)
+            hours_back: Heures avant le ticket le plus récent du flux
+                (défaut: GLPI_FEED_INITIAL_LOOKBACK_HOURS)
+
+        Raises:
+            ValueError: start_date invalide
+        """
+        if start_date:
+            parsed = parse_glpi_datetime(start_date)
+            if parsed is None:
+                raise ValueError(f"start_date invalide: {start_date} (attendu YYYY-MM-DD HH:MM:SS)")
+            return parsed
+
+        latest = await glpi_client.latest_feed_date(feed)
+        if latest is None:
+            # Flux vide: tout ticket à venir est nouveau
+            return datetime(1970, 1, 1)
+        if hours_back is None:
+            hours_back = settings.glpi_feed_initial_lookback_hours
+        return latest - timedelta(hours=hours_back)
+
+    async def _claim(
+        self,
+        consumer: str,
+        feed: str,
+        start_date: Optional[str] = None,
+    ) -> Optional[asyncpg.Record]:
+        """
+        Prend le bail du curseur (créé au premier appel).
+
+        Raises:
+            ValueError: start_date invalide (premier appel)
+
+        Returns:
+            Curseur (last_date, last_id, lease_id) ou None si un bail est actif
+        """
+        pool = await self._get_pool()
+        lease_id = uuid4()
+
+        exists = await pool.fetchval(
+            "SELECT 1 FROM glpi_feed_cursors WHERE consumer = $1 AND feed = $2",
+            consumer,
+            feed,
+        )
+        if not exists:
+            # Premier passage: position lue sur l'horloge de GLPI (hors transaction)
+            initial_date = await self._start_date(feed, start_date)
+            await pool.execute(
+                """
+                INSERT INTO glpi_feed_cursors (consumer, feed, last_date)
+                VALUES ($1, $2, $3)
+                ON CONFLICT (consumer, feed) DO NOTHING
+                """,
+                consumer,
+                feed,
+                initial_date,
+            )
+
+        return await pool.fetchrow(
+            """
+            UPDATE glpi_feed_cursors
+            SET lease_id = $3,
+                leased_until = NOW() + make_interval(secs => $4),
+                updated_at = NOW()
+            WHERE consumer = $1 AND feed = $2
+              AND (lease_id IS NULL OR leased_until < NOW())
+            RETURNING last_date, last_id, lease_id
+            """,
+            consumer,
+            feed,
+            lease_id,
+            float(settings.glpi_feed_lease_seconds),
+        )
+
+    async def release(self, consumer: str, feed: str, lease_id: Any) -> None:
+        """Libère un bail sans avancer le curseur (le lot sera relivré)."""
+        pool = await self._get_pool()
+        await pool.execute(
+            """
+            UPDATE glpi_feed_cursors
+            SET lease_id = NULL, leased_until = NULL,
+                pending_date = NULL, pending_id = NULL, pending_count = 0
+            WHERE consumer = $1 AND feed = $2 AND lease_id = $3
+            """,
+            consumer,
+            feed,
+            lease_id,
+        )
+
+    async def fetch(
+        self,
+        consumer: str,
+        feed: str,
+        limit: int = 50,
+        include_details: bool = False,
+        auto_ack: bool = False,
+        start_date: Optional[str] = None,
+    ) -> dict[str, Any]:
+        """
+        Retourne les tickets du flux postérieurs au curseur du consommateur.
+
+        Args:
+            consumer: Nom du consommateur (ex: "proactif", "enrichisseur")
+            feed: Flux ("new" ou "resolved")
+            limit: Nombre maximum de tickets
+            include_details: Ajouter description, solution et followups
+            auto_ack: Avancer le curseur immédiatement (au plus une fois)
+            start_date: Position initiale d'un nouveau consommateur (heure
+                GLPI, ignorée si le curseur existe déjà)
+
+        Returns:
+            Tickets + lease_id à passer à ack()
+        """
+        if feed not in TICKET_FEEDS:
+            return {
+                "success": False,
+                "error": f"Flux inconnu: {feed} (attendu: {', '.join(TICKET_FEEDS)})",
+            }
+
+        await self.initialize()
+        try:
+            claimed = await self._claim(consumer, feed, start_date)
+        except Exception as e:
+            logger.exception("glpi_feed_claim_error", consumer=consumer, feed=feed, error=str(e))
+            return {"success": False, "consumer": consumer, "feed": feed, "error": str(e)}
+        if claimed is None:
+            return {
+                "success": True,
+                "busy": True,
+                "consumer": consumer,
+                "feed": feed,
+                "count": 0,
+                "tickets": [],
+                "message": "Un lot est déjà en cours de traitement pour ce consommateur",
+            }
+
+        lease_id = claimed["lease_id"]
+        try:
+            tickets = await glpi_client.fetch_ticket_changes(
+                feed,
+                after_date=claimed["last_date"],
+                after_id=claimed["last_id"],
+                limit=max(1, limit),
+                include_details=include_details,
+            )
+        except Exception as e:
+            await self.release(consumer, feed, lease_id)
+            logger.exception("glpi_feed_fetch_error", consumer=consumer, feed=feed, error=str(e))
+            return {"success": False, "consumer": consumer, "feed": feed, "error": str(e)}
+
+        if not tickets:
+            await self.release(consumer, feed, lease_id)
+            return {
+                "success": True,
+                "busy": False,
+                "consumer": consumer,
+                "feed": feed,
+                "count": 0,
+                "tickets": [],
+                "cursor": self._cursor(claimed["last_date"], claimed["last_id"]),
+            }
+
+        last = tickets[-1]
+        pool = await self._get_pool()
+        await pool.execute(
+            """
+            UPDATE glpi_feed_cursors
+            SET pending_date = $4, pending_id = $5, pending_count = $6
+            WHERE consumer = $1 AND feed = $2 AND lease_id = $3
+            """,
+            consumer,
+            feed,
+            lease_id,
+            parse_glpi_datetime(last["feed_date"]),
+            int(last["id"]),
+            len(tickets),
+        )
+
+        result: dict[str, Any] = {
+            "success": True,
+            "busy": False,
+            "consumer": consumer,
+            "feed": feed,
+            "count": len(tickets),
+            "tickets": tickets,
+            "lease_id": str(lease_id),
+            "lease_seconds": settings.glpi_feed_lease_seconds,
+        }
+
+        if auto_ack:
+            result["acked"] = (await self.ack(consumer, feed, str(lease_id)))["acked"]
+            result.pop("lease_id")
+
+        logger.info("glpi_feed_fetched", consumer=consumer, feed=feed, count=len(tickets))
+        return result
+
+    async def ack(self, consumer: str, feed: str, lease_id: str) -> dict[str, Any]:
+        """
+        Valide le lot livré: le curseur avance et le bail est libéré.
+
+        Un bail expiré puis repris par un autre appel n'est plus valide:
+        l'ack est refusé (le lot a été ou sera relivré).
+
+        Args:
+            consumer: Nom du consommateur
+            feed: Flux
+            lease_id: Bail retourné par fetch()
+
+        Returns:
+            acked=True si le curseur a avancé
+        """
+        try:
+            lease_uuid = UUID(str(lease_id))
+        except ValueError:
+            logger.warning("glpi_feed_ack_invalid_lease", consumer=consumer, feed=feed)
+            return {
+                "success": False,
+                "acked": False,
+                "error": f"lease_id invalide: {lease_id}",
+            }
+
+        await self.initialize()
+        pool = await self._get_pool()
+        row = await pool.fetchrow(
+            """
+            UPDATE glpi_feed_cursors
+            SET last_date = pending_date,
+                last_id = pending_id,
+                delivered = delivered + pending_count,
+                lease_id = NULL, leased_until = NULL,
+                pending_date = NULL, pending_id = NULL, pending_count = 0,
+                updated_at = NOW()
+            WHERE consumer = $1 AND feed = $2
+              AND lease_id = $3 AND pending_date IS NOT NULL
+            RETURNING last_date, last_id, delivered
+            """,
+            consumer,
+            feed,
+            lease_uuid,
+        )
+
+        if row is None:
+            logger.warning("glpi_feed_ack_rejected", consumer=consumer, feed=feed)
+            return {
+                "success": False,
+                "acked": False,
+                "error": "Bail inconnu ou expiré: le lot sera relivré",
+            }
+
+        logger.info("glpi_feed_acked", consumer=consumer, feed=feed, delivered=row["delivered"])
+        return {
+            "success": True,
+            "acked": True,
+            "consumer": consumer,
+            "feed": feed,
+            "cursor": self._cursor(row["last_date"], row["last_id"]),
+            "delivered": row["delivered"],
+        }
+
+    async def reset(
+        self,
+        consumer: str,
+        feed: str,
+        hours_back: Optional[int] = None,
+        start_date: Optional[str] = None,
+    ) -> dict[str, Any]:
+        """
+        Repositionne le curseur d'un consommateur (rejeu manuel).
+
+        Args:
+            consumer: Nom du consommateur
+            feed: Flux
+            hours_back: Heures avant le ticket le plus récent du flux
+            start_date: Date explicite (heure GLPI), prioritaire sur hours_back
+        """
+        await self.initialize()
+        try:
+            last_date = await self._start_date(feed, start_date, hours_back)
+        except ValueError as e:
+            return {"success": False, "error": str(e)}
+
+        pool = await self._get_pool()
+        await pool.execute(
+            """
+            INSERT INTO glpi_feed_cursors (consumer, feed, last_date)
+            VALUES ($1, $2, $3)
+            ON CONFLICT (consumer, feed) DO UPDATE SET
+                last_date = EXCLUDED.last_date, last_id = 0,
+                lease_id = NULL, leased_until = NULL,
+                pending_date = NULL, pending_id = NULL, pending_count = 0,
+                updated_at = NOW()
+            """,
+            consumer,
+            feed,
+            last_date,
+        )
+        return {
+            "success": True,
+            "consumer": consumer,
+            "feed": feed,
+            "cursor": self._cursor(last_date, 0),
+        }
+
+    @staticmethod
+    def _cursor(last_date: Any, last_id: int) -> dict[str, Any]:
+        return {
+            "date": last_date.strftime("%Y-%m-%d %H:%M:%S") if last_date else None,
+            "id": last_id,
+        }
+
+    async def close(self) -> None:
+        """Ferme le pool de connexions."""
+        if self._pool:
+            await self._pool.close()
+            self._pool = None
+
+
+# Instance singleton
+ticket_feed = TicketFeed()
@@ -0,0 +1,178 @@
+"""
+Pool de clients HTTP partagés pour les intégrations WIDIP.
+
+Un seul httpx.AsyncClient par service amont (GLPI, Observium, MySecret,
+Ollama, webhooks...), réutilisé par tous les appels du serveur:
+- Limites de pool et keep-alive configurables (pas de handshake TLS à chaque rafale)
+- HTTP/2 optionnel (nécessite le paquet h2: pip install "httpx[http2]")
+- Plafond de connexions par hôte/service (HTTP_HOST_LIMITS)
+- Compteurs exposés dans /metrics (requêtes, en cours, erreurs, connexions)
+"""
+
+import time
+from importlib.util import find_spec
+from typing import Any
+from urllib.parse import urlsplit
+
+import httpx
+import structlog
+
+from ..config import settings
+
+logger = structlog.get_logger(__name__)
+
+
+def _parse_host_limits(raw: str) -> dict[str, int]:
+    """Parse "glpi=10,hooks.slack.com=4" en {"glpi": 10, "hooks.slack.com": 4}."""
+    limits: dict[str, int] = {}
+    for item in raw.split(","):
+        name, _, value = item.partition("=")
+        if name.strip() and value.strip().isdigit():
+            limits[name.strip().lower()] = int(value.strip())
+    return limits
+
+
+class _InstrumentedTransport(httpx.AsyncBaseTransport):
+    """Transport httpx qui compte les requêtes et expose l'état du pool."""
+
+    def __init__(self, transport: httpx.AsyncHTTPTransport) -> None:
+        self._transport = transport
+        self.requests = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.total_time = 0.0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        self.in_flight += 1
+        start = time.perf_counter()
+        try:
+            return await self._transport.handle_async_request(request)
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            self.in_flight -= 1
+            self.total_time += time.perf_counter() - start
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+    def pool_stats(self) -> dict[str, int]:
+        """État des connexions du pool httpcore sous-jacent."""
+        pool = getattr(self._transport, "_pool", None)
+        connections = list(getattr(pool, "connections", []))
+        idle = sum(1 for conn in connections if conn.is_idle())
+        return {
+            "connections": len(connections),
+            "idle": idle,
+            "active": len(connections) - idle,
+        }
+
+
+class HTTPClientPool:
+    """
+    Registre des clients HTTP partagés (un par service amont).
+
+    Les clients sont créés à la demande et fermés à l'arrêt du serveur
+    (voir lifespan dans mcp/server.py).
+    """
+
+    def __init__(self) -> None:
+        self._clients: dict[str, httpx.AsyncClient] = {}
+        self._transports: dict[str, _InstrumentedTransport] = {}
+        self._host_limits = _parse_host_limits(settings.http_host_limits)
+        self._http2 = settings.http2_enabled and find_spec("h2") is not None
+
+        if settings.http2_enabled and not self._http2:
+            logger.warning(
+                "http2_unavailable",
+                hint='Installer le paquet h2: pip install "httpx[http2]"',
+            )
+
+    def _max_connections(self, name: str, base_url: str) -> int:
+        """Plafond de connexions: par service, puis par hôte, sinon global."""
+        host = (urlsplit(base_url).hostname or "").lower()
+        for key in (name.lower(), host):
+            if key and key in self._host_limits:
+                return self._host_limits[key]
+        return settings.http_max_connections
+
+    def get_client(
+        self,
+        name: str,
+        base_url: str = "",
+        timeout: float = 30.0,
+    ) -> httpx.AsyncClient:
+        """
+        Retourne le client partagé d'un service (créé au premier appel).
+
+        Args:
+            name: Nom du service (glpi, observium, ollama, webhooks...)
+            base_url: URL de base (sert au plafond par hôte)
+            timeout: Timeout par défaut des requêtes (surcharge possible par appel)
+
+        Returns:
+            httpx.AsyncClient partagé
+        """
+        client = self._clients.get(name)
+        if client is not None and not client.is_closed:
+            return client
+
+        max_connections = self._max_connections(name, base_url)
+        transport = _InstrumentedTransport(
+            httpx.AsyncHTTPTransport(
+                limits=httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=min(
+                        max_connections, settings.http_max_keepalive_connections
+                    ),
+                    keepalive_expiry=settings.http_keepalive_expiry,
+                ),
+                http2=self._http2,
+            )
+        )
+
+        client = httpx.AsyncClient(
+            transport=transport,
+            timeout=httpx.Timeout(timeout),
+            follow_redirects=True,
+        )
+        self._clients[name] = client
+        self._transports[name] = transport
+
+        logger.info(
+            "http_client_created",
+            service=name,
+            max_connections=max_connections,
+            http2=self._http2,
+        )
+        return client
+
+    def stats(self) -> dict[str, Any]:
+        """Statistiques par service (pour /metrics)."""
+        services: dict[str, Any] = {}
+        for name, transport in self._transports.items():
+            services[name] = {
+                "requests": transport.requests,
+                "errors": transport.errors,
+                "in_flight": transport.in_flight,
+                "avg_latency_ms": round(
+                    transport.total_time / transport.requests * 1000, 2
+                ) if transport.requests else None,
+                **transport.pool_stats(),
+            }
+        return {"http2": self._http2, "services": services}
+
+    async def aclose(self) -> None:
+        """Ferme tous les clients partagés."""
+        for client in list(self._clients.values()):
+            if not client.is_closed:
+                await client.aclose()
+        self._clients.clear()
+        self._transports.clear()
+        logger.info("http_clients_closed")
+
+
+# Instance singleton
+http_pool = HTTPClientPool()
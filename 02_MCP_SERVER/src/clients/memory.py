@@ -8,6 +8,9 @@ Ce client gère la mémoire à long terme des agents IA:
 - Utilise Ollama pour la génération d'embeddings
 """
 
+import asyncio
+import json
+import math
 from typing import Any, Optional
 
 import asyncpg
@@ -15,9 +18,259 @@ import httpx
 import structlog
 
 from ..config import settings
+from ..utils.circuit_breaker import get_circuit_breaker
+from .base import APIError
+from .http_pool import http_pool
 
 logger = structlog.get_logger(__name__)
 
+# Ligne existante du ticket (ou de son groupe) et plus proche voisin (index
+# HNSW) de chaque connaissance d'un lot: une seule requête
+_NEAREST_KNOWLEDGE_SQL = """
+    SELECT
+        own.id AS own_id,
+        own.ticket_id AS own_ticket_id,
+        near.id AS near_id,
+        near.similarity
+    FROM unnest($1::varchar[], $2::text[]) WITH ORDINALITY AS q(ticket_id, embedding, idx)
+    LEFT JOIN LATERAL (
+        SELECT id, ticket_id
+        FROM widip_knowledge_base
+        WHERE ticket_id = q.ticket_id
+           OR duplicate_ticket_ids @> ARRAY[q.ticket_id::text]
+        LIMIT 1
+    ) own ON TRUE
+    LEFT JOIN LATERAL (
+        SELECT id, 1 - (embedding <=> q.embedding::vector) AS similarity
+        FROM widip_knowledge_base
+        WHERE own.id IS NULL
+        ORDER BY embedding <=> q.embedding::vector
+        LIMIT 1
+    ) near ON TRUE
+    ORDER BY q.idx
+"""
+
+# Tickets déjà en base (ligne propre ou déjà fusionnés dans un groupe)
+_KNOWN_TICKETS_SQL = """
+    SELECT q.ticket_id
+    FROM unnest($1::varchar[]) AS q(ticket_id)
+    WHERE EXISTS (
+        SELECT 1 FROM widip_knowledge_base
+        WHERE ticket_id = q.ticket_id
+           OR duplicate_ticket_ids @> ARRAY[q.ticket_id::text]
+    )
+"""
+
+# Les tags et listes de tickets (tableaux de tailles variables) passent en
+# JSON: unnest n'accepte pas de tableau de tableaux
+_UPSERT_KNOWLEDGE_SQL = """
+    INSERT INTO widip_knowledge_base
+        (ticket_id, problem_summary, solution_summary, category, tags, embedding,
+         quality_score, duplicate_ticket_ids, created_at)
+    SELECT
+        r.ticket_id,
+        r.problem_summary,
+        r.solution_summary,
+        r.category,
+        ARRAY(SELECT jsonb_array_elements_text(r.tags::jsonb)),
+        r.embedding::vector,
+        r.quality_score,
+        ARRAY(SELECT jsonb_array_elements_text(r.duplicates::jsonb)),
+        NOW()
+    FROM unnest(
+        $1::varchar[], $2::text[], $3::text[], $4::varchar[],
+        $5::text[], $6::text[], $7::float8[], $8::text[]
+    ) AS r(ticket_id, problem_summary, solution_summary, category, tags, embedding, quality_score, duplicates)
+    ON CONFLICT (ticket_id)
+    DO UPDATE SET
+        problem_summary = EXCLUDED.problem_summary,
+        solution_summary = EXCLUDED.solution_summary,
+        category = EXCLUDED.category,
+        tags = EXCLUDED.tags,
+        embedding = EXCLUDED.embedding,
+        quality_score = EXCLUDED.quality_score,
+        duplicate_ticket_ids = ARRAY(
+            SELECT DISTINCT unnest(
+                widip_knowledge_base.duplicate_ticket_ids || EXCLUDED.duplicate_ticket_ids
+            )
+        ),
+        updated_at = NOW()
+    RETURNING ticket_id, id
+"""
+
+# Fusion de groupes de quasi-doublons dans une ligne existante: le contenu
+# du meilleur quality_score devient (ou reste) le représentant
+_MERGE_KNOWLEDGE_SQL = """
+    UPDATE widip_knowledge_base AS k SET
+        ticket_id = CASE WHEN m.better THEN m.ticket_id ELSE k.ticket_id END,
+        problem_summary = CASE WHEN m.better THEN m.problem_summary ELSE k.problem_summary END,
+        solution_summary = CASE WHEN m.better THEN m.solution_summary ELSE k.solution_summary END,
+        category = CASE WHEN m.better THEN m.category ELSE k.category END,
+        tags = CASE WHEN m.better THEN ARRAY(SELECT jsonb_array_elements_text(m.tags::jsonb)) ELSE k.tags END,
+        embedding = CASE WHEN m.better THEN m.embedding::vector ELSE k.embedding END,
+        quality_score = CASE WHEN m.better THEN m.quality_score ELSE k.quality_score END,
+        duplicate_ticket_ids = ARRAY(
+            SELECT DISTINCT t
+            FROM unnest(
+                k.duplicate_ticket_ids
+                || ARRAY[k.ticket_id::text]
+                || ARRAY(SELECT jsonb_array_elements_text(m.tickets::jsonb))
+            ) AS t
+            WHERE t <> CASE WHEN m.better THEN m.ticket_id ELSE k.ticket_id END
+        ),
+        updated_at = NOW()
+    FROM (
+        SELECT r.*, r.quality_score > COALESCE(w.quality_score, 0) AS better
+        FROM unnest(
+            $1::int[], $2::varchar[], $3::text[], $4::text[], $5::varchar[],
+            $6::text[], $7::text[], $8::float8[], $9::text[]
+        ) AS r(id, ticket_id, problem_summary, solution_summary, category, tags, embedding, quality_score, tickets)
+        JOIN widip_knowledge_base AS w ON w.id = r.id
+    ) AS m
+    WHERE k.id = m.id
+    RETURNING k.id, k.ticket_id
+"""
+
+# Recherche vectorielle seule (mode "vector"); {filters}: filtres catégorie/tags
+_VECTOR_SEARCH_SQL = """
+    SELECT
+        ticket_id,
+        problem_summary,
+        solution_summary,
+        quality_score,
+        cardinality(duplicate_ticket_ids) as duplicates,
+        1 - (embedding <=> $1::vector) as similarity
+    FROM widip_knowledge_base
+    WHERE 1 - (embedding <=> $1::vector) > $2
+        AND quality_score >= 0.4  -- Filtrer les solutions de faible qualité{filters}
+    ORDER BY similarity DESC
+    LIMIT $3
+"""
+
+# Recherche hybride (mode "hybrid") en une requête: classement vectoriel
+# (index HNSW) et classement plein texte (index GIN sur search_tsv, termes
+# de la requête combinés en OU) fusionnés par reciprocal rank fusion:
+# score = somme de 1 / (k + rang) sur les deux classements
+_HYBRID_SEARCH_SQL = """
+    WITH vector_hits AS (
+        SELECT id, row_number() OVER (ORDER BY distance) AS rank
+        FROM (
+            SELECT id, embedding <=> $1::vector AS distance
+            FROM widip_knowledge_base
+            WHERE quality_score >= 0.4{filters}
+            ORDER BY embedding <=> $1::vector
+            LIMIT $3
+        ) AS nearest
+        WHERE 1 - distance > $4
+    ),
+    text_hits AS (
+        SELECT id, row_number() OVER (ORDER BY text_rank DESC, id) AS rank
+        FROM (
+            SELECT id, ts_rank_cd(search_tsv, q.query) AS text_rank
+            FROM (
+                SELECT replace(plainto_tsquery('french', $2)::text, ' & ', ' | ')::tsquery AS query
+            ) AS q
+            CROSS JOIN widip_knowledge_base
+            WHERE search_tsv @@ q.query
+                AND quality_score >= 0.4{filters}
+            ORDER BY text_rank DESC, id
+            LIMIT $3
+        ) AS matches
+    ),
+    fused AS (
+        SELECT
+            COALESCE(v.id, t.id) AS id,
+            v.rank AS vector_rank,
+            t.rank AS text_rank,
+            COALESCE(1.0 / ($5 + v.rank), 0) + COALESCE(1.0 / ($5 + t.rank), 0) AS score
+        FROM vector_hits AS v
+        FULL OUTER JOIN text_hits AS t ON t.id = v.id
+    )
+    SELECT
+        k.ticket_id,
+        k.problem_summary,
+        k.solution_summary,
+        k.quality_score,
+        cardinality(k.duplicate_ticket_ids) AS duplicates,
+        1 - (k.embedding <=> $1::vector) AS similarity,
+        f.vector_rank,
+        f.text_rank
+    FROM fused AS f
+    JOIN widip_knowledge_base AS k ON k.id = f.id
+    ORDER BY f.score DESC, similarity DESC
+    LIMIT $6
+"""
+
+SEARCH_MODES = ("hybrid", "vector")
+
+
+def _search_filters(
+    category: Optional[str],
+    tags: Optional[list[str]],
+    first_param: int,
+) -> tuple[str, list[Any]]:
+    """
+    Filtres optionnels de la recherche (catégorie exacte, au moins un tag).
+
+    Seuls les filtres demandés sont ajoutés à la requête: le planificateur
+    peut alors utiliser les index category et GIN tags.
+
+    Returns:
+        (clauses SQL à ajouter au WHERE, paramètres à partir de $first_param)
+    """
+    clauses = []
+    args: list[Any] = []
+    if category:
+        args.append(category)
+        clauses.append(f"category = ${first_param + len(args) - 1}")
+    if tags:
+        args.append(list(tags))
+        clauses.append(f"tags && ${first_param + len(args) - 1}::text[]")
+    return "".join(f"\n                AND {clause}" for clause in clauses), args
+
+
+def _vector_literal(embedding: list[float]) -> str:
+    """Embedding au format texte pgvector."""
+    return "[" + ",".join(str(x) for x in embedding) + "]"
+
+
+def _quality(entry: dict[str, Any]) -> float:
+    """quality_score d'une connaissance extraite."""
+    return float(entry.get("quality_score") or 0.0)
+
+
+def cluster_near_duplicates(
+    embeddings: list[list[float]],
+    quality_scores: list[float],
+    threshold: float,
+) -> list[tuple[int, list[int]]]:
+    """
+    Regroupe les quasi-doublons d'un lot (similarité cosinus >= threshold).
+
+    Parcours par quality_score décroissant: chaque vecteur rejoint le premier
+    représentant assez proche, sinon devient représentant.
+
+    Returns:
+        [(indice du représentant, indices des doublons)], dans l'ordre du lot
+    """
+    normalized = []
+    for embedding in embeddings:
+        norm = math.sqrt(sum(x * x for x in embedding)) or 1.0
+        normalized.append([x / norm for x in embedding])
+
+    order = sorted(range(len(embeddings)), key=lambda i: -quality_scores[i])
+    clusters: dict[int, list[int]] = {}
+    for index in order:
+        vector = normalized[index]
+        for rep in clusters:
+            if sum(map(float.__mul__, vector, normalized[rep])) >= threshold:
+                clusters[rep].append(index)
+                break
+        else:
+            clusters[index] = []
+
+    return sorted(clusters.items())
+
 
 class MemoryClient:
     """
@@ -30,7 +283,6 @@ class MemoryClient:
 
     def __init__(self) -> None:
         self._pool: Optional[asyncpg.Pool] = None
-        self._http_client: Optional[httpx.AsyncClient] = None
 
     async def _get_pool(self) -> asyncpg.Pool:
         """Retourne le pool de connexions PostgreSQL."""
@@ -45,19 +297,14 @@ class MemoryClient:
 
     @property
     def http_client(self) -> httpx.AsyncClient:
-        """Retourne le client HTTP pour Ollama."""
-        if self._http_client is None or self._http_client.is_closed:
-            self._http_client = httpx.AsyncClient(timeout=60.0)
-        return self._http_client
+        """Retourne le client HTTP partagé pour Ollama."""
+        return http_pool.get_client("ollama", base_url=settings.ollama_url, timeout=60.0)
 
     async def close(self) -> None:
         """Ferme les connexions."""
         if self._pool:
             await self._pool.close()
             self._pool = None
-        if self._http_client and not self._http_client.is_closed:
-            await self._http_client.aclose()
-            self._http_client = None
 
     async def _get_embedding(self, text: str) -> list[float]:
         """
@@ -70,42 +317,159 @@ class MemoryClient:
             Vecteur d'embedding
         """
         try:
+            with get_circuit_breaker("ollama").guard():
+                return await self._post_embedding(text)
+        except Exception as e:
+            logger.exception("embedding_error", error=str(e))
+            raise
+
+    async def _post_embedding(self, text: str) -> list[float]:
+        """Requête /api/embeddings, sans circuit breaker (l'appelant le tient)."""
+        response = await self.http_client.post(
+            f"{settings.ollama_url}/api/embeddings",
+            json={
+                "model": settings.ollama_embed_model,
+                "prompt": text,
+            },
+        )
+
+        if not response.is_success:
+            raise APIError(
+                f"Ollama error: {response.status_code}",
+                status_code=response.status_code,
+            )
+
+        return response.json().get("embedding", [])
+
+    async def _get_embeddings(self, texts: list[str]) -> list[list[float]]:
+        """
+        Génère les embeddings d'un lot de textes en une requête Ollama (/api/embed).
+
+        Repli texte par texte sur /api/embeddings si l'instance Ollama ne
+        connaît pas l'API par lot (versions < 0.3).
+
+        Args:
+            texts: Textes à encoder
+
+        Returns:
+            Vecteurs d'embedding, dans l'ordre des textes
+        """
+        if not texts:
+            return []
+
+        with get_circuit_breaker("ollama").guard():
             response = await self.http_client.post(
-                f"{settings.ollama_url}/api/embeddings",
+                f"{settings.ollama_url}/api/embed",
                 json={
                     "model": settings.ollama_embed_model,
-                    "prompt": text,
+                    "input": texts,
                 },
             )
 
+            if response.status_code == 404:
+                # Repli dans le même appel gardé: une sonde half-open ne doit
+                # pas reprendre le circuit (elle serait refusée)
+                logger.warning("embedding_batch_unsupported", texts=len(texts))
+                embeddings = []
+                for text in texts:
+                    embeddings.append(await self._post_embedding(text))
+                return embeddings
+
             if not response.is_success:
-                raise Exception(f"Ollama error: {response.status_code}")
+                raise APIError(
+                    f"Ollama error: {response.status_code}",
+                    status_code=response.status_code,
+                )
+
+        embeddings = response.json().get("embeddings", [])
+        if len(embeddings) != len(texts):
+            raise APIError(
+                f"Ollama: {len(embeddings)} embeddings pour {len(texts)} textes"
+            )
+        return embeddings
 
-            data = response.json()
-            return data.get("embedding", [])
+    async def check_exists_bulk(self, ticket_ids: list[str]) -> dict[str, dict[str, Any]]:
+        """
+        Vérifie en une requête quels tickets sont déjà dans la base.
 
-        except Exception as e:
-            logger.exception("embedding_error", error=str(e))
-            raise
+        Un ticket fusionné dans une autre connaissance (quasi-doublon) est
+        présent: merged_into donne le ticket représentant.
+
+        Args:
+            ticket_ids: IDs des tickets GLPI
+
+        Returns:
+            {ticket_id: {knowledge_id, created_at, updated_at[, merged_into]}}
+            des tickets présents
+        """
+        if not ticket_ids:
+            return {}
+
+        pool = await self._get_pool()
+        ids = list(dict.fromkeys(ticket_ids))
+        rows = await pool.fetch(
+            """
+            SELECT k.ticket_id AS requested, k.ticket_id, k.id, k.created_at, k.updated_at
+            FROM widip_knowledge_base AS k
+            WHERE k.ticket_id = ANY($1::varchar[])
+            UNION ALL
+            SELECT q.ticket_id, k.ticket_id, k.id, k.created_at, k.updated_at
+            FROM unnest($1::varchar[]) AS q(ticket_id)
+            JOIN widip_knowledge_base AS k
+                ON k.duplicate_ticket_ids @> ARRAY[q.ticket_id::text]
+            """,
+            ids,
+        )
+
+        existing: dict[str, dict[str, Any]] = {}
+        for row in rows:
+            found = {
+                "knowledge_id": row["id"],
+                "created_at": str(row["created_at"]),
+                "updated_at": str(row["updated_at"]) if row["updated_at"] else None,
+            }
+            if row["ticket_id"] != row["requested"]:
+                found["merged_into"] = row["ticket_id"]
+            existing.setdefault(row["requested"], found)
+        return existing
 
     async def search_similar_cases(
         self,
         query: str,
         limit: int = 3,
         min_similarity: float = 0.6,
+        mode: Optional[str] = None,
+        category: Optional[str] = None,
+        tags: Optional[list[str]] = None,
     ) -> dict[str, Any]:
         """
         Recherche des cas similaires dans la base de connaissances.
 
+        Le mode hybrid retrouve aussi les cas qui partagent un identifiant
+        exact avec la requête (hostname, IP, code d'erreur, numéro KB) même
+        quand la similarité vectorielle est faible.
+
         Args:
             query: Description du problème à rechercher
             limit: Nombre max de résultats
-            min_similarity: Seuil de similarité minimum (0-1)
+            min_similarity: Seuil de similarité minimum (0-1) des résultats
+                vectoriels
+            mode: "hybrid" (plein texte + vectoriel) ou "vector"
+                (défaut: MEMORY_SEARCH_MODE)
+            category: Ne chercher que dans cette catégorie
+            tags: Ne chercher que les cas ayant au moins un de ces tags
 
         Returns:
             Liste des cas similaires avec leur score
         """
-        logger.info("memory_search", query=query[:100], limit=limit)
+        mode = mode or settings.memory_search_mode
+        if mode not in SEARCH_MODES:
+            return {
+                "knowledge_found": False,
+                "error": f"Mode de recherche inconnu: {mode} (attendu: {', '.join(SEARCH_MODES)})",
+            }
+
+        logger.info("memory_search", query=query[:100], limit=limit, mode=mode)
 
         try:
             # Générer l'embedding de la requête
@@ -121,23 +485,29 @@ class MemoryClient:
             pool = await self._get_pool()
 
             # Convertir l'embedding en string pour pgvector
-            embedding_str = "[" + ",".join(str(x) for x in query_embedding) + "]"
-
-            sql = """
-                SELECT
-                    ticket_id,
-                    problem_summary,
-                    solution_summary,
-                    quality_score,
-                    1 - (embedding <=> $1::vector) as similarity
-                FROM widip_knowledge_base
-                WHERE 1 - (embedding <=> $1::vector) > $2
-                    AND quality_score >= 0.4  -- Filtrer les solutions de faible qualité
-                ORDER BY similarity DESC
-                LIMIT $3
-            """
-
-            rows = await pool.fetch(sql, embedding_str, min_similarity, limit)
+            embedding_str = _vector_literal(query_embedding)
+
+            if mode == "hybrid":
+                filters, filter_args = _search_filters(category, tags, first_param=7)
+                rows = await pool.fetch(
+                    _HYBRID_SEARCH_SQL.format(filters=filters),
+                    embedding_str,
+                    query,
+                    max(settings.memory_search_candidates, limit),
+                    min_similarity,
+                    settings.memory_search_rrf_k,
+                    limit,
+                    *filter_args,
+                )
+            else:
+                filters, filter_args = _search_filters(category, tags, first_param=4)
+                rows = await pool.fetch(
+                    _VECTOR_SEARCH_SQL.format(filters=filters),
+                    embedding_str,
+                    min_similarity,
+                    limit,
+                    *filter_args,
+                )
 
             if not rows:
                 return {
@@ -152,15 +522,26 @@ class MemoryClient:
                     "solution": row["solution_summary"],
                     "similarity": f"{row['similarity'] * 100:.0f}%",
                     "quality": f"{row['quality_score']:.2f}",
+                    # Tickets quasi identiques fusionnés dans ce cas
+                    "duplicates": row["duplicates"],
                 }
                 for row in rows
             ]
+            if mode == "hybrid":
+                # Classement(s) ayant retrouvé chaque cas
+                for case, row in zip(cases, rows, strict=True):
+                    case["matched_by"] = [
+                        source
+                        for source, rank in (("vector", row["vector_rank"]), ("text", row["text_rank"]))
+                        if rank is not None
+                    ]
 
-            logger.info("memory_search_results", count=len(cases))
+            logger.info("memory_search_results", count=len(cases), mode=mode)
 
             return {
                 "knowledge_found": True,
                 "count": len(cases),
+                "mode": mode,
                 "cases": cases,
             }
 
@@ -207,47 +588,32 @@ class MemoryClient:
                     "error": "Impossible de générer l'embedding",
                 }
 
-            pool = await self._get_pool()
-
-            # Convertir l'embedding en string pour pgvector
-            embedding_str = "[" + ",".join(str(x) for x in embedding) + "]"
-
-            # Insérer ou mettre à jour
-            sql = """
-                INSERT INTO widip_knowledge_base
-                    (ticket_id, problem_summary, solution_summary, category, tags, embedding, quality_score, created_at)
-                VALUES ($1, $2, $3, $4, $5, $6::vector, $7, NOW())
-                ON CONFLICT (ticket_id)
-                DO UPDATE SET
-                    problem_summary = EXCLUDED.problem_summary,
-                    solution_summary = EXCLUDED.solution_summary,
-                    category = EXCLUDED.category,
-                    tags = EXCLUDED.tags,
-                    embedding = EXCLUDED.embedding,
-                    quality_score = EXCLUDED.quality_score,
-                    updated_at = NOW()
-                RETURNING id
-            """
-
-            row = await pool.fetchrow(
-                sql,
-                ticket_id,
-                problem_summary,
-                solution_summary,
-                category,
-                tags or [],
-                embedding_str,
-                quality_score,
+            # Insérer, mettre à jour, ou fusionner avec un quasi-doublon
+            results = await self.add_knowledge_bulk(
+                [{
+                    "ticket_id": ticket_id,
+                    "problem_summary": problem_summary,
+                    "solution_summary": solution_summary,
+                    "category": category,
+                    "tags": tags or [],
+                    "quality_score": quality_score,
+                }],
+                [embedding],
             )
+            stored = results[ticket_id]
 
-            logger.info("memory_added", ticket_id=ticket_id, id=row["id"])
+            logger.info("memory_added", ticket_id=ticket_id, id=stored["id"])
 
-            return {
+            result = {
                 "success": True,
                 "ticket_id": ticket_id,
-                "id": row["id"],
+                "id": stored["id"],
                 "message": "Connaissance ajoutée à la base",
             }
+            if stored["representative"] != ticket_id:
+                result["merged_into"] = stored["representative"]
+                result["message"] = "Quasi-doublon fusionné avec une connaissance existante"
+            return result
 
         except Exception as e:
             logger.exception("memory_add_error", error=str(e))
@@ -256,6 +622,161 @@ class MemoryClient:
                 "error": str(e),
             }
 
+    async def add_knowledge_bulk(
+        self,
+        entries: list[dict[str, Any]],
+        embeddings: list[list[float]],
+    ) -> dict[str, dict[str, Any]]:
+        """
+        Insère ou met à jour un lot de connaissances, en fusionnant les quasi-doublons.
+
+        Avec MEMORY_DEDUP_ENABLED, avant insertion:
+        1. Les quasi-doublons du lot sont regroupés (similarité cosinus
+           >= MEMORY_DEDUP_THRESHOLD); le meilleur quality_score représente
+           le groupe; un doublon déjà en base en est retiré et traité seul
+        2. Chaque représentant est comparé à la base (plus proche voisin via
+           l'index HNSW, une requête pour tout le lot)
+        3. Un groupe proche d'une connaissance existante y est fusionné: la
+           ligne garde le contenu du meilleur quality_score et liste les
+           autres tickets dans duplicate_ticket_ids
+        4. Les autres groupes sont insérés (INSERT ... ON CONFLICT groupé)
+
+        Args:
+            entries: Connaissances extraites (ticket_id, problem_summary,
+                solution_summary, category, tags, quality_score)
+            embeddings: Embeddings correspondants (même ordre)
+
+        Returns:
+            {ticket_id: {id, representative}}: ligne de chaque ticket et
+            ticket dont elle garde le contenu (différent si fusionné)
+        """
+        if not entries:
+            return {}
+
+        # Un ticket en double dans le lot ferait échouer l'ON CONFLICT: le dernier gagne
+        rows_by_ticket = {
+            entry["ticket_id"]: (entry, embedding)
+            for entry, embedding in zip(entries, embeddings, strict=True)
+        }
+        batch = list(rows_by_ticket.values())
+
+        dedup = settings.memory_dedup_enabled
+        if dedup:
+            clusters = await asyncio.to_thread(
+                cluster_near_duplicates,
+                [embedding for _, embedding in batch],
+                [entry.get("quality_score", 0.0) for entry, _ in batch],
+                settings.memory_dedup_threshold,
+            )
+        else:
+            clusters = [(i, []) for i in range(len(batch))]
+
+        pool = await self._get_pool()
+        results: dict[str, dict[str, Any]] = {}
+
+        async with pool.acquire() as conn, conn.transaction():
+            member_ids = [batch[m][0]["ticket_id"] for _, members in clusters for m in members]
+            if member_ids:
+                # Un doublon du lot déjà en base garde sa ligne (ou son
+                # groupe): traité seul, jamais listé dans une autre ligne
+                known = {
+                    row["ticket_id"]
+                    for row in await conn.fetch(_KNOWN_TICKETS_SQL, member_ids)
+                }
+                if known:
+                    split: list[tuple[int, list[int]]] = []
+                    for rep, members in clusters:
+                        split.append(
+                            (rep, [m for m in members if batch[m][0]["ticket_id"] not in known])
+                        )
+                        split.extend(
+                            (m, []) for m in members if batch[m][0]["ticket_id"] in known
+                        )
+                    clusters = sorted(split)
+
+            neighbours = []
+            if dedup:
+                representatives = [batch[rep] for rep, _ in clusters]
+                neighbours = await conn.fetch(
+                    _NEAREST_KNOWLEDGE_SQL,
+                    [entry["ticket_id"] for entry, _ in representatives],
+                    [_vector_literal(embedding) for _, embedding in representatives],
+                )
+
+            inserts: list[tuple[int, list[int]]] = []
+            merges: dict[int, tuple[int, list[int]]] = {}
+            for position, (rep, members) in enumerate(clusters):
+                row = neighbours[position] if dedup else None
+                target = None
+                if row is not None and row["own_id"] is not None:
+                    # Ticket déjà présent: mise à jour de sa ligne, ou de
+                    # celle de son groupe s'il y a déjà été fusionné
+                    if row["own_ticket_id"] != batch[rep][0]["ticket_id"]:
+                        target = row["own_id"]
+                elif (
+                    row is not None
+                    and row["near_id"] is not None
+                    and row["similarity"] >= settings.memory_dedup_threshold
+                ):
+                    target = row["near_id"]
+
+                if target is None:
+                    inserts.append((rep, members))
+                    continue
+
+                # Plusieurs groupes du lot peuvent viser la même ligne
+                best, tickets = merges.get(target, (rep, []))
+                if _quality(batch[rep][0]) > _quality(batch[best][0]):
+                    best = rep
+                merges[target] = (best, tickets + [rep, *members])
+
+            if inserts:
+                rows = await conn.fetch(
+                    _UPSERT_KNOWLEDGE_SQL,
+                    [batch[rep][0]["ticket_id"] for rep, _ in inserts],
+                    [batch[rep][0]["problem_summary"] for rep, _ in inserts],
+                    [batch[rep][0]["solution_summary"] for rep, _ in inserts],
+                    [batch[rep][0].get("category") for rep, _ in inserts],
+                    [json.dumps(batch[rep][0].get("tags") or []) for rep, _ in inserts],
+                    [_vector_literal(batch[rep][1]) for rep, _ in inserts],
+                    [_quality(batch[rep][0]) for rep, _ in inserts],
+                    [json.dumps([batch[m][0]["ticket_id"] for m in members]) for _, members in inserts],
+                )
+                stored = {row["ticket_id"]: row["id"] for row in rows}
+                for rep, members in inserts:
+                    representative = batch[rep][0]["ticket_id"]
+                    for index in [rep, *members]:
+                        results[batch[index][0]["ticket_id"]] = {
+                            "id": stored[representative],
+                            "representative": representative,
+                        }
+
+            if merges:
+                targets = list(merges.items())
+                rows = await conn.fetch(
+                    _MERGE_KNOWLEDGE_SQL,
+                    [target for target, _ in targets],
+                    [batch[best][0]["ticket_id"] for _, (best, _) in targets],
+                    [batch[best][0]["problem_summary"] for _, (best, _) in targets],
+                    [batch[best][0]["solution_summary"] for _, (best, _) in targets],
+                    [batch[best][0].get("category") for _, (best, _) in targets],
+                    [json.dumps(batch[best][0].get("tags") or []) for _, (best, _) in targets],
+                    [_vector_literal(batch[best][1]) for _, (best, _) in targets],
+                    [_quality(batch[best][0]) for _, (best, _) in targets],
+                    [json.dumps([batch[i][0]["ticket_id"] for i in tickets]) for _, (_, tickets) in targets],
+                )
+                representatives = {row["id"]: row["ticket_id"] for row in rows}
+                for target, (_, tickets) in targets:
+                    for index in tickets:
+                        results[batch[index][0]["ticket_id"]] = {
+                            "id": target,
+                            "representative": representatives[target],
+                        }
+
+        merged = sum(1 for ticket_id, r in results.items() if r["representative"] != ticket_id)
+        logger.info("memory_added_bulk", count=len(results), merged=merged)
+        return results
+
     async def get_stats(self) -> dict[str, Any]:
         """Retourne les statistiques de la base de connaissances."""
         try:
@@ -266,7 +787,8 @@ class MemoryClient:
                     COUNT(*) as total_entries,
                     COUNT(DISTINCT category) as categories,
                     MIN(created_at) as oldest_entry,
-                    MAX(created_at) as newest_entry
+                    MAX(created_at) as newest_entry,
+                    COALESCE(SUM(cardinality(duplicate_ticket_ids)), 0) as merged_duplicates
                 FROM widip_knowledge_base
             """
 
@@ -276,6 +798,7 @@ class MemoryClient:
                 "success": True,
                 "total_entries": row["total_entries"],
                 "categories": row["categories"],
+                "merged_duplicates": row["merged_duplicates"],
                 "oldest_entry": str(row["oldest_entry"]) if row["oldest_entry"] else None,
                 "newest_entry": str(row["newest_entry"]) if row["newest_entry"] else None,
             }
@@ -26,6 +26,7 @@ class MySecretClient(BaseClient):
         super().__init__(
             base_url=settings.mysecret_url,
             timeout=30.0,
+            service_name="mysecret",
         )
 
     def _get_headers(self) -> dict[str, str]:
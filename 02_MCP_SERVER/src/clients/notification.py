@@ -8,19 +8,40 @@ Ce module gère les notifications vers:
 
 Utilise le SMTPClient existant pour les emails
 et des webhooks pour les notifications instantanées.
+
+Quand les workers de l'outbox tournent (serveur MCP), les envois sont
+mis en file dans notification_outbox et livrés en arrière-plan: les tools
+rendent la main sans attendre SMTP ni les webhooks (voir
+notification_outbox.py). Sinon, livraison directe. Un canal non configuré
+(webhook absent) n'est jamais mis en file: son erreur est rendue tout de suite.
 """
 
-from typing import Any, Optional
+import asyncio
+import time
+from typing import Any, Awaitable, Optional
 
 import httpx
 import structlog
 
 from ..config import settings
+from .http_pool import http_pool
+from .notification_digest import NotificationCoalescer
+from .notification_outbox import notification_outbox
+from .notification_templates import notification_templates
 from .smtp import smtp_client
 
 logger = structlog.get_logger(__name__)
 
 
+def _channel_config_error(channel: str) -> Optional[str]:
+    """Erreur de configuration d'un canal webhook (None si configuré)."""
+    if channel == "teams" and not settings.teams_webhook_url:
+        return "Teams webhook URL not configured"
+    if channel == "slack" and not settings.slack_webhook_url:
+        return "Slack webhook URL not configured"
+    return None
+
+
 class NotificationClient:
     """
     Client unifié pour les notifications WIDIP.
@@ -31,20 +52,17 @@ class NotificationClient:
     """
 
     def __init__(self) -> None:
-        self._http_client: Optional[httpx.AsyncClient] = None
+        # Regroupement des notifications techniciens (tempêtes d'alertes)
+        self.coalescer = NotificationCoalescer(self._send_technician_notification)
 
     @property
     def http_client(self) -> httpx.AsyncClient:
-        """Retourne le client HTTP pour les webhooks."""
-        if self._http_client is None or self._http_client.is_closed:
-            self._http_client = httpx.AsyncClient(timeout=30.0)
-        return self._http_client
+        """Retourne le client HTTP partagé pour les webhooks."""
+        return http_pool.get_client("webhooks", timeout=30.0)
 
     async def close(self) -> None:
-        """Ferme le client HTTP."""
-        if self._http_client and not self._http_client.is_closed:
-            await self._http_client.aclose()
-            self._http_client = None
+        """Envoie les digests en attente (pool HTTP partagé: fermé à l'arrêt du serveur)."""
+        await self.coalescer.flush_all()
 
     # =========================================================================
     # Notifications Client
@@ -59,6 +77,7 @@ class NotificationClient:
         message: str,
         notification_type: str = "info",
         include_ticket_link: bool = True,
+        locale: Optional[str] = None,
     ) -> dict[str, Any]:
         """
         Envoie une notification au client final.
@@ -71,6 +90,7 @@ class NotificationClient:
             message: Corps du message
             notification_type: Type de notification (info, update, resolved)
             include_ticket_link: Inclure un lien vers le ticket
+            locale: Langue de l'email (défaut: NOTIFICATION_LOCALE)
 
         Returns:
             Résultat de l'envoi
@@ -89,15 +109,23 @@ class NotificationClient:
             message=message,
             notification_type=notification_type,
             include_ticket_link=include_ticket_link,
+            locale=locale,
         )
 
-        # Envoyer via SMTP
-        result = await smtp_client.send_email(
-            to=client_email,
-            subject=f"[Ticket #{ticket_id}] {subject}",
-            body=message,  # Version texte
-            html_body=html_body,
+        # Envoyer via SMTP (ou mise en file)
+        email = {
+            "to": client_email,
+            "subject": f"[Ticket #{ticket_id}] {subject}",
+            "body": message,  # Version texte
+            "html_body": html_body,
+        }
+        outcome = await self._send(
+            {"email": email},
+            context={"kind": "client", "ticket_id": ticket_id},
         )
+        result = outcome["email"]
+        if result.get("queued"):
+            result.update({"to": client_email, "subject": email["subject"]})
 
         if result.get("success"):
             result["notification_type"] = notification_type
@@ -113,66 +141,26 @@ class NotificationClient:
         message: str,
         notification_type: str,
         include_ticket_link: bool,
+        locale: Optional[str] = None,
     ) -> str:
         """Construit le corps HTML de l'email client."""
-        # Couleurs selon le type
-        colors = {
-            "info": "#17a2b8",
-            "update": "#ffc107",
-            "resolved": "#28a745",
-            "error": "#dc3545",
-        }
-        color = colors.get(notification_type, "#6c757d")
-
-        # Icônes selon le type
-        icons = {
-            "info": "ℹ️",
-            "update": "🔄",
-            "resolved": "✅",
-            "error": "⚠️",
-        }
-        icon = icons.get(notification_type, "📧")
-
-        ticket_link_html = ""
-        if include_ticket_link and settings.glpi_url:
-            ticket_link_html = f"""
-            <p style="margin-top: 20px;">
-                <a href="{settings.glpi_url}/front/ticket.form.php?id={ticket_id}"
-                   style="background: {color}; color: white; padding: 10px 20px;
-                          text-decoration: none; border-radius: 5px;">
-                    Voir le ticket #{ticket_id}
-                </a>
-            </p>
-            """
-
-        return f"""
-<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="UTF-8">
-    <style>
-        body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-        .header {{ background: {color}; color: white; padding: 20px; text-align: center; }}
-        .content {{ padding: 20px; }}
-        .footer {{ background: #f5f5f5; padding: 15px; text-align: center; font-size: 12px; color: #666; }}
-    </style>
-</head>
-<body>
-    <div class="header">
-        <h1>{icon} Ticket #{ticket_id}</h1>
-    </div>
-    <div class="content">
-        <p>Bonjour {client_name},</p>
-        <p>{message}</p>
-        {ticket_link_html}
-    </div>
-    <div class="footer">
-        <p>Cet email a été envoyé automatiquement par le système WIDIP.</p>
-        <p>© {settings.smtp_from_name}</p>
-    </div>
-</body>
-</html>
-"""
+        return notification_templates.render(
+            "client_email.html.j2",
+            locale=locale,
+            client_name=client_name,
+            ticket_id=ticket_id,
+            message=message,
+            notification_type=notification_type,
+            ticket_url=self._ticket_url(ticket_id) if include_ticket_link else None,
+            from_name=settings.smtp_from_name,
+        )
+
+    @staticmethod
+    def _ticket_url(ticket_id: str) -> Optional[str]:
+        """Lien vers le ticket dans GLPI (None si GLPI non configuré)."""
+        if not settings.glpi_url:
+            return None
+        return f"{settings.glpi_url}/front/ticket.form.php?id={ticket_id}"
 
     # =========================================================================
     # Notifications Technicien
@@ -186,10 +174,17 @@ class NotificationClient:
         priority: str = "normal",
         assigned_technician: Optional[str] = None,
         channels: Optional[list[str]] = None,
+        group_key: Optional[str] = None,
+        dedup_key: Optional[str] = None,
+        coalesce: bool = True,
     ) -> dict[str, Any]:
         """
         Notifie un ou plusieurs techniciens.
 
+        Les notifications d'un même groupe sont regroupées (voir
+        notification_digest.py): la première part immédiatement, les
+        suivantes de la fenêtre partent dans un digest unique.
+
         Args:
             ticket_id: ID du ticket concerné
             subject: Sujet de la notification
@@ -197,15 +192,19 @@ class NotificationClient:
             priority: Priorité (low, normal, high, critical)
             assigned_technician: Email du technicien assigné (optionnel)
             channels: Canaux à utiliser ["email", "teams", "slack"]
+            group_key: Groupe de regroupement (client, site...; défaut: ticket)
+            dedup_key: Empreinte de déduplication (défaut: ticket + sujet)
+            coalesce: False pour envoyer sans regroupement
 
         Returns:
-            Résultat des notifications par canal
+            Résultat des notifications par canal (ou du regroupement)
         """
         logger.info(
             "notify_technician",
             ticket_id=ticket_id,
             priority=priority,
             assigned_technician=assigned_technician,
+            group_key=group_key,
         )
 
         # Canaux par défaut selon la priorité
@@ -215,6 +214,35 @@ class NotificationClient:
             else:
                 channels = ["email"]
 
+        if coalesce and settings.notification_digest_enabled:
+            result = await self.coalescer.submit(
+                ticket_id=ticket_id,
+                subject=subject,
+                message=message,
+                priority=priority,
+                recipient=assigned_technician,
+                channels=channels,
+                group_key=group_key,
+                dedup_key=dedup_key,
+            )
+            result.setdefault("ticket_id", ticket_id)
+            result.setdefault("priority", priority)
+            return result
+
+        return await self._send_technician_notification(
+            ticket_id, subject, message, priority, assigned_technician, channels
+        )
+
+    async def _send_technician_notification(
+        self,
+        ticket_id: str,
+        subject: str,
+        message: str,
+        priority: str,
+        assigned_technician: Optional[str],
+        channels: list[str],
+    ) -> dict[str, Any]:
+        """Envoie une notification technicien sur les canaux demandés."""
         results: dict[str, Any] = {
             "success": True,
             "ticket_id": ticket_id,
@@ -223,41 +251,40 @@ class NotificationClient:
             "channels_results": {},
         }
 
+        deliveries: dict[str, dict[str, Any]] = {}
+
         # Envoi par email
         if "email" in channels:
             tech_email = assigned_technician or settings.smtp_from_email
-            email_result = await smtp_client.send_email(
-                to=tech_email,
-                subject=f"[{priority.upper()}] Ticket #{ticket_id}: {subject}",
-                body=message,
-                html_body=self._build_technician_email_html(
+            deliveries["email"] = {
+                "to": tech_email,
+                "subject": f"[{priority.upper()}] Ticket #{ticket_id}: {subject}",
+                "body": message,
+                "html_body": self._build_technician_email_html(
                     ticket_id=ticket_id,
                     subject=subject,
                     message=message,
                     priority=priority,
                 ),
-            )
-            results["channels_results"]["email"] = email_result
+            }
 
-        # Envoi via Teams webhook
-        if "teams" in channels:
-            teams_result = await self._send_teams_notification(
-                ticket_id=ticket_id,
-                subject=subject,
-                message=message,
-                priority=priority,
-            )
-            results["channels_results"]["teams"] = teams_result
+        # Envoi via Teams / Slack webhook
+        for channel in ("teams", "slack"):
+            if channel in channels:
+                deliveries[channel] = {
+                    "ticket_id": ticket_id,
+                    "subject": subject,
+                    "message": message,
+                    "priority": priority,
+                }
 
-        # Envoi via Slack webhook
-        if "slack" in channels:
-            slack_result = await self._send_slack_notification(
-                ticket_id=ticket_id,
-                subject=subject,
-                message=message,
-                priority=priority,
-            )
-            results["channels_results"]["slack"] = slack_result
+        results["channels_results"] = await self._send(
+            deliveries,
+            context={"kind": "technician", "ticket_id": ticket_id, "priority": priority},
+        )
+        results["queued"] = any(
+            r.get("queued", False) for r in results["channels_results"].values()
+        )
 
         # Vérifier si au moins un canal a réussi
         any_success = any(
@@ -268,6 +295,107 @@ class NotificationClient:
 
         return results
 
+    # =========================================================================
+    # Livraison (directe ou via l'outbox)
+    # =========================================================================
+
+    async def deliver(self, channel: str, payload: dict[str, Any]) -> dict[str, Any]:
+        """
+        Livre un envoi sur un canal, avec le timeout du canal.
+
+        Utilisé en direct par _dispatch et par les workers de l'outbox.
+
+        Args:
+            channel: email, teams ou slack
+            payload: Arguments du canal (voir notify_technician)
+
+        Raises:
+            asyncio.TimeoutError: Canal plus lent que son timeout
+        """
+        if channel == "email":
+            sender: Awaitable[dict[str, Any]] = smtp_client.send_email(**payload)
+            timeout = settings.notification_email_timeout
+        elif channel == "teams":
+            sender = self._send_teams_notification(**payload)
+            timeout = settings.notification_webhook_timeout
+        elif channel == "slack":
+            sender = self._send_slack_notification(**payload)
+            timeout = settings.notification_webhook_timeout
+        else:
+            return {"success": False, "error": f"Canal inconnu: {channel}", "permanent": True}
+
+        return await asyncio.wait_for(sender, timeout=timeout)
+
+    async def _send(
+        self,
+        deliveries: dict[str, dict[str, Any]],
+        context: Optional[dict[str, Any]] = None,
+    ) -> dict[str, dict[str, Any]]:
+        """
+        Met les envois en file si les workers de l'outbox tournent, sinon les livre.
+
+        Si l'outbox est indisponible (PostgreSQL), livraison directe. Les
+        canaux non configurés échouent immédiatement, sans file ni envoi.
+        """
+        results: dict[str, dict[str, Any]] = {}
+        for channel in list(deliveries):
+            error = _channel_config_error(channel)
+            if error:
+                results[channel] = {"success": False, "error": error, "permanent": True}
+        deliveries = {c: p for c, p in deliveries.items() if c not in results}
+
+        if deliveries and settings.notification_outbox_enabled and notification_outbox.is_running:
+            try:
+                ids = await notification_outbox.enqueue(deliveries, context=context)
+                results.update(
+                    (channel, {"success": True, "queued": True, "outbox_id": outbox_id})
+                    for channel, outbox_id in ids.items()
+                )
+                return results
+            except Exception as e:
+                logger.warning("notification_enqueue_failed", error=str(e))
+
+        results.update(await self._dispatch(deliveries))
+        return results
+
+    async def _dispatch(
+        self,
+        deliveries: dict[str, dict[str, Any]],
+    ) -> dict[str, dict[str, Any]]:
+        """
+        Envoie sur tous les canaux simultanément.
+
+        Chaque canal a son propre timeout (NOTIFICATION_EMAIL_TIMEOUT,
+        NOTIFICATION_WEBHOOK_TIMEOUT): un webhook injoignable ne retarde
+        ni ne bloque les autres canaux.
+
+        Returns:
+            Résultat par canal (avec duration_ms)
+        """
+
+        async def run(channel: str, payload: dict[str, Any]) -> dict[str, Any]:
+            start = time.perf_counter()
+            try:
+                result = await self.deliver(channel, payload)
+            except asyncio.TimeoutError:
+                logger.warning("notification_channel_timeout", channel=channel)
+                result = {
+                    "success": False,
+                    "error": f"Timeout after {time.perf_counter() - start:.1f}s",
+                    "timed_out": True,
+                }
+            except Exception as e:
+                logger.exception("notification_channel_error", channel=channel, error=str(e))
+                result = {"success": False, "error": str(e)}
+
+            result["duration_ms"] = round((time.perf_counter() - start) * 1000, 1)
+            return result
+
+        outcomes = await asyncio.gather(
+            *(run(channel, payload) for channel, payload in deliveries.items())
+        )
+        return dict(zip(deliveries, outcomes, strict=True))
+
     def _build_technician_email_html(
         self,
         ticket_id: str,
@@ -276,42 +404,13 @@ class NotificationClient:
         priority: str,
     ) -> str:
         """Construit le corps HTML de l'email technicien."""
-        priority_colors = {
-            "low": "#6c757d",
-            "normal": "#17a2b8",
-            "high": "#ffc107",
-            "critical": "#dc3545",
-        }
-        color = priority_colors.get(priority, "#6c757d")
-
-        return f"""
-<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="UTF-8">
-    <style>
-        body {{ font-family: Arial, sans-serif; }}
-        .priority-badge {{
-            background: {color};
-            color: white;
-            padding: 5px 10px;
-            border-radius: 3px;
-            display: inline-block;
-        }}
-        .content {{ padding: 20px; }}
-    </style>
-</head>
-<body>
-    <div class="content">
-        <h2>Ticket #{ticket_id}: {subject}</h2>
-        <p><span class="priority-badge">{priority.upper()}</span></p>
-        <p>{message}</p>
-        <hr>
-        <p><small>Notification WIDIP - Action requise</small></p>
-    </div>
-</body>
-</html>
-"""
+        return notification_templates.render(
+            "technician_email.html.j2",
+            ticket_id=ticket_id,
+            subject=subject,
+            message=message,
+            priority=priority,
+        )
 
     async def _send_teams_notification(
         self,
@@ -321,52 +420,21 @@ class NotificationClient:
         priority: str,
     ) -> dict[str, Any]:
         """Envoie une notification via Microsoft Teams webhook."""
-        teams_webhook_url = getattr(settings, "teams_webhook_url", "")
+        teams_webhook_url = settings.teams_webhook_url
 
-        if not teams_webhook_url:
-            return {
-                "success": False,
-                "error": "Teams webhook URL not configured",
-            }
-
-        # Couleurs Teams selon priorité
-        theme_colors = {
-            "low": "808080",
-            "normal": "0078D7",
-            "high": "FFC107",
-            "critical": "DC3545",
-        }
+        error = _channel_config_error("teams")
+        if error:
+            return {"success": False, "error": error, "permanent": True}
 
-        # Format Adaptive Card pour Teams
-        payload = {
-            "@type": "MessageCard",
-            "@context": "http://schema.org/extensions",
-            "themeColor": theme_colors.get(priority, "0078D7"),
-            "summary": f"Ticket #{ticket_id}: {subject}",
-            "sections": [
-                {
-                    "activityTitle": f"🎫 Ticket #{ticket_id}",
-                    "activitySubtitle": subject,
-                    "facts": [
-                        {"name": "Priorité", "value": priority.upper()},
-                    ],
-                    "text": message,
-                    "markdown": True,
-                }
-            ],
-            "potentialAction": [
-                {
-                    "@type": "OpenUri",
-                    "name": "Voir le ticket",
-                    "targets": [
-                        {
-                            "os": "default",
-                            "uri": f"{settings.glpi_url}/front/ticket.form.php?id={ticket_id}",
-                        }
-                    ],
-                }
-            ] if settings.glpi_url else [],
-        }
+        # MessageCard Teams
+        payload = notification_templates.render_json(
+            "teams_card.json.j2",
+            ticket_id=ticket_id,
+            subject=subject,
+            message=message,
+            priority=priority,
+            ticket_url=self._ticket_url(ticket_id),
+        )
 
         try:
             response = await self.http_client.post(teams_webhook_url, json=payload)
@@ -393,52 +461,20 @@ class NotificationClient:
         priority: str,
     ) -> dict[str, Any]:
         """Envoie une notification via Slack webhook."""
-        slack_webhook_url = getattr(settings, "slack_webhook_url", "")
+        slack_webhook_url = settings.slack_webhook_url
 
-        if not slack_webhook_url:
-            return {
-                "success": False,
-                "error": "Slack webhook URL not configured",
-            }
-
-        # Emojis selon priorité
-        priority_emojis = {
-            "low": "ℹ️",
-            "normal": "📋",
-            "high": "⚠️",
-            "critical": "🚨",
-        }
-        emoji = priority_emojis.get(priority, "📋")
+        error = _channel_config_error("slack")
+        if error:
+            return {"success": False, "error": error, "permanent": True}
 
         # Format Slack Block Kit
-        payload = {
-            "blocks": [
-                {
-                    "type": "header",
-                    "text": {
-                        "type": "plain_text",
-                        "text": f"{emoji} Ticket #{ticket_id}: {subject}",
-                        "emoji": True,
-                    },
-                },
-                {
-                    "type": "section",
-                    "fields": [
-                        {
-                            "type": "mrkdwn",
-                            "text": f"*Priorité:* {priority.upper()}",
-                        },
-                    ],
-                },
-                {
-                    "type": "section",
-                    "text": {
-                        "type": "mrkdwn",
-                        "text": message,
-                    },
-                },
-            ],
-        }
+        payload = notification_templates.render_json(
+            "slack_blocks.json.j2",
+            ticket_id=ticket_id,
+            subject=subject,
+            message=message,
+            priority=priority,
+        )
 
         try:
             response = await self.http_client.post(slack_webhook_url, json=payload)
@@ -532,6 +568,7 @@ class NotificationClient:
             message=message,
             priority=urgency,
             channels=notification_channels,
+            coalesce=False,  # Chaque demande doit être vue individuellement
         )
 
         return {
@@ -546,6 +583,7 @@ class NotificationClient:
             "expires_at": expires_at.isoformat(),
             "expiration_minutes": expiration_minutes,
             "notification_sent": notification_result.get("success", False),
+            "notification_queued": notification_result.get("queued", False),
             "notification_channels": notification_channels,
             "message": (
                 "Demande de validation créée. "
@@ -565,28 +603,16 @@ class NotificationClient:
         expires_at: Any,
     ) -> str:
         """Construit le message de demande de validation."""
-        lines = [
-            f"🔒 VALIDATION HUMAINE REQUISE",
-            f"",
-            f"**ID Demande:** {validation_id}",
-            f"**Action:** {action_type}",
-            f"**Description:** {action_description}",
-        ]
-
-        if affected_entity:
-            lines.append(f"**Entité affectée:** {affected_entity}")
-
-        if ticket_id:
-            lines.append(f"**Ticket associé:** #{ticket_id}")
-
-        lines.extend([
-            f"**Urgence:** {urgency.upper()}",
-            f"**Expire:** {expires_at.strftime('%Y-%m-%d %H:%M UTC')}",
-            f"",
-            f"Veuillez approuver ou refuser cette action via le Dashboard SAFEGUARD.",
-        ])
-
-        return "\n".join(lines)
+        return notification_templates.render(
+            "validation_message.txt.j2",
+            validation_id=validation_id,
+            action_type=action_type,
+            action_description=action_description,
+            ticket_id=ticket_id,
+            affected_entity=affected_entity,
+            urgency=urgency,
+            expires_at=expires_at,
+        )
 
 
 # Instance singleton
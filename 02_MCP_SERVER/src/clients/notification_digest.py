@@ -0,0 +1,286 @@
+"""
+Regroupement des notifications techniciens (anti tempête d'alertes).
+
+Pendant une panne de site, le workflow proactif notifie une fois par
+équipement ou ticket: des centaines de messages Teams/email en quelques
+minutes. Le coalesceur regroupe ces notifications:
+
+- Clé de regroupement: destinataire + groupe (client/site fourni par
+  l'appelant, sinon le ticket: des alertes sans lien ne sont jamais
+  retenues ensemble)
+- La première notification d'un groupe part immédiatement; les suivantes
+  de la fenêtre (NOTIFICATION_DIGEST_WINDOW) sont accumulées et envoyées
+  en un seul digest à la fin de la fenêtre
+- Une alerte critique nouvelle part toujours immédiatement (seules ses
+  répétitions sont dédupliquées)
+- Une fenêtre qui a produit un digest est rouverte (fenêtre glissante);
+  une fenêtre vide referme le groupe
+- Empreinte de déduplication (dedup_key, sinon ticket + sujet): une même
+  alerte répétée n'apparaît qu'une fois dans le digest, avec son compteur
+"""
+
+import asyncio
+import hashlib
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Optional
+
+import structlog
+
+from ..config import settings
+
+logger = structlog.get_logger(__name__)
+
+# Ordre des priorités (le digest prend la plus haute de ses alertes)
+PRIORITY_ORDER = {"low": 0, "normal": 1, "high": 2, "critical": 3}
+
+# Nombre maximum d'alertes détaillées dans le corps d'un digest
+_MAX_DIGEST_LINES = 50
+
+# Envoi d'un digest: (ticket_id, subject, message, priority, recipient, channels)
+DigestSender = Callable[
+    [str, str, str, str, Optional[str], list[str]],
+    Awaitable[dict[str, Any]],
+]
+
+
+def notification_fingerprint(ticket_id: str, subject: str, dedup_key: Optional[str] = None) -> str:
+    """Empreinte de déduplication d'une notification."""
+    raw = dedup_key or f"{ticket_id}|{' '.join(subject.lower().split())}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+@dataclass
+class _DigestItem:
+    """Alerte accumulée dans un digest."""
+
+    ticket_id: str
+    subject: str
+    message: str
+    priority: str
+    count: int = 1
+    first_seen: float = field(default_factory=time.time)
+    last_seen: float = field(default_factory=time.time)
+
+
+@dataclass
+class _DigestGroup:
+    """Fenêtre de regroupement ouverte pour un destinataire et un groupe."""
+
+    recipient: Optional[str]
+    group: str
+    channels: list[str]
+    items: dict[str, _DigestItem] = field(default_factory=dict)
+    # Empreintes déjà envoyées dans cette fenêtre (envoi immédiat inclus)
+    sent: set[str] = field(default_factory=set)
+    task: Optional[asyncio.Task] = None
+
+
+class NotificationCoalescer:
+    """
+    Regroupe les notifications d'un même groupe dans une fenêtre glissante.
+
+    État en mémoire du processus: comme les circuits et budgets de retries,
+    chaque instance du serveur regroupe ses propres notifications.
+
+    Args:
+        send: Envoi effectif (immédiat ou digest)
+        window: Durée de la fenêtre (secondes)
+    """
+
+    def __init__(self, send: DigestSender, window: Optional[float] = None) -> None:
+        self._send = send
+        self._window = window
+        self._groups: dict[tuple[Optional[str], str], _DigestGroup] = {}
+        self.received = 0
+        self.sent_immediately = 0
+        self.coalesced = 0
+        self.duplicates = 0
+        self.digests_sent = 0
+
+    @property
+    def window(self) -> float:
+        return self._window if self._window is not None else settings.notification_digest_window
+
+    async def submit(
+        self,
+        ticket_id: str,
+        subject: str,
+        message: str,
+        priority: str,
+        recipient: Optional[str],
+        channels: list[str],
+        group_key: Optional[str] = None,
+        dedup_key: Optional[str] = None,
+    ) -> dict[str, Any]:
+        """
+        Envoie ou accumule une notification.
+
+        Returns:
+            Résultat de l'envoi immédiat, ou {"coalesced": True, ...}
+        """
+        self.received += 1
+        group = group_key or f"ticket:{ticket_id}"
+        key = (recipient, group)
+        fingerprint = notification_fingerprint(ticket_id, subject, dedup_key)
+
+        digest = self._groups.get(key)
+        if digest is None:
+            # Première alerte du groupe: envoi immédiat et ouverture de la fenêtre
+            digest = _DigestGroup(recipient=recipient, group=group, channels=list(channels))
+            self._groups[key] = digest
+            digest.task = asyncio.create_task(self._run_window(key))
+            return await self._send_now(digest, fingerprint, ticket_id, subject, message,
+                                        priority, recipient, channels)
+
+        is_new = fingerprint not in digest.items and fingerprint not in digest.sent
+        if priority == "critical" and is_new:
+            # Jamais de critique retenue dans un digest
+            return await self._send_now(digest, fingerprint, ticket_id, subject, message,
+                                        priority, recipient, channels)
+
+        for channel in channels:
+            if channel not in digest.channels:
+                digest.channels.append(channel)
+
+        item = digest.items.get(fingerprint)
+        duplicate = item is not None or fingerprint in digest.sent
+        if item is not None:
+            item.count += 1
+            item.last_seen = time.time()
+            item.message = message
+            if PRIORITY_ORDER.get(priority, 1) > PRIORITY_ORDER.get(item.priority, 1):
+                item.priority = priority
+        elif fingerprint in digest.sent:
+            # Déjà envoyée dans cette fenêtre: simple répétition, rien à renvoyer
+            pass
+        else:
+            digest.items[fingerprint] = _DigestItem(
+                ticket_id=ticket_id,
+                subject=subject,
+                message=message,
+                priority=priority,
+            )
+
+        if duplicate:
+            self.duplicates += 1
+        else:
+            self.coalesced += 1
+
+        return {
+            "success": True,
+            "coalesced": True,
+            "duplicate": duplicate,
+            "digest_group": group,
+            "pending_in_digest": len(digest.items),
+            "channels_attempted": digest.channels,
+            "message": (
+                "Notification regroupée: envoi dans le prochain digest "
+                f"(fenêtre de {self.window:.0f}s)"
+            ),
+        }
+
+    async def _send_now(
+        self,
+        digest: _DigestGroup,
+        fingerprint: str,
+        ticket_id: str,
+        subject: str,
+        message: str,
+        priority: str,
+        recipient: Optional[str],
+        channels: list[str],
+    ) -> dict[str, Any]:
+        """Envoi immédiat (répétitions de la fenêtre dédupliquées ensuite)."""
+        digest.sent.add(fingerprint)
+        self.sent_immediately += 1
+        result = await self._send(ticket_id, subject, message, priority, recipient, channels)
+        result["coalesced"] = False
+        result["digest_group"] = digest.group
+        return result
+
+    async def _run_window(self, key: tuple[Optional[str], str]) -> None:
+        """Envoie un digest à chaque fin de fenêtre tant que le groupe reçoit des alertes."""
+        try:
+            while True:
+                await asyncio.sleep(self.window)
+                digest = self._groups.get(key)
+                if digest is None:
+                    return
+                if not digest.items:
+                    del self._groups[key]
+                    return
+                await self._flush(digest)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.exception("notification_digest_error", group=key[1], error=str(e))
+            self._groups.pop(key, None)
+
+    async def _flush(self, digest: _DigestGroup) -> None:
+        """Envoie le digest des alertes accumulées et vide la fenêtre."""
+        items = list(digest.items.values())
+        digest.items = {}
+        digest.sent = set()
+        if not items:
+            return
+
+        items.sort(key=lambda i: (-PRIORITY_ORDER.get(i.priority, 1), i.first_seen))
+        priority = items[0].priority
+        total = sum(i.count for i in items)
+
+        lines = [
+            f"{len(items)} alerte(s) distincte(s), {total} notification(s) "
+            f"regroupées sur {self.window:.0f}s ({digest.group}).",
+            "",
+        ]
+        for item in items[:_MAX_DIGEST_LINES]:
+            repeat = f" (x{item.count})" if item.count > 1 else ""
+            lines.append(f"- [{item.priority.upper()}] #{item.ticket_id} {item.subject}{repeat}")
+        if len(items) > _MAX_DIGEST_LINES:
+            lines.append(f"... et {len(items) - _MAX_DIGEST_LINES} autre(s)")
+
+        ticket_ids = list(dict.fromkeys(i.ticket_id for i in items))
+        ticket_label = ", ".join(ticket_ids[:3])
+        if len(ticket_ids) > 3:
+            ticket_label += f" (+{len(ticket_ids) - 3})"
+
+        self.digests_sent += 1
+        logger.info(
+            "notification_digest_sent",
+            group=digest.group,
+            recipient=digest.recipient,
+            alerts=len(items),
+            notifications=total,
+        )
+        await self._send(
+            ticket_label,
+            f"Digest: {len(items)} alerte(s) ({digest.group})",
+            "\n".join(lines),
+            priority,
+            digest.recipient,
+            digest.channels,
+        )
+
+    def stats(self) -> dict[str, Any]:
+        """Compteurs du regroupement (pour /metrics)."""
+        return {
+            "open_groups": len(self._groups),
+            "pending": sum(len(d.items) for d in self._groups.values()),
+            "received": self.received,
+            "sent_immediately": self.sent_immediately,
+            "coalesced": self.coalesced,
+            "duplicates": self.duplicates,
+            "digests_sent": self.digests_sent,
+        }
+
+    async def flush_all(self) -> None:
+        """Envoie tous les digests en attente (arrêt du serveur)."""
+        groups, self._groups = self._groups, {}
+        for digest in groups.values():
+            if digest.task is not None:
+                digest.task.cancel()
+            try:
+                await self._flush(digest)
+            except Exception as e:
+                logger.error("notification_digest_flush_failed", group=digest.group, error=str(e))
@@ -0,0 +1,439 @@
+"""
+File d'envoi persistante des notifications (outbox PostgreSQL).
+
+Les tools notify_client / notify_technician / request_human_validation
+n'attendent plus SMTP ni les webhooks: chaque envoi (un par canal) est
+inséré dans notification_outbox et l'appel rend la main immédiatement.
+
+Des workers en arrière-plan livrent les envois:
+- Réservation par lots avec FOR UPDATE SKIP LOCKED (plusieurs workers,
+  plusieurs instances du serveur, sans double envoi)
+- Débit limité par canal (seau à jetons, NOTIFICATION_RATE_LIMITS)
+- Retries avec backoff; au-delà de NOTIFICATION_MAX_ATTEMPTS l'envoi passe
+  en "dead" (dead letter) et reste consultable / relançable. Une erreur
+  permanente (résultat "permanent": canal non configuré) y passe sans retry
+- Un envoi réservé par un worker arrêté brutalement est repris à
+  l'expiration de son verrou
+"""
+
+import asyncio
+import contextlib
+import json
+from typing import Any, Awaitable, Callable, Optional
+
+import asyncpg
+import structlog
+
+from ..config import settings
+from ..utils.retry import RetryPolicy, TokenBucket
+
+logger = structlog.get_logger(__name__)
+
+# Fonction de livraison: (canal, payload) -> résultat {"success": ...}
+DeliverFunc = Callable[[str, dict[str, Any]], Awaitable[dict[str, Any]]]
+
+OUTBOX_SQL = """
+    CREATE TABLE IF NOT EXISTS notification_outbox (
+        id BIGSERIAL PRIMARY KEY,
+        channel VARCHAR(20) NOT NULL,
+        payload JSONB NOT NULL,
+        context JSONB,
+        status VARCHAR(20) NOT NULL DEFAULT 'pending',
+        attempts INTEGER NOT NULL DEFAULT 0,
+        next_attempt_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+        locked_until TIMESTAMP WITH TIME ZONE,
+        last_error TEXT,
+        created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+        sent_at TIMESTAMP WITH TIME ZONE
+    );
+
+    CREATE INDEX IF NOT EXISTS idx_notification_outbox_due
+        ON notification_outbox(next_attempt_at)
+        WHERE status IN ('pending', 'sending');
+    CREATE INDEX IF NOT EXISTS idx_notification_outbox_dead
+        ON notification_outbox(created_at DESC)
+        WHERE status = 'dead';
+"""
+
+CLAIM_SQL = """
+    UPDATE notification_outbox
+    SET status = 'sending',
+        attempts = attempts + 1,
+        locked_until = NOW() + make_interval(secs => $2)
+    WHERE id IN (
+        SELECT id FROM notification_outbox
+        WHERE (status = 'pending' AND next_attempt_at <= NOW())
+           OR (status = 'sending' AND locked_until < NOW())
+        ORDER BY next_attempt_at
+        LIMIT $1
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING id, channel, payload, context, attempts
+"""
+
+
+def _parse_rate_limits(raw: str) -> dict[str, float]:
+    """Parse "email=5,teams=1" en {"email": 5.0, "teams": 1.0} (envois/seconde)."""
+    limits: dict[str, float] = {}
+    for item in raw.split(","):
+        name, _, value = item.partition("=")
+        try:
+            limits[name.strip().lower()] = float(value)
+        except ValueError:
+            continue
+    return limits
+
+
+class NotificationOutbox:
+    """
+    Outbox des notifications et workers de livraison.
+
+    La livraison elle-même est fournie au démarrage (NotificationClient.deliver)
+    pour éviter une dépendance circulaire avec le client de notification.
+    """
+
+    def __init__(self) -> None:
+        self._pool: Optional[asyncpg.Pool] = None
+        self._initialized = False
+        self._workers: list[asyncio.Task] = []
+        self._wakeup = asyncio.Event()
+        self._deliver: Optional[DeliverFunc] = None
+        self._buckets: dict[str, TokenBucket] = {}
+        self._retry_policy = RetryPolicy(
+            base_delay=settings.notification_retry_base_delay,
+            max_delay=settings.notification_retry_max_delay,
+        )
+        self.delivered = 0
+        self.failed = 0
+        self.dead_lettered = 0
+
+    @property
+    def is_running(self) -> bool:
+        """Indique si les workers de livraison tournent."""
+        return any(not task.done() for task in self._workers)
+
+    async def _get_pool(self) -> asyncpg.Pool:
+        """Retourne le pool de connexions PostgreSQL."""
+        if self._pool is None:
+            self._pool = await asyncpg.create_pool(
+                settings.postgres_dsn,
+                min_size=1,
+                max_size=settings.notification_outbox_workers + 1,
+            )
+        return self._pool
+
+    async def initialize(self) -> None:
+        """Crée la table de l'outbox si nécessaire."""
+        if self._initialized:
+            return
+
+        pool = await self._get_pool()
+        await pool.execute(OUTBOX_SQL)
+        self._initialized = True
+        logger.info("notification_outbox_initialized")
+
+    # =========================================================================
+    # Enfilage
+    # =========================================================================
+
+    async def enqueue(
+        self,
+        deliveries: dict[str, dict[str, Any]],
+        context: Optional[dict[str, Any]] = None,
+    ) -> dict[str, int]:
+        """
+        Enregistre des envois (un par canal) et réveille les workers.
+
+        Args:
+            deliveries: Payload de livraison par canal
+            context: Contexte commun (ticket, type de notification...)
+
+        Returns:
+            ID d'outbox par canal
+        """
+        await self.initialize()
+        pool = await self._get_pool()
+        context_json = json.dumps(context or {})
+
+        ids: dict[str, int] = {}
+        async with pool.acquire() as conn, conn.transaction():
+            for channel, payload in deliveries.items():
+                ids[channel] = await conn.fetchval(
+                    """
+                    INSERT INTO notification_outbox (channel, payload, context)
+                    VALUES ($1, $2::jsonb, $3::jsonb)
+                    RETURNING id
+                    """,
+                    channel,
+                    json.dumps(payload),
+                    context_json,
+                )
+
+        self._wakeup.set()
+        logger.info("notification_enqueued", channels=list(ids), ids=list(ids.values()))
+        return ids
+
+    # =========================================================================
+    # Workers
+    # =========================================================================
+
+    def start(self, deliver: DeliverFunc) -> None:
+        """Démarre les workers de livraison (NOTIFICATION_OUTBOX_WORKERS)."""
+        if self.is_running:
+            return
+
+        self._deliver = deliver
+        self._workers = [
+            asyncio.create_task(self._worker(index), name=f"notification-outbox-{index}")
+            for index in range(max(1, settings.notification_outbox_workers))
+        ]
+        logger.info("notification_outbox_started", workers=len(self._workers))
+
+    async def stop(self) -> None:
+        """Arrête les workers (les envois réservés seront repris au redémarrage)."""
+        workers, self._workers = self._workers, []
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+    async def _worker(self, index: int) -> None:
+        """Boucle d'un worker: réserve un lot, le livre, recommence."""
+        while True:
+            try:
+                processed = await self.process_batch()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("notification_outbox_worker_error", worker=index, error=str(e))
+                processed = 0
+
+            if processed:
+                continue
+
+            # File vide: attendre un enfilage ou le prochain retry planifié
+            self._wakeup.clear()
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(
+                    self._wakeup.wait(),
+                    timeout=settings.notification_outbox_poll_interval,
+                )
+
+    async def process_batch(self) -> int:
+        """
+        Réserve et livre un lot d'envois dus.
+
+        Returns:
+            Nombre d'envois traités
+        """
+        if self._deliver is None:
+            raise RuntimeError("NotificationOutbox.start() n'a pas été appelé")
+
+        await self.initialize()
+        pool = await self._get_pool()
+
+        rows = await pool.fetch(
+            CLAIM_SQL,
+            settings.notification_outbox_batch_size,
+            self._lock_seconds(),
+        )
+
+        for row in rows:
+            await self._deliver_row(pool, row)
+        return len(rows)
+
+    @staticmethod
+    def _lock_seconds() -> float:
+        """
+        Durée du verrou d'un lot: plus longue que son pire traitement.
+
+        Chaque envoi peut durer NOTIFICATION_EMAIL_TIMEOUT, après l'attente
+        du seau à jetons de son canal. Les seaux sont partagés par les
+        workers: au pire, le lot attend aussi les jetons des lots des autres
+        workers, au débit du canal le plus lent.
+        """
+        batch_size = settings.notification_outbox_batch_size
+        workers = max(1, settings.notification_outbox_workers)
+        rates = [
+            rate for rate in _parse_rate_limits(settings.notification_rate_limits).values()
+            if rate > 0
+        ]
+        bucket_wait = batch_size * workers / min(rates) if rates else 0.0
+        return float(settings.notification_email_timeout * batch_size + bucket_wait + 60)
+
+    def _bucket(self, channel: str) -> Optional[TokenBucket]:
+        """Seau à jetons du canal (None si débit non limité)."""
+        bucket = self._buckets.get(channel)
+        if bucket is None:
+            rate = _parse_rate_limits(settings.notification_rate_limits).get(channel)
+            if not rate or rate <= 0:
+                return None
+            bucket = TokenBucket(capacity=max(1.0, rate), refill_rate=rate)
+            self._buckets[channel] = bucket
+        return bucket
+
+    async def _deliver_row(self, pool: asyncpg.Pool, row: asyncpg.Record) -> None:
+        """Livre un envoi puis enregistre le résultat (sent, retry ou dead)."""
+        channel = row["channel"]
+        payload = row["payload"]
+        if isinstance(payload, str):
+            payload = json.loads(payload)
+
+        bucket = self._bucket(channel)
+        if bucket is not None:
+            await bucket.acquire()
+
+        permanent = False
+        try:
+            result = await self._deliver(channel, payload)
+            error = None if result.get("success") else str(result.get("error", "échec"))
+            # Erreur de configuration (webhook absent, canal inconnu): inutile de réessayer
+            permanent = bool(result.get("permanent"))
+        except Exception as e:
+            error = str(e)
+
+        if error is None:
+            await pool.execute(
+                """
+                UPDATE notification_outbox
+                SET status = 'sent', sent_at = NOW(), locked_until = NULL, last_error = NULL
+                WHERE id = $1
+                """,
+                row["id"],
+            )
+            self.delivered += 1
+            logger.info("notification_delivered", outbox_id=row["id"], channel=channel)
+            return
+
+        attempts = row["attempts"]
+        if permanent or attempts >= settings.notification_max_attempts:
+            await pool.execute(
+                """
+                UPDATE notification_outbox
+                SET status = 'dead', locked_until = NULL, last_error = $2
+                WHERE id = $1
+                """,
+                row["id"],
+                error[:2000],
+            )
+            self.dead_lettered += 1
+            logger.error(
+                "notification_dead_lettered",
+                outbox_id=row["id"],
+                channel=channel,
+                attempts=attempts,
+                permanent=permanent,
+                error=error[:200],
+            )
+            return
+
+        delay = self._retry_policy.backoff(attempts)
+        await pool.execute(
+            """
+            UPDATE notification_outbox
+            SET status = 'pending', locked_until = NULL, last_error = $2,
+                next_attempt_at = NOW() + make_interval(secs => $3)
+            WHERE id = $1
+            """,
+            row["id"],
+            error[:2000],
+            delay,
+        )
+        self.failed += 1
+        logger.warning(
+            "notification_delivery_retry",
+            outbox_id=row["id"],
+            channel=channel,
+            attempt=attempts,
+            retry_in=round(delay, 1),
+            error=error[:200],
+        )
+
+    # =========================================================================
+    # Administration
+    # =========================================================================
+
+    async def get_stats(self) -> dict[str, Any]:
+        """Compteurs par statut et canal."""
+        await self.initialize()
+        pool = await self._get_pool()
+        rows = await pool.fetch(
+            """
+            SELECT channel, status, COUNT(*) AS count
+            FROM notification_outbox
+            WHERE status <> 'sent' OR sent_at > NOW() - INTERVAL '24 hours'
+            GROUP BY channel, status
+            """
+        )
+
+        by_status: dict[str, int] = {}
+        by_channel: dict[str, dict[str, int]] = {}
+        for row in rows:
+            by_status[row["status"]] = by_status.get(row["status"], 0) + row["count"]
+            by_channel.setdefault(row["channel"], {})[row["status"]] = row["count"]
+
+        return {
+            "running": self.is_running,
+            "workers": len(self._workers),
+            "by_status": by_status,
+            "by_channel": by_channel,
+            "delivered": self.delivered,
+            "failed_attempts": self.failed,
+            "dead_lettered": self.dead_lettered,
+        }
+
+    async def get_dead_letters(self, limit: int = 50) -> list[dict[str, Any]]:
+        """Envois abandonnés (dead letters), les plus récents d'abord."""
+        await self.initialize()
+        pool = await self._get_pool()
+        rows = await pool.fetch(
+            """
+            SELECT id, channel, context, attempts, last_error, created_at
+            FROM notification_outbox
+            WHERE status = 'dead'
+            ORDER BY created_at DESC
+            LIMIT $1
+            """,
+            limit,
+        )
+        return [
+            {
+                "id": row["id"],
+                "channel": row["channel"],
+                "context": json.loads(row["context"]) if row["context"] else None,
+                "attempts": row["attempts"],
+                "last_error": row["last_error"],
+                "created_at": row["created_at"].isoformat(),
+            }
+            for row in rows
+        ]
+
+    async def retry_dead(self, outbox_id: Optional[int] = None) -> int:
+        """
+        Remet des dead letters en file (toutes, ou une seule).
+
+        Returns:
+            Nombre d'envois remis en file
+        """
+        await self.initialize()
+        pool = await self._get_pool()
+        result = await pool.execute(
+            """
+            UPDATE notification_outbox
+            SET status = 'pending', attempts = 0, next_attempt_at = NOW()
+            WHERE status = 'dead' AND ($1::bigint IS NULL OR id = $1)
+            """,
+            outbox_id,
+        )
+        self._wakeup.set()
+        return int(result.split()[-1])
+
+    async def close(self) -> None:
+        """Arrête les workers et ferme le pool de connexions."""
+        await self.stop()
+        if self._pool:
+            await self._pool.close()
+            self._pool = None
+
+
+# Instance singleton
+notification_outbox = NotificationOutbox()
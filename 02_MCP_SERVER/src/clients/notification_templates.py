@@ -0,0 +1,106 @@
+"""
+Templates des notifications (emails, cartes Teams, blocs Slack).
+
+Rendu Jinja2 pour tous les formats de notification:
+- Templates compilés une fois et gardés en cache par l'environnement
+  (rendu en quelques microsecondes pendant une rafale)
+- Cache de bytecode sur disque optionnel (NOTIFICATION_TEMPLATES_CACHE_DIR):
+  pas de recompilation au redémarrage
+- Rechargement à chaud (NOTIFICATION_TEMPLATES_AUTO_RELOAD): un template
+  modifié sur disque est recompilé au rendu suivant, sans redémarrage
+- Variantes par langue: <locale>/<nom>, repli sur la langue par défaut
+
+Les templates livrés sont dans src/templates/notifications/; un répertoire
+NOTIFICATION_TEMPLATES_DIR les surcharge fichier par fichier.
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Optional
+
+import structlog
+from jinja2 import (
+    ChoiceLoader,
+    Environment,
+    FileSystemBytecodeCache,
+    FileSystemLoader,
+    StrictUndefined,
+    select_autoescape,
+)
+
+from ..config import settings
+
+logger = structlog.get_logger(__name__)
+
+# Templates livrés avec le serveur
+BUNDLED_TEMPLATES_DIR = Path(__file__).resolve().parent.parent / "templates" / "notifications"
+
+
+class NotificationTemplates:
+    """Moteur de rendu des notifications (environnement Jinja2 créé à la demande)."""
+
+    def __init__(self) -> None:
+        self._env: Optional[Environment] = None
+
+    @property
+    def env(self) -> Environment:
+        """Environnement Jinja2 (loaders, caches, échappement HTML)."""
+        if self._env is None:
+            search_path = [str(BUNDLED_TEMPLATES_DIR)]
+            if settings.notification_templates_dir:
+                search_path.insert(0, settings.notification_templates_dir)
+
+            bytecode_cache = None
+            if settings.notification_templates_cache_dir:
+                Path(settings.notification_templates_cache_dir).mkdir(parents=True, exist_ok=True)
+                bytecode_cache = FileSystemBytecodeCache(settings.notification_templates_cache_dir)
+
+            self._env = Environment(
+                loader=ChoiceLoader([FileSystemLoader(path) for path in search_path]),
+                autoescape=select_autoescape(["html", "html.j2"]),
+                auto_reload=settings.notification_templates_auto_reload,
+                bytecode_cache=bytecode_cache,
+                cache_size=100,
+                undefined=StrictUndefined,
+                keep_trailing_newline=False,
+            )
+            logger.info(
+                "notification_templates_loaded",
+                search_path=search_path,
+                auto_reload=settings.notification_templates_auto_reload,
+            )
+        return self._env
+
+    def render(self, name: str, locale: Optional[str] = None, **context: Any) -> str:
+        """
+        Rend un template dans la langue demandée.
+
+        Args:
+            name: Nom du template (ex: "client_email.html.j2")
+            locale: Langue (défaut: NOTIFICATION_LOCALE)
+            **context: Variables du template
+
+        Returns:
+            Texte rendu
+        """
+        default_locale = settings.notification_locale
+        candidates = [f"{locale or default_locale}/{name}"]
+        if locale and locale != default_locale:
+            candidates.append(f"{default_locale}/{name}")
+
+        template = self.env.select_template(candidates)
+        return template.render(**context)
+
+    def render_json(self, name: str, locale: Optional[str] = None, **context: Any) -> Any:
+        """Rend un template JSON (cartes Teams, blocs Slack) et le décode."""
+        return json.loads(self.render(name, locale=locale, **context))
+
+    def reload(self) -> None:
+        """Vide les templates compilés (prise en compte immédiate d'un changement)."""
+        if self._env is not None and self._env.bytecode_cache is not None:
+            self._env.bytecode_cache.clear()
+        self._env = None
+
+
+# Instance singleton
+notification_templates = NotificationTemplates()
@@ -28,6 +28,7 @@ class ObserviumClient(BaseClient):
         super().__init__(
             base_url=settings.observium_url,
             timeout=30.0,
+            service_name="observium",
         )
         self._user = settings.observium_user
         self._password = settings.observium_pass.get_secret_value()
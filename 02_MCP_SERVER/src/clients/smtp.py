@@ -2,12 +2,21 @@
 Client SMTP pour l'envoi d'emails.
 
 Utilisé pour les notifications et communications automatisées.
+
+Les connexions authentifiées sont conservées dans un petit pool
+(SMTP_POOL_SIZE): une rafale de notifications ne paie la connexion TLS et
+le login qu'une fois. Une connexion inactive depuis quelques secondes est
+vérifiée par NOOP avant réutilisation, et fermée au-delà de
+SMTP_POOL_IDLE_TIMEOUT (la plupart des serveurs coupent vers 60-300s).
 """
 
+import asyncio
+import time
 from typing import Any, Optional
 
 import aiosmtplib
 import structlog
+from email.message import Message
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 
@@ -16,16 +25,25 @@ from ..config import settings
 logger = structlog.get_logger(__name__)
 
 
+# Inactivité au-delà de laquelle une connexion est vérifiée par NOOP (secondes)
+_NOOP_AFTER = 5.0
+
+
 class SMTPClient:
     """
     Client SMTP asynchrone pour l'envoi d'emails.
     """
 
     def __init__(self) -> None:
-        self._smtp: Optional[aiosmtplib.SMTP] = None
+        # Connexions libres: (connexion, dernière utilisation)
+        self._idle: list[tuple[aiosmtplib.SMTP, float]] = []
+        self._slots = asyncio.Semaphore(max(1, settings.smtp_pool_size))
+        self.connections_opened = 0
+        self.connections_reused = 0
+        self.emails_sent = 0
 
     async def _get_connection(self) -> aiosmtplib.SMTP:
-        """Retourne une connexion SMTP."""
+        """Ouvre une nouvelle connexion SMTP authentifiée."""
         smtp = aiosmtplib.SMTP(
             hostname=settings.smtp_host,
             port=settings.smtp_port,
@@ -39,8 +57,85 @@ class SMTPClient:
                 settings.smtp_pass.get_secret_value(),
             )
 
+        self.connections_opened += 1
         return smtp
 
+    @staticmethod
+    async def _discard(smtp: aiosmtplib.SMTP) -> None:
+        """Ferme une connexion sans propager d'erreur."""
+        try:
+            if smtp.is_connected:
+                await smtp.quit()
+        except Exception:
+            smtp.close()
+
+    async def _acquire(self) -> tuple[aiosmtplib.SMTP, bool]:
+        """
+        Retourne une connexion du pool (ou une nouvelle).
+
+        Le slot du pool doit déjà être réservé (self._slots).
+
+        Returns:
+            (connexion, réutilisée)
+        """
+        now = time.monotonic()
+        while self._idle:
+            smtp, last_used = self._idle.pop()
+            idle_for = now - last_used
+
+            if idle_for > settings.smtp_pool_idle_timeout or not smtp.is_connected:
+                await self._discard(smtp)
+                continue
+
+            if idle_for > _NOOP_AFTER:
+                try:
+                    await smtp.noop()
+                except Exception:
+                    await self._discard(smtp)
+                    continue
+
+            self.connections_reused += 1
+            return smtp, True
+
+        return await self._get_connection(), False
+
+    def _release(self, smtp: aiosmtplib.SMTP) -> None:
+        """Remet une connexion saine dans le pool."""
+        self._idle.append((smtp, time.monotonic()))
+
+    async def _send(self, msg: Message, recipients: list[str]) -> None:
+        """
+        Envoie un message via le pool.
+
+        Une connexion réutilisée peut avoir été coupée par le serveur entre
+        le NOOP et l'envoi: dans ce cas, un seul nouvel essai sur une
+        connexion neuve.
+        """
+        async with self._slots:
+            smtp, reused = await self._acquire()
+            try:
+                await smtp.send_message(msg, recipients=recipients)
+            except aiosmtplib.SMTPServerDisconnected:
+                await self._discard(smtp)
+                if not reused:
+                    raise
+                smtp = await self._get_connection()
+                try:
+                    await smtp.send_message(msg, recipients=recipients)
+                except BaseException:
+                    await self._discard(smtp)
+                    raise
+            except aiosmtplib.SMTPResponseException:
+                # Refus du serveur (destinataire, taille...): la connexion reste utilisable
+                self._release(smtp)
+                raise
+            except BaseException:
+                await self._discard(smtp)
+                raise
+
+            self._release(smtp)
+            self.emails_sent += 1
+
     async def send_email(
         self,
         to: str,
@@ -89,19 +184,15 @@ class SMTPClient:
             if bcc:
                 recipients.extend(bcc)
 
-            # Envoyer
-            smtp = await self._get_connection()
-            try:
-                await smtp.send_message(msg, recipients=recipients)
-                logger.info("smtp_sent", to=to)
-                return {
-                    "success": True,
-                    "to": to,
-                    "subject": subject,
-                    "message": "Email envoyé avec succès",
-                }
-            finally:
-                await smtp.quit()
+            # Envoyer (connexion du pool)
+            await self._send(msg, recipients)
+            logger.info("smtp_sent", to=to)
+            return {
+                "success": True,
+                "to": to,
+                "subject": subject,
+                "message": "Email envoyé avec succès",
+            }
 
         except Exception as e:
             logger.exception("smtp_error", error=str(e))
@@ -110,6 +201,22 @@ class SMTPClient:
                 "error": str(e),
             }
 
+    def stats(self) -> dict[str, Any]:
+        """Statistiques du pool (pour /metrics)."""
+        return {
+            "idle": len(self._idle),
+            "pool_size": settings.smtp_pool_size,
+            "connections_opened": self.connections_opened,
+            "connections_reused": self.connections_reused,
+            "emails_sent": self.emails_sent,
+        }
+
+    async def close(self) -> None:
+        """Ferme les connexions du pool."""
+        idle, self._idle = self._idle, []
+        for smtp, _ in idle:
+            await self._discard(smtp)
+
 
 # Instance singleton
 smtp_client = SMTPClient()
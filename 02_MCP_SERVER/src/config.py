@@ -38,7 +38,10 @@ TOOL_SECURITY_LEVELS: dict[str, SecurityLevel] = {
     # GLPI Tools
     "glpi_search_new_tickets": SecurityLevel.L0_READ_ONLY,
     "glpi_get_ticket_details": SecurityLevel.L0_READ_ONLY,
+    "glpi_get_tickets_details": SecurityLevel.L0_READ_ONLY,
     "glpi_search_client": SecurityLevel.L0_READ_ONLY,
+    "glpi_feed_fetch": SecurityLevel.L0_READ_ONLY,
+    "glpi_feed_ack": SecurityLevel.L0_READ_ONLY,  # Avance un curseur interne, aucune écriture GLPI
     "glpi_create_ticket": SecurityLevel.L1_MINOR,
     "glpi_add_ticket_followup": SecurityLevel.L1_MINOR,
     "glpi_update_ticket_status": SecurityLevel.L2_MODERATE,
@@ -79,6 +82,7 @@ TOOL_SECURITY_LEVELS: dict[str, SecurityLevel] = {
     # Enrichisseur Tools (Cercle Vertueux)
     "glpi_get_resolved_tickets": SecurityLevel.L0_READ_ONLY,  # Lecture tickets résolus
     "memory_check_exists": SecurityLevel.L0_READ_ONLY,  # Vérification existence dans RAG
+    "memory_check_exists_bulk": SecurityLevel.L0_READ_ONLY,  # Vérification groupée (une requête)
     "enrichisseur_extract_knowledge": SecurityLevel.L0_READ_ONLY,  # Extraction connaissances
     "enrichisseur_get_stats": SecurityLevel.L0_READ_ONLY,  # Stats RAG
     "enrichisseur_run_batch": SecurityLevel.L1_MINOR,  # Batch enrichissement (écriture RAG)
@@ -203,12 +207,105 @@ class Settings(BaseSettings):
 
         return errors
 
+    # -------------------------------------------------------------------------
+    # HTTP Client Pool (clients partagés GLPI, Observium, Ollama, webhooks...)
+    # -------------------------------------------------------------------------
+    http_max_connections: int = Field(
+        default=20,
+        description="Connexions HTTP max par service amont"
+    )
+    http_max_keepalive_connections: int = Field(
+        default=10,
+        description="Connexions keep-alive conservées par service amont"
+    )
+    http_keepalive_expiry: float = Field(
+        default=60.0,
+        description="Durée (secondes) avant fermeture d'une connexion keep-alive inactive"
+    )
+    http2_enabled: bool = Field(
+        default=False,
+        description="Activer HTTP/2 (nécessite le paquet h2: pip install \"httpx[http2]\")"
+    )
+    http_host_limits: str = Field(
+        default="",
+        description="Plafonds de connexions par service ou hôte (ex: glpi=10,hooks.slack.com=4)"
+    )
+
+    # -------------------------------------------------------------------------
+    # Retry Policy (clients HTTP)
+    # -------------------------------------------------------------------------
+    retry_base_delay: float = Field(
+        default=0.5,
+        description="Délai de base du backoff exponentiel (secondes, full jitter)"
+    )
+    retry_max_delay: float = Field(
+        default=10.0,
+        description="Délai maximum entre deux tentatives (secondes)"
+    )
+    retry_budget_capacity: float = Field(
+        default=10.0,
+        description="Budget de retries par service (jetons)"
+    )
+    retry_budget_refill_rate: float = Field(
+        default=0.2,
+        description="Jetons de retry regagnés par seconde et par service"
+    )
+
+    # -------------------------------------------------------------------------
+    # Circuit Breaker (GLPI, Observium, MySecret, Ollama, LDAP)
+    # -------------------------------------------------------------------------
+    circuit_failure_threshold: int = Field(
+        default=5,
+        description="Échecs consécutifs avant ouverture du circuit d'un service"
+    )
+    circuit_reset_timeout: float = Field(
+        default=30.0,
+        description="Durée d'ouverture du circuit avant appel sonde (secondes)"
+    )
+    circuit_half_open_max_calls: int = Field(
+        default=1,
+        description="Appels sonde simultanés autorisés en half-open"
+    )
+
     # -------------------------------------------------------------------------
     # GLPI API Configuration
     # -------------------------------------------------------------------------
     glpi_url: str = Field(default="", description="URL de l'API GLPI")
     glpi_app_token: SecretStr = Field(default="", description="App-Token GLPI")
     glpi_user_token: SecretStr = Field(default="", description="User-Token GLPI")
+    glpi_search_page_size: int = Field(
+        default=200,
+        description="Résultats par requête lors du parcours paginé des recherches GLPI"
+    )
+    glpi_directory_enabled: bool = Field(
+        default=True,
+        description="Servir les recherches de clients depuis l'annuaire local (glpi_user_directory)"
+    )
+    glpi_directory_sync_interval: int = Field(
+        default=300,
+        description="Âge maximum de l'annuaire local avant synchro incrémentale (secondes)"
+    )
+    glpi_requester_min_similarity: float = Field(
+        default=0.8,
+        description="Similarité minimale du nom (annuaire local) pour attribuer le demandeur "
+                    "d'un ticket sans correspondance exacte"
+    )
+    glpi_batch_concurrency: int = Field(
+        default=8,
+        description="Requêtes GLPI simultanées max pour les lectures groupées (glpi_get_tickets_details)"
+    )
+    glpi_history_max_entries: int = Field(
+        default=200,
+        description="Entrées d'historique de ticket retournées par défaut (les plus récentes)"
+    )
+    glpi_feed_lease_seconds: int = Field(
+        default=600,
+        description="Durée du bail d'un lot du flux de tickets avant relivraison sans ack (secondes)"
+    )
+    glpi_feed_initial_lookback_hours: int = Field(
+        default=24,
+        description="Position initiale du curseur d'un nouveau consommateur du flux (heures en arrière)"
+    )
 
     # -------------------------------------------------------------------------
     # Observium API Configuration
@@ -234,6 +331,11 @@ class Settings(BaseSettings):
     ldap_bind_user: str = Field(default="", description="DN du compte de service")
     ldap_bind_pass: SecretStr = Field(default="", description="Mot de passe du compte")
     ldap_user_search_base: str = Field(default="", description="Base de recherche utilisateurs")
+    ldap_connect_timeout: float = Field(default=5.0, description="Timeout de connexion LDAP (secondes)")
+    ldap_receive_timeout: float = Field(
+        default=15.0,
+        description="Timeout de réponse d'une opération LDAP (secondes)"
+    )
 
     # -------------------------------------------------------------------------
     # SMTP Configuration
@@ -245,6 +347,14 @@ class Settings(BaseSettings):
     smtp_pass: SecretStr = Field(default="", description="Mot de passe SMTP")
     smtp_from_name: str = Field(default="WIDIP", description="Nom expéditeur")
     smtp_from_email: str = Field(default="", description="Email expéditeur")
+    smtp_pool_size: int = Field(
+        default=2,
+        description="Connexions SMTP authentifiées conservées et envoyés simultanés max"
+    )
+    smtp_pool_idle_timeout: float = Field(
+        default=60.0,
+        description="Inactivité après laquelle une connexion SMTP du pool est fermée (secondes)"
+    )
 
     # -------------------------------------------------------------------------
     # MySecret API Configuration
@@ -257,6 +367,70 @@ class Settings(BaseSettings):
     # -------------------------------------------------------------------------
     teams_webhook_url: str = Field(default="", description="URL du webhook Microsoft Teams")
     slack_webhook_url: str = Field(default="", description="URL du webhook Slack")
+    notification_email_timeout: float = Field(
+        default=15.0,
+        description="Durée max d'envoi d'une notification email (secondes)"
+    )
+    notification_webhook_timeout: float = Field(
+        default=5.0,
+        description="Durée max d'envoi d'une notification Teams/Slack (secondes)"
+    )
+    notification_locale: str = Field(
+        default="fr",
+        description="Langue par défaut des templates de notification"
+    )
+    notification_templates_dir: str = Field(
+        default="",
+        description="Répertoire de templates surchargeant ceux livrés (<locale>/<nom>.j2)"
+    )
+    notification_templates_auto_reload: bool = Field(
+        default=True,
+        description="Recompiler un template modifié sur disque au rendu suivant (sans redémarrage)"
+    )
+    notification_templates_cache_dir: str = Field(
+        default="",
+        description="Cache de bytecode des templates compilés (vide = cache mémoire seulement)"
+    )
+    notification_digest_enabled: bool = Field(
+        default=True,
+        description="Regrouper les notifications techniciens d'un même groupe en digests"
+    )
+    notification_digest_window: float = Field(
+        default=300.0,
+        description="Fenêtre de regroupement des notifications techniciens (secondes)"
+    )
+    notification_outbox_enabled: bool = Field(
+        default=True,
+        description="Mettre les notifications en file (notification_outbox) au lieu de les envoyer pendant le tool call"
+    )
+    notification_outbox_workers: int = Field(
+        default=2,
+        description="Workers de livraison de l'outbox des notifications"
+    )
+    notification_outbox_batch_size: int = Field(
+        default=10,
+        description="Envois réservés par un worker à chaque passage"
+    )
+    notification_outbox_poll_interval: float = Field(
+        default=2.0,
+        description="Intervalle de scrutation de l'outbox quand elle est vide (secondes)"
+    )
+    notification_max_attempts: int = Field(
+        default=5,
+        description="Tentatives de livraison avant passage en dead letter"
+    )
+    notification_retry_base_delay: float = Field(
+        default=5.0,
+        description="Délai de base du backoff entre deux tentatives de livraison (secondes)"
+    )
+    notification_retry_max_delay: float = Field(
+        default=300.0,
+        description="Plafond du backoff entre deux tentatives de livraison (secondes)"
+    )
+    notification_rate_limits: str = Field(
+        default="email=5,teams=1,slack=1",
+        description="Débit max par canal en envois/seconde (ex: email=5,teams=1,slack=1)"
+    )
     glpi_ticket_base_url: str = Field(
         default="",
         description="URL de base pour les liens vers tickets GLPI (ex: https://glpi.example.com/front/ticket.form.php?id=)"
@@ -275,6 +449,22 @@ class Settings(BaseSettings):
     postgres_pass: SecretStr = Field(default="", description="Mot de passe PostgreSQL")
     postgres_db: str = Field(default="widip_knowledge", description="Base de données")
 
+    # -------------------------------------------------------------------------
+    # Rétention / Partitionnement (tables SAFEGUARD et logs agents)
+    # -------------------------------------------------------------------------
+    partition_retention_months: int = Field(
+        default=12,
+        description="Nombre de mois conservés en ligne avant archivage des partitions"
+    )
+    partition_premake_months: int = Field(
+        default=2,
+        description="Nombre de partitions mensuelles créées à l'avance"
+    )
+    partition_archive_dir: str = Field(
+        default="/app/archives",
+        description="Répertoire des archives compressées (.csv.gz) des partitions détachées"
+    )
+
     # -------------------------------------------------------------------------
     # Redis Configuration
     # -------------------------------------------------------------------------
@@ -282,11 +472,24 @@ class Settings(BaseSettings):
     redis_port: int = Field(default=6379, description="Port Redis")
     redis_password: Optional[SecretStr] = Field(default=None, description="Mot de passe Redis")
     redis_db: int = Field(default=0, description="Base Redis")
+    redis_max_connections: int = Field(
+        default=20,
+        description="Taille max du pool de connexions Redis partagé"
+    )
+    redis_socket_timeout: float = Field(
+        default=5.0,
+        description="Timeout socket Redis (secondes)"
+    )
     redis_secret_key: SecretStr = Field(
         default="",
         description="Clé de chiffrement pour les secrets temporaires dans Redis (32+ chars). "
                     "OBLIGATOIRE en production pour la persistance des secrets SAFEGUARD."
     )
+    redis_secret_key_previous: SecretStr = Field(
+        default="",
+        description="Anciennes clés de chiffrement (séparées par des virgules), acceptées en "
+                    "déchiffrement pendant une rotation de REDIS_SECRET_KEY"
+    )
 
     # -------------------------------------------------------------------------
     # Ollama Configuration (Embeddings)
@@ -301,6 +504,50 @@ class Settings(BaseSettings):
         description="Dimensions des embeddings (e5-multilingual-large = 1024)"
     )
 
+    # -------------------------------------------------------------------------
+    # Enrichisseur (pipeline enrichisseur_run_batch)
+    # -------------------------------------------------------------------------
+    enrichisseur_queue_size: int = Field(
+        default=100,
+        description="Taille des files entre les étapes du pipeline d'enrichissement"
+    )
+    enrichisseur_extract_workers: int = Field(
+        default=4,
+        description="Workers d'extraction des connaissances (threads, hors boucle d'événements)"
+    )
+    enrichisseur_embed_batch_size: int = Field(
+        default=32,
+        description="Textes par requête d'embedding Ollama (/api/embed)"
+    )
+    enrichisseur_embed_concurrency: int = Field(
+        default=2,
+        description="Requêtes d'embedding Ollama simultanées"
+    )
+    enrichisseur_upsert_batch_size: int = Field(
+        default=200,
+        description="Connaissances écrites par requête INSERT ... ON CONFLICT groupée"
+    )
+    memory_dedup_enabled: bool = Field(
+        default=True,
+        description="Fusionner les quasi-doublons à l'insertion dans la base de connaissances"
+    )
+    memory_dedup_threshold: float = Field(
+        default=0.95,
+        description="Similarité cosinus à partir de laquelle deux connaissances sont des quasi-doublons"
+    )
+    memory_search_mode: str = Field(
+        default="hybrid",
+        description="Mode de recherche par défaut: hybrid (plein texte + vectoriel) ou vector"
+    )
+    memory_search_candidates: int = Field(
+        default=50,
+        description="Candidats de chaque classement (plein texte, vectoriel) avant fusion"
+    )
+    memory_search_rrf_k: int = Field(
+        default=60,
+        description="Constante k de la reciprocal rank fusion (score = somme de 1 / (k + rang))"
+    )
+
     # -------------------------------------------------------------------------
     # Computed Properties
     # -------------------------------------------------------------------------
@@ -0,0 +1,430 @@
+"""
+Rétention et partitionnement mensuel des tables SAFEGUARD et des logs agents.
+
+Les tables à forte croissance sont partitionnées par mois (RANGE sur la
+colonne de date). Les requêtes chaudes ne lisent que les partitions récentes
+et la rétention se fait par détachement de partition plutôt que par DELETE.
+
+Cycle de vie:
+- Au démarrage: création du mois courant + N mois à l'avance (+ partition DEFAULT)
+- Job de rétention (cron via POST /maintenance/retention):
+    1. Maintien des partitions à venir
+    2. Export des partitions expirées en CSV compressé (gzip)
+    3. Détachement + suppression, en vérifiant le nombre de lignes archivées
+
+Les compteurs SAFEGUARD (safeguard_status_counters) sont décrémentés des
+lignes archivées pour rester cohérents avec le contenu en ligne.
+
+Une partition SAFEGUARD qui contient encore des lignes vivantes (statut non
+terminal: pending, approved, scheduled...) n'est jamais archivée: elle est
+ignorée jusqu'à ce que ses lignes soient terminées (exécutées, rejetées,
+expirées, annulées, en échec).
+
+Une partition dont l'archive ne correspond pas au contenu en base reste en
+place: l'erreur est consignée dans le rapport et le job passe à la suivante.
+"""
+
+import gzip
+import os
+import re
+from datetime import date
+from pathlib import Path
+from typing import Any, Optional
+
+import asyncpg
+import structlog
+
+from ..config import settings
+
+logger = structlog.get_logger(__name__)
+
+
+# Tables partitionnées: table -> (colonne de partition, scope des compteurs SAFEGUARD)
+PARTITIONED_TABLES: dict[str, tuple[str, Optional[str]]] = {
+    "safeguard_approvals": ("created_at", "approvals"),
+    "safeguard_deferred_actions": ("created_at", "deferred"),
+    "safeguard_audit_log": ("timestamp", None),
+    "incident_logs": ("timestamp", None),
+    "widip_agent_logs": ("timestamp", None),
+}
+
+# Statuts terminaux des tables SAFEGUARD (ApprovalStatus / DeferredStatus):
+# tout autre statut est une approbation ou une action encore vivante
+_TERMINAL_STATUSES = ["rejected", "expired", "executed", "failed", "cancelled"]
+
+# Partitions mensuelles nommées <table>_pYYYYMM
+_PARTITION_SUFFIX_RE = re.compile(r"_p(\d{4})(\d{2})$")
+
+
+def month_start(day: date, offset: int = 0) -> date:
+    """Retourne le 1er du mois de `day`, décalé de `offset` mois."""
+    index = day.year * 12 + (day.month - 1) + offset
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    """Nom de la partition mensuelle d'une table (ex: incident_logs_p202601)."""
+    return f"{table}_p{month:%Y%m}"
+
+
+def _partition_month(table: str, child: str) -> Optional[date]:
+    """Extrait le mois couvert par une partition depuis son nom."""
+    if not child.startswith(f"{table}_p"):
+        return None
+    match = _PARTITION_SUFFIX_RE.search(child)
+    if not match:
+        return None
+    return date(int(match.group(1)), int(match.group(2)), 1)
+
+
+class RetentionManager:
+    """
+    Gestionnaire des partitions mensuelles et de la rétention.
+
+    Les opérations sont idempotentes: elles peuvent être relancées sans risque
+    (partitions déjà existantes ignorées, archives réécrites).
+    """
+
+    def __init__(self) -> None:
+        self._pool: Optional[asyncpg.Pool] = None
+
+    async def _get_pool(self) -> asyncpg.Pool:
+        """Retourne le pool de connexions PostgreSQL."""
+        if self._pool is None:
+            self._pool = await asyncpg.create_pool(
+                settings.postgres_dsn,
+                min_size=1,
+                max_size=2,
+            )
+        return self._pool
+
+    async def is_partitioned(self, conn: asyncpg.Connection, table: str) -> bool:
+        """Vérifie si une table est partitionnée (table parente)."""
+        return await conn.fetchval(
+            """
+            SELECT EXISTS (
+                SELECT 1 FROM pg_partitioned_table pt
+                JOIN pg_class c ON c.oid = pt.partrelid
+                WHERE c.relname = $1
+            )
+            """,
+            table,
+        )
+
+    async def list_partitions(self, conn: asyncpg.Connection, table: str) -> list[str]:
+        """Liste les partitions attachées à une table."""
+        rows = await conn.fetch(
+            """
+            SELECT child.relname
+            FROM pg_inherits i
+            JOIN pg_class child ON child.oid = i.inhrelid
+            JOIN pg_class parent ON parent.oid = i.inhparent
+            WHERE parent.relname = $1
+            ORDER BY child.relname
+            """,
+            table,
+        )
+        return [row["relname"] for row in rows]
+
+    async def ensure_partitions(
+        self,
+        table: str,
+        pool: Optional[asyncpg.Pool] = None,
+        months_ahead: Optional[int] = None,
+    ) -> list[str]:
+        """
+        Crée la partition DEFAULT et les partitions du mois courant et à venir.
+
+        Args:
+            table: Table partitionnée (clé de PARTITIONED_TABLES)
+            pool: Pool à utiliser (sinon pool interne)
+            months_ahead: Nombre de mois à créer à l'avance
+
+        Returns:
+            Noms des partitions créées
+        """
+        if months_ahead is None:
+            months_ahead = settings.partition_premake_months
+
+        pool = pool or await self._get_pool()
+        created: list[str] = []
+
+        async with pool.acquire() as conn:
+            if not await self.is_partitioned(conn, table):
+                logger.warning(
+                    "retention_table_not_partitioned",
+                    table=table,
+                    hint="Appliquer migrations/004_partitioning.sql",
+                )
+                return created
+
+            await conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table}_default PARTITION OF {table} DEFAULT"
+            )
+
+            current = month_start(date.today())
+            for offset in range(0, months_ahead + 1):
+                month = month_start(current, offset)
+                if await self._create_month_partition(conn, table, month):
+                    created.append(partition_name(table, month))
+
+        if created:
+            logger.info("retention_partitions_created", table=table, partitions=created)
+
+        return created
+
+    async def _create_month_partition(
+        self,
+        conn: asyncpg.Connection,
+        table: str,
+        month: date,
+    ) -> bool:
+        """
+        Crée la partition d'un mois si elle n'existe pas.
+
+        Les lignes déjà tombées dans la partition DEFAULT pour ce mois y sont
+        déplacées (sinon l'attachement serait refusé par PostgreSQL).
+        """
+        name = partition_name(table, month)
+        if await conn.fetchval("SELECT to_regclass($1) IS NOT NULL", name):
+            return False
+
+        column, scope = PARTITIONED_TABLES[table]
+        start = month.isoformat()
+        end = month_start(month, 1).isoformat()
+
+        async with conn.transaction():
+            await conn.execute(
+                f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+            )
+            moved = await conn.execute(
+                f"""
+                WITH moved AS (
+                    DELETE FROM {table}_default
+                    WHERE {column} >= '{start}' AND {column} < '{end}'
+                    RETURNING *
+                )
+                INSERT INTO {name} SELECT * FROM moved
+                """
+            )
+            await conn.execute(
+                f"ALTER TABLE {table} ATTACH PARTITION {name} "
+                f"FOR VALUES FROM ('{start}') TO ('{end}')"
+            )
+
+            moved_count = int(moved.split()[-1]) if moved else 0
+            if moved_count and scope:
+                # Le DELETE sur DEFAULT a décrémenté les compteurs: les lignes
+                # existent toujours (dans la nouvelle partition), on les recompte.
+                await conn.execute(
+                    f"""
+                    INSERT INTO safeguard_status_counters (scope, status, count)
+                    SELECT $1, COALESCE(status, 'unknown'), COUNT(*)
+                    FROM {name}
+                    GROUP BY COALESCE(status, 'unknown')
+                    ON CONFLICT (scope, status)
+                    DO UPDATE SET count = safeguard_status_counters.count + EXCLUDED.count
+                    """,
+                    scope,
+                )
+
+        if moved_count:
+            logger.warning(
+                "retention_rows_moved_from_default",
+                table=table,
+                partition=name,
+                rows=moved_count,
+            )
+
+        return True
+
+    async def apply_retention(
+        self,
+        retention_months: Optional[int] = None,
+        dry_run: bool = False,
+    ) -> dict[str, Any]:
+        """
+        Archive puis supprime les partitions plus anciennes que la rétention.
+
+        Args:
+            retention_months: Nombre de mois conservés (mois courant inclus)
+            dry_run: Liste les partitions concernées sans rien modifier
+
+        Returns:
+            Rapport par table (partitions créées, archivées, ignorées)
+        """
+        if retention_months is None:
+            retention_months = settings.partition_retention_months
+        retention_months = max(1, retention_months)
+
+        cutoff = month_start(date.today(), -(retention_months - 1))
+        pool = await self._get_pool()
+        report: dict[str, Any] = {
+            "cutoff": cutoff.isoformat(),
+            "dry_run": dry_run,
+            "tables": {},
+        }
+
+        for table in PARTITIONED_TABLES:
+            table_report: dict[str, Any] = {"created": [], "archived": []}
+            report["tables"][table] = table_report
+
+            async with pool.acquire() as conn:
+                if not await self.is_partitioned(conn, table):
+                    table_report["skipped"] = "not_partitioned"
+                    continue
+                partitions = await self.list_partitions(conn, table)
+
+            if not dry_run:
+                table_report["created"] = await self.ensure_partitions(table, pool=pool)
+
+            for child in partitions:
+                month = _partition_month(table, child)
+                if month is None or month >= cutoff:
+                    continue
+
+                async with pool.acquire() as conn:
+                    # Approbations / actions différées encore vivantes: on garde
+                    live = await self._count_live(conn, table, child)
+                    if live:
+                        logger.warning(
+                            "retention_partition_has_live_rows",
+                            table=table,
+                            partition=child,
+                            live=live,
+                        )
+                        table_report.setdefault("skipped_live", []).append(
+                            {"partition": child, "live": live}
+                        )
+                        continue
+
+                    if dry_run:
+                        table_report["archived"].append({"partition": child})
+                        continue
+
+                    try:
+                        archived = await self._archive_partition(conn, table, child)
+                    except (RuntimeError, OSError, asyncpg.PostgresError) as e:
+                        # Partition laissée en place (transaction annulée): on continue
+                        logger.error(
+                            "retention_partition_archive_failed",
+                            table=table,
+                            partition=child,
+                            error=str(e),
+                        )
+                        table_report.setdefault("errors", []).append(
+                            {"partition": child, "error": str(e)}
+                        )
+                        continue
+
+                    table_report["archived"].append(archived)
+
+        logger.info(
+            "retention_applied",
+            cutoff=report["cutoff"],
+            dry_run=dry_run,
+            archived=sum(len(t["archived"]) for t in report["tables"].values()),
+        )
+        return report
+
+    async def _count_live(
+        self,
+        conn: asyncpg.Connection,
+        table: str,
+        child: str,
+    ) -> int:
+        """Lignes non terminées d'une partition SAFEGUARD (0 pour les logs)."""
+        _, scope = PARTITIONED_TABLES[table]
+        if not scope:
+            return 0
+        return await conn.fetchval(
+            f"SELECT COUNT(*) FROM {child} WHERE status IS NULL OR status <> ALL($1::text[])",
+            _TERMINAL_STATUSES,
+        )
+
+    async def _archive_partition(
+        self,
+        conn: asyncpg.Connection,
+        table: str,
+        child: str,
+    ) -> dict[str, Any]:
+        """
+        Exporte une partition en CSV gzip, puis la détache et la supprime.
+
+        L'export est fait avant le détachement (pas de verrou exclusif pendant
+        la copie). Le nombre de lignes est revérifié après détachement: en cas
+        d'écart, la transaction est annulée et la partition reste en place
+        (RuntimeError, consignée par apply_retention).
+        """
+        _, scope = PARTITIONED_TABLES[table]
+
+        archive_dir = Path(settings.partition_archive_dir) / table
+        archive_dir.mkdir(parents=True, exist_ok=True)
+        archive_path = archive_dir / f"{child}.csv.gz"
+        tmp_path = archive_path.with_suffix(".gz.tmp")
+
+        with gzip.open(tmp_path, "wb") as archive:
+            status = await conn.copy_from_table(
+                child,
+                output=archive,
+                format="csv",
+                header=True,
+            )
+        copied = int(status.split()[-1]) if status else 0
+        os.replace(tmp_path, archive_path)
+
+        async with conn.transaction():
+            await conn.execute(f"ALTER TABLE {table} DETACH PARTITION {child}")
+
+            remaining = await conn.fetchval(f"SELECT COUNT(*) FROM {child}")
+            if remaining != copied:
+                raise RuntimeError(
+                    f"Archive incomplète pour {child}: {copied} lignes exportées, "
+                    f"{remaining} en base"
+                )
+
+            if scope:
+                rows = await conn.fetch(
+                    f"""
+                    SELECT COALESCE(status, 'unknown') AS status, COUNT(*) AS count
+                    FROM {child}
+                    GROUP BY COALESCE(status, 'unknown')
+                    """
+                )
+                for row in rows:
+                    await conn.execute(
+                        """
+                        UPDATE safeguard_status_counters
+                        SET count = count - $3
+                        WHERE scope = $1 AND status = $2
+                        """,
+                        scope,
+                        row["status"],
+                        row["count"],
+                    )
+
+            await conn.execute(f"DROP TABLE {child}")
+
+        logger.warning(
+            "retention_partition_archived",
+            table=table,
+            partition=child,
+            rows=copied,
+            archive=str(archive_path),
+        )
+
+        return {
+            "partition": child,
+            "rows": copied,
+            "archive": str(archive_path),
+        }
+
+    async def close(self) -> None:
+        """Ferme le pool de connexions."""
+        if self._pool:
+            await self._pool.close()
+            self._pool = None
+
+
+# Instance singleton
+retention_manager = RetentionManager()
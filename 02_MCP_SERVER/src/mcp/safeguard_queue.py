@@ -18,19 +18,21 @@ SÉCURITÉ:
 """
 
 import asyncio
-from datetime import datetime, timedelta
+import os
+import re
+import time
+from datetime import datetime, timedelta, timezone
 from enum import Enum
 from typing import Any, Optional
-from uuid import uuid4
+from uuid import UUID
 
 import asyncpg
 import structlog
 
 from ..config import settings
+from .retention import retention_manager
 from ..utils.secrets import (
-    extract_sensitive_fields,
-    has_sensitive_fields,
-    redact_sensitive_fields,
+    scan_sensitive_fields,
     secret_store,
 )
 
@@ -63,6 +65,250 @@ DEFERRED_DELAY_HOURS: dict[str, int] = {
 }
 
 
+# =============================================================================
+# Identifiants et partitions (tables partitionnées par created_at)
+# =============================================================================
+#
+# PostgreSQL impose la clé de partition dans les contraintes d'unicité:
+# PRIMARY KEY (id, created_at) et UNIQUE (deferred_id, created_at). L'unicité
+# de id / deferred_id seuls est garantie par leur génération (UUIDv7 horodaté,
+# séquence de la colonne id), jamais par une valeur fournie de l'extérieur.
+# Les recherches par identifiant portent aussi sur created_at, déduit de
+# l'identifiant: seules une (approbation) ou quelques (action différée)
+# partitions sont lues au lieu de tout l'historique en ligne.
+
+_DEFERRED_ID_RE = re.compile(r"^DEF-(20\d{2})-\d+$")
+
+
+def new_approval_id() -> tuple[UUID, datetime]:
+    """
+    Génère un identifiant d'approbation UUIDv7 et son horodatage.
+
+    Les 48 premiers bits sont le timestamp (ms) enregistré tel quel dans
+    created_at: l'identifiant suffit pour retrouver la partition.
+
+    Returns:
+        Tuple (identifiant, created_at)
+    """
+    timestamp_ms = time.time_ns() // 1_000_000
+    rand = int.from_bytes(os.urandom(10), "big")
+    value = (
+        (timestamp_ms << 80)
+        | (0x7 << 76)
+        | ((rand >> 68) << 64)
+        | (0b10 << 62)
+        | (rand & ((1 << 62) - 1))
+    )
+    approval_id = UUID(int=value)
+    return approval_id, datetime.fromtimestamp(timestamp_ms / 1000, tz=timezone.utc)
+
+
+def approval_created_at(approval_id: Any) -> Optional[datetime]:
+    """
+    created_at d'une approbation, lu dans son identifiant UUIDv7.
+
+    Returns:
+        Horodatage, ou None (UUIDv4 créé avant les UUIDv7, ID invalide,
+        timestamp hors des dates représentables)
+    """
+    try:
+        value = approval_id if isinstance(approval_id, UUID) else UUID(str(approval_id))
+    except ValueError:
+        return None
+    if value.version != 7:
+        return None
+    try:
+        return datetime.fromtimestamp((value.int >> 80) / 1000, tz=timezone.utc)
+    except (ValueError, OverflowError, OSError):
+        # ID fourni par l'appelant: recherche sans élagage plutôt qu'une erreur 500
+        return None
+
+
+def approval_id_filter(approval_id: str, first_param: int = 1) -> tuple[str, list[Any]]:
+    """
+    Clause WHERE d'une recherche par identifiant d'approbation.
+
+    Returns:
+        (clause SQL, paramètres à partir de $first_param)
+    """
+    created_at = approval_created_at(approval_id)
+    if created_at is None:
+        return f"id = ${first_param}", [approval_id]
+    return (
+        f"id = ${first_param} AND created_at = ${first_param + 1}",
+        [approval_id, created_at],
+    )
+
+
+def deferred_id_filter(deferred_id: str, first_param: int = 1) -> tuple[str, list[Any]]:
+    """
+    Clause WHERE d'une recherche par identifiant d'action différée.
+
+    L'année de DEF-2026-001 est celle de created_at (à un jour près: horloge
+    du serveur MCP contre NOW() PostgreSQL).
+
+    Returns:
+        (clause SQL, paramètres à partir de $first_param)
+    """
+    match = _DEFERRED_ID_RE.match(deferred_id)
+    if not match:
+        return f"deferred_id = ${first_param}", [deferred_id]
+    year = int(match.group(1))
+    return (
+        f"deferred_id = ${first_param} "
+        f"AND created_at >= ${first_param + 1} AND created_at < ${first_param + 2}",
+        [
+            deferred_id,
+            datetime(year, 1, 1, tzinfo=timezone.utc) - timedelta(days=1),
+            datetime(year + 1, 1, 1, tzinfo=timezone.utc) + timedelta(days=1),
+        ],
+    )
+
+
+# =============================================================================
+# Compteurs matérialisés par statut (stats en temps constant)
+# =============================================================================
+
+# Table de compteurs + fonction trigger partagée par les tables SAFEGUARD.
+# Le trigger maintient les compteurs dans la même transaction que l'écriture,
+# ce qui évite un GROUP BY status sur tout l'historique à chaque appel de stats.
+STATUS_COUNTERS_SQL = """
+    CREATE TABLE IF NOT EXISTS safeguard_status_counters (
+        scope VARCHAR(20) NOT NULL,
+        status VARCHAR(20) NOT NULL,
+        count BIGINT NOT NULL DEFAULT 0,
+        PRIMARY KEY (scope, status)
+    );
+
+    CREATE OR REPLACE FUNCTION safeguard_count_status()
+    RETURNS TRIGGER AS $$
+    BEGIN
+        IF TG_OP = 'UPDATE' AND OLD.status IS NOT DISTINCT FROM NEW.status THEN
+            RETURN NULL;
+        END IF;
+
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            UPDATE safeguard_status_counters
+            SET count = count - 1
+            WHERE scope = TG_ARGV[0] AND status = COALESCE(OLD.status, 'unknown');
+        END IF;
+
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            INSERT INTO safeguard_status_counters (scope, status, count)
+            VALUES (TG_ARGV[0], COALESCE(NEW.status, 'unknown'), 1)
+            ON CONFLICT (scope, status)
+            DO UPDATE SET count = safeguard_status_counters.count + 1;
+        END IF;
+
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+"""
+
+
+async def ensure_status_counters(pool: asyncpg.Pool, table: str, scope: str) -> None:
+    """
+    Installe le trigger de compteurs sur une table SAFEGUARD.
+
+    Au premier passage, les compteurs du scope sont initialisés depuis la table
+    existante. Le verrou pris pendant l'initialisation garantit qu'aucune écriture
+    concurrente n'est comptée deux fois.
+
+    Trigger et compteurs déjà en place (cas de tous les redémarrages): simple
+    lecture du catalogue, sans verrou ni recomptage, les écritures ne sont
+    pas bloquées.
+
+    Args:
+        pool: Pool PostgreSQL
+        table: Table surveillée (doit avoir une colonne status)
+        scope: Clé du compteur (approvals, deferred)
+    """
+    trigger_name = f"trigger_{table}_status_counters"
+    # Compteurs absents et table non vide: à recalculer
+    counters_missing_sql = f"""
+        SELECT NOT EXISTS (SELECT 1 FROM safeguard_status_counters WHERE scope = $1)
+            AND EXISTS (SELECT 1 FROM {table})
+    """
+
+    async with pool.acquire() as conn:
+        installed = await conn.fetchval(
+            """
+            SELECT to_regclass('safeguard_status_counters') IS NOT NULL
+                AND EXISTS (
+                    SELECT 1 FROM pg_trigger
+                    WHERE tgname = $1 AND tgrelid = to_regclass($2)
+                )
+            """,
+            trigger_name,
+            table,
+        )
+        if installed and not await conn.fetchval(counters_missing_sql, scope):
+            return
+
+        async with conn.transaction():
+            await conn.execute(STATUS_COUNTERS_SQL)
+            await conn.execute(f"LOCK TABLE {table} IN SHARE ROW EXCLUSIVE MODE")
+
+            trigger_exists = await conn.fetchval(
+                "SELECT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = $1 AND tgrelid = to_regclass($2))",
+                trigger_name,
+                table,
+            )
+            if trigger_exists and not await conn.fetchval(counters_missing_sql, scope):
+                return
+
+            if not trigger_exists:
+                await conn.execute(
+                    f"""
+                    CREATE TRIGGER {trigger_name}
+                        AFTER INSERT OR UPDATE OF status OR DELETE ON {table}
+                        FOR EACH ROW
+                        EXECUTE FUNCTION safeguard_count_status('{scope}')
+                    """
+                )
+
+            # Repartir de l'état réel de la table (installation ou compteurs perdus)
+            await conn.execute(
+                "DELETE FROM safeguard_status_counters WHERE scope = $1",
+                scope,
+            )
+            await conn.execute(
+                f"""
+                INSERT INTO safeguard_status_counters (scope, status, count)
+                SELECT $1, COALESCE(status, 'unknown'), COUNT(*)
+                FROM {table}
+                GROUP BY COALESCE(status, 'unknown')
+                """,
+                scope,
+            )
+
+    logger.info("safeguard_status_counters_installed", table=table, scope=scope)
+
+
+async def read_status_counters(
+    pool: asyncpg.Pool,
+    scope: str,
+    statuses: list[str],
+) -> dict[str, int]:
+    """
+    Lit les compteurs matérialisés d'un scope.
+
+    Returns:
+        Dictionnaire {status: count} avec tous les statuts connus + total
+    """
+    rows = await pool.fetch(
+        "SELECT status, count FROM safeguard_status_counters WHERE scope = $1",
+        scope,
+    )
+
+    stats = dict.fromkeys(statuses, 0)
+    for row in rows:
+        stats[row["status"]] = row["count"]
+
+    stats["total"] = sum(stats.values())
+    return stats
+
+
 class SafeguardQueue:
     """
     Gestionnaire de la queue d'approbation SAFEGUARD.
@@ -92,24 +338,26 @@ class SafeguardQueue:
 
         pool = await self._get_pool()
 
+        # Table partitionnée par mois (created_at): voir mcp/retention.py
         create_table_sql = """
             CREATE TABLE IF NOT EXISTS safeguard_approvals (
-                id UUID PRIMARY KEY,
+                id UUID NOT NULL,
                 tool_name VARCHAR(100) NOT NULL,
                 arguments JSONB NOT NULL,
                 security_level VARCHAR(10) NOT NULL,
                 requester_ip VARCHAR(45),
                 request_context JSONB,
                 status VARCHAR(20) NOT NULL DEFAULT 'pending',
-                created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+                created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
                 expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
                 approved_at TIMESTAMP WITH TIME ZONE,
                 approver VARCHAR(100),
                 approval_comment TEXT,
                 executed_at TIMESTAMP WITH TIME ZONE,
                 execution_result JSONB,
-                execution_error TEXT
-            );
+                execution_error TEXT,
+                PRIMARY KEY (id, created_at)
+            ) PARTITION BY RANGE (created_at);
 
             CREATE INDEX IF NOT EXISTS idx_safeguard_status
                 ON safeguard_approvals(status);
@@ -118,9 +366,15 @@ class SafeguardQueue:
                 WHERE status = 'pending';
             CREATE INDEX IF NOT EXISTS idx_safeguard_created
                 ON safeguard_approvals(created_at DESC);
+            -- Liste des demandes en attente: index partiel, petit dans chaque partition
+            CREATE INDEX IF NOT EXISTS idx_safeguard_pending_created
+                ON safeguard_approvals(created_at DESC)
+                WHERE status = 'pending';
         """
 
         await pool.execute(create_table_sql)
+        await retention_manager.ensure_partitions("safeguard_approvals", pool=pool)
+        await ensure_status_counters(pool, "safeguard_approvals", "approvals")
         self._initialized = True
         logger.info("safeguard_queue_initialized")
 
@@ -154,15 +408,16 @@ class SafeguardQueue:
         await self.initialize()
         pool = await self._get_pool()
 
-        approval_id = uuid4()
+        approval_id, created_at = new_approval_id()
         approval_id_str = str(approval_id)
         expires_at = datetime.utcnow() + timedelta(minutes=ttl_minutes)
 
         # =================================================================
         # SÉCURITÉ: Extraire et sécuriser les champs sensibles
         # =================================================================
-        has_secrets = has_sensitive_fields(arguments)
-        safe_arguments, extracted_secrets = extract_sensitive_fields(arguments)
+        scan = scan_sensitive_fields(arguments)
+        has_secrets = scan.has_secrets
+        safe_arguments, extracted_secrets = scan.redacted, scan.secrets
 
         # Stocker les secrets chiffrés dans Redis si présents
         if extracted_secrets:
@@ -181,8 +436,8 @@ class SafeguardQueue:
         sql = """
             INSERT INTO safeguard_approvals
                 (id, tool_name, arguments, security_level, requester_ip,
-                 request_context, expires_at)
-            VALUES ($1, $2, $3, $4, $5, $6, $7)
+                 request_context, expires_at, created_at)
+            VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
             RETURNING id, created_at
         """
 
@@ -196,6 +451,7 @@ class SafeguardQueue:
             requester_ip,
             json.dumps(context or {}),
             expires_at,
+            created_at,
         )
 
         logger.warning(
@@ -278,14 +534,16 @@ class SafeguardQueue:
         await self.initialize()
         pool = await self._get_pool()
 
+        where, where_args = approval_id_filter(approval_id)
+
         # Vérifier que la demande existe et est valide
-        check_sql = """
+        check_sql = f"""
             SELECT id, tool_name, status, expires_at
             FROM safeguard_approvals
-            WHERE id = $1
+            WHERE {where}
         """
 
-        row = await pool.fetchrow(check_sql, approval_id)
+        row = await pool.fetchrow(check_sql, *where_args)
 
         if not row:
             return {
@@ -302,8 +560,8 @@ class SafeguardQueue:
         if row["expires_at"] < datetime.now(row["expires_at"].tzinfo):
             # Marquer comme expirée
             await pool.execute(
-                "UPDATE safeguard_approvals SET status = 'expired' WHERE id = $1",
-                approval_id,
+                f"UPDATE safeguard_approvals SET status = 'expired' WHERE {where}",
+                *where_args,
             )
             return {
                 "success": False,
@@ -311,17 +569,17 @@ class SafeguardQueue:
             }
 
         # Approuver
-        update_sql = """
+        update_sql = f"""
             UPDATE safeguard_approvals
             SET status = 'approved',
                 approved_at = NOW(),
-                approver = $2,
-                approval_comment = $3
-            WHERE id = $1
+                approver = $1,
+                approval_comment = $2
+            WHERE {approval_id_filter(approval_id, first_param=3)[0]}
             RETURNING id, tool_name, arguments
         """
 
-        result = await pool.fetchrow(update_sql, approval_id, approver, comment)
+        result = await pool.fetchrow(update_sql, approver, comment, *where_args)
 
         logger.info(
             "safeguard_approved",
@@ -352,17 +610,18 @@ class SafeguardQueue:
         await self.initialize()
         pool = await self._get_pool()
 
-        update_sql = """
+        where, where_args = approval_id_filter(approval_id, first_param=3)
+        update_sql = f"""
             UPDATE safeguard_approvals
             SET status = 'rejected',
                 approved_at = NOW(),
-                approver = $2,
-                approval_comment = $3
-            WHERE id = $1 AND status = 'pending'
+                approver = $1,
+                approval_comment = $2
+            WHERE {where} AND status = 'pending'
             RETURNING id, tool_name
         """
 
-        result = await pool.fetchrow(update_sql, approval_id, approver, comment)
+        result = await pool.fetchrow(update_sql, approver, comment, *where_args)
 
         if not result:
             return {
@@ -397,19 +656,20 @@ class SafeguardQueue:
         import json
         status = ApprovalStatus.EXECUTED.value if not error else ApprovalStatus.FAILED.value
 
+        where, where_args = approval_id_filter(approval_id, first_param=4)
         await pool.execute(
-            """
+            f"""
             UPDATE safeguard_approvals
-            SET status = $2,
+            SET status = $1,
                 executed_at = NOW(),
-                execution_result = $3,
-                execution_error = $4
-            WHERE id = $1
+                execution_result = $2,
+                execution_error = $3
+            WHERE {where}
             """,
-            approval_id,
             status,
             json.dumps(result) if result else None,
             error,
+            *where_args,
         )
 
     async def expire_old_requests(self) -> int:
@@ -443,13 +703,14 @@ class SafeguardQueue:
         await self.initialize()
         pool = await self._get_pool()
 
-        sql = """
+        where, where_args = approval_id_filter(approval_id)
+        sql = f"""
             SELECT *
             FROM safeguard_approvals
-            WHERE id = $1
+            WHERE {where}
         """
 
-        row = await pool.fetchrow(sql, approval_id)
+        row = await pool.fetchrow(sql, *where_args)
 
         if not row:
             return None
@@ -490,9 +751,13 @@ class SafeguardQueue:
         await self.initialize()
         pool = await self._get_pool()
 
-        # Récupérer les arguments redactés depuis PostgreSQL
-        sql = "SELECT arguments FROM safeguard_approvals WHERE id = $1"
-        row = await pool.fetchrow(sql, approval_id)
+        # Arguments redactés (PostgreSQL) et secrets (Redis) lus en parallèle
+        where, where_args = approval_id_filter(approval_id)
+        sql = f"SELECT arguments FROM safeguard_approvals WHERE {where}"
+        row, secrets = await asyncio.gather(
+            pool.fetchrow(sql, *where_args),
+            secret_store.get_secret(f"approval:{approval_id}"),
+        )
 
         if not row:
             return None
@@ -502,9 +767,6 @@ class SafeguardQueue:
             import json
             redacted_args = json.loads(redacted_args)
 
-        # Récupérer les secrets depuis Redis
-        secrets = await secret_store.get_secret(f"approval:{approval_id}")
-
         if not secrets:
             # Pas de secrets stockés, retourner les arguments tels quels
             return redacted_args
@@ -520,19 +782,89 @@ class SafeguardQueue:
 
         return full_args
 
+    async def get_full_arguments_bulk(
+        self,
+        approval_ids: list[str],
+    ) -> dict[str, dict[str, Any]]:
+        """
+        Récupère les arguments COMPLETS de plusieurs demandes en deux requêtes.
+
+        Une requête PostgreSQL (ANY) et un MGET Redis, exécutés en parallèle.
+
+        ATTENTION: N'utiliser que pour l'exécution après approbation!
+
+        Args:
+            approval_ids: IDs des demandes approuvées
+
+        Returns:
+            Dictionnaire {approval_id: arguments complets} (IDs inconnus omis)
+        """
+        if not approval_ids:
+            return {}
+
+        await self.initialize()
+        pool = await self._get_pool()
+
+        sql = "SELECT id, arguments FROM safeguard_approvals WHERE id = ANY($1::uuid[])"
+        args: list[Any] = [approval_ids]
+        created = [approval_created_at(approval_id) for approval_id in approval_ids]
+        if all(created):
+            # Uniquement les partitions des demandes (UUIDv7)
+            sql += " AND created_at = ANY($2::timestamptz[])"
+            args.append(created)
+        rows, secrets_by_key = await asyncio.gather(
+            pool.fetch(sql, *args),
+            secret_store.get_secrets([f"approval:{aid}" for aid in approval_ids]),
+        )
+
+        import json
+        results: dict[str, dict[str, Any]] = {}
+        for row in rows:
+            approval_id = str(row["id"])
+            args = row["arguments"]
+            if isinstance(args, str):
+                args = json.loads(args)
+
+            full_args = dict(args)
+            secrets = secrets_by_key.get(f"approval:{approval_id}")
+            if secrets:
+                self._merge_secrets(full_args, secrets)
+            results[approval_id] = full_args
+
+        logger.info(
+            "safeguard_secrets_retrieved_bulk",
+            requested=len(approval_ids),
+            found=len(results),
+            with_secrets=len(secrets_by_key),
+        )
+
+        return results
+
     def _merge_secrets(
         self,
-        target: dict[str, Any],
+        target: Any,
         secrets: dict[str, Any],
     ) -> None:
         """
         Fusionne les secrets dans les arguments cibles (in-place).
 
         Remplace les valeurs [REDACTED] par les vraies valeurs.
+        Les secrets des listes sont indexés par position ("0", "1", ...).
         """
+        if isinstance(target, list):
+            for index, value in secrets.items():
+                position = int(index)
+                if position < len(target) and isinstance(target[position], (dict, list)):
+                    self._merge_secrets(target[position], value)
+            return
+
         for key, value in secrets.items():
-            if isinstance(value, dict) and key in target and isinstance(target[key], dict):
-                # Récursion pour les objets imbriqués
+            if (
+                isinstance(value, dict)
+                and key in target
+                and isinstance(target[key], (dict, list))
+            ):
+                # Récursion pour les objets imbriqués (dicts et listes)
                 self._merge_secrets(target[key], value)
             else:
                 target[key] = value
@@ -551,6 +883,31 @@ class SafeguardQueue:
         """
         return await secret_store.delete_secret(f"approval:{approval_id}")
 
+    async def cleanup_secrets_bulk(self, approval_ids: list[str]) -> int:
+        """
+        Supprime les secrets chiffrés de plusieurs demandes (une commande DEL).
+
+        Returns:
+            Nombre de secrets supprimés
+        """
+        return await secret_store.delete_secrets(
+            [f"approval:{approval_id}" for approval_id in approval_ids]
+        )
+
+    async def get_stats(self) -> dict[str, int]:
+        """
+        Retourne les statistiques des demandes d'approbation.
+
+        Lecture des compteurs materialises (maintenus par trigger),
+        en temps constant quel que soit le volume d'historique.
+        """
+        await self.initialize()
+        pool = await self._get_pool()
+
+        return await read_status_counters(
+            pool, "approvals", [status.value for status in ApprovalStatus]
+        )
+
     async def close(self) -> None:
         """Ferme le pool de connexions."""
         if self._pool:
@@ -588,10 +945,11 @@ class DeferredActionManager:
 
         pool = await self._get_pool()
 
+        # Table partitionnée par mois (created_at): voir mcp/retention.py
         create_table_sql = """
             CREATE TABLE IF NOT EXISTS safeguard_deferred_actions (
-                id SERIAL PRIMARY KEY,
-                deferred_id VARCHAR(50) UNIQUE NOT NULL,
+                id SERIAL,
+                deferred_id VARCHAR(50) NOT NULL,
                 approval_id UUID NOT NULL,
                 tool_name VARCHAR(100) NOT NULL,
                 parameters JSONB NOT NULL,
@@ -609,9 +967,11 @@ class DeferredActionManager:
                 execution_result JSONB,
                 execution_error TEXT,
                 context JSONB,
-                created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-                updated_at TIMESTAMP WITH TIME ZONE
-            );
+                created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+                updated_at TIMESTAMP WITH TIME ZONE,
+                PRIMARY KEY (id, created_at),
+                UNIQUE (deferred_id, created_at)
+            ) PARTITION BY RANGE (created_at);
 
             CREATE INDEX IF NOT EXISTS idx_deferred_status
                 ON safeguard_deferred_actions(status);
@@ -621,24 +981,30 @@ class DeferredActionManager:
         """
 
         await pool.execute(create_table_sql)
+        await retention_manager.ensure_partitions("safeguard_deferred_actions", pool=pool)
+        await ensure_status_counters(pool, "safeguard_deferred_actions", "deferred")
         self._initialized = True
         logger.info("deferred_action_manager_initialized")
 
-    async def _generate_deferred_id(self) -> str:
-        """Genere un ID unique pour une action differee (DEF-2026-001)."""
+    async def _generate_deferred_id(self) -> tuple[int, str]:
+        """
+        Genere un ID unique pour une action differee (DEF-2026-001).
+
+        Le numero vient de la sequence de la colonne id: unique meme apres
+        archivage des anciennes partitions (un COUNT reutiliserait des numeros).
+
+        Returns:
+            Tuple (id, deferred_id)
+        """
         year = datetime.utcnow().year
-        cache_key = f"deferred_{year}"
 
         pool = await self._get_pool()
 
-        # Compter les actions existantes cette annee
-        count = await pool.fetchval(
-            "SELECT COUNT(*) FROM safeguard_deferred_actions WHERE deferred_id LIKE $1",
-            f"DEF-{year}-%",
+        next_num = await pool.fetchval(
+            "SELECT nextval(pg_get_serial_sequence('safeguard_deferred_actions', 'id'))"
         )
 
-        next_num = (count or 0) + 1
-        return f"DEF-{year}-{next_num:03d}"
+        return next_num, f"DEF-{year}-{next_num:03d}"
 
     async def create_deferred_action(
         self,
@@ -674,22 +1040,23 @@ class DeferredActionManager:
         if delay_hours is None:
             delay_hours = DEFERRED_DELAY_HOURS.get(security_level, 24)
 
-        deferred_id = await self._generate_deferred_id()
+        row_id, deferred_id = await self._generate_deferred_id()
         scheduled_at = datetime.utcnow() + timedelta(hours=delay_hours)
         approved_at = datetime.utcnow()
 
         import json
         sql = """
             INSERT INTO safeguard_deferred_actions
-                (deferred_id, approval_id, tool_name, parameters, security_level,
+                (id, deferred_id, approval_id, tool_name, parameters, security_level,
                  delay_hours, scheduled_at, approved_by, approved_at,
                  approval_comment, context)
-            VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11)
+            VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12)
             RETURNING id, created_at
         """
 
         await pool.fetchrow(
             sql,
+            row_id,
             deferred_id,
             approval_id,
             tool_name,
@@ -822,14 +1189,16 @@ class DeferredActionManager:
         await self.initialize()
         pool = await self._get_pool()
 
+        where, where_args = deferred_id_filter(deferred_id)
+
         # Verifier que l'action existe et est annulable
-        check_sql = """
+        check_sql = f"""
             SELECT deferred_id, tool_name, status, scheduled_at
             FROM safeguard_deferred_actions
-            WHERE deferred_id = $1
+            WHERE {where}
         """
 
-        row = await pool.fetchrow(check_sql, deferred_id)
+        row = await pool.fetchrow(check_sql, *where_args)
 
         if not row:
             return {
@@ -844,17 +1213,17 @@ class DeferredActionManager:
             }
 
         # Annuler
-        update_sql = """
+        update_sql = f"""
             UPDATE safeguard_deferred_actions
             SET status = 'cancelled',
-                cancelled_by = $2,
+                cancelled_by = $1,
                 cancelled_at = NOW(),
-                cancellation_reason = $3
-            WHERE deferred_id = $1
+                cancellation_reason = $2
+            WHERE {deferred_id_filter(deferred_id, first_param=3)[0]}
             RETURNING deferred_id, tool_name
         """
 
-        result = await pool.fetchrow(update_sql, deferred_id, cancelled_by, reason)
+        result = await pool.fetchrow(update_sql, cancelled_by, reason, *where_args)
 
         logger.info(
             "deferred_action_cancelled",
@@ -884,19 +1253,20 @@ class DeferredActionManager:
         import json
         status = DeferredStatus.EXECUTED.value if not error else DeferredStatus.FAILED.value
 
+        where, where_args = deferred_id_filter(deferred_id, first_param=4)
         await pool.execute(
-            """
+            f"""
             UPDATE safeguard_deferred_actions
-            SET status = $2,
+            SET status = $1,
                 executed_at = NOW(),
-                execution_result = $3,
-                execution_error = $4
-            WHERE deferred_id = $1
+                execution_result = $2,
+                execution_error = $3
+            WHERE {where}
             """,
-            deferred_id,
             status,
             json.dumps(result) if result else None,
             error,
+            *where_args,
         )
 
         logger.info(
@@ -911,8 +1281,9 @@ class DeferredActionManager:
         await self.initialize()
         pool = await self._get_pool()
 
-        sql = "SELECT * FROM safeguard_deferred_actions WHERE deferred_id = $1"
-        row = await pool.fetchrow(sql, deferred_id)
+        where, where_args = deferred_id_filter(deferred_id)
+        sql = f"SELECT * FROM safeguard_deferred_actions WHERE {where}"
+        row = await pool.fetchrow(sql, *where_args)
 
         if not row:
             return None
@@ -944,24 +1315,18 @@ class DeferredActionManager:
         }
 
     async def get_stats(self) -> dict[str, int]:
-        """Retourne les statistiques des actions differees."""
-        await self.initialize()
-        pool = await self._get_pool()
-
-        sql = """
-            SELECT status, COUNT(*) as count
-            FROM safeguard_deferred_actions
-            GROUP BY status
         """
+        Retourne les statistiques des actions differees.
 
-        rows = await pool.fetch(sql)
-
-        stats = {status.value: 0 for status in DeferredStatus}
-        for row in rows:
-            stats[row["status"]] = row["count"]
+        Lecture des compteurs materialises (maintenus par trigger),
+        en temps constant quel que soit le volume d'historique.
+        """
+        await self.initialize()
+        pool = await self._get_pool()
 
-        stats["total"] = sum(stats.values())
-        return stats
+        return await read_status_counters(
+            pool, "deferred", [status.value for status in DeferredStatus]
+        )
 
     async def close(self) -> None:
         """Ferme le pool de connexions."""
@@ -27,9 +27,22 @@ from ..config import (
     TOOL_SECURITY_LEVELS,
     get_settings,
 )
+from ..clients.base import endpoint_timing_stats
+from ..clients.glpi import glpi_client
+from ..clients.glpi_directory import glpi_directory
+from ..clients.glpi_feed import ticket_feed
+from ..clients.http_pool import http_pool
 from ..clients.memory import memory_client
+from ..clients.notification import notification_client
+from ..clients.notification_outbox import notification_outbox
+from ..clients.smtp import smtp_client
 from .protocol import ExecutionContext, MCPErrorCode, MCPRequest, MCPResponse
+from ..utils.redis_pool import close_redis_pool, get_redis, get_redis_pool_stats
+from ..utils.circuit_breaker import circuit_breaker_stats, get_circuit_breaker
+from ..utils.retry import retry_budget_stats
+from ..utils.secrets import secret_store
 from .registry import tool_registry
+from .retention import PARTITIONED_TABLES, retention_manager
 from .safeguard_queue import (
     safeguard_queue,
     deferred_manager,
@@ -256,6 +269,23 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
         # Initialiser le gestionnaire d'actions differees
         await deferred_manager.initialize()
         logger.info("deferred_manager_initialized")
+
+        # Partitions mensuelles des tables de logs (mois courant + a venir)
+        for table in PARTITIONED_TABLES:
+            await retention_manager.ensure_partitions(table)
+
+        # Annuaire local GLPI (synchronisé au premier lookup ou par cron)
+        if settings.glpi_url and settings.glpi_directory_enabled:
+            await glpi_directory.initialize()
+
+        # Curseurs des flux de tickets (proactif, enrichisseur)
+        if settings.glpi_url:
+            await ticket_feed.initialize()
+
+        # Outbox des notifications + workers de livraison
+        if settings.notification_outbox_enabled:
+            await notification_outbox.initialize()
+            notification_outbox.start(notification_client.deliver)
     except Exception as e:
         logger.error("database_init_failed", error=str(e))
         # On continue quand même, les pools seront créés à la demande
@@ -278,6 +308,14 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     await memory_client.close()
     await safeguard_queue.close()
     await deferred_manager.close()
+    await retention_manager.close()
+    await glpi_directory.close()
+    await ticket_feed.close()
+    await notification_client.close()  # Digests en attente, avant l'arrêt des workers
+    await notification_outbox.close()
+    await close_redis_pool()
+    await http_pool.aclose()
+    await smtp_client.close()
     logger.info("database_pools_closed")
 
 
@@ -330,6 +368,81 @@ def create_mcp_app() -> FastAPI:
     return app
 
 
+async def _run_deferred_action(
+    deferred_id: str,
+    tool_name: str,
+    arguments: dict[str, Any],
+    caller: Optional[str],
+) -> tuple[dict[str, Any], int]:
+    """
+    Execute une action differee et enregistre son resultat.
+
+    Les secrets Redis ne sont pas supprimes ici: l'appelant les nettoie
+    (un par un ou en une seule commande pour un lot).
+
+    Returns:
+        (contenu de la reponse, code HTTP)
+    """
+    context = ExecutionContext(
+        request_id=f"deferred-{deferred_id}",
+        tool_name=tool_name,
+        caller=caller,
+    )
+
+    try:
+        response = await tool_registry.execute(
+            tool_name=tool_name,
+            arguments=arguments,
+            context=context,
+        )
+
+        if response.error:
+            await deferred_manager.mark_executed(
+                deferred_id=deferred_id,
+                error=str(response.error),
+            )
+            return {
+                "success": False,
+                "deferred_id": deferred_id,
+                "error": response.error.model_dump(),
+            }, 500
+
+        # Marquer comme execute
+        await deferred_manager.mark_executed(
+            deferred_id=deferred_id,
+            result=response.result,
+        )
+
+        logger.info(
+            "deferred_action_executed_successfully",
+            deferred_id=deferred_id,
+            tool_name=tool_name,
+        )
+
+        return {
+            "success": True,
+            "deferred_id": deferred_id,
+            "tool_name": tool_name,
+            "result": response.result,
+        }, 200
+
+    except Exception as e:
+        await deferred_manager.mark_executed(
+            deferred_id=deferred_id,
+            error=str(e),
+        )
+        logger.error(
+            "deferred_action_execution_failed",
+            deferred_id=deferred_id,
+            error=str(e),
+        )
+        return {
+            "success": False,
+            "deferred_id": deferred_id,
+            "error": str(e),
+        }, 500
+
+
 def _register_routes(app: FastAPI) -> None:
     """Enregistre les routes MCP."""
 
@@ -361,44 +474,45 @@ def _register_routes(app: FastAPI) -> None:
         except Exception as e:
             checks["postgresql"] = {"status": "error", "error": str(e)[:100]}
 
-        # Check Redis
+        # Check Redis (pool partagé)
         try:
-            import redis.asyncio as aioredis
-            redis_client = aioredis.from_url(settings.redis_url, socket_timeout=5.0)
-            await redis_client.ping()
-            await redis_client.close()
-            checks["redis"] = {"status": "ok"}
+            await get_redis().ping()
+            checks["redis"] = {"status": "ok", "pool": get_redis_pool_stats()}
         except Exception as e:
             checks["redis"] = {"status": "error", "error": str(e)[:100]}
 
-        # Check GLPI (si configuré)
-        if settings.glpi_url:
+        # Check GLPI (si configuré) - clients HTTP partagés, timeout court.
+        # Circuit ouvert: service connu comme down, pas de sonde réseau.
+        if settings.glpi_url and get_circuit_breaker("glpi").state == "open":
+            checks["glpi"] = {"status": "error", "circuit": "open"}
+        elif settings.glpi_url:
             try:
-                import httpx
-                async with httpx.AsyncClient(timeout=5.0) as client:
-                    resp = await client.get(f"{settings.glpi_url}/apirest.php/")
-                    checks["glpi"] = {
-                        "status": "ok" if resp.status_code < 500 else "error",
-                        "http_code": resp.status_code
-                    }
+                client = http_pool.get_client("glpi", base_url=settings.glpi_url)
+                resp = await client.get(f"{settings.glpi_url}/apirest.php/", timeout=5.0)
+                checks["glpi"] = {
+                    "status": "ok" if resp.status_code < 500 else "error",
+                    "http_code": resp.status_code
+                }
             except Exception as e:
                 checks["glpi"] = {"status": "error", "error": str(e)[:100]}
         else:
             checks["glpi"] = {"status": "not_configured"}
 
         # Check Observium (si configuré)
-        if settings.observium_url:
+        if settings.observium_url and get_circuit_breaker("observium").state == "open":
+            checks["observium"] = {"status": "error", "circuit": "open"}
+        elif settings.observium_url:
             try:
-                import httpx
-                async with httpx.AsyncClient(timeout=5.0) as client:
-                    resp = await client.get(
-                        f"{settings.observium_url}/api/v0/devices",
-                        auth=(settings.observium_user, settings.observium_pass.get_secret_value())
-                    )
-                    checks["observium"] = {
-                        "status": "ok" if resp.status_code < 500 else "error",
-                        "http_code": resp.status_code
-                    }
+                client = http_pool.get_client("observium", base_url=settings.observium_url)
+                resp = await client.get(
+                    f"{settings.observium_url}/api/v0/devices",
+                    auth=(settings.observium_user, settings.observium_pass.get_secret_value()),
+                    timeout=5.0,
+                )
+                checks["observium"] = {
+                    "status": "ok" if resp.status_code < 500 else "error",
+                    "http_code": resp.status_code
+                }
             except Exception as e:
                 checks["observium"] = {"status": "error", "error": str(e)[:100]}
         else:
@@ -426,6 +540,7 @@ def _register_routes(app: FastAPI) -> None:
             "tools_count": len(tool_registry),
             "safeguard_enabled": settings.safeguard_enabled,
             "checks": checks,
+            "circuit_breakers": circuit_breaker_stats(),
         }
 
         if status != "healthy":
@@ -433,6 +548,21 @@ def _register_routes(app: FastAPI) -> None:
 
         return JSONResponse(content=response, status_code=http_code)
 
+    @app.get("/metrics")
+    async def metrics(
+        _api_key: Optional[str] = Depends(verify_api_key),
+    ) -> dict[str, Any]:
+        """Métriques des pools de connexions (HTTP par service, Redis, SMTP) et temps par endpoint."""
+        return {
+            "timestamp": datetime.utcnow().isoformat(),
+            "http": http_pool.stats(),
+            "redis": get_redis_pool_stats(),
+            "retry_budgets": retry_budget_stats(),
+            "endpoints": endpoint_timing_stats(),
+            "smtp": smtp_client.stats(),
+            "notification_digest": notification_client.coalescer.stats(),
+        }
+
     # -------------------------------------------------------------------------
     # MCP SSE Endpoint (Découverte des tools)
     # -------------------------------------------------------------------------
@@ -796,6 +926,26 @@ def _register_routes(app: FastAPI) -> None:
 
         return JSONResponse(content=status)
 
+    @app.get("/safeguard/stats")
+    async def get_safeguard_stats(
+        _api_key: Optional[str] = Depends(verify_api_key),
+    ) -> dict[str, Any]:
+        """
+        Resume des compteurs SAFEGUARD (approbations + actions differees).
+
+        Lecture des compteurs materialises: cout constant, adapte au polling
+        des dashboards.
+        """
+        approvals, deferred = await asyncio.gather(
+            safeguard_queue.get_stats(),
+            deferred_manager.get_stats(),
+        )
+        return {
+            "approvals": approvals,
+            "deferred": deferred,
+            "delay_config": DEFERRED_DELAY_HOURS,
+        }
+
     @app.post("/safeguard/approve/{approval_id}")
     async def approve_action(
         approval_id: str,
@@ -970,6 +1120,32 @@ def _register_routes(app: FastAPI) -> None:
             "actions": actions,
         }
 
+    # Routes statiques declarees avant /{deferred_id} (sinon masquees)
+    @app.get("/safeguard/deferred/due")
+    async def get_due_deferred_actions(
+        _api_key: Optional[str] = Depends(verify_api_key),
+    ) -> dict[str, Any]:
+        """
+        Liste les actions differees pretes a etre executees.
+        Utilise par le cron pour recuperer les actions a executer.
+        """
+        actions = await deferred_manager.get_due_actions()
+        return {
+            "count": len(actions),
+            "actions": actions,
+        }
+
+    @app.get("/safeguard/deferred/stats")
+    async def get_deferred_stats(
+        _api_key: Optional[str] = Depends(verify_api_key),
+    ) -> dict[str, Any]:
+        """Retourne les statistiques des actions differees."""
+        stats = await deferred_manager.get_stats()
+        return {
+            "delay_config": DEFERRED_DELAY_HOURS,
+            "stats": stats,
+        }
+
     @app.get("/safeguard/deferred/{deferred_id}")
     async def get_deferred_action_detail(
         deferred_id: str,
@@ -1018,20 +1194,6 @@ def _register_routes(app: FastAPI) -> None:
         status_code = 200 if result.get("success") else 400
         return JSONResponse(content=result, status_code=status_code)
 
-    @app.get("/safeguard/deferred/due")
-    async def get_due_deferred_actions(
-        _api_key: Optional[str] = Depends(verify_api_key),
-    ) -> dict[str, Any]:
-        """
-        Liste les actions differees pretes a etre executees.
-        Utilise par le cron pour recuperer les actions a executer.
-        """
-        actions = await deferred_manager.get_due_actions()
-        return {
-            "count": len(actions),
-            "actions": actions,
-        }
-
     @app.post("/safeguard/deferred/{deferred_id}/execute")
     async def execute_deferred_action(
         deferred_id: str,
@@ -1067,84 +1229,201 @@ def _register_routes(app: FastAPI) -> None:
         if not full_arguments:
             full_arguments = detail["parameters"]
 
-        tool_name = detail["tool_name"]
-
-        # Executer le tool
-        context = ExecutionContext(
-            request_id=f"deferred-{deferred_id}",
-            tool_name=tool_name,
+        content, status_code = await _run_deferred_action(
+            deferred_id=deferred_id,
+            tool_name=detail["tool_name"],
+            arguments=full_arguments,
             caller=request.client.host if request.client else None,
         )
 
+        if status_code == 200:
+            # Nettoyer les secrets de Redis
+            await safeguard_queue.cleanup_secrets(approval_id)
+
+        return JSONResponse(content=content, status_code=status_code)
+
+    @app.post("/safeguard/deferred/execute-due")
+    async def execute_due_deferred_actions(
+        request: Request,
+        _api_key: Optional[str] = Depends(verify_api_key),
+    ) -> dict[str, Any]:
+        """
+        Execute toutes les actions differees echues (appele par le cron).
+
+        Arguments complets lus en une requete PostgreSQL + un MGET Redis,
+        secrets des actions reussies supprimes en une seule commande DEL.
+        """
+        actions = await deferred_manager.get_due_actions()
+        if not actions:
+            return {"count": 0, "executed": 0, "failed": 0, "results": []}
+
+        full_arguments = await safeguard_queue.get_full_arguments_bulk(
+            [action["approval_id"] for action in actions]
+        )
+        caller = request.client.host if request.client else None
+
+        results = []
+        executed_approvals = []
+        for action in actions:
+            content, status_code = await _run_deferred_action(
+                deferred_id=action["deferred_id"],
+                tool_name=action["tool_name"],
+                arguments=full_arguments.get(action["approval_id"]) or action["parameters"],
+                caller=caller,
+            )
+            results.append(content)
+            if status_code == 200:
+                executed_approvals.append(action["approval_id"])
+
+        # Nettoyer les secrets de Redis (une commande pour tout le lot)
+        await safeguard_queue.cleanup_secrets_bulk(executed_approvals)
+
+        return {
+            "count": len(actions),
+            "executed": len(executed_approvals),
+            "failed": len(actions) - len(executed_approvals),
+            "results": results,
+        }
+
+    # -------------------------------------------------------------------------
+    # Maintenance - Retention des partitions
+    # -------------------------------------------------------------------------
+
+    @app.post("/maintenance/retention")
+    async def run_retention(
+        request: Request,
+        _api_key: Optional[str] = Depends(verify_api_key),
+    ) -> JSONResponse:
+        """
+        Archive et supprime les partitions mensuelles expirees.
+
+        A appeler par un cron (ex: quotidien). Cree aussi les partitions
+        des mois a venir.
+
+        Body (optionnel):
+        {
+            "retention_months": 12,
+            "dry_run": true
+        }
+        """
         try:
-            response = await tool_registry.execute(
-                tool_name=tool_name,
-                arguments=full_arguments,
-                context=context,
+            body = await request.json()
+        except Exception:
+            body = {}
+
+        try:
+            report = await retention_manager.apply_retention(
+                retention_months=body.get("retention_months"),
+                dry_run=bool(body.get("dry_run", False)),
+            )
+            return JSONResponse(content=report)
+        except Exception as e:
+            logger.error("retention_failed", error=str(e))
+            return JSONResponse(
+                content={"success": False, "error": str(e)},
+                status_code=500,
             )
 
-            if response.error:
-                await deferred_manager.mark_executed(
-                    deferred_id=deferred_id,
-                    error=str(response.error),
-                )
-                return JSONResponse(
-                    content={
-                        "success": False,
-                        "deferred_id": deferred_id,
-                        "error": response.error.model_dump(),
-                    },
-                    status_code=500,
-                )
+    @app.post("/maintenance/secrets/rotate")
+    async def rotate_secrets(
+        request: Request,
+        _api_key: Optional[str] = Depends(verify_api_key),
+    ) -> JSONResponse:
+        """
+        Rechiffre les secrets SAFEGUARD de Redis avec la cle courante.
 
-            # Marquer comme execute
-            await deferred_manager.mark_executed(
-                deferred_id=deferred_id,
-                result=response.result,
+        A appeler apres une rotation de REDIS_SECRET_KEY (ancienne cle dans
+        REDIS_SECRET_KEY_PREVIOUS), avant de retirer l'ancienne cle.
+
+        Body (optionnel):
+        {
+            "batch_size": 200
+        }
+        """
+        try:
+            body = await request.json()
+        except Exception:
+            body = {}
+
+        try:
+            rotated = await secret_store.rotate_secrets(
+                batch_size=int(body.get("batch_size", 200)),
+            )
+            return JSONResponse(content={"success": True, "rotated": rotated})
+        except Exception as e:
+            logger.error("secrets_rotation_failed", error=str(e))
+            return JSONResponse(
+                content={"success": False, "error": str(e)},
+                status_code=500,
             )
 
-            # Nettoyer les secrets de Redis
-            await safeguard_queue.cleanup_secrets(approval_id)
+    # -------------------------------------------------------------------------
+    # Maintenance - Annuaire local GLPI
+    # -------------------------------------------------------------------------
 
-            logger.info(
-                "deferred_action_executed_successfully",
-                deferred_id=deferred_id,
-                tool_name=tool_name,
+    @app.post("/maintenance/glpi-directory/sync")
+    async def sync_glpi_directory(
+        full: bool = False,
+        _api_key: Optional[str] = Depends(verify_api_key),
+    ) -> JSONResponse:
+        """
+        Synchronise l'annuaire local des utilisateurs GLPI.
+
+        Incrémentale (date_mod) par défaut; ?full=true relit tout GLPI et
+        purge les utilisateurs supprimés (ex: cron hebdomadaire).
+        """
+        if not settings.glpi_url:
+            return JSONResponse(
+                content={"success": False, "error": "GLPI non configuré"},
+                status_code=400,
             )
 
+        try:
+            result = await glpi_client.sync_user_directory(full=full)
+            result["directory"] = await glpi_directory.get_stats()
+            return JSONResponse(content=result)
+        except Exception as e:
+            logger.error("glpi_directory_sync_failed", error=str(e))
+            return JSONResponse(
+                content={"success": False, "error": str(e)},
+                status_code=500,
+            )
+
+    # -------------------------------------------------------------------------
+    # Maintenance - Outbox des notifications
+    # -------------------------------------------------------------------------
+
+    @app.get("/maintenance/notification-outbox")
+    async def get_notification_outbox(
+        dead_limit: int = 20,
+        _api_key: Optional[str] = Depends(verify_api_key),
+    ) -> JSONResponse:
+        """État de l'outbox: compteurs par statut/canal et dernières dead letters."""
+        try:
             return JSONResponse(content={
                 "success": True,
-                "deferred_id": deferred_id,
-                "tool_name": tool_name,
-                "result": response.result,
+                "stats": await notification_outbox.get_stats(),
+                "dead_letters": await notification_outbox.get_dead_letters(limit=dead_limit),
             })
-
         except Exception as e:
-            await deferred_manager.mark_executed(
-                deferred_id=deferred_id,
-                error=str(e),
-            )
-            logger.error(
-                "deferred_action_execution_failed",
-                deferred_id=deferred_id,
-                error=str(e),
-            )
+            logger.error("notification_outbox_stats_failed", error=str(e))
             return JSONResponse(
-                content={
-                    "success": False,
-                    "deferred_id": deferred_id,
-                    "error": str(e),
-                },
+                content={"success": False, "error": str(e)},
                 status_code=500,
             )
 
-    @app.get("/safeguard/deferred/stats")
-    async def get_deferred_stats(
+    @app.post("/maintenance/notification-outbox/retry")
+    async def retry_notification_dead_letters(
+        outbox_id: Optional[int] = None,
         _api_key: Optional[str] = Depends(verify_api_key),
-    ) -> dict[str, Any]:
-        """Retourne les statistiques des actions differees."""
-        stats = await deferred_manager.get_stats()
-        return {
-            "delay_config": DEFERRED_DELAY_HOURS,
-            "stats": stats,
-        }
+    ) -> JSONResponse:
+        """Remet en file les dead letters (toutes, ou ?outbox_id=N)."""
+        try:
+            requeued = await notification_outbox.retry_dead(outbox_id)
+            return JSONResponse(content={"success": True, "requeued": requeued})
+        except Exception as e:
+            logger.error("notification_outbox_retry_failed", error=str(e))
+            return JSONResponse(
+                content={"success": False, "error": str(e)},
+                status_code=500,
+            )
@@ -14,19 +14,32 @@ Workflow quotidien (18h00):
    b. enrichisseur_extract_knowledge → Extraire problème/solution
    c. memory_add_knowledge → Injecter dans RAG
 3. enrichisseur_get_stats → Rapport d'enrichissement
+
+enrichisseur_run_batch exécute les étapes 2a-2c en pipeline (files bornées):
+doublons en une requête → extraction parallèle → embeddings par lots →
+écriture groupée.
 """
 
+import asyncio
+import json
+from dataclasses import dataclass
 from typing import Any, Optional
 from datetime import datetime
 
 from ..clients.glpi import glpi_client
+from ..clients.glpi_feed import ticket_feed
 from ..clients.memory import memory_client
+from ..config import settings
+from ..mcp.protocol import ToolParameterType
 from ..mcp.registry import (
     tool_registry,
     string_param,
     int_param,
     bool_param,
+    array_param,
 )
+from ..utils.html_text import html_to_text
+from ..utils.keyword_matcher import KeywordMatcher
 
 import structlog
 
@@ -78,22 +91,15 @@ SAFEGUARD: L0 (READ_ONLY)""",
     },
 )
 async def memory_check_exists(ticket_id: str) -> dict[str, Any]:
-    """Vérifie si un ticket existe déjà dans le RAG."""
+    """Vérifie si un ticket existe déjà dans le RAG (ou y a été fusionné)."""
     try:
-        pool = await memory_client._get_pool()
+        existing = await memory_client.check_exists_bulk([ticket_id])
 
-        row = await pool.fetchrow(
-            "SELECT id, created_at, updated_at FROM widip_knowledge_base WHERE ticket_id = $1",
-            ticket_id,
-        )
-
-        if row:
+        if ticket_id in existing:
             return {
                 "exists": True,
                 "ticket_id": ticket_id,
-                "knowledge_id": row["id"],
-                "created_at": str(row["created_at"]),
-                "updated_at": str(row["updated_at"]) if row["updated_at"] else None,
+                **existing[ticket_id],
             }
 
         return {
@@ -106,6 +112,51 @@ async def memory_check_exists(ticket_id: str) -> dict[str, Any]:
         return {"exists": False, "error": str(e)}
 
 
+@tool_registry.register_function(
+    name="memory_check_exists_bulk",
+    description="""Vérifie en un seul appel quels tickets sont déjà dans la base de connaissances RAG.
+À préférer à une boucle de memory_check_exists (workflow Enrichisseur):
+une seule requête indexée pour toute la liste.
+Retourne les IDs déjà présents (existing) et ceux à traiter (missing).
+SAFEGUARD: L0 (READ_ONLY)""",
+    parameters={
+        "ticket_ids": array_param(
+            "IDs des tickets GLPI à vérifier",
+            items_type=ToolParameterType.STRING,
+            required=True,
+        ),
+        "include_details": bool_param(
+            "Inclure knowledge_id et dates des tickets présents",
+            required=False,
+            default=False,
+        ),
+    },
+)
+async def memory_check_exists_bulk(
+    ticket_ids: list[str],
+    include_details: bool = False,
+) -> dict[str, Any]:
+    """Vérifie l'existence d'une liste de tickets dans le RAG."""
+    ids = list(dict.fromkeys(str(ticket_id) for ticket_id in ticket_ids if str(ticket_id)))
+
+    try:
+        existing = await memory_client.check_exists_bulk(ids)
+    except Exception as e:
+        logger.exception("memory_check_exists_bulk_error", error=str(e))
+        return {"success": False, "error": str(e)}
+
+    result = {
+        "success": True,
+        "checked": len(ids),
+        "existing_count": len(existing),
+        "existing": [ticket_id for ticket_id in ids if ticket_id in existing],
+        "missing": [ticket_id for ticket_id in ids if ticket_id not in existing],
+    }
+    if include_details:
+        result["details"] = existing
+    return result
+
+
 @tool_registry.register_function(
     name="enrichisseur_extract_knowledge",
     description="""Extrait et structure les connaissances d'un ticket résolu.
@@ -148,11 +199,31 @@ async def enrichisseur_extract_knowledge(
     followups: Optional[str] = None,
 ) -> dict[str, Any]:
     """Extrait les connaissances structurées d'un ticket."""
+    return await asyncio.to_thread(
+        _extract_knowledge, ticket_id, title, description, solution, followups
+    )
+
+
+def _extract_knowledge(
+    ticket_id: str,
+    title: str,
+    description: str,
+    solution: Optional[str] = None,
+    followups: Any = None,
+) -> dict[str, Any]:
+    """
+    Extraction synchrone (HTML → texte, mots-clés, score qualité).
+
+    Calcul pur sans I/O, exécuté dans un thread (asyncio.to_thread): un
+    gros ticket ne bloque pas la boucle d'événements.
 
+    Args:
+        followups: Followups (liste, ou JSON string depuis le tool)
+    """
     # Nettoyer les entrées
     title = title.strip() if title else ""
-    description = _clean_html(description) if description else ""
-    solution = _clean_html(solution) if solution else ""
+    description = html_to_text(description)
+    solution = html_to_text(solution)
 
     # Construire le résumé du problème
     problem_summary = f"{title}"
@@ -172,13 +243,12 @@ async def enrichisseur_extract_knowledge(
     elif followups:
         # Si pas de solution formelle, utiliser le dernier followup
         try:
-            import json
             fups = json.loads(followups) if isinstance(followups, str) else followups
             if fups and isinstance(fups, list):
                 # Prendre le dernier followup non privé
                 for fu in reversed(fups):
                     if not fu.get("is_private", False):
-                        solution_summary = _clean_html(fu.get("content", ""))[:1000]
+                        solution_summary = html_to_text(fu.get("content", ""))[:1000]
                         break
         except Exception:
             pass
@@ -186,11 +256,10 @@ async def enrichisseur_extract_knowledge(
     if not solution_summary:
         solution_summary = "Solution non documentée - voir les followups du ticket"
 
-    # Détecter la catégorie automatiquement
-    category = _detect_category(title, description, solution_summary)
-
-    # Générer des tags
-    tags = _generate_tags(title, description, solution_summary)
+    # Catégorie, tags, solution vide / actionnable: un seul passage sur le texte
+    keywords = _scan_keywords(title, description, solution_summary)
+    category = keywords.category
+    tags = keywords.tags
 
     # 🆕 CALCUL DU SCORE DE QUALITÉ
     quality_score = _calculate_quality_score(
@@ -198,7 +267,8 @@ async def enrichisseur_extract_knowledge(
         description=description,
         solution_summary=solution_summary,
         category=category,
-        tags=tags
+        tags=tags,
+        keywords=keywords,
     )
 
     # Seuil de qualité minimum : 0.4 (40%)
@@ -280,6 +350,8 @@ async def enrichisseur_get_stats() -> dict[str, Any]:
     name="enrichisseur_run_batch",
     description="""Exécute un batch d'enrichissement complet.
 1. Récupère les tickets résolus des dernières heures
+   (ou, avec consumer, ceux résolus depuis le dernier batch de ce consommateur;
+   un lot avec des injections échouées est relivré au batch suivant)
 2. Filtre ceux déjà dans le RAG
 3. Extrait les connaissances
 4. Injecte dans la base
@@ -302,12 +374,18 @@ SAFEGUARD: L1 (MINOR) - Écriture dans RAG uniquement""",
             required=False,
             default=False,
         ),
+        "consumer": string_param(
+            "Lire le flux 'resolved' avec ce curseur (ignore hours_since): "
+            "chaque ticket n'est traité qu'une fois",
+            required=False,
+        ),
     },
 )
 async def enrichisseur_run_batch(
     hours_since: int = 24,
     max_tickets: int = 50,
     dry_run: bool = False,
+    consumer: Optional[str] = None,
 ) -> dict[str, Any]:
     """Exécute un batch d'enrichissement."""
 
@@ -316,6 +394,7 @@ async def enrichisseur_run_batch(
         hours_since=hours_since,
         max_tickets=max_tickets,
         dry_run=dry_run,
+        consumer=consumer,
     )
 
     report = {
@@ -327,15 +406,30 @@ async def enrichisseur_run_batch(
         "tickets_processed": 0,
         "tickets_injected": 0,
         "tickets_failed": 0,
+        "tickets_merged": 0,
         "details": [],
     }
 
+    lease_id = None
+
     try:
         # 1. Récupérer les tickets résolus
-        resolved = await glpi_client.get_resolved_tickets(
-            hours_since=hours_since,
-            limit=max_tickets,
-        )
+        if consumer:
+            resolved = await ticket_feed.fetch(
+                consumer,
+                "resolved",
+                limit=max_tickets,
+                include_details=True,
+            )
+            lease_id = resolved.get("lease_id")
+            report["consumer"] = consumer
+            if resolved.get("busy"):
+                report["busy"] = True
+        else:
+            resolved = await glpi_client.get_resolved_tickets(
+                hours_since=hours_since,
+                limit=max_tickets,
+            )
 
         if not resolved.get("success"):
             report["success"] = False
@@ -345,71 +439,22 @@ async def enrichisseur_run_batch(
         tickets = resolved.get("tickets", [])
         report["tickets_found"] = len(tickets)
 
-        # 2. Traiter chaque ticket
-        for ticket in tickets:
-            ticket_id = str(ticket.get("id", ""))
-            ticket_detail = {
-                "ticket_id": ticket_id,
-                "title": ticket.get("title", "")[:100],
-                "status": "pending",
-            }
-
-            # Vérifier si déjà dans RAG
-            exists_check = await memory_check_exists(ticket_id)
-            if exists_check.get("exists"):
-                report["tickets_already_in_rag"] += 1
-                ticket_detail["status"] = "already_exists"
-                report["details"].append(ticket_detail)
-                continue
-
-            # Extraire les connaissances
-            import json
-            extraction = await enrichisseur_extract_knowledge(
-                ticket_id=ticket_id,
-                title=ticket.get("title", ""),
-                description=ticket.get("description", ""),
-                solution=ticket.get("solution"),
-                followups=json.dumps(ticket.get("followups", [])),
-            )
-
-            if not extraction.get("ready_for_injection"):
-                report["tickets_failed"] += 1
-                ticket_detail["status"] = "extraction_failed"
-                ticket_detail["reason"] = "Missing problem or solution"
-                report["details"].append(ticket_detail)
-                continue
-
-            report["tickets_processed"] += 1
-
-            # Injecter dans RAG (sauf dry_run)
-            if not dry_run:
-                inject_result = await memory_client.add_knowledge(
-                    ticket_id=ticket_id,
-                    problem_summary=extraction["problem_summary"],
-                    solution_summary=extraction["solution_summary"],
-                    category=extraction.get("category"),
-                    tags=extraction.get("tags", []),
-                    quality_score=extraction.get("quality_score", 0.0),
-                )
-
-                if inject_result.get("success"):
-                    report["tickets_injected"] += 1
-                    ticket_detail["status"] = "injected"
-                    ticket_detail["knowledge_id"] = inject_result.get("id")
-                else:
-                    report["tickets_failed"] += 1
-                    ticket_detail["status"] = "injection_failed"
-                    ticket_detail["error"] = inject_result.get("error")
+        # 2. Pipeline: doublons → extraction → embeddings → écriture
+        report["details"] = await _run_enrichment_pipeline(tickets, report, dry_run)
+
+        # 3. Valider le lot: le curseur avance (un dry_run le laisse en place).
+        # Une injection échouée (Ollama, PostgreSQL) libère le bail: le lot
+        # est relivré, les tickets déjà injectés sont filtrés par check_exists_bulk.
+        # Un échec d'extraction (ticket sans problème/solution) est définitif.
+        if lease_id:
+            retry = any(d["status"] == "injection_failed" for d in report["details"])
+            if dry_run or retry:
+                await ticket_feed.release(consumer, "resolved", lease_id)
+                report["acked"] = False
             else:
-                ticket_detail["status"] = "dry_run_ok"
-                ticket_detail["would_inject"] = {
-                    "problem": extraction["problem_summary"][:100] + "...",
-                    "solution": extraction["solution_summary"][:100] + "...",
-                    "category": extraction.get("category"),
-                    "tags": extraction.get("tags", []),
-                }
-
-            report["details"].append(ticket_detail)
+                ack = await ticket_feed.ack(consumer, "resolved", lease_id)
+                report["acked"] = ack.get("acked", False)
+            lease_id = None
 
         report["completed_at"] = datetime.utcnow().isoformat()
 
@@ -425,92 +470,339 @@ async def enrichisseur_run_batch(
 
     except Exception as e:
         logger.exception("enrichisseur_batch_error", error=str(e))
+        if lease_id:
+            # Lot relivré au prochain batch (les tickets déjà injectés sont filtrés)
+            await ticket_feed.release(consumer, "resolved", lease_id)
         report["success"] = False
         report["error"] = str(e)
         return report
 
 
 # =============================================================================
-# Fonctions utilitaires
+# Pipeline d'enrichissement
 # =============================================================================
 
-def _clean_html(text: str) -> str:
-    """Nettoie le HTML du texte."""
-    if not text:
-        return ""
-
-    import re
-
-    # Supprimer les tags HTML
-    text = re.sub(r'<[^>]+>', ' ', text)
-
-    # Décoder les entités HTML courantes
-    text = text.replace('&nbsp;', ' ')
-    text = text.replace('&amp;', '&')
-    text = text.replace('&lt;', '<')
-    text = text.replace('&gt;', '>')
-    text = text.replace('&quot;', '"')
-    text = text.replace('&#39;', "'")
-
-    # Nettoyer les espaces multiples
-    text = re.sub(r'\s+', ' ', text)
-
-    return text.strip()
-
-
-def _detect_category(title: str, description: str, solution: str) -> str:
-    """Détecte automatiquement la catégorie du ticket."""
-    text = f"{title} {description} {solution}".lower()
-
-    # Mapping mot-clé → catégorie
-    category_keywords = {
-        "VPN": ["vpn", "tunnel", "connexion distante", "remote access"],
-        "Imprimante": ["imprimante", "printer", "impression", "print", "pilote imprimante"],
-        "Réseau": ["réseau", "network", "ethernet", "wifi", "internet", "connexion", "ping", "dns"],
-        "Active Directory": ["ad ", "active directory", "compte", "mot de passe", "password", "ldap", "utilisateur bloqué"],
-        "Messagerie": ["email", "mail", "outlook", "exchange", "boite mail", "smtp", "imap"],
-        "Téléphonie": ["téléphone", "phone", "voip", "sip", "appel"],
-        "Serveur": ["serveur", "server", "vm", "virtualisation", "vmware", "hyper-v"],
-        "Sauvegarde": ["sauvegarde", "backup", "restore", "restauration"],
-        "Sécurité": ["virus", "malware", "antivirus", "sécurité", "security", "firewall"],
-        "Logiciel": ["logiciel", "application", "software", "installation", "mise à jour", "update"],
-        "Matériel": ["matériel", "hardware", "pc", "ordinateur", "écran", "clavier", "souris"],
-    }
+# Fin de flux entre deux étapes du pipeline
+_DONE = object()
 
-    for category, keywords in category_keywords.items():
-        for keyword in keywords:
-            if keyword in text:
-                return category
-
-    return "Autre"
-
-
-def _generate_tags(title: str, description: str, solution: str) -> list[str]:
-    """Génère des tags pertinents pour le ticket."""
-    text = f"{title} {description} {solution}".lower()
-
-    # Liste de tags possibles
-    tag_keywords = {
-        "vpn": ["vpn"],
-        "windows": ["windows", "win10", "win11"],
-        "réseau": ["réseau", "network", "ethernet", "wifi"],
-        "mot_de_passe": ["mot de passe", "password", "mdp"],
-        "imprimante": ["imprimante", "printer"],
-        "outlook": ["outlook", "mail", "email"],
-        "teams": ["teams", "microsoft teams"],
-        "ad": ["active directory", "ad ", "ldap"],
-        "urgent": ["urgent", "critique", "bloquant"],
-        "client": ["client", "utilisateur"],
-    }
+# Attente max pour compléter un lot avant de l'envoyer incomplet (secondes)
+_BATCH_LINGER = 0.05
+
+
+async def _next_batch(queue: asyncio.Queue, size: int) -> tuple[list[Any], bool]:
+    """
+    Lit un lot dans une file: attend le premier élément, puis complète le
+    lot pendant _BATCH_LINGER au plus.
 
-    tags = []
-    for tag, keywords in tag_keywords.items():
-        for keyword in keywords:
-            if keyword in text:
-                tags.append(tag)
+    Returns:
+        (lot, fin de flux atteinte)
+    """
+    item = await queue.get()
+    if item is _DONE:
+        return [], True
+
+    batch = [item]
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + _BATCH_LINGER
+    while len(batch) < size:
+        try:
+            item = queue.get_nowait()
+        except asyncio.QueueEmpty:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(queue.get(), remaining)
+            except TimeoutError:
                 break
+        if item is _DONE:
+            return batch, True
+        batch.append(item)
+
+    return batch, False
+
 
-    return list(set(tags))  # Dédupliquer
+async def _close_stage(workers: list[asyncio.Task], queue: asyncio.Queue, consumers: int) -> None:
+    """Signale la fin de flux à l'étape suivante quand tous ses producteurs ont fini."""
+    await asyncio.gather(*workers)
+    for _ in range(consumers):
+        await queue.put(_DONE)
+
+
+async def _run_enrichment_pipeline(
+    tickets: list[dict[str, Any]],
+    report: dict[str, Any],
+    dry_run: bool,
+) -> list[dict[str, Any]]:
+    """
+    Traite un lot de tickets résolus en pipeline.
+
+    Étapes reliées par des files bornées (ENRICHISSEUR_QUEUE_SIZE):
+    1. Doublons: une seule requête ticket_id = ANY($1) pour tout le lot
+    2. Extraction: ENRICHISSEUR_EXTRACT_WORKERS workers (asyncio.to_thread)
+    3. Embeddings: lots de ENRICHISSEUR_EMBED_BATCH_SIZE textes,
+       ENRICHISSEUR_EMBED_CONCURRENCY requêtes Ollama simultanées
+    4. Écriture: INSERT ... ON CONFLICT groupé (ENRICHISSEUR_UPSERT_BATCH_SIZE),
+       quasi-doublons fusionnés (MEMORY_DEDUP_THRESHOLD)
+
+    Une erreur d'embedding ou d'écriture n'échoue que le lot concerné.
+    En dry_run, les étapes 3 et 4 sont sautées.
+
+    Args:
+        tickets: Tickets résolus (avec description, solution, followups)
+        report: Rapport du batch (compteurs mis à jour)
+        dry_run: Analyse sans injection
+
+    Returns:
+        Détail par ticket, dans l'ordre du lot
+    """
+    details: dict[str, dict[str, Any]] = {}
+    pending = []
+    for ticket in tickets:
+        ticket_id = str(ticket.get("id", ""))
+        if ticket_id in details:
+            continue
+        details[ticket_id] = {
+            "ticket_id": ticket_id,
+            "title": ticket.get("title", "")[:100],
+            "status": "pending",
+        }
+        pending.append(ticket)
+
+    # 1. Doublons: une requête pour tout le lot
+    existing = await memory_client.check_exists_bulk(list(details))
+    for ticket_id in existing:
+        report["tickets_already_in_rag"] += 1
+        details[ticket_id]["status"] = "already_exists"
+    pending = [t for t in pending if str(t.get("id", "")) not in existing]
+
+    queue_size = settings.enrichisseur_queue_size
+    extract_queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    embed_queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    upsert_queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+
+    def mark_failed(entries: list[dict[str, Any]], error: str) -> None:
+        for entry in entries:
+            report["tickets_failed"] += 1
+            details[entry["ticket_id"]]["status"] = "injection_failed"
+            details[entry["ticket_id"]]["error"] = error
+
+    async def feed() -> None:
+        for ticket in pending:
+            await extract_queue.put(ticket)
+
+    async def extract() -> None:
+        while (ticket := await extract_queue.get()) is not _DONE:
+            ticket_id = str(ticket.get("id", ""))
+            detail = details[ticket_id]
+            # Extraction synchrone dans un thread: la boucle reste libre
+            # pour les embeddings et écritures en cours
+            extraction = await asyncio.to_thread(
+                _extract_knowledge,
+                ticket_id,
+                ticket.get("title", ""),
+                ticket.get("description", ""),
+                ticket.get("solution"),
+                ticket.get("followups", []),
+            )
+
+            if not extraction.get("ready_for_injection"):
+                report["tickets_failed"] += 1
+                detail["status"] = "extraction_failed"
+                detail["reason"] = "Missing problem or solution"
+            else:
+                report["tickets_processed"] += 1
+                if dry_run:
+                    detail["status"] = "dry_run_ok"
+                    detail["would_inject"] = {
+                        "problem": extraction["problem_summary"][:100] + "...",
+                        "solution": extraction["solution_summary"][:100] + "...",
+                        "category": extraction.get("category"),
+                        "tags": extraction.get("tags", []),
+                    }
+                else:
+                    await embed_queue.put(extraction)
+
+    async def embed() -> None:
+        done = False
+        while not done:
+            batch, done = await _next_batch(embed_queue, settings.enrichisseur_embed_batch_size)
+            if not batch:
+                continue
+            try:
+                embeddings = await memory_client._get_embeddings([
+                    f"{entry['problem_summary']}\n\n{entry['solution_summary']}"
+                    for entry in batch
+                ])
+            except Exception as e:
+                logger.warning("enrichisseur_embed_batch_failed", size=len(batch), error=str(e))
+                mark_failed(batch, str(e))
+                continue
+
+            for entry, embedding in zip(batch, embeddings, strict=True):
+                if embedding:
+                    await upsert_queue.put((entry, embedding))
+                else:
+                    mark_failed([entry], "Impossible de générer l'embedding")
+
+    async def upsert() -> None:
+        done = False
+        while not done:
+            batch, done = await _next_batch(upsert_queue, settings.enrichisseur_upsert_batch_size)
+            if not batch:
+                continue
+            entries = [entry for entry, _ in batch]
+            try:
+                stored = await memory_client.add_knowledge_bulk(
+                    entries,
+                    [embedding for _, embedding in batch],
+                )
+            except Exception as e:
+                logger.warning("enrichisseur_upsert_batch_failed", size=len(batch), error=str(e))
+                mark_failed(entries, str(e))
+                continue
+
+            for entry in entries:
+                detail = details[entry["ticket_id"]]
+                result = stored.get(entry["ticket_id"])
+                if result is None:
+                    mark_failed([entry], "Ligne non écrite")
+                    continue
+                detail["knowledge_id"] = result["id"]
+                if result["representative"] != entry["ticket_id"]:
+                    # Quasi-doublon fusionné dans une connaissance existante
+                    report["tickets_merged"] += 1
+                    detail["status"] = "merged"
+                    detail["merged_into"] = result["representative"]
+                else:
+                    report["tickets_injected"] += 1
+                    detail["status"] = "injected"
+
+    extract_workers = max(1, settings.enrichisseur_extract_workers)
+    embed_workers = max(1, settings.enrichisseur_embed_concurrency)
+
+    try:
+        async with asyncio.TaskGroup() as tg:
+            feeder = tg.create_task(feed())
+            extractors = [tg.create_task(extract()) for _ in range(extract_workers)]
+            embedders = [tg.create_task(embed()) for _ in range(embed_workers)]
+            tg.create_task(upsert())
+            tg.create_task(_close_stage([feeder], extract_queue, extract_workers))
+            tg.create_task(_close_stage(extractors, embed_queue, embed_workers))
+            tg.create_task(_close_stage(embedders, upsert_queue, 1))
+    except ExceptionGroup as eg:
+        # Erreur inattendue d'une étape: les autres sont annulées, le lot échoue
+        raise eg.exceptions[0] from eg
+
+    return list(details.values())
+
+
+# =============================================================================
+# Fonctions utilitaires
+# =============================================================================
+
+# Vocabulaires de l'analyse des tickets (compilés une fois dans _KEYWORD_MATCHER)
+
+# Mapping mot-clé → catégorie (la première catégorie trouvée, dans cet ordre, gagne)
+_CATEGORY_KEYWORDS = {
+    "VPN": ["vpn", "tunnel", "connexion distante", "remote access"],
+    "Imprimante": ["imprimante", "printer", "impression", "print", "pilote imprimante"],
+    "Réseau": ["réseau", "network", "ethernet", "wifi", "internet", "connexion", "ping", "dns"],
+    "Active Directory": ["ad ", "active directory", "compte", "mot de passe", "password", "ldap", "utilisateur bloqué"],
+    "Messagerie": ["email", "mail", "outlook", "exchange", "boite mail", "smtp", "imap"],
+    "Téléphonie": ["téléphone", "phone", "voip", "sip", "appel"],
+    "Serveur": ["serveur", "server", "vm", "virtualisation", "vmware", "hyper-v"],
+    "Sauvegarde": ["sauvegarde", "backup", "restore", "restauration"],
+    "Sécurité": ["virus", "malware", "antivirus", "sécurité", "security", "firewall"],
+    "Logiciel": ["logiciel", "application", "software", "installation", "mise à jour", "update"],
+    "Matériel": ["matériel", "hardware", "pc", "ordinateur", "écran", "clavier", "souris"],
+}
+
+# Liste de tags possibles
+_TAG_KEYWORDS = {
+    "vpn": ["vpn"],
+    "windows": ["windows", "win10", "win11"],
+    "réseau": ["réseau", "network", "ethernet", "wifi"],
+    "mot_de_passe": ["mot de passe", "password", "mdp"],
+    "imprimante": ["imprimante", "printer"],
+    "outlook": ["outlook", "mail", "email"],
+    "teams": ["teams", "microsoft teams"],
+    "ad": ["active directory", "ad ", "ldap"],
+    "urgent": ["urgent", "critique", "bloquant"],
+    "client": ["client", "utilisateur"],
+}
+
+# Solutions vides/inutiles (recherchées dans la solution uniquement)
+_USELESS_SOLUTIONS = (
+    "fait", "ok", "fermé", "close", "résolu", "done",
+    "solution non documentée", "voir les followups",
+    "ras", "n/a", "na", "test",
+)
+
+# Actions concrètes (recherchées dans la solution uniquement)
+_ACTION_VERBS = (
+    "réinstaller", "redémarrer", "vérifier", "configurer",
+    "modifier", "supprimer", "ajouter", "créer", "ouvrir",
+    "fermer", "désactiver", "activer", "mettre à jour",
+    "télécharger", "installer", "contacter", "appeler",
+)
+
+# Rang de catégorie et tags associés à chaque mot-clé
+_CATEGORY_RANK: dict[str, int] = {}
+for _rank, _keywords in enumerate(_CATEGORY_KEYWORDS.values()):
+    for _keyword in _keywords:
+        _CATEGORY_RANK.setdefault(_keyword, _rank)
+_CATEGORY_NAMES = list(_CATEGORY_KEYWORDS)
+
+_TAGS_BY_KEYWORD: dict[str, set[str]] = {}
+for _tag, _keywords in _TAG_KEYWORDS.items():
+    for _keyword in _keywords:
+        _TAGS_BY_KEYWORD.setdefault(_keyword, set()).add(_tag)
+_TAG_ORDER = {tag: i for i, tag in enumerate(_TAG_KEYWORDS)}
+
+_USELESS_SET = frozenset(_USELESS_SOLUTIONS)
+_ACTION_SET = frozenset(_ACTION_VERBS)
+
+_KEYWORD_MATCHER = KeywordMatcher(
+    [*_CATEGORY_RANK, *_TAGS_BY_KEYWORD, *_USELESS_SOLUTIONS, *_ACTION_VERBS]
+)
+
+
+@dataclass
+class _TicketKeywords:
+    """Résultat de l'analyse par mots-clés d'un ticket."""
+
+    category: str
+    tags: list[str]
+    useless_solution: bool
+    actionable_solution: bool
+
+
+def _scan_keywords(title: str, description: str, solution: str) -> _TicketKeywords:
+    """
+    Analyse titre + description + solution en un seul passage.
+
+    Catégorie et tags portent sur tout le texte; solutions vides et
+    actions concrètes sur la solution seule.
+    """
+    found, in_solution = _KEYWORD_MATCHER.find_all_split(
+        f"{title} {description} ".lower(),
+        solution.lower(),
+    )
+
+    ranks = [_CATEGORY_RANK[k] for k in found if k in _CATEGORY_RANK]
+    category = _CATEGORY_NAMES[min(ranks)] if ranks else "Autre"
+
+    tags: set[str] = set()
+    for keyword in found:
+        tags.update(_TAGS_BY_KEYWORD.get(keyword, ()))
+
+    return _TicketKeywords(
+        category=category,
+        tags=sorted(tags, key=_TAG_ORDER.__getitem__),
+        useless_solution=not in_solution.isdisjoint(_USELESS_SET),
+        actionable_solution=not in_solution.isdisjoint(_ACTION_SET),
+    )
 
 
 def _calculate_quality_score(
@@ -519,6 +811,7 @@ def _calculate_quality_score(
     solution_summary: str,
     category: str,
     tags: list[str],
+    keywords: Optional[_TicketKeywords] = None,
 ) -> float:
     """
     Calcule un score de qualité pour un ticket (0.0 - 1.0).
@@ -530,6 +823,8 @@ def _calculate_quality_score(
     - Présence de catégorie identifiée
     - Nombre de tags pertinents
     - Détection de solutions vides ("fait", "ok", "fermé")
+
+    keywords: analyse déjà faite par _scan_keywords (sinon la solution est analysée)
     """
     score = 0.0
 
@@ -555,16 +850,11 @@ def _calculate_quality_score(
 
     # 3. Solution (0-0.40 points - le plus important)
     solution_length = len(solution_summary.strip())
-    solution_lower = solution_summary.lower()
+    if keywords is None:
+        keywords = _scan_keywords("", "", solution_summary)
 
-    # Pénalité pour solutions vides/inutiles
-    useless_solutions = [
-        "fait", "ok", "fermé", "close", "résolu", "done",
-        "solution non documentée", "voir les followups",
-        "ras", "n/a", "na", "test"
-    ]
-
-    is_useless = any(phrase in solution_lower for phrase in useless_solutions)
+    # Pénalité pour solutions vides/inutiles (_USELESS_SOLUTIONS)
+    is_useless = keywords.useless_solution
 
     if is_useless or solution_length < 10:
         score += 0.0  # Pas de points pour solution vide
@@ -592,15 +882,8 @@ def _calculate_quality_score(
     elif num_tags >= 1:
         score += 0.05
 
-    # Bonus : Solution contient des actions concrètes
-    action_verbs = [
-        "réinstaller", "redémarrer", "vérifier", "configurer",
-        "modifier", "supprimer", "ajouter", "créer", "ouvrir",
-        "fermer", "désactiver", "activer", "mettre à jour",
-        "télécharger", "installer", "contacter", "appeler"
-    ]
-
-    if any(verb in solution_lower for verb in action_verbs):
+    # Bonus : Solution contient des actions concrètes (_ACTION_VERBS)
+    if keywords.actionable_solution:
         score += 0.05  # Bonus pour solution actionnable
 
     return min(score, 1.0)  # Cap à 1.0
@@ -9,12 +9,15 @@ Ce module expose les outils de gestion GLPI aux agents IA:
 
 from typing import Any, Optional
 
-from ..clients.glpi import glpi_client
+from ..clients.glpi import TICKET_DETAIL_FIELDS, glpi_client
+from ..clients.glpi_feed import ticket_feed
+from ..mcp.protocol import ToolParameterType
 from ..mcp.registry import (
     tool_registry,
     string_param,
     int_param,
     bool_param,
+    array_param,
 )
 
 
@@ -27,6 +30,8 @@ from ..mcp.registry import (
     name="glpi_search_client",
     description="""Recherche un client/utilisateur dans GLPI par nom, email ou téléphone.
 Utilise ce tool pour trouver les informations d'un client avant de créer un ticket.
+Tous les critères fournis sont combinés en une seule recherche: le meilleur
+candidat (le plus de critères satisfaits) est retourné, les autres dans "candidates".
 Retourne l'ID client, nom, email et téléphone si trouvé.""",
     parameters={
         "name": string_param(
@@ -41,15 +46,21 @@ Retourne l'ID client, nom, email et téléphone si trouvé.""",
             "Numéro de téléphone du client",
             required=False,
         ),
+        "limit": int_param(
+            "Nombre maximum de candidats retournés",
+            required=False,
+            default=5,
+        ),
     },
 )
 async def glpi_search_client(
     name: Optional[str] = None,
     email: Optional[str] = None,
     phone: Optional[str] = None,
+    limit: int = 5,
 ) -> dict[str, Any]:
     """Recherche un client dans GLPI."""
-    return await glpi_client.search_client(name=name, email=email, phone=phone)
+    return await glpi_client.search_client(name=name, email=email, phone=phone, limit=limit)
 
 
 # =============================================================================
@@ -61,7 +72,8 @@ async def glpi_search_client(
     name="glpi_create_ticket",
     description="""Crée un nouveau ticket d'incident dans GLPI.
 Utilise ce tool pour ouvrir un ticket suite à une alerte ou une demande utilisateur.
-Retourne l'ID du ticket créé.""",
+Retourne l'ID du ticket créé. Le demandeur n'est attribué que si client_name désigne
+un seul utilisateur actif; sinon les candidats sont retournés (requester_candidates).""",
     parameters={
         "title": string_param(
             "Titre du ticket (résumé du problème)",
@@ -128,6 +140,34 @@ async def glpi_get_ticket_details(ticket_id: int) -> dict[str, Any]:
     return await glpi_client.get_ticket_details(ticket_id)
 
 
+@tool_registry.register_function(
+    name="glpi_get_tickets_details",
+    description=f"""Récupère les détails de plusieurs tickets GLPI en un seul appel.
+À préférer à des appels répétés de glpi_get_ticket_details (revue d'une file,
+tickets liés...): ticket, suivis, solution et historique sont lus en parallèle.
+Maximum 50 tickets par appel.
+Champs disponibles pour "fields": {", ".join(TICKET_DETAIL_FIELDS)}.""",
+    parameters={
+        "ticket_ids": array_param(
+            "IDs des tickets à consulter",
+            items_type=ToolParameterType.INTEGER,
+            required=True,
+        ),
+        "fields": array_param(
+            "Champs à retourner (défaut: tous). Omettre followups/solution/history "
+            "évite les requêtes correspondantes",
+            required=False,
+        ),
+    },
+)
+async def glpi_get_tickets_details(
+    ticket_ids: list[int],
+    fields: Optional[list[str]] = None,
+) -> dict[str, Any]:
+    """Récupère les détails de plusieurs tickets."""
+    return await glpi_client.get_tickets_details(ticket_ids, fields=fields)
+
+
 @tool_registry.register_function(
     name="glpi_get_ticket_status",
     description="""Récupère le statut actuel d'un ticket GLPI.
@@ -267,55 +307,120 @@ async def glpi_search_new_tickets(
     return await glpi_client.search_new_tickets(minutes_since=minutes_since, limit=limit)
 
 
+@tool_registry.register_function(
+    name="glpi_feed_fetch",
+    description="""Récupère les tickets GLPI apparus depuis le dernier passage d'un consommateur.
+Remplace les fenêtres "X dernières minutes": chaque consommateur a un curseur
+persistant et ne reçoit chaque ticket qu'une fois.
+Flux: "new" (tickets créés) ou "resolved" (tickets résolus/clos).
+Après traitement du lot, appeler glpi_feed_ack avec le lease_id retourné;
+sans ack, le même lot est relivré à l'expiration du bail.
+Si busy=true, un autre passage du même consommateur est en cours.""",
+    parameters={
+        "consumer": string_param(
+            "Nom du consommateur (ex: proactif, enrichisseur)",
+            required=True,
+        ),
+        "feed": string_param(
+            "Flux à lire",
+            required=True,
+            enum=["new", "resolved"],
+        ),
+        "limit": int_param(
+            "Nombre maximum de tickets du lot",
+            required=False,
+            default=50,
+        ),
+        "include_details": bool_param(
+            "Inclure description, followups (et solution pour resolved)",
+            required=False,
+            default=False,
+        ),
+        "auto_ack": bool_param(
+            "Valider le lot immédiatement (livraison au plus une fois)",
+            required=False,
+            default=False,
+        ),
+        "start_date": string_param(
+            "Premier appel d'un consommateur: date de départ (YYYY-MM-DD HH:MM:SS, "
+            "heure GLPI). Défaut: GLPI_FEED_INITIAL_LOOKBACK_HOURS avant le dernier ticket du flux",
+            required=False,
+        ),
+    },
+)
+async def glpi_feed_fetch(
+    consumer: str,
+    feed: str,
+    limit: int = 50,
+    include_details: bool = False,
+    auto_ack: bool = False,
+    start_date: Optional[str] = None,
+) -> dict[str, Any]:
+    """Lit le lot suivant du flux de tickets d'un consommateur."""
+    return await ticket_feed.fetch(
+        consumer,
+        feed,
+        limit=limit,
+        include_details=include_details,
+        auto_ack=auto_ack,
+        start_date=start_date,
+    )
+
+
+@tool_registry.register_function(
+    name="glpi_feed_ack",
+    description="""Valide un lot lu avec glpi_feed_fetch: le curseur du consommateur avance.
+À appeler une fois le lot entièrement traité.""",
+    parameters={
+        "consumer": string_param(
+            "Nom du consommateur",
+            required=True,
+        ),
+        "feed": string_param(
+            "Flux du lot",
+            required=True,
+            enum=["new", "resolved"],
+        ),
+        "lease_id": string_param(
+            "lease_id retourné par glpi_feed_fetch",
+            required=True,
+        ),
+    },
+)
+async def glpi_feed_ack(consumer: str, feed: str, lease_id: str) -> dict[str, Any]:
+    """Valide un lot du flux de tickets."""
+    return await ticket_feed.ack(consumer, feed, lease_id)
+
+
 @tool_registry.register_function(
     name="glpi_get_ticket_history",
     description="""Récupère l'historique des modifications d'un ticket.
-Retourne les changements de statut, assignations, etc.""",
+Retourne les changements de statut, assignations, etc., du plus récent au plus ancien.
+Seules les dernières entrées sont retournées; si truncated=true, rappeler
+avec offset=next_offset pour lire les plus anciennes.""",
     parameters={
         "ticket_id": int_param(
             "ID du ticket",
             required=True,
         ),
+        "limit": int_param(
+            "Nombre maximum d'entrées (défaut et maximum: GLPI_HISTORY_MAX_ENTRIES)",
+            required=False,
+        ),
+        "offset": int_param(
+            "Nombre d'entrées récentes à sauter",
+            required=False,
+            default=0,
+        ),
     },
 )
-async def glpi_get_ticket_history(ticket_id: int) -> dict[str, Any]:
+async def glpi_get_ticket_history(
+    ticket_id: int,
+    limit: Optional[int] = None,
+    offset: int = 0,
+) -> dict[str, Any]:
     """Récupère l'historique d'un ticket."""
-    await glpi_client._ensure_session()
-
-    try:
-        response = await glpi_client.client.get(
-            f"{glpi_client.base_url}/Ticket/{ticket_id}/Log",
-            headers=glpi_client._get_headers(),
-        )
-
-        if not response.is_success:
-            return {"success": False, "error": f"Error: {response.status_code}"}
-
-        logs = response.json()
-
-        if isinstance(logs, list):
-            history = [
-                {
-                    "id": log.get("id"),
-                    "date": log.get("date_mod") or log.get("date_creation"),
-                    "user": log.get("user_name"),
-                    "field": log.get("id_search_option"),
-                    "old_value": log.get("old_value"),
-                    "new_value": log.get("new_value"),
-                }
-                for log in logs
-            ]
-            return {
-                "success": True,
-                "ticket_id": ticket_id,
-                "count": len(history),
-                "history": history,
-            }
-
-        return {"success": True, "ticket_id": ticket_id, "count": 0, "history": []}
-
-    except Exception as e:
-        return {"success": False, "error": str(e)}
+    return await glpi_client.get_ticket_history(ticket_id, limit=limit, offset=offset)
 
 
 # =============================================================================
@@ -376,8 +481,6 @@ async def glpi_create_user(
     is_active: bool = True,
 ) -> dict[str, Any]:
     """Crée un utilisateur GLPI."""
-    await glpi_client._ensure_session()
-
     user_input: dict[str, Any] = {
         "name": login,
         "realname": realname,
@@ -394,27 +497,17 @@ async def glpi_create_user(
         user_input["password"] = password
         user_input["password2"] = password
 
-    try:
-        response = await glpi_client.client.post(
-            f"{glpi_client.base_url}/User",
-            json={"input": user_input},
-            headers=glpi_client._get_headers(),
-        )
-
-        if not response.is_success:
-            return {"success": False, "error": response.text[:200]}
+    result = await glpi_client.create_user(user_input)
+    if not result.get("success"):
+        return result
 
-        data = response.json()
-        return {
-            "success": True,
-            "user_id": str(data.get("id")),
-            "login": login,
-            "realname": realname,
-            "message": "Utilisateur GLPI créé avec succès",
-        }
-
-    except Exception as e:
-        return {"success": False, "error": str(e)}
+    return {
+        "success": True,
+        "user_id": result["user_id"],
+        "login": login,
+        "realname": realname,
+        "message": "Utilisateur GLPI créé avec succès",
+    }
 
 
 @tool_registry.register_function(
@@ -429,39 +522,7 @@ async def glpi_create_user(
 )
 async def glpi_get_user(user_id: int) -> dict[str, Any]:
     """Récupère un utilisateur GLPI."""
-    await glpi_client._ensure_session()
-
-    try:
-        response = await glpi_client.client.get(
-            f"{glpi_client.base_url}/User/{user_id}",
-            params={"expand_dropdowns": "true"},
-            headers=glpi_client._get_headers(),
-        )
-
-        if not response.is_success:
-            return {"success": False, "error": "Utilisateur non trouvé"}
-
-        user = response.json()
-        return {
-            "success": True,
-            "user": {
-                "id": user.get("id"),
-                "login": user.get("name"),
-                "realname": user.get("realname"),
-                "firstname": user.get("firstname"),
-                "email": user.get("email"),
-                "phone": user.get("phone"),
-                "is_active": user.get("is_active") == 1,
-                "entities_id": user.get("entities_id"),
-                "profiles_id": user.get("profiles_id"),
-                "date_creation": user.get("date_creation"),
-                "date_mod": user.get("date_mod"),
-                "last_login": user.get("last_login"),
-            },
-        }
-
-    except Exception as e:
-        return {"success": False, "error": str(e)}
+    return await glpi_client.get_user(user_id)
 
 
 @tool_registry.register_function(
@@ -488,9 +549,7 @@ async def glpi_update_user(
     is_active: Optional[bool] = None,
 ) -> dict[str, Any]:
     """Met à jour un utilisateur GLPI."""
-    await glpi_client._ensure_session()
-
-    update_fields: dict[str, Any] = {"id": user_id}
+    update_fields: dict[str, Any] = {}
 
     if realname is not None:
         update_fields["realname"] = realname
@@ -503,24 +562,15 @@ async def glpi_update_user(
     if is_active is not None:
         update_fields["is_active"] = 1 if is_active else 0
 
-    try:
-        response = await glpi_client.client.put(
-            f"{glpi_client.base_url}/User/{user_id}",
-            json={"input": update_fields},
-            headers=glpi_client._get_headers(),
-        )
-
-        if not response.is_success:
-            return {"success": False, "error": response.text[:200]}
+    result = await glpi_client.update_user(user_id, update_fields)
+    if not result.get("success"):
+        return result
 
-        return {
-            "success": True,
-            "user_id": user_id,
-            "message": "Utilisateur GLPI mis à jour avec succès",
-        }
-
-    except Exception as e:
-        return {"success": False, "error": str(e)}
+    return {
+        "success": True,
+        "user_id": user_id,
+        "message": "Utilisateur GLPI mis à jour avec succès",
+    }
 
 
 @tool_registry.register_function(
@@ -569,46 +619,11 @@ async def glpi_assign_ticket(
     group_id: Optional[int] = None,
 ) -> dict[str, Any]:
     """Assigne un ticket à un technicien ou groupe."""
-    if not user_id and not group_id:
-        return {"success": False, "error": "user_id ou group_id requis"}
-
-    await glpi_client._ensure_session()
-
-    try:
-        assignments = []
-
-        # Assigner à un utilisateur
-        if user_id:
-            response = await glpi_client.client.post(
-                f"{glpi_client.base_url}/Ticket/{ticket_id}/Ticket_User",
-                json={"input": {"tickets_id": ticket_id, "users_id": user_id, "type": 2}},  # type 2 = technicien
-                headers=glpi_client._get_headers(),
-            )
-            if response.is_success:
-                assignments.append({"type": "user", "id": user_id})
-
-        # Assigner à un groupe
-        if group_id:
-            response = await glpi_client.client.post(
-                f"{glpi_client.base_url}/Ticket/{ticket_id}/Group_Ticket",
-                json={"input": {"tickets_id": ticket_id, "groups_id": group_id, "type": 2}},  # type 2 = technicien
-                headers=glpi_client._get_headers(),
-            )
-            if response.is_success:
-                assignments.append({"type": "group", "id": group_id})
-
-        if not assignments:
-            return {"success": False, "error": "Échec de l'assignation"}
-
-        return {
-            "success": True,
-            "ticket_id": ticket_id,
-            "assignments": assignments,
-            "message": "Ticket assigné avec succès",
-        }
-
-    except Exception as e:
-        return {"success": False, "error": str(e)}
+    return await glpi_client.assign_ticket(
+        ticket_id=ticket_id,
+        user_id=user_id,
+        group_id=group_id,
+    )
 
 
 @tool_registry.register_function(
@@ -643,8 +658,6 @@ async def glpi_send_email(
     body: str,
 ) -> dict[str, Any]:
     """Envoie un email via GLPI lié à un ticket."""
-    await glpi_client._ensure_session()
-
     try:
         # Ajouter un suivi au ticket avec l'email envoyé
         followup_content = f"""📧 **Email envoyé**
@@ -656,11 +669,13 @@ async def glpi_send_email(
 {body}
 """
         # Ajouter le suivi de l'email dans le ticket
-        await glpi_client.add_ticket_followup(
+        followup = await glpi_client.add_ticket_followup(
             ticket_id=ticket_id,
             content=followup_content,
             is_private=False,
         )
+        if not followup.get("success"):
+            return {"success": False, "error": followup.get("error")}
 
         # Note: L'envoi réel de l'email se fait via le module notification
         # GLPI peut être configuré pour envoyer automatiquement les notifications
@@ -8,7 +8,7 @@ Ce module expose les outils de mémoire à long terme aux agents IA:
 
 from typing import Any, Optional
 
-from ..clients.memory import memory_client
+from ..clients.memory import SEARCH_MODES, memory_client
 from ..mcp.registry import (
     tool_registry,
     string_param,
@@ -22,7 +22,10 @@ from ..mcp.registry import (
     description="""Recherche des cas similaires dans la base de connaissances WIDIP.
 Utilise ce tool AVANT de résoudre un problème pour voir si une solution existe déjà.
 Retourne les tickets passés similaires avec leur problème et solution.
-Très utile pour les diagnostics et résolutions de tickets.""",
+Très utile pour les diagnostics et résolutions de tickets.
+Mode hybrid (défaut): retrouve aussi les identifiants exacts (hostname, IP,
+code d'erreur, numéro KB) cités dans la requête: inutile de relancer la
+recherche avec des variantes.""",
     parameters={
         "query": string_param(
             "Description du problème à rechercher (ex: 'VPN ne fonctionne plus EHPAD Bellevue')",
@@ -33,14 +36,36 @@ Très utile pour les diagnostics et résolutions de tickets.""",
             required=False,
             default=3,
         ),
+        "mode": string_param(
+            "hybrid (plein texte + vectoriel) ou vector (similarité seule)",
+            required=False,
+            enum=list(SEARCH_MODES),
+        ),
+        "category": string_param(
+            "Limiter à une catégorie (ex: VPN, Imprimante, Réseau)",
+            required=False,
+        ),
+        "tags": array_param(
+            "Limiter aux cas ayant au moins un de ces tags (ex: vpn, outlook)",
+            required=False,
+        ),
     },
 )
 async def memory_search_similar_cases(
     query: str,
     limit: int = 3,
+    mode: Optional[str] = None,
+    category: Optional[str] = None,
+    tags: Optional[list[str]] = None,
 ) -> dict[str, Any]:
     """Recherche des cas similaires dans la mémoire."""
-    result = await memory_client.search_similar_cases(query=query, limit=limit)
+    result = await memory_client.search_similar_cases(
+        query=query,
+        limit=limit,
+        mode=mode,
+        category=category,
+        tags=tags,
+    )
     result["operation"] = "search_similar_cases"
     return result
 
@@ -30,7 +30,8 @@ Utilise ce tool pour informer le client de l'avancement de son ticket:
 - Résolution du problème
 - Demande d'information complémentaire
 
-Le client reçoit un email formaté avec un lien vers son ticket GLPI.""",
+Le client reçoit un email formaté avec un lien vers son ticket GLPI.
+L'email est mis en file et envoyé en arrière-plan (queued=true).""",
     parameters={
         "client_email": string_param(
             "Adresse email du client",
@@ -63,6 +64,11 @@ Le client reçoit un email formaté avec un lien vers son ticket GLPI.""",
             required=False,
             default=True,
         ),
+        "locale": string_param(
+            "Langue de l'email (défaut: langue configurée)",
+            required=False,
+            enum=["fr", "en"],
+        ),
     },
 )
 async def notify_client(
@@ -73,6 +79,7 @@ async def notify_client(
     message: str,
     notification_type: str = "info",
     include_ticket_link: bool = True,
+    locale: Optional[str] = None,
 ) -> dict[str, Any]:
     """Envoie une notification au client final."""
     result = await notification_client.notify_client(
@@ -83,6 +90,7 @@ async def notify_client(
         message=message,
         notification_type=notification_type,
         include_ticket_link=include_ticket_link,
+        locale=locale,
     )
     result["operation"] = "notify_client"
     return result
@@ -98,7 +106,13 @@ Utilise ce tool pour alerter les techniciens sur:
 - Incident critique
 
 Les notifications peuvent être envoyées par email et/ou Teams/Slack
-selon la priorité et la configuration.""",
+selon la priorité et la configuration.
+Les envois sont mis en file et livrés en arrière-plan (queued=true):
+le succès indique la prise en charge, pas la réception.
+Pendant une tempête d'alertes, les notifications d'un même groupe (group_key)
+sont regroupées: la première part immédiatement, les suivantes dans un digest
+unique en fin de fenêtre (coalesced=true). Sans group_key, seules les alertes
+d'un même ticket sont regroupées; une alerte critique n'est jamais retenue.""",
     parameters={
         "ticket_id": string_param(
             "ID du ticket concerné",
@@ -126,6 +140,14 @@ selon la priorité et la configuration.""",
             "Canaux de notification: email, teams, slack",
             required=False,
         ),
+        "group_key": string_param(
+            "Groupe de regroupement des alertes (ex: client ou site); défaut: ticket",
+            required=False,
+        ),
+        "dedup_key": string_param(
+            "Identifiant de l'alerte pour la déduplication (ex: device_id:alert_id)",
+            required=False,
+        ),
     },
 )
 async def notify_technician(
@@ -135,6 +157,8 @@ async def notify_technician(
     priority: str = "normal",
     assigned_technician: Optional[str] = None,
     channels: Optional[list[str]] = None,
+    group_key: Optional[str] = None,
+    dedup_key: Optional[str] = None,
 ) -> dict[str, Any]:
     """Envoie une notification aux techniciens."""
     result = await notification_client.notify_technician(
@@ -144,6 +168,8 @@ async def notify_technician(
         priority=priority,
         assigned_technician=assigned_technician,
         channels=channels,
+        group_key=group_key,
+        dedup_key=dedup_key,
     )
     result["operation"] = "notify_technician"
     return result
@@ -2,22 +2,38 @@
 Utilitaires pour le serveur MCP WIDIP.
 """
 
+from .circuit_breaker import CircuitBreaker, CircuitOpenError, get_circuit_breaker
+from .html_text import html_to_text
+from .keyword_matcher import KeywordMatcher
 from .logging import setup_logging
-from .retry import with_retry
+from .redis_pool import close_redis_pool, get_redis
+from .retry import RetryBudget, RetryPolicy, TokenBucket, with_retry
 from .secrets import (
     redact_sensitive_fields,
     has_sensitive_fields,
     extract_sensitive_fields,
+    scan_sensitive_fields,
     secret_store,
     SecureSecretStore,
 )
 
 __all__ = [
     "setup_logging",
+    "get_redis",
+    "close_redis_pool",
     "with_retry",
+    "RetryPolicy",
+    "RetryBudget",
+    "TokenBucket",
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "get_circuit_breaker",
+    "KeywordMatcher",
+    "html_to_text",
     "redact_sensitive_fields",
     "has_sensitive_fields",
     "extract_sensitive_fields",
+    "scan_sensitive_fields",
     "secret_store",
     "SecureSecretStore",
 ]
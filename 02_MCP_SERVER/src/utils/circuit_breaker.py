@@ -0,0 +1,219 @@
+"""
+Circuit breaker par intégration amont (GLPI, Observium, Ollama, LDAP...).
+
+Quand un service est tombé, les appels échouent immédiatement au lieu
+d'attendre le timeout (et les retries) à chaque tool call:
+
+- CLOSED: fonctionnement normal, les échecs consécutifs sont comptés
+- OPEN: après N échecs, les appels sont refusés (CircuitOpenError) sans
+  toucher au réseau ni occuper de slot dans le pool de connexions
+- HALF_OPEN: après le délai de reset, quelques appels "sonde" passent;
+  un succès referme le circuit, un échec le rouvre
+"""
+
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional
+
+import httpx
+import structlog
+
+from .retry import NonRetryableError
+
+logger = structlog.get_logger(__name__)
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(NonRetryableError):
+    """Appel refusé: le circuit du service est ouvert (jamais retry)."""
+
+    def __init__(self, service: str, retry_in: float) -> None:
+        super().__init__(
+            f"Service {service} indisponible (circuit ouvert, "
+            f"nouvel essai dans {retry_in:.0f}s)"
+        )
+        self.service = service
+        self.retry_in = retry_in
+
+
+def is_upstream_failure(exc: BaseException) -> bool:
+    """
+    Indique si une erreur signale un service amont défaillant.
+
+    Les erreurs réseau, timeouts et réponses 5xx comptent; les erreurs
+    "métier" (401, 404, 429...) prouvent que le service répond.
+    """
+    status = getattr(exc, "status_code", None)
+    if status is None and isinstance(exc, httpx.HTTPStatusError):
+        status = exc.response.status_code
+    if status is not None:
+        return status >= 500
+    return isinstance(exc, (httpx.TransportError, OSError, TimeoutError))
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker d'un service.
+
+    Pas de verrou: les transitions sont faites sans await (boucle asyncio
+    mono-thread), y compris pour les appels LDAP synchrones.
+
+    Args:
+        name: Nom du service (logs, /health)
+        failure_threshold: Échecs consécutifs avant ouverture
+        reset_timeout: Durée d'ouverture avant les appels sonde (secondes)
+        half_open_max_calls: Appels sonde simultanés autorisés
+        is_failure: Classification des erreurs (défaut: is_upstream_failure)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        half_open_max_calls: int = 1,
+        is_failure: Callable[[BaseException], bool] = is_upstream_failure,
+    ) -> None:
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = max(1, half_open_max_calls)
+        self.is_failure = is_failure
+
+        self._state = STATE_CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self.rejected = 0
+        self.opened_count = 0
+
+    @property
+    def state(self) -> str:
+        """État courant (passe en half_open une fois le délai écoulé)."""
+        if (
+            self._state == STATE_OPEN
+            and time.monotonic() - self._opened_at >= self.reset_timeout
+        ):
+            self._state = STATE_HALF_OPEN
+            self._probes = 0
+            logger.info("circuit_half_open", service=self.name)
+        return self._state
+
+    def before_call(self) -> None:
+        """
+        Réserve le droit d'appeler le service.
+
+        Raises:
+            CircuitOpenError: Circuit ouvert, ou sondes déjà en cours
+        """
+        state = self.state
+        if state == STATE_CLOSED:
+            return
+
+        if state == STATE_HALF_OPEN and self._probes < self.half_open_max_calls:
+            self._probes += 1
+            return
+
+        self.rejected += 1
+        retry_in = max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+        raise CircuitOpenError(self.name, retry_in)
+
+    def record_success(self) -> None:
+        """Le service a répondu: referme le circuit si c'était une sonde."""
+        if self._state == STATE_HALF_OPEN:
+            logger.info("circuit_closed", service=self.name)
+        self._state = STATE_CLOSED
+        self._failures = 0
+        self._probes = 0
+
+    def record_failure(self) -> None:
+        """Échec amont: ouvre le circuit au seuil (ou immédiatement en half_open)."""
+        self._failures += 1
+        if self._state == STATE_HALF_OPEN or self._failures >= self.failure_threshold:
+            if self._state != STATE_OPEN:
+                self.opened_count += 1
+                logger.warning(
+                    "circuit_opened",
+                    service=self.name,
+                    failures=self._failures,
+                    reset_timeout=self.reset_timeout,
+                )
+            self._state = STATE_OPEN
+            self._opened_at = time.monotonic()
+            self._probes = 0
+
+    def _release(self) -> None:
+        """Libère une sonde sans conclure (appel annulé)."""
+        if self._state == STATE_HALF_OPEN and self._probes > 0:
+            self._probes -= 1
+
+    @contextmanager
+    def guard(self) -> Iterator[None]:
+        """
+        Protège un appel au service.
+
+        Usage:
+            with breaker.guard():
+                response = await client.get(...)
+        """
+        self.before_call()
+        try:
+            yield
+        except Exception as e:
+            if self.is_failure(e):
+                self.record_failure()
+            else:
+                self.record_success()
+            raise
+        except BaseException:
+            self._release()
+            raise
+        else:
+            self.record_success()
+
+    def stats(self) -> dict[str, Any]:
+        """État du circuit (pour /health)."""
+        state = self.state
+        info: dict[str, Any] = {
+            "state": state,
+            "failures": self._failures,
+            "rejected": self.rejected,
+            "opened_count": self.opened_count,
+        }
+        if state == STATE_OPEN:
+            info["retry_in"] = round(
+                max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at)), 1
+            )
+        return info
+
+
+# Circuits partagés par service (toutes les instances d'un même client)
+_breakers: dict[str, CircuitBreaker] = {}
+
+
+def get_circuit_breaker(
+    name: str,
+    is_failure: Optional[Callable[[BaseException], bool]] = None,
+) -> CircuitBreaker:
+    """Retourne le circuit breaker d'un service (créé au premier appel)."""
+    breaker = _breakers.get(name)
+    if breaker is None:
+        from ..config import settings
+
+        breaker = CircuitBreaker(
+            name,
+            failure_threshold=settings.circuit_failure_threshold,
+            reset_timeout=settings.circuit_reset_timeout,
+            half_open_max_calls=settings.circuit_half_open_max_calls,
+            is_failure=is_failure or is_upstream_failure,
+        )
+        _breakers[name] = breaker
+    return breaker
+
+
+def circuit_breaker_stats() -> dict[str, Any]:
+    """État de tous les circuits (pour /health)."""
+    return {name: breaker.stats() for name, breaker in _breakers.items()}
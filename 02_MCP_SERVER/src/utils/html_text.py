@@ -0,0 +1,96 @@
+"""
+Conversion HTML → texte des contenus GLPI (descriptions, solutions, suivis).
+
+- Un seul passage sur le texte: balises, commentaires et blocs
+  <script>/<style> sont traités par une seule expression précompilée
+- Décodage complet des entités (html.unescape): nommées, numériques
+  (&#233;, &#x2019;) et &nbsp;
+- Contenu GLPI stocké échappé (&lt;p&gt;...): détecté et décodé avant
+  l'extraction du texte
+- Balises de bloc (p, div, br, li...) → saut de ligne, balises en ligne
+  (b, span, a...) → rien: "<b>V</b>PN" donne "VPN"
+"""
+
+import html
+import re
+from typing import Optional
+
+# Contenu GLPI échappé: balises encodées en entités
+_ESCAPED_MARKUP_RE = re.compile(r"&lt;/?[a-zA-Z!]")
+
+# Échappement appliqué par GLPI (htmlspecialchars), &amp; en dernier:
+# le texte de l'utilisateur garde son propre niveau d'échappement
+_GLPI_ESCAPES = (
+    ("&lt;", "<"),
+    ("&gt;", ">"),
+    ("&quot;", '"'),
+    ("&#039;", "'"),
+    ("&#39;", "'"),
+    ("&amp;", "&"),
+)
+
+# Une seule alternative ancrée sur "<": blocs non textuels, commentaires,
+# balises (groupe 1: nom de la balise)
+_MARKUP_RE = re.compile(
+    r"<(?:(?i:script|style)\b[^>]*>(?s:.*?)</(?i:script|style)\s*>"
+    r"|!--(?s:.*?)-->"
+    r"|/?([a-zA-Z][a-zA-Z0-9]*)\b[^>]*>"
+    r"|![^>]*>)"
+)
+
+# Balises qui séparent des blocs de texte → saut de ligne
+_BLOCK_TAGS = (
+    "address", "article", "aside", "blockquote", "br", "dd", "div", "dl", "dt",
+    "fieldset", "figcaption", "figure", "footer", "form", "h1", "h2", "h3", "h4",
+    "h5", "h6", "header", "hr", "li", "main", "nav", "ol", "p", "pre", "section",
+    "table", "tbody", "tfoot", "thead", "tr", "ul",
+)
+
+# Balises en ligne qui séparent tout de même deux mots (cellules, images)
+_SPACE_TAGS = ("td", "th", "img", "input", "option")
+
+_TAG_REPLACEMENTS = {
+    **dict.fromkeys(_BLOCK_TAGS, "\n"),
+    **dict.fromkeys(_SPACE_TAGS, " "),
+}
+
+_MULTI_BLANK_LINES_RE = re.compile(r"\n{3,}")
+
+
+def _replace_markup(match: re.Match) -> str:
+    """Remplacement d'un élément de balisage (script/style/commentaire → espace)."""
+    tag = match.group(1)
+    if tag is None:
+        return " "
+    return _TAG_REPLACEMENTS.get(tag.lower(), "")
+
+
+def html_to_text(text: Optional[str], keep_newlines: bool = False) -> str:
+    """
+    Convertit un contenu HTML (éventuellement échappé) en texte brut.
+
+    Args:
+        text: Contenu HTML ou texte
+        keep_newlines: Garder les sauts de ligne des blocs (affichage d'un
+            suivi); sinon tout l'espace blanc est réduit à un espace
+
+    Returns:
+        Texte brut, espaces normalisés
+    """
+    if not text:
+        return ""
+
+    if _ESCAPED_MARKUP_RE.search(text):
+        for entity, char in _GLPI_ESCAPES:
+            text = text.replace(entity, char)
+
+    if "<" in text:
+        text = _MARKUP_RE.sub(_replace_markup, text)
+    if "&" in text:
+        text = html.unescape(text)
+
+    if not keep_newlines:
+        return " ".join(text.split())
+
+    lines = (" ".join(line.split()) for line in text.splitlines())
+    return _MULTI_BLANK_LINES_RE.sub("\n\n", "\n".join(lines)).strip()
@@ -0,0 +1,59 @@
+"""
+Recherche multi-mots-clés en un seul passage sur le texte.
+
+Remplace les boucles `keyword in text` (une recherche complète du texte
+par mot-clé):
+- Les mots-clés sont compilés une fois en un automate Aho-Corasick
+  (pyahocorasick, implémentation C)
+- Le texte est parcouru une seule fois, quel que soit le nombre de
+  mots-clés
+- Sémantique de sous-chaîne identique à `keyword in text`: toutes les
+  occurrences sont trouvées, y compris imbriquées ("mail" dans "email")
+  ou chevauchantes
+"""
+
+from typing import Iterable
+
+import ahocorasick
+
+
+class KeywordMatcher:
+    """
+    Automate de recherche d'un ensemble fixe de mots-clés.
+
+    Args:
+        keywords: Mots-clés recherchés (sous-chaînes, sensibles à la casse:
+            passer un texte déjà normalisé, ex. .lower())
+    """
+
+    def __init__(self, keywords: Iterable[str]) -> None:
+        self.keywords = frozenset(k for k in keywords if k)
+        self.max_length = max(map(len, self.keywords), default=0)
+        self._automaton = ahocorasick.Automaton()
+        for keyword in self.keywords:
+            self._automaton.add_word(keyword, keyword)
+        if self.keywords:
+            self._automaton.make_automaton()
+
+    def find_all(self, text: str) -> set[str]:
+        """Mots-clés présents dans le texte."""
+        if not self.keywords or not text:
+            return set()
+        return {keyword for _, keyword in self._automaton.iter(text)}
+
+    def find_all_split(self, head: str, tail: str) -> tuple[set[str], set[str]]:
+        """
+        Mots-clés présents dans head + tail, et ceux présents dans tail seul.
+
+        Chaque partie est parcourue une fois; seule la jonction (moins de
+        deux longueurs de mot-clé) est relue pour les occurrences à cheval.
+
+        Returns:
+            (mots-clés de head + tail, mots-clés de tail)
+        """
+        in_tail = self.find_all(tail)
+        found = self.find_all(head) | in_tail
+        if head and tail and self.max_length > 1:
+            overlap = self.max_length - 1
+            found |= self.find_all(head[-overlap:] + tail[:overlap])
+        return found, in_tail
@@ -0,0 +1,74 @@
+"""
+Pool de connexions Redis partagé par tout le serveur MCP.
+
+Un seul ConnectionPool est créé à la demande et réutilisé par le
+SecureSecretStore, le health check, etc. Les clients Redis obtenus via
+get_redis() sont légers: ils empruntent une connexion au pool à chaque
+commande (ou pipeline) et la rendent ensuite.
+"""
+
+from typing import Optional
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+_pool = None
+
+
+def get_redis_pool():
+    """Retourne le ConnectionPool Redis partagé (créé au premier appel)."""
+    global _pool
+
+    if _pool is None:
+        import redis.asyncio as aioredis
+        from ..config import settings
+
+        _pool = aioredis.ConnectionPool.from_url(
+            settings.redis_url,
+            max_connections=settings.redis_max_connections,
+            socket_timeout=settings.redis_socket_timeout,
+            socket_connect_timeout=settings.redis_socket_timeout,
+            health_check_interval=30,
+            decode_responses=False,  # Bytes: nécessaire pour les secrets chiffrés
+        )
+        logger.info(
+            "redis_pool_created",
+            max_connections=settings.redis_max_connections,
+        )
+
+    return _pool
+
+
+def get_redis():
+    """
+    Retourne un client Redis adossé au pool partagé.
+
+    Returns:
+        redis.asyncio.Redis (réponses en bytes)
+    """
+    import redis.asyncio as aioredis
+
+    return aioredis.Redis(connection_pool=get_redis_pool())
+
+
+def get_redis_pool_stats() -> Optional[dict[str, int]]:
+    """Statistiques du pool (None si pas encore créé)."""
+    if _pool is None:
+        return None
+
+    return {
+        "max_connections": _pool.max_connections,
+        "in_use": len(getattr(_pool, "_in_use_connections", ())),
+        "available": len(getattr(_pool, "_available_connections", ())),
+    }
+
+
+async def close_redis_pool() -> None:
+    """Ferme toutes les connexions du pool partagé (arrêt du serveur)."""
+    global _pool
+
+    if _pool is not None:
+        await _pool.disconnect()
+        _pool = None
+        logger.info("redis_pool_closed")
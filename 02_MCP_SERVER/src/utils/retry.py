@@ -1,19 +1,21 @@
 """
 Utilitaires pour les retries avec backoff exponentiel.
+
+- RetryPolicy: classification des erreurs (httpx, 5xx, 429), respect de
+  Retry-After, backoff exponentiel "full jitter"
+- RetryBudget: budget de retries par service (seau à jetons) pour éviter
+  qu'une panne amont soit amplifiée par les retries
+- with_retry: décorateur historique, délègue à RetryPolicy
 """
 
 import asyncio
 import functools
-from typing import Any, Callable, Optional, Tuple, Type, TypeVar, Union
+import random
+import time
+from typing import Any, Awaitable, Callable, Optional, Tuple, Type, TypeVar
 
+import httpx
 import structlog
-from tenacity import (
-    AsyncRetrying,
-    RetryError,
-    retry_if_exception_type,
-    stop_after_attempt,
-    wait_exponential,
-)
 
 logger = structlog.get_logger(__name__)
 
@@ -24,8 +26,272 @@ DEFAULT_RETRY_EXCEPTIONS: Tuple[Type[Exception], ...] = (
     ConnectionError,
     TimeoutError,
     OSError,
+    httpx.TransportError,
+)
+
+# Statuts HTTP transitoires (erreurs serveur et limitation de débit)
+DEFAULT_RETRY_STATUSES: frozenset[int] = frozenset({429, 500, 502, 503, 504})
+
+# Erreurs où la requête n'a pas atteint le serveur: retry sûr même pour un POST
+_NOT_SENT_EXCEPTIONS: Tuple[Type[Exception], ...] = (
+    httpx.ConnectError,
+    httpx.ConnectTimeout,
+    httpx.PoolTimeout,
 )
 
+# Statuts où le serveur a refusé la requête sans la traiter
+_NOT_PROCESSED_STATUSES: frozenset[int] = frozenset({429, 503})
+
+
+class RetryableError(Exception):
+    """Exception marquée comme retryable."""
+
+    pass
+
+
+class NonRetryableError(Exception):
+    """Exception qui ne doit pas être retry."""
+
+    pass
+
+
+class TokenBucket:
+    """
+    Seau à jetons simple (mono-thread asyncio, pas de verrou nécessaire).
+
+    Args:
+        capacity: Nombre maximum de jetons
+        refill_rate: Jetons ajoutés par seconde
+    """
+
+    def __init__(self, capacity: float, refill_rate: float) -> None:
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+        self._tokens = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.refill_rate)
+        self._updated = now
+
+    @property
+    def tokens(self) -> float:
+        """Jetons disponibles."""
+        self._refill()
+        return self._tokens
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """Consomme des jetons si disponibles (non bloquant)."""
+        self._refill()
+        if self._tokens >= tokens:
+            self._tokens -= tokens
+            return True
+        return False
+
+    def deposit(self, tokens: float) -> None:
+        """Ajoute des jetons (plafonné à la capacité)."""
+        self._refill()
+        self._tokens = min(self.capacity, self._tokens + tokens)
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        """Attend que des jetons soient disponibles puis les consomme."""
+        while not self.try_acquire(tokens):
+            missing = tokens - self._tokens
+            await asyncio.sleep(missing / self.refill_rate if self.refill_rate > 0 else 1.0)
+
+
+class RetryBudget:
+    """
+    Budget de retries d'un service amont.
+
+    Chaque retry consomme un jeton; chaque succès en rend une fraction et le
+    seau se remplit lentement avec le temps. Pendant une panne, le budget
+    s'épuise et les appels échouent dès la première erreur au lieu de
+    multiplier la charge sur le service.
+    """
+
+    def __init__(
+        self,
+        capacity: float = 10.0,
+        refill_rate: float = 0.2,
+        success_credit: float = 0.1,
+    ) -> None:
+        self._bucket = TokenBucket(capacity, refill_rate)
+        self.success_credit = success_credit
+        self.retries_allowed = 0
+        self.retries_denied = 0
+
+    def can_retry(self) -> bool:
+        """Consomme un jeton de retry si le budget le permet."""
+        if self._bucket.try_acquire(1.0):
+            self.retries_allowed += 1
+            return True
+        self.retries_denied += 1
+        return False
+
+    def record_success(self) -> None:
+        """Crédite le budget après un appel réussi."""
+        self._bucket.deposit(self.success_credit)
+
+    def stats(self) -> dict[str, Any]:
+        """Etat du budget (pour /metrics)."""
+        return {
+            "tokens": round(self._bucket.tokens, 2),
+            "capacity": self._bucket.capacity,
+            "retries_allowed": self.retries_allowed,
+            "retries_denied": self.retries_denied,
+        }
+
+
+# Budgets partagés par service (toutes les instances d'un même client)
+_budgets: dict[str, RetryBudget] = {}
+
+
+def get_retry_budget(name: str) -> RetryBudget:
+    """Retourne le budget de retries d'un service (créé au premier appel)."""
+    budget = _budgets.get(name)
+    if budget is None:
+        from ..config import settings
+
+        budget = RetryBudget(
+            capacity=settings.retry_budget_capacity,
+            refill_rate=settings.retry_budget_refill_rate,
+        )
+        _budgets[name] = budget
+    return budget
+
+
+def retry_budget_stats() -> dict[str, Any]:
+    """Etat de tous les budgets de retries (pour /metrics)."""
+    return {name: budget.stats() for name, budget in _budgets.items()}
+
+
+class RetryPolicy:
+    """
+    Politique de retry: quoi retenter, quand, et dans quelle limite.
+
+    Args:
+        max_attempts: Nombre maximum de tentatives (1 = pas de retry)
+        base_delay: Délai de base du backoff (secondes)
+        max_delay: Plafond du backoff (secondes)
+        retry_exceptions: Exceptions transitoires
+        retry_statuses: Statuts HTTP transitoires (via exc.status_code)
+        max_retry_after: Retry-After au-delà duquel on abandonne (secondes)
+        budget: Budget de retries partagé (optionnel)
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 10.0,
+        retry_exceptions: Optional[Tuple[Type[Exception], ...]] = None,
+        retry_statuses: frozenset[int] = DEFAULT_RETRY_STATUSES,
+        max_retry_after: float = 30.0,
+        budget: Optional[RetryBudget] = None,
+    ) -> None:
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_exceptions = retry_exceptions or DEFAULT_RETRY_EXCEPTIONS
+        self.retry_statuses = retry_statuses
+        self.max_retry_after = max_retry_after
+        self.budget = budget
+
+    def is_retryable(self, exc: BaseException, idempotent: bool = True) -> bool:
+        """
+        Indique si une erreur est transitoire.
+
+        Pour une requête non idempotente (POST), seules les erreurs garantissant
+        que le serveur n'a rien traité sont retentées (connexion impossible,
+        429, 503), afin d'éviter les doublons (tickets, comptes...).
+        """
+        if isinstance(exc, NonRetryableError):
+            return False
+        if isinstance(exc, RetryableError):
+            return True
+
+        status = getattr(exc, "status_code", None)
+        if status is not None:
+            if not idempotent:
+                return status in _NOT_PROCESSED_STATUSES
+            return status in self.retry_statuses
+
+        if not idempotent:
+            return isinstance(exc, _NOT_SENT_EXCEPTIONS)
+        return isinstance(exc, self.retry_exceptions)
+
+    def backoff(self, attempt: int) -> float:
+        """Délai avant la tentative suivante: full jitter, uniforme sur [0, cap]."""
+        cap = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return random.uniform(0, cap)
+
+    def next_delay(self, exc: BaseException, attempt: int) -> Optional[float]:
+        """
+        Délai avant retry, ou None si le retry doit être abandonné.
+
+        Retry-After (exc.retry_after, en secondes) prime sur le backoff,
+        sauf s'il dépasse max_retry_after.
+        """
+        retry_after = getattr(exc, "retry_after", None)
+        if retry_after is not None:
+            if retry_after > self.max_retry_after:
+                return None
+            return max(retry_after, 0.0)
+        return self.backoff(attempt)
+
+    async def run(
+        self,
+        func: Callable[..., Awaitable[T]],
+        *args: Any,
+        idempotent: bool = True,
+        operation: Optional[str] = None,
+        **kwargs: Any,
+    ) -> T:
+        """
+        Exécute une coroutine avec la politique de retry.
+
+        Args:
+            func: Fonction asynchrone à appeler
+            idempotent: False pour les requêtes à effet de bord (POST)
+            operation: Nom pour les logs (défaut: nom de la fonction)
+        """
+        name = operation or getattr(func, "__name__", "call")
+        attempt = 1
+
+        while True:
+            try:
+                result = await func(*args, **kwargs)
+            except Exception as e:
+                if attempt >= self.max_attempts or not self.is_retryable(e, idempotent):
+                    raise
+
+                delay = self.next_delay(e, attempt)
+                if delay is None:
+                    logger.warning("retry_abandoned_retry_after", function=name, error=str(e))
+                    raise
+
+                if self.budget is not None and not self.budget.can_retry():
+                    logger.warning("retry_budget_exhausted", function=name, error=str(e))
+                    raise
+
+                logger.warning(
+                    "retry_attempt",
+                    function=name,
+                    attempt=attempt + 1,
+                    max_attempts=self.max_attempts,
+                    delay=round(delay, 2),
+                    error=str(e)[:200],
+                )
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+
+            if self.budget is not None:
+                self.budget.record_success()
+            return result
+
 
 def with_retry(
     max_attempts: int = 3,
@@ -34,91 +300,61 @@ def with_retry(
     retry_exceptions: Optional[Tuple[Type[Exception], ...]] = None,
 ) -> Callable[[Callable[..., T]], Callable[..., T]]:
     """
-    Décorateur pour ajouter des retries avec backoff exponentiel.
+    Décorateur pour ajouter des retries avec backoff exponentiel (full jitter).
 
     Args:
         max_attempts: Nombre maximum de tentatives
-        min_wait: Temps d'attente minimum entre les tentatives (secondes)
+        min_wait: Délai de base du backoff (secondes)
         max_wait: Temps d'attente maximum entre les tentatives (secondes)
-        retry_exceptions: Types d'exceptions à retry (défaut: ConnectionError, TimeoutError)
+        retry_exceptions: Types d'exceptions à retry (défaut: erreurs réseau/httpx)
 
     Usage:
         @with_retry(max_attempts=3)
         async def fetch_data():
             ...
     """
-    exceptions = retry_exceptions or DEFAULT_RETRY_EXCEPTIONS
+    policy = RetryPolicy(
+        max_attempts=max_attempts,
+        base_delay=min_wait,
+        max_delay=max_wait,
+        retry_exceptions=retry_exceptions,
+    )
 
     def decorator(func: Callable[..., T]) -> Callable[..., T]:
         if asyncio.iscoroutinefunction(func):
 
             @functools.wraps(func)
             async def async_wrapper(*args: Any, **kwargs: Any) -> T:
-                attempt = 0
-                async for attempt_ctx in AsyncRetrying(
-                    stop=stop_after_attempt(max_attempts),
-                    wait=wait_exponential(multiplier=min_wait, max=max_wait),
-                    retry=retry_if_exception_type(exceptions),
-                    reraise=True,
-                ):
-                    with attempt_ctx:
-                        attempt += 1
-                        if attempt > 1:
-                            logger.warning(
-                                "retry_attempt",
-                                function=func.__name__,
-                                attempt=attempt,
-                                max_attempts=max_attempts,
-                            )
-                        return await func(*args, **kwargs)
-                # Should not reach here, but satisfy type checker
-                raise RuntimeError("Retry loop exited unexpectedly")
+                return await policy.run(
+                    functools.partial(func, *args, **kwargs),
+                    operation=func.__name__,
+                )
 
             return async_wrapper  # type: ignore
         else:
             # Version synchrone
             @functools.wraps(func)
             def sync_wrapper(*args: Any, **kwargs: Any) -> T:
-                last_exception: Optional[Exception] = None
-                wait_time = min_wait
-
-                for attempt in range(1, max_attempts + 1):
+                attempt = 1
+                while True:
                     try:
                         return func(*args, **kwargs)
-                    except exceptions as e:
-                        last_exception = e
-                        if attempt < max_attempts:
-                            logger.warning(
-                                "retry_attempt",
-                                function=func.__name__,
-                                attempt=attempt,
-                                max_attempts=max_attempts,
-                                error=str(e),
-                            )
-                            import time
-
-                            time.sleep(wait_time)
-                            wait_time = min(wait_time * 2, max_wait)
-                        else:
+                    except Exception as e:
+                        if attempt >= policy.max_attempts or not policy.is_retryable(e):
                             raise
-
-                # Should not reach here
-                if last_exception:
-                    raise last_exception
-                raise RuntimeError("Retry loop exited unexpectedly")
+                        delay = policy.next_delay(e, attempt)
+                        if delay is None:
+                            raise
+                        logger.warning(
+                            "retry_attempt",
+                            function=func.__name__,
+                            attempt=attempt + 1,
+                            max_attempts=policy.max_attempts,
+                            error=str(e),
+                        )
+                        time.sleep(delay)
+                        attempt += 1
 
             return sync_wrapper  # type: ignore
 
     return decorator
-
-
-class RetryableError(Exception):
-    """Exception marquée comme retryable."""
-
-    pass
-
-
-class NonRetryableError(Exception):
-    """Exception qui ne doit pas être retry."""
-
-    pass
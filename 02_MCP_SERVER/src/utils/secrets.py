@@ -12,12 +12,16 @@ IMPORTANT: Ne JAMAIS stocker de mots de passe en clair dans PostgreSQL!
 import base64
 import hashlib
 import json
+import re
 import secrets as stdlib_secrets
 from datetime import timedelta
-from typing import Any, Optional
+from functools import lru_cache
+from typing import Any, NamedTuple, Optional
 
 import structlog
 
+from .redis_pool import get_redis
+
 # Liste des noms de champs considérés comme sensibles
 SENSITIVE_FIELD_NAMES = frozenset([
     "password",
@@ -36,9 +40,141 @@ SENSITIVE_FIELD_NAMES = frozenset([
 # Valeur de remplacement pour les champs redactés
 REDACTED_VALUE = "[REDACTED]"
 
+# Préfixe des clés Redis des secrets
+SECRET_KEY_PREFIX = "widip:secret:"
+
 logger = structlog.get_logger(__name__)
 
 
+class SensitiveScan(NamedTuple):
+    """Résultat d'un parcours unique des arguments (voir scan_sensitive_fields)."""
+
+    redacted: Any
+    secrets: dict[str, Any]
+    has_secrets: bool
+
+
+class _KeyMatcher:
+    """
+    Matcher compilé pour un ensemble de noms de champs sensibles.
+
+    Un champ est sensible si l'un des noms apparaît dans sa clé (sous-chaîne,
+    insensible à la casse): "user_password" et "X-Api-Key" sont détectés.
+    Une seule regex (alternance) remplace la boucle sur tous les noms, et le
+    verdict par clé est mémorisé (les mêmes clés reviennent d'un appel à l'autre).
+    """
+
+    __slots__ = ("_search", "_cache")
+
+    _CACHE_MAX = 4096
+
+    def __init__(self, fields: frozenset[str]) -> None:
+        alternatives = sorted(fields, key=len, reverse=True)
+        self._search = re.compile("|".join(re.escape(name) for name in alternatives)).search
+        self._cache: dict[str, bool] = {}
+
+    def __call__(self, key: str) -> bool:
+        hit = self._cache.get(key)
+        if hit is None:
+            if len(self._cache) >= self._CACHE_MAX:
+                self._cache.clear()
+            hit = self._cache[key] = self._search(key.lower()) is not None
+        return hit
+
+
+@lru_cache(maxsize=32)
+def _compile_matcher(fields: frozenset[str]) -> _KeyMatcher:
+    """Retourne le matcher compilé (mis en cache) pour un ensemble de champs."""
+    return _KeyMatcher(fields)
+
+
+def _scan(value: Any, is_sensitive: _KeyMatcher) -> tuple[Any, Optional[dict[str, Any]]]:
+    """
+    Parcourt récursivement une valeur (dict/list) en un seul passage.
+
+    Returns:
+        Tuple (valeur_redactée, secrets_extraits ou None)
+        Les secrets des listes sont indexés par position ("0", "1", ...).
+    """
+    if isinstance(value, dict):
+        redacted: dict[str, Any] = {}
+        secrets_found: dict[str, Any] = {}
+
+        for key, item in value.items():
+            if is_sensitive(key):
+                redacted[key] = REDACTED_VALUE
+                secrets_found[key] = item
+            elif isinstance(item, (dict, list)):
+                redacted[key], nested = _scan(item, is_sensitive)
+                if nested:
+                    secrets_found[key] = nested
+            else:
+                redacted[key] = item
+
+        return redacted, secrets_found or None
+
+    if isinstance(value, list):
+        redacted_list: list[Any] = []
+        secrets_by_index: dict[str, Any] = {}
+
+        for index, item in enumerate(value):
+            if isinstance(item, (dict, list)):
+                redacted_item, nested = _scan(item, is_sensitive)
+                redacted_list.append(redacted_item)
+                if nested:
+                    secrets_by_index[str(index)] = nested
+            else:
+                redacted_list.append(item)
+
+        return redacted_list, secrets_by_index or None
+
+    return value, None
+
+
+def scan_sensitive_fields(
+    data: dict[str, Any],
+    sensitive_fields: Optional[frozenset[str]] = None,
+) -> SensitiveScan:
+    """
+    Redacte, extrait et détecte les champs sensibles en un seul parcours.
+
+    Args:
+        data: Dictionnaire à analyser (dicts et listes imbriqués supportés)
+        sensitive_fields: Liste des noms de champs sensibles (optionnel)
+
+    Returns:
+        SensitiveScan(redacted, secrets, has_secrets)
+
+    Example:
+        >>> scan = scan_sensitive_fields({"user": "john", "password": "secret"})
+        >>> scan.redacted
+        {"user": "john", "password": "[REDACTED]"}
+        >>> scan.secrets
+        {"password": "secret"}
+    """
+    if not data:
+        return SensitiveScan(data, {}, False)
+
+    is_sensitive = _compile_matcher(sensitive_fields or SENSITIVE_FIELD_NAMES)
+    redacted, secrets_found = _scan(data, is_sensitive)
+    return SensitiveScan(redacted, secrets_found or {}, bool(secrets_found))
+
+
+def _contains_sensitive(value: Any, is_sensitive: _KeyMatcher) -> bool:
+    """Détection seule, avec arrêt au premier champ sensible trouvé."""
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if is_sensitive(key):
+                return True
+            if isinstance(item, (dict, list)) and _contains_sensitive(item, is_sensitive):
+                return True
+    elif isinstance(value, list):
+        for item in value:
+            if isinstance(item, (dict, list)) and _contains_sensitive(item, is_sensitive):
+                return True
+    return False
+
+
 def redact_sensitive_fields(
     data: dict[str, Any],
     sensitive_fields: Optional[frozenset[str]] = None,
@@ -57,33 +193,7 @@ def redact_sensitive_fields(
         >>> redact_sensitive_fields({"username": "john", "password": "secret123"})
         {"username": "john", "password": "[REDACTED]"}
     """
-    if not data:
-        return data
-
-    fields = sensitive_fields or SENSITIVE_FIELD_NAMES
-    redacted = {}
-
-    for key, value in data.items():
-        key_lower = key.lower()
-
-        # Vérifier si c'est un champ sensible
-        if key_lower in fields or any(f in key_lower for f in fields):
-            redacted[key] = REDACTED_VALUE
-        elif isinstance(value, dict):
-            # Récursion pour les objets imbriqués
-            redacted[key] = redact_sensitive_fields(value, fields)
-        elif isinstance(value, list):
-            # Traiter les listes
-            redacted[key] = [
-                redact_sensitive_fields(item, fields)
-                if isinstance(item, dict)
-                else item
-                for item in value
-            ]
-        else:
-            redacted[key] = value
-
-    return redacted
+    return scan_sensitive_fields(data, sensitive_fields).redacted
 
 
 def has_sensitive_fields(data: dict[str, Any]) -> bool:
@@ -99,21 +209,7 @@ def has_sensitive_fields(data: dict[str, Any]) -> bool:
     if not data:
         return False
 
-    for key, value in data.items():
-        key_lower = key.lower()
-
-        if key_lower in SENSITIVE_FIELD_NAMES or any(f in key_lower for f in SENSITIVE_FIELD_NAMES):
-            return True
-
-        if isinstance(value, dict) and has_sensitive_fields(value):
-            return True
-
-        if isinstance(value, list):
-            for item in value:
-                if isinstance(item, dict) and has_sensitive_fields(item):
-                    return True
-
-    return False
+    return _contains_sensitive(data, _compile_matcher(SENSITIVE_FIELD_NAMES))
 
 
 def extract_sensitive_fields(data: dict[str, Any]) -> tuple[dict[str, Any], dict[str, Any]]:
@@ -133,27 +229,13 @@ def extract_sensitive_fields(data: dict[str, Any]) -> tuple[dict[str, Any], dict
         >>> secrets
         {"password": "secret"}
     """
-    if not data:
-        return data, {}
-
-    cleaned = {}
-    secrets_found = {}
-
-    for key, value in data.items():
-        key_lower = key.lower()
-
-        if key_lower in SENSITIVE_FIELD_NAMES or any(f in key_lower for f in SENSITIVE_FIELD_NAMES):
-            cleaned[key] = REDACTED_VALUE
-            secrets_found[key] = value
-        elif isinstance(value, dict):
-            nested_clean, nested_secrets = extract_sensitive_fields(value)
-            cleaned[key] = nested_clean
-            if nested_secrets:
-                secrets_found[key] = nested_secrets
-        else:
-            cleaned[key] = value
+    scan = scan_sensitive_fields(data)
+    return scan.redacted, scan.secrets
 
-    return cleaned, secrets_found
+
+def _derive_fernet_key(secret: str) -> bytes:
+    """Dérive une clé Fernet (32 bytes base64) depuis une clé texte."""
+    return base64.urlsafe_b64encode(hashlib.sha256(secret.encode()).digest())
 
 
 class SecureSecretStore:
@@ -162,22 +244,33 @@ class SecureSecretStore:
 
     Utilise Fernet (AES-128-CBC) pour le chiffrement at-rest.
     Les secrets sont stockés avec un TTL automatique.
+
+    Rotation de clé: la clé courante chiffre, les anciennes clés
+    (previous_keys) restent acceptées en déchiffrement (MultiFernet).
     """
 
-    def __init__(self, encryption_key: Optional[str] = None) -> None:
+    def __init__(
+        self,
+        encryption_key: Optional[str] = None,
+        previous_keys: Optional[list[str]] = None,
+    ) -> None:
         """
         Initialise le store de secrets.
 
         Args:
             encryption_key: Clé de chiffrement (32 bytes base64).
                            Si non fournie, générée aléatoirement (non persistante!).
+            previous_keys: Anciennes clés encore acceptées en déchiffrement
         """
         self._redis_client = None
+        self._cipher = None
+        self._previous_fernet_keys = [
+            _derive_fernet_key(key) for key in (previous_keys or []) if key
+        ]
 
         if encryption_key:
             # Dériver une clé Fernet depuis la clé fournie
-            key_bytes = hashlib.sha256(encryption_key.encode()).digest()
-            self._fernet_key = base64.urlsafe_b64encode(key_bytes)
+            self._fernet_key = _derive_fernet_key(encryption_key)
         else:
             # Générer une clé aléatoire (WARNING: perdue au redémarrage!)
             self._fernet_key = base64.urlsafe_b64encode(stdlib_secrets.token_bytes(32))
@@ -188,41 +281,46 @@ class SecureSecretStore:
             )
 
     async def _get_redis(self):
-        """Retourne le client Redis."""
+        """Retourne le client Redis (adossé au pool partagé du serveur)."""
         if self._redis_client is None:
-            import redis.asyncio as aioredis
-            from ..config import settings
-
-            self._redis_client = aioredis.from_url(
-                settings.redis_url,
-                decode_responses=False,  # Garder les bytes pour le chiffrement
-            )
+            self._redis_client = get_redis()
         return self._redis_client
 
+    def _get_cipher(self):
+        """
+        Retourne le chiffreur (construit une seule fois par store).
+
+        Fernet simple si aucune ancienne clé, sinon MultiFernet
+        (chiffre avec la clé courante, déchiffre avec toutes).
+        """
+        if self._cipher is None:
+            try:
+                from cryptography.fernet import Fernet, MultiFernet
+            except ImportError:
+                logger.error("cryptography_not_installed")
+                raise ImportError(
+                    "Le package 'cryptography' est requis. "
+                    "Installez-le avec: pip install cryptography"
+                )
+
+            current = Fernet(self._fernet_key)
+            if self._previous_fernet_keys:
+                self._cipher = MultiFernet(
+                    [current] + [Fernet(key) for key in self._previous_fernet_keys]
+                )
+            else:
+                self._cipher = current
+
+        return self._cipher
+
     def _encrypt(self, data: Any) -> bytes:
         """Chiffre des données avec Fernet."""
-        try:
-            from cryptography.fernet import Fernet
-        except ImportError:
-            logger.error("cryptography_not_installed")
-            raise ImportError(
-                "Le package 'cryptography' est requis. "
-                "Installez-le avec: pip install cryptography"
-            )
-
-        fernet = Fernet(self._fernet_key)
         json_data = json.dumps(data).encode("utf-8")
-        return fernet.encrypt(json_data)
+        return self._get_cipher().encrypt(json_data)
 
     def _decrypt(self, encrypted: bytes) -> Any:
         """Déchiffre des données avec Fernet."""
-        try:
-            from cryptography.fernet import Fernet
-        except ImportError:
-            raise ImportError("Le package 'cryptography' est requis.")
-
-        fernet = Fernet(self._fernet_key)
-        decrypted = fernet.decrypt(encrypted)
+        decrypted = self._get_cipher().decrypt(encrypted)
         return json.loads(decrypted.decode("utf-8"))
 
     async def store_secret(
@@ -243,7 +341,7 @@ class SecureSecretStore:
             Clé de stockage
         """
         redis = await self._get_redis()
-        redis_key = f"widip:secret:{key}"
+        redis_key = f"{SECRET_KEY_PREFIX}{key}"
         encrypted = self._encrypt(data)
 
         await redis.setex(
@@ -266,7 +364,7 @@ class SecureSecretStore:
             Données déchiffrées ou None si non trouvé/expiré
         """
         redis = await self._get_redis()
-        redis_key = f"widip:secret:{key}"
+        redis_key = f"{SECRET_KEY_PREFIX}{key}"
 
         encrypted = await redis.get(redis_key)
 
@@ -291,16 +389,111 @@ class SecureSecretStore:
             True si supprimé, False si non trouvé
         """
         redis = await self._get_redis()
-        redis_key = f"widip:secret:{key}"
+        redis_key = f"{SECRET_KEY_PREFIX}{key}"
 
         result = await redis.delete(redis_key)
         return result > 0
 
+    async def get_secrets(self, keys: list[str]) -> dict[str, Any]:
+        """
+        Récupère plusieurs secrets en un seul aller-retour (MGET).
+
+        Args:
+            keys: Identifiants des secrets
+
+        Returns:
+            Dictionnaire {clé: données déchiffrées} (absents/illisibles omis)
+        """
+        if not keys:
+            return {}
+
+        redis = await self._get_redis()
+        values = await redis.mget([f"{SECRET_KEY_PREFIX}{key}" for key in keys])
+
+        found: dict[str, Any] = {}
+        for key, encrypted in zip(keys, values, strict=True):
+            if encrypted is None:
+                continue
+            try:
+                found[key] = self._decrypt(encrypted)
+            except Exception as e:
+                logger.error("secret_decrypt_error", key=key[:20] + "...", error=str(e))
+
+        if len(found) < len(keys):
+            logger.warning("secrets_not_found", requested=len(keys), found=len(found))
+
+        return found
+
+    async def delete_secrets(self, keys: list[str]) -> int:
+        """
+        Supprime plusieurs secrets en une seule commande DEL.
+
+        Args:
+            keys: Identifiants des secrets
+
+        Returns:
+            Nombre de secrets supprimés
+        """
+        if not keys:
+            return 0
+
+        redis = await self._get_redis()
+        return await redis.delete(*[f"{SECRET_KEY_PREFIX}{key}" for key in keys])
+
+    async def rotate_secrets(self, batch_size: int = 200) -> int:
+        """
+        Rechiffre tous les secrets stockés avec la clé courante.
+
+        À lancer après une rotation de REDIS_SECRET_KEY (ancienne clé placée
+        dans REDIS_SECRET_KEY_PREVIOUS), via POST /maintenance/secrets/rotate.
+        Le TTL restant de chaque secret est conservé (KEEPTTL) et un secret
+        supprimé entre la lecture et la réécriture n'est pas recréé (XX).
+        Une fois terminé, l'ancienne clé peut être retirée.
+
+        Args:
+            batch_size: Nombre de clés traitées par aller-retour Redis
+
+        Returns:
+            Nombre de secrets rechiffrés
+        """
+        if not self._previous_fernet_keys:
+            return 0
+
+        cipher = self._get_cipher()
+        redis = await self._get_redis()
+        rotated = 0
+        batch: list[bytes] = []
+
+        async def _rotate_batch(keys: list[bytes]) -> int:
+            tokens = await redis.mget(keys)
+
+            async with redis.pipeline(transaction=False) as pipe:
+                for key, token in zip(keys, tokens, strict=True):
+                    if token is None:
+                        continue  # Expiré ou supprimé entre-temps
+                    try:
+                        # XX: ne jamais recréer un secret supprimé depuis le GET
+                        pipe.set(key, cipher.rotate(token), xx=True, keepttl=True)
+                    except Exception as e:
+                        logger.error("secret_rotate_error", key=key[:30], error=str(e))
+                results = await pipe.execute()
+            return sum(1 for result in results if result)
+
+        async for key in redis.scan_iter(match=f"{SECRET_KEY_PREFIX}*", count=batch_size):
+            batch.append(key)
+            if len(batch) >= batch_size:
+                rotated += await _rotate_batch(batch)
+                batch = []
+
+        if batch:
+            rotated += await _rotate_batch(batch)
+
+        logger.info("secrets_rotated", count=rotated)
+        return rotated
+
     async def close(self) -> None:
-        """Ferme la connexion Redis."""
-        if self._redis_client:
-            await self._redis_client.close()
-            self._redis_client = None
+        """Libère le client Redis (le pool partagé est fermé à l'arrêt du serveur)."""
+        self._redis_client = None
 
 
 def get_secret_store() -> SecureSecretStore:
@@ -312,7 +505,11 @@ def get_secret_store() -> SecureSecretStore:
     from ..config import settings
 
     key = settings.redis_secret_key.get_secret_value() if settings.redis_secret_key else None
-    return SecureSecretStore(encryption_key=key if key else None)
+    previous = settings.redis_secret_key_previous.get_secret_value()
+    return SecureSecretStore(
+        encryption_key=key if key else None,
+        previous_keys=[k.strip() for k in previous.split(",") if k.strip()],
+    )
 
 
 # Instance singleton (utilise REDIS_SECRET_KEY de la config si disponible)
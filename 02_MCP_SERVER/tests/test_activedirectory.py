@@ -0,0 +1,49 @@
+"""Client Active Directory: opérations LDAP protégées par le circuit breaker."""
+
+import pytest
+from ldap3 import MOCK_SYNC, Connection, Server
+from ldap3.core.exceptions import LDAPSocketOpenError, LDAPSocketReceiveError
+
+from src.clients.activedirectory import _GuardedConnection
+from src.config import settings
+from src.utils import circuit_breaker
+
+
+@pytest.fixture
+def connection(monkeypatch):
+    monkeypatch.setattr(circuit_breaker, "_breakers", {})
+    monkeypatch.setattr(settings, "circuit_failure_threshold", 2)
+    conn = _GuardedConnection(Server("ad.test"), client_strategy=MOCK_SYNC)
+    conn.guarded = True
+    return conn
+
+
+def test_unresponsive_ad_opens_the_circuit(connection, monkeypatch):
+    calls = []
+
+    def search(self, *args, **kwargs):
+        calls.append(args)
+        raise LDAPSocketReceiveError("timed out")
+
+    monkeypatch.setattr(Connection, "search", search)
+
+    for _ in range(2):
+        with pytest.raises(LDAPSocketReceiveError):
+            connection.search("dc=test", "(sAMAccountName=jdoe)")
+    with pytest.raises(LDAPSocketOpenError):
+        connection.modify("cn=jdoe,dc=test", {})
+
+    assert len(calls) == 2
+    assert circuit_breaker.get_circuit_breaker("ldap").state == "open"
+
+
+def test_reads_during_bind_are_not_guarded(connection, monkeypatch):
+    # Lecture du schéma pendant le bind, déjà gardé par _get_connection
+    monkeypatch.setattr(Connection, "search", lambda self, *args, **kwargs: True)
+    connection.guarded = False
+    breaker = circuit_breaker.get_circuit_breaker("ldap")
+    breaker.record_failure()
+    breaker.record_failure()
+
+    assert connection.search("dc=test", "(objectClass=*)") is True
+    assert breaker.state == "open"
@@ -0,0 +1,91 @@
+"""Batch d'enrichissement en mode consommateur: validation ou relivraison du lot."""
+
+import pytest
+
+from src.clients.memory import MemoryClient
+from src.tools import enrichisseur_tools
+from src.tools.enrichisseur_tools import enrichisseur_run_batch
+
+
+class _FakeFeed:
+    """Flux 'resolved' d'un seul lot; enregistre ack / release."""
+
+    def __init__(self, tickets: list[dict]) -> None:
+        self.tickets = tickets
+        self.calls: list[str] = []
+
+    async def fetch(self, consumer, feed, limit=50, include_details=False):
+        return {"success": True, "tickets": self.tickets, "lease_id": "lease"}
+
+    async def ack(self, consumer, feed, lease_id):
+        self.calls.append("ack")
+        return {"acked": True}
+
+    async def release(self, consumer, feed, lease_id):
+        self.calls.append("release")
+
+
+class _FakeMemory(MemoryClient):
+    """Base de connaissances en mémoire; Ollama indisponible si `ollama_down`."""
+
+    def __init__(self, ollama_down: bool) -> None:
+        super().__init__()
+        self.ollama_down = ollama_down
+        self.stored: list[str] = []
+
+    async def check_exists_bulk(self, ticket_ids):
+        return set()
+
+    async def _get_embeddings(self, texts):
+        if self.ollama_down:
+            raise RuntimeError("Ollama unavailable")
+        return [[1.0] for _ in texts]
+
+    async def add_knowledge_bulk(self, entries, embeddings):
+        self.stored += [entry["ticket_id"] for entry in entries]
+        return {e["ticket_id"]: {"id": 1, "representative": e["ticket_id"]} for e in entries}
+
+
+def _ticket(ticket_id: int) -> dict:
+    return {
+        "id": ticket_id,
+        "title": "Le VPN ne se connecte plus depuis ce matin",
+        "description": "<p>Erreur 809 à la connexion VPN depuis le poste du bureau.</p>",
+        "solution": "Redémarrer le service VPN puis vérifier la connexion",
+        "followups": [],
+    }
+
+
+def _poor_ticket(ticket_id: int) -> dict:
+    return {"id": ticket_id, "title": "pb", "description": "x", "solution": "ok", "followups": []}
+
+
+@pytest.fixture
+def feed(monkeypatch):
+    def install(tickets: list[dict], ollama_down: bool = False):
+        fake_feed = _FakeFeed(tickets)
+        monkeypatch.setattr(enrichisseur_tools, "ticket_feed", fake_feed)
+        monkeypatch.setattr(enrichisseur_tools, "memory_client", _FakeMemory(ollama_down))
+        return fake_feed
+
+    return install
+
+
+async def test_batch_is_acked_despite_extraction_failures(feed):
+    fake_feed = feed([_ticket(1), _poor_ticket(2)])
+
+    report = await enrichisseur_run_batch(consumer="rag")
+
+    assert [d["status"] for d in report["details"]] == ["injected", "extraction_failed"]
+    assert fake_feed.calls == ["ack"]
+    assert report["acked"] is True
+
+
+async def test_injection_failure_releases_the_lease(feed):
+    fake_feed = feed([_ticket(1)], ollama_down=True)
+
+    report = await enrichisseur_run_batch(consumer="rag")
+
+    assert report["details"][0]["status"] == "injection_failed"
+    assert fake_feed.calls == ["release"]
+    assert report["acked"] is False
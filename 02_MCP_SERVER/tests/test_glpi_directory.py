@@ -0,0 +1,145 @@
+"""Annuaire local GLPI: synchro, motifs LIKE, utilisateurs inactifs, correspondance exacte."""
+
+from datetime import datetime
+
+import asyncpg
+import pytest
+
+from src.clients import glpi as glpi_module
+from src.clients.glpi import USER_FIELD_DATE_MOD, USER_FIELD_ID, USER_FIELD_LOGIN, GLPIClient
+from src.clients.glpi_directory import GLPIUserDirectory, _like_pattern, directory_record
+from src.config import settings
+
+
+class _FakeDirectory:
+    """Annuaire en mémoire (upsert et purge des utilisateurs non revus)."""
+
+    def __init__(self, users: dict[int, str]) -> None:
+        self.users = dict(users)
+        self.last_date_mod = None
+        self.synced_ids: set[int] = set()
+
+    async def initialize(self):
+        return None
+
+    async def db_now(self):
+        return datetime(2030, 1, 1)
+
+    async def upsert_users(self, records):
+        self.synced_ids.update(record[0] for record in records)
+        self.users.update({record[0]: record[1] for record in records})
+        return len(records)
+
+    async def record_sync(self, last_date_mod, started_at, full=False):
+        self.last_date_mod = last_date_mod
+        if not full:
+            return 0
+        stale = set(self.users) - self.synced_ids
+        for user_id in stale:
+            del self.users[user_id]
+        return len(stale)
+
+
+class _FakeGLPI(GLPIClient):
+    """Utilisateurs GLPI en mémoire; un utilisateur est modifié après la première page."""
+
+    def __init__(self, users: list[tuple[int, str]], edited: int) -> None:
+        super().__init__()
+        self.users = dict(users)
+        self.edited = edited
+        self.pages = 0
+
+    async def search(self, query, start=0, limit=50):
+        since = next((c["value"] for c in query._criteria if c["searchtype"] == "morethan"), "")
+        rows = sorted(
+            (date_mod, user_id) for user_id, date_mod in self.users.items() if date_mod > since
+        )
+        page = rows[start:start + limit]
+
+        self.pages += 1
+        if self.pages == 1:
+            self.users[self.edited] = "2029-12-31 23:59:59"
+
+        return {
+            "totalcount": len(rows),
+            "count": len(page),
+            "start": start,
+            "data": [
+                {str(USER_FIELD_ID): user_id, str(USER_FIELD_LOGIN): f"user{user_id}",
+                 str(USER_FIELD_DATE_MOD): date_mod}
+                for date_mod, user_id in page
+            ],
+        }
+
+
+async def test_sync_reads_every_user_despite_concurrent_edit(monkeypatch):
+    # Trois utilisateurs par seconde: les pages coupent au milieu d'une seconde
+    users = [(i, f"2020-01-01 00:00:{i // 3:02d}") for i in range(1, 13)]
+    directory = _FakeDirectory({99: "supprime_de_glpi"} | {i: f"user{i}" for i, _ in users})
+    monkeypatch.setattr(glpi_module, "glpi_directory", directory)
+    monkeypatch.setattr(settings, "glpi_search_page_size", 4)
+    client = _FakeGLPI(users, edited=2)
+
+    result = await client.sync_user_directory(full=True)
+
+    assert directory.synced_ids == set(range(1, 13))
+    assert sorted(directory.users) == list(range(1, 13))
+    assert result["purged"] == 1
+    assert result["last_date_mod"] == "2029-12-31T23:59:59"
+
+
+def test_like_pattern_escapes_wildcards():
+    assert _like_pattern("a%b_c\\d") == "%a\\%b\\_c\\\\d%"
+    assert _like_pattern(None) is None
+
+
+async def _directory(pg_pool) -> GLPIUserDirectory:
+    try:
+        await pg_pool.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    except asyncpg.PostgresError:
+        pytest.skip("extension pg_trgm non disponible")
+
+    directory = GLPIUserDirectory()
+    directory._pool = pg_pool
+    await directory.initialize()
+    await directory.upsert_users([
+        directory_record({"id": 1, "login": "jdupont", "firstname": "Jean",
+                          "realname": "Dupont", "email": "j.dupont@client.fr"}),
+        directory_record({"id": 2, "login": "jdupont2", "firstname": "Jeanne",
+                          "realname": "Dupont", "email": "jeanne@client.fr"}),
+        directory_record({"id": 3, "login": "old_user", "firstname": "Jean",
+                          "realname": "Dupont", "is_active": 0}),
+        directory_record({"id": 4, "login": "a_b", "email": "x_y@client.fr"}),
+    ])
+    await directory.record_sync(None, await directory.db_now())
+    return directory
+
+
+async def test_lookup_skips_inactive_users(pg_pool):
+    directory = await _directory(pg_pool)
+
+    results = await directory.lookup(name="jean dupont")
+
+    assert 3 not in [r["client_id"] for r in results]
+    assert results[0]["client_id"] == 1
+    assert results[0]["exact_match"] is True
+
+
+async def test_lookup_treats_wildcards_literally(pg_pool):
+    directory = await _directory(pg_pool)
+
+    assert await directory.lookup(email="%") == []
+    assert [r["client_id"] for r in await directory.lookup(email="x_y@")] == [4]
+    assert [r["client_id"] for r in await directory.lookup(email="x%y@")] == []
+
+
+async def test_sync_pages_through_a_crowded_second(monkeypatch):
+    users = [(i, "2020-01-01 00:00:00") for i in range(1, 11)]
+    directory = _FakeDirectory({})
+    monkeypatch.setattr(glpi_module, "glpi_directory", directory)
+    monkeypatch.setattr(settings, "glpi_search_page_size", 4)
+    client = _FakeGLPI(users, edited=11)
+
+    await client.sync_user_directory(full=True)
+
+    assert directory.synced_ids == set(range(1, 12))
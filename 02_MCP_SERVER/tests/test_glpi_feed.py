@@ -0,0 +1,81 @@
+"""Flux de tickets GLPI: position initiale du curseur, bail et ack."""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.clients import glpi_feed as glpi_feed_module
+from src.clients.glpi_feed import TicketFeed
+from src.config import settings
+
+GLPI_LATEST = datetime(2020, 3, 1, 12, 0, 0)
+
+
+class _FakeGLPI:
+    """Tickets d'un flux en mémoire (dates dans l'heure GLPI)."""
+
+    def __init__(self, tickets: list[tuple[datetime, int]]) -> None:
+        self.tickets = sorted(tickets)
+        self.after_dates: list[datetime] = []
+
+    async def latest_feed_date(self, feed):
+        return self.tickets[-1][0] if self.tickets else None
+
+    async def fetch_ticket_changes(self, feed, after_date, after_id=0, limit=50,
+                                   include_details=False):
+        self.after_dates.append(after_date)
+        return [
+            {"id": ticket_id, "feed_date": date.strftime("%Y-%m-%d %H:%M:%S")}
+            for date, ticket_id in self.tickets
+            if (date, ticket_id) > (after_date, after_id)
+        ][:limit]
+
+
+@pytest.fixture
+async def feed(pg_pool):
+    ticket_feed = TicketFeed()
+    ticket_feed._pool = pg_pool
+    await ticket_feed.initialize()
+    return ticket_feed
+
+
+async def test_initial_cursor_follows_glpi_clock(feed, monkeypatch):
+    glpi = _FakeGLPI([(GLPI_LATEST - timedelta(hours=30), 1), (GLPI_LATEST, 2)])
+    monkeypatch.setattr(glpi_feed_module, "glpi_client", glpi)
+
+    result = await feed.fetch("proactif", "new")
+
+    hours = settings.glpi_feed_initial_lookback_hours
+    assert glpi.after_dates == [GLPI_LATEST - timedelta(hours=hours)]
+    assert [ticket["id"] for ticket in result["tickets"]] == [2]
+
+
+async def test_explicit_start_date(feed, monkeypatch):
+    glpi = _FakeGLPI([(GLPI_LATEST - timedelta(hours=30), 1), (GLPI_LATEST, 2)])
+    monkeypatch.setattr(glpi_feed_module, "glpi_client", glpi)
+
+    result = await feed.fetch("proactif", "new", start_date="2020-01-01 00:00:00")
+    invalid = await feed.fetch("autre", "new", start_date="hier")
+
+    assert [ticket["id"] for ticket in result["tickets"]] == [1, 2]
+    assert invalid["success"] is False
+
+
+async def test_ack_advances_cursor(feed, monkeypatch):
+    glpi = _FakeGLPI([(GLPI_LATEST, 1), (GLPI_LATEST, 2)])
+    monkeypatch.setattr(glpi_feed_module, "glpi_client", glpi)
+
+    first = await feed.fetch("proactif", "new", limit=1)
+    busy = await feed.fetch("proactif", "new", limit=1)
+    acked = await feed.ack("proactif", "new", first["lease_id"])
+    second = await feed.fetch("proactif", "new", limit=1)
+
+    assert busy["busy"] is True
+    assert acked["acked"] is True
+    assert [ticket["id"] for ticket in second["tickets"]] == [2]
+
+
+async def test_malformed_lease_is_rejected(feed):
+    result = await feed.ack("proactif", "new", "pas-un-uuid")
+
+    assert result["acked"] is False
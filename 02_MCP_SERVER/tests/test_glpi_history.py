@@ -0,0 +1,37 @@
+"""Historique de ticket GLPI: limite plafonnée et pagination."""
+
+from src.clients.glpi import GLPIClient
+from src.config import settings
+
+
+class _FakeGLPI(GLPIClient):
+    """Historique de 1000 entrées en mémoire."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.max_items: list[int] = []
+
+    async def iter_ticket_history(self, ticket_id, page_size=None, max_items=None, offset=0):
+        self.max_items.append(max_items)
+        for index in range(offset, min(1000, offset + max_items)):
+            yield {"id": index}
+
+
+async def test_limit_is_clamped_to_max_entries(monkeypatch):
+    monkeypatch.setattr(settings, "glpi_history_max_entries", 50)
+    client = _FakeGLPI()
+
+    result = await client.get_ticket_history(1, limit=100000)
+
+    assert result["count"] == 50
+    assert client.max_items == [51]
+    assert result["next_offset"] == 50
+
+
+async def test_smaller_limit_and_offset():
+    client = _FakeGLPI()
+
+    result = await client.get_ticket_history(1, limit=10, offset=995)
+
+    assert [entry["id"] for entry in result["history"]] == [995, 996, 997, 998, 999]
+    assert result["truncated"] is False
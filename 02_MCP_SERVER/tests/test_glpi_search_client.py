@@ -0,0 +1,156 @@
+"""Recherche de client GLPI: classement par nombre de critères satisfaits."""
+
+from typing import Any
+
+import pytest
+
+from src.clients import glpi as glpi_module
+from src.clients.glpi import (
+    USER_FIELD_EMAIL,
+    USER_FIELD_FIRSTNAME,
+    USER_FIELD_ID,
+    USER_FIELD_IS_ACTIVE,
+    USER_FIELD_LOGIN,
+    USER_FIELD_PHONE,
+    USER_FIELD_REALNAME,
+    GLPIClient,
+    _pick_requester,
+)
+
+
+def _user(
+    user_id: int, login: str, email: str = "", phone: str = "", active: int = 1
+) -> dict[str, Any]:
+    return {
+        str(USER_FIELD_ID): user_id,
+        str(USER_FIELD_IS_ACTIVE): active,
+        str(USER_FIELD_LOGIN): login,
+        str(USER_FIELD_REALNAME): login.upper(),
+        str(USER_FIELD_FIRSTNAME): "",
+        str(USER_FIELD_EMAIL): email,
+        str(USER_FIELD_PHONE): phone,
+    }
+
+
+def _matches(row: dict[str, Any], criteria: list[dict[str, Any]]) -> bool:
+    """Évalue des critères GLPI (contains, liens AND/OR, groupes) sur une ligne."""
+    result = False
+    for index, criterion in enumerate(criteria):
+        if "criteria" in criterion:
+            value = _matches(row, criterion["criteria"])
+        else:
+            cell = str(row.get(str(criterion["field"])) or "").lower()
+            if criterion["searchtype"] == "equals":
+                value = cell == str(criterion["value"]).lower()
+            else:
+                value = str(criterion["value"]).lower() in cell
+        if index == 0:
+            result = value
+        elif criterion["link"] == "AND":
+            result = result and value
+        else:
+            result = result or value
+    return result
+
+
+class _FakeGLPI(GLPIClient):
+    """Client dont la recherche porte sur une liste d'utilisateurs en mémoire."""
+
+    def __init__(self, users: list[dict[str, Any]]) -> None:
+        super().__init__()
+        self.users = users
+        self.queries = 0
+
+    def _schedule_directory_sync(self) -> None:
+        return None
+
+    async def _post(self, endpoint, json_data=None):
+        self.posted = json_data["input"]
+        return {"id": 1000}
+
+    async def iter_search(self, query, page_size=None, max_items=None):
+        self.queries += 1
+        rows = [row for row in self.users if _matches(row, query._criteria)]
+        for row in rows[:max_items]:
+            yield row
+
+
+@pytest.fixture(autouse=True)
+def _no_directory(monkeypatch):
+    async def lookup(**_kwargs):
+        return None
+
+    monkeypatch.setattr(glpi_module.glpi_directory, "lookup", lookup)
+
+
+async def test_best_match_is_found_behind_many_partial_matches():
+    users = [_user(i, f"martin{i}") for i in range(1, 60)]
+    users.append(_user(99, "martin.best", email="m.best@client.fr"))
+    client = _FakeGLPI(users)
+
+    result = await client.search_client(name="martin", email="m.best@client.fr", limit=1)
+
+    assert result["client_id"] == 99
+    assert result["matched_criteria"] == 2
+    assert client.queries == 1
+
+
+async def test_falls_back_to_partial_matches():
+    users = [_user(1, "durand", phone="0102"), _user(2, "dupont", email="x@client.fr")]
+    client = _FakeGLPI(users)
+
+    result = await client.search_client(name="dupont", phone="0102", limit=5)
+
+    assert result["found"] is True
+    assert {result["client_id"], *(c["client_id"] for c in result["candidates"])} == {1, 2}
+    assert result["matched_criteria"] == 1
+
+
+async def test_inactive_users_are_skipped():
+    client = _FakeGLPI([_user(1, "dupont", active=0), _user(2, "dupont.j")])
+
+    result = await client.search_client(name="dupont", limit=5)
+
+    assert result["client_id"] == 2
+    assert result["candidates"] == []
+
+
+async def test_ticket_requester_requires_unambiguous_match():
+    client = _FakeGLPI([_user(1, "dupont.jean"), _user(2, "dupont.paul")])
+
+    result = await client.create_ticket(title="t", description="d", client_name="dupont")
+
+    assert "_users_id_requester" not in client.posted
+    assert result["requester_id"] is None
+    assert [c["client_id"] for c in result["requester_candidates"]] == [1, 2]
+
+
+async def test_ticket_requester_assigned_on_exact_login():
+    client = _FakeGLPI([_user(1, "dupont.jean"), _user(2, "dupont.jean2")])
+
+    result = await client.create_ticket(title="t", description="d", client_name="Dupont.Jean")
+
+    assert client.posted["_users_id_requester"] == 1
+    assert result["requester_id"] == 1
+    assert "requester_candidates" not in result
+
+
+def test_pick_requester_uses_unique_high_similarity():
+    info = {
+        "found": True, "client_id": 1, "exact_match": False, "similarity": 0.9,
+        "candidates": [{"client_id": 2, "exact_match": False, "similarity": 0.4}],
+    }
+    assert _pick_requester(info) == (1, [])
+
+    info["candidates"][0]["similarity"] = 0.85
+    requester_id, candidates = _pick_requester(info)
+    assert requester_id is None
+    assert [c["client_id"] for c in candidates] == [1, 2]
+
+
+async def test_no_match():
+    client = _FakeGLPI([_user(1, "durand")])
+
+    result = await client.search_client(name="inconnu")
+
+    assert result == {"found": False, "message": "No client found"}
@@ -0,0 +1,35 @@
+"""Conversion HTML → texte des contenus GLPI."""
+
+from src.utils.html_text import html_to_text
+
+
+def test_inline_tags_do_not_split_words():
+    assert html_to_text("Le <b>V</b>PN ne répond <span>plus</span>") == "Le VPN ne répond plus"
+
+
+def test_block_tags_separate_lines():
+    text = "<p>Bonjour,</p><p>Le poste<br/>ne démarre plus</p><table><tr><td>a</td><td>b</td></tr></table>"
+
+    assert html_to_text(text) == "Bonjour, Le poste ne démarre plus a b"
+    assert html_to_text(text, keep_newlines=True) == "Bonjour,\n\nLe poste\nne démarre plus\n\na b"
+
+
+def test_named_and_numeric_entities():
+    assert html_to_text("&eacute;t&#233; &#x2014; caf&eacute;&nbsp;ok") == "été — café ok"
+
+
+def test_escaped_glpi_content_is_decoded():
+    stored = "&lt;p&gt;Accès &lt;b&gt;V&lt;/b&gt;PN&lt;/p&gt;&lt;p&gt;R&amp;amp;D &amp;lt;urgent&amp;gt;&lt;/p&gt;"
+
+    assert html_to_text(stored) == "Accès VPN R&D <urgent>"
+
+
+def test_scripts_styles_and_comments_are_dropped():
+    text = "<style>p{color:red}</style><!-- note --><script>alert(1)</script>texte a < b"
+
+    assert html_to_text(text) == "texte a < b"
+
+
+def test_plain_text_is_only_normalized():
+    assert html_to_text("  Texte  brut\n\n\n\nsans balise ") == "Texte brut sans balise"
+    assert html_to_text(None) == ""
@@ -0,0 +1,112 @@
+"""Base de connaissances: regroupement et fusion des quasi-doublons."""
+
+import pytest
+
+from src.clients.memory import MemoryClient, cluster_near_duplicates
+from src.config import settings
+from tests.conftest import init_db_statements
+
+DIMENSIONS = 1024
+
+
+def _vector(axis: int, tilt: float = 0.0) -> list[float]:
+    """Vecteur unitaire sur un axe, légèrement incliné vers l'axe suivant."""
+    vector = [0.0] * DIMENSIONS
+    vector[axis] = 1.0
+    vector[axis + 1] = tilt
+    return vector
+
+
+def _entry(ticket_id: str, quality: float) -> dict:
+    return {
+        "ticket_id": ticket_id,
+        "problem_summary": f"Problème {ticket_id}",
+        "solution_summary": f"Solution {ticket_id}",
+        "category": "VPN",
+        "tags": ["vpn"],
+        "quality_score": quality,
+    }
+
+
+def test_cluster_groups_behind_best_quality():
+    embeddings = [_vector(0), _vector(0, 0.1), _vector(10), _vector(0, 0.05)]
+
+    clusters = cluster_near_duplicates(embeddings, [0.5, 0.9, 0.7, 0.6], threshold=0.95)
+
+    assert clusters == [(1, [3, 0]), (2, [])]
+
+
+def test_cluster_keeps_distinct_vectors_apart():
+    embeddings = [_vector(0), _vector(0, 1.0), _vector(0, -1.0)]
+
+    clusters = cluster_near_duplicates(embeddings, [0.5, 0.5, 0.5], threshold=0.95)
+
+    assert clusters == [(0, []), (1, []), (2, [])]
+
+
+@pytest.fixture
+async def memory(pg_pool, monkeypatch):
+    monkeypatch.setattr(settings, "memory_dedup_enabled", True)
+    monkeypatch.setattr(settings, "memory_dedup_threshold", 0.95)
+    for statement in init_db_statements("widip_knowledge_base"):
+        await pg_pool.execute(statement)
+    client = MemoryClient()
+    client._pool = pg_pool
+    return client
+
+
+async def _rows(pg_pool) -> dict[str, tuple[str, list[str]]]:
+    rows = await pg_pool.fetch(
+        "SELECT ticket_id, problem_summary, duplicate_ticket_ids FROM widip_knowledge_base"
+    )
+    return {
+        row["ticket_id"]: (row["problem_summary"], sorted(row["duplicate_ticket_ids"]))
+        for row in rows
+    }
+
+
+async def test_batch_duplicates_are_inserted_as_one_row(memory, pg_pool):
+    results = await memory.add_knowledge_bulk(
+        [_entry("1", 0.5), _entry("2", 0.9), _entry("3", 0.7)],
+        [_vector(0), _vector(0, 0.1), _vector(10)],
+    )
+
+    assert await _rows(pg_pool) == {
+        "2": ("Problème 2", ["1"]),
+        "3": ("Problème 3", []),
+    }
+    assert results["1"] == {"id": results["2"]["id"], "representative": "2"}
+
+
+async def test_near_duplicate_is_merged_into_existing_row(memory, pg_pool):
+    await memory.add_knowledge_bulk([_entry("1", 0.5)], [_vector(0)])
+
+    worse = await memory.add_knowledge_bulk([_entry("2", 0.4)], [_vector(0, 0.1)])
+    better = await memory.add_knowledge_bulk([_entry("3", 0.9)], [_vector(0, 0.05)])
+
+    assert await _rows(pg_pool) == {"3": ("Problème 3", ["1", "2"])}
+    assert worse["2"]["representative"] == "1"
+    assert better["3"]["representative"] == "3"
+
+
+async def test_resent_tickets_keep_their_rows(memory, pg_pool):
+    await memory.add_knowledge_bulk(
+        [_entry("1", 0.5), _entry("2", 0.9)],
+        [_vector(0), _vector(0, 0.1)],
+    )
+    await memory.add_knowledge_bulk([_entry("3", 0.6)], [_vector(20)])
+
+    # Ticket "3" modifié: quasi-doublon du nouveau "4" mais loin de sa propre
+    # ligne; "1" est déjà fusionné dans "2". Aucun n'est listé ailleurs.
+    results = await memory.add_knowledge_bulk(
+        [_entry("4", 0.9), _entry("3", 0.7), _entry("1", 0.8)],
+        [_vector(10, 0.1), _vector(10, 0.05), _vector(0)],
+    )
+
+    assert await _rows(pg_pool) == {
+        "2": ("Problème 2", ["1"]),
+        "3": ("Problème 3", []),
+        "4": ("Problème 4", []),
+    }
+    assert results["3"]["representative"] == "3"
+    assert results["1"]["representative"] == "2"
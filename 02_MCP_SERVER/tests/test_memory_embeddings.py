@@ -0,0 +1,41 @@
+"""Embeddings Ollama: API par lot, repli texte par texte, circuit breaker."""
+
+import httpx
+
+from src.clients.memory import MemoryClient
+from src.config import settings
+from src.utils import circuit_breaker
+
+
+def _ollama(request: httpx.Request) -> httpx.Response:
+    """Ollama < 0.3: pas d'API /api/embed."""
+    if request.url.path == "/api/embed":
+        return httpx.Response(404)
+    return httpx.Response(200, json={"embedding": [0.5, 0.5]})
+
+
+class _LegacyOllamaMemory(MemoryClient):
+    """Client dont les requêtes Ollama sont servies par _ollama."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._http = httpx.AsyncClient(transport=httpx.MockTransport(_ollama))
+
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        return self._http
+
+
+async def test_fallback_probe_closes_half_open_circuit(monkeypatch):
+    monkeypatch.setattr(circuit_breaker, "_breakers", {})
+    monkeypatch.setattr(settings, "circuit_reset_timeout", 0.0)
+    monkeypatch.setattr(settings, "circuit_half_open_max_calls", 1)
+    breaker = circuit_breaker.get_circuit_breaker("ollama")
+    for _ in range(settings.circuit_failure_threshold):
+        breaker.record_failure()
+    assert breaker.state == "half_open"
+
+    embeddings = await _LegacyOllamaMemory()._get_embeddings(["a", "b"])
+
+    assert embeddings == [[0.5, 0.5], [0.5, 0.5]]
+    assert breaker.state == "closed"
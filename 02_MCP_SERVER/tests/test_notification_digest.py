@@ -0,0 +1,57 @@
+"""Regroupement des notifications techniciens (digests)."""
+
+import pytest
+
+from src.clients.notification_digest import NotificationCoalescer
+
+
+@pytest.fixture
+async def coalescer():
+    sent: list[tuple[str, str, str]] = []
+
+    async def send(ticket_id, subject, message, priority, recipient, channels):
+        sent.append((ticket_id, subject, priority))
+        return {"success": True}
+
+    digest = NotificationCoalescer(send, window=3600)
+    digest.sent_messages = sent
+    yield digest
+    for group in list(digest._groups.values()):
+        group.task.cancel()
+
+
+async def _submit(coalescer, ticket_id, subject, priority="normal", group_key=None):
+    return await coalescer.submit(
+        ticket_id, subject, "msg", priority, "tech@widip.fr", ["email"], group_key=group_key
+    )
+
+
+async def test_unrelated_critical_alerts_are_not_held(coalescer):
+    first = await _submit(coalescer, "1", "Serveur down", "critical")
+    second = await _submit(coalescer, "2", "Switch down", "critical")
+
+    assert first["coalesced"] is False
+    assert second["coalesced"] is False
+    assert [ticket for ticket, _, _ in coalescer.sent_messages] == ["1", "2"]
+
+
+async def test_same_ticket_is_coalesced_without_group_key(coalescer):
+    await _submit(coalescer, "1", "Ping perdu")
+    repeat = await _submit(coalescer, "1", "Ping perdu")
+    other = await _submit(coalescer, "1", "CPU élevé")
+
+    assert repeat["duplicate"] is True
+    assert other["coalesced"] is True
+    assert len(coalescer.sent_messages) == 1
+
+
+async def test_critical_in_explicit_group_is_sent_once(coalescer):
+    await _submit(coalescer, "1", "Lien WAN", group_key="site:lyon")
+    held = await _submit(coalescer, "2", "Imprimante", group_key="site:lyon")
+    critical = await _submit(coalescer, "3", "Firewall down", "critical", group_key="site:lyon")
+    repeat = await _submit(coalescer, "3", "Firewall down", "critical", group_key="site:lyon")
+
+    assert held["coalesced"] is True
+    assert critical["coalesced"] is False
+    assert repeat["duplicate"] is True
+    assert [ticket for ticket, _, _ in coalescer.sent_messages] == ["1", "3"]
@@ -0,0 +1,135 @@
+"""Outbox des notifications: réservation, envoi, retry, dead letter."""
+
+import pytest
+
+from src.clients import notification as notification_module
+from src.clients.notification import NotificationClient
+from src.clients.notification_outbox import NotificationOutbox
+from src.config import settings
+
+
+@pytest.fixture
+async def outbox(pg_pool, monkeypatch):
+    monkeypatch.setattr(settings, "notification_rate_limits", "")
+    monkeypatch.setattr(settings, "notification_max_attempts", 2)
+    box = NotificationOutbox()
+    box._pool = pg_pool
+    await box.initialize()
+    return box
+
+
+def _deliver_with(results: list[dict]):
+    calls: list[tuple[str, dict]] = []
+
+    async def deliver(channel, payload):
+        calls.append((channel, payload))
+        return results.pop(0)
+
+    return deliver, calls
+
+
+async def _row(pg_pool, outbox_id: int):
+    return await pg_pool.fetchrow(
+        """
+        SELECT status, attempts, last_error, locked_until, sent_at,
+               next_attempt_at > NOW() AS delayed
+        FROM notification_outbox WHERE id = $1
+        """,
+        outbox_id,
+    )
+
+
+async def test_delivery_marks_sent(outbox, pg_pool):
+    outbox._deliver, calls = _deliver_with([{"success": True}])
+    ids = await outbox.enqueue({"email": {"to": "a@client.fr"}}, context={"ticket_id": 1})
+
+    assert await outbox.process_batch() == 1
+
+    row = await _row(pg_pool, ids["email"])
+    assert calls == [("email", {"to": "a@client.fr"})]
+    assert (row["status"], row["attempts"], row["locked_until"]) == ("sent", 1, None)
+    assert row["sent_at"] is not None
+
+
+async def test_failure_schedules_retry_then_dead_letter(outbox, pg_pool):
+    outbox._deliver, _calls = _deliver_with([
+        {"success": False, "error": "smtp down"},
+        {"success": False, "error": "smtp still down"},
+    ])
+    ids = await outbox.enqueue({"email": {"to": "a@client.fr"}})
+
+    await outbox.process_batch()
+    row = await _row(pg_pool, ids["email"])
+    assert (row["status"], row["attempts"], row["last_error"]) == ("pending", 1, "smtp down")
+    assert row["delayed"] is True
+    assert await outbox.process_batch() == 0  # Pas encore dû
+
+    await pg_pool.execute("UPDATE notification_outbox SET next_attempt_at = NOW()")
+    await outbox.process_batch()
+    row = await _row(pg_pool, ids["email"])
+    assert (row["status"], row["attempts"]) == ("dead", 2)
+    assert [d["id"] for d in await outbox.get_dead_letters()] == [ids["email"]]
+
+    assert await outbox.retry_dead(ids["email"]) == 1
+    row = await _row(pg_pool, ids["email"])
+    assert (row["status"], row["attempts"]) == ("pending", 0)
+
+
+async def test_expired_lock_is_reclaimed(outbox, pg_pool):
+    outbox._deliver, _calls = _deliver_with([{"success": True}])
+    ids = await outbox.enqueue({"teams": {"text": "x"}})
+    # Worker arrêté en plein envoi: ligne restée 'sending' avec un verrou expiré
+    await pg_pool.execute(
+        """
+        UPDATE notification_outbox
+        SET status = 'sending', attempts = 1, locked_until = NOW() - INTERVAL '1 second'
+        """
+    )
+
+    assert await outbox.process_batch() == 1
+    row = await _row(pg_pool, ids["teams"])
+    assert (row["status"], row["attempts"]) == ("sent", 2)
+
+
+def test_lock_covers_rate_limit_wait(monkeypatch):
+    monkeypatch.setattr(settings, "notification_email_timeout", 10.0)
+    monkeypatch.setattr(settings, "notification_outbox_batch_size", 10)
+    monkeypatch.setattr(settings, "notification_outbox_workers", 2)
+    monkeypatch.setattr(settings, "notification_rate_limits", "email=5,teams=0.5")
+
+    # 10 envois x 10 s + 10 x 2 workers / 0.5 envoi/s + 60 s de marge
+    assert NotificationOutbox._lock_seconds() == 100 + 40 + 60
+
+    monkeypatch.setattr(settings, "notification_rate_limits", "")
+    assert NotificationOutbox._lock_seconds() == 160
+
+
+async def test_permanent_error_is_dead_lettered_without_retry(outbox, pg_pool):
+    outbox._deliver, calls = _deliver_with([
+        {"success": False, "error": "Teams webhook URL not configured", "permanent": True},
+    ])
+    ids = await outbox.enqueue({"teams": {"text": "x"}})
+
+    await outbox.process_batch()
+
+    row = await _row(pg_pool, ids["teams"])
+    assert (row["status"], row["attempts"]) == ("dead", 1)
+    assert len(calls) == 1
+
+
+async def test_unconfigured_channel_is_not_queued(outbox, pg_pool, monkeypatch):
+    monkeypatch.setattr(settings, "teams_webhook_url", "")
+    monkeypatch.setattr(settings, "notification_outbox_enabled", True)
+    monkeypatch.setattr(notification_module, "notification_outbox", outbox)
+    monkeypatch.setattr(type(outbox), "is_running", property(lambda self: True))
+
+    results = await NotificationClient()._send(
+        {"email": {"to": "a@client.fr"}, "teams": {"text": "x"}}
+    )
+
+    assert results["teams"] == {
+        "success": False, "error": "Teams webhook URL not configured", "permanent": True,
+    }
+    assert results["email"]["queued"] is True
+    channels = await pg_pool.fetch("SELECT channel FROM notification_outbox")
+    assert [row["channel"] for row in channels] == ["email"]
@@ -0,0 +1,60 @@
+"""Compteurs matérialisés SAFEGUARD (trigger + installation au démarrage)."""
+
+import asyncio
+
+from src.mcp.safeguard_queue import SafeguardQueue, ensure_status_counters
+
+
+async def _queue(pg_pool) -> SafeguardQueue:
+    queue = SafeguardQueue()
+    queue._pool = pg_pool
+    await queue.initialize()
+    return queue
+
+
+async def test_counters_follow_status_changes(pg_pool):
+    queue = await _queue(pg_pool)
+    first = await queue.create_approval_request("ad_reset_password", {"user": "a"}, "L3")
+    await queue.create_approval_request("ad_reset_password", {"user": "b"}, "L3")
+
+    await queue.reject(first["approval_id"], approver="tech")
+
+    stats = await queue.get_stats()
+    assert stats["pending"] == 1
+    assert stats["rejected"] == 1
+    assert stats["total"] == 2
+
+
+async def test_restart_does_not_lock_writers(pg_pool):
+    await _queue(pg_pool)
+
+    async with pg_pool.acquire() as writer:
+        transaction = writer.transaction()
+        await transaction.start()
+        try:
+            await writer.execute(
+                """
+                INSERT INTO safeguard_approvals (id, tool_name, arguments, security_level, expires_at)
+                VALUES (gen_random_uuid(), 'ad_reset_password', '{}', 'L3', NOW() + INTERVAL '1 hour')
+                """
+            )
+            # Écriture en cours (ROW EXCLUSIVE): le redémarrage ne doit pas attendre
+            await asyncio.wait_for(
+                ensure_status_counters(pg_pool, "safeguard_approvals", "approvals"),
+                timeout=5,
+            )
+        finally:
+            await transaction.rollback()
+
+
+async def test_lost_counters_are_recounted(pg_pool):
+    queue = await _queue(pg_pool)
+    await queue.create_approval_request("ad_reset_password", {"user": "a"}, "L3")
+    await queue.create_approval_request("ad_reset_password", {"user": "b"}, "L3")
+
+    await pg_pool.execute("DELETE FROM safeguard_status_counters WHERE scope = 'approvals'")
+    await ensure_status_counters(pg_pool, "safeguard_approvals", "approvals")
+
+    stats = await queue.get_stats()
+    assert stats["pending"] == 2
+    assert stats["total"] == 2
@@ -0,0 +1,243 @@
+"""Tables SAFEGUARD partitionnées: identifiants, requêtes pending, rétention."""
+
+from datetime import date, datetime, timedelta, timezone
+from uuid import uuid4
+
+from src.config import settings
+from src.mcp.retention import RetentionManager, month_start
+from src.mcp.safeguard_queue import (
+    DeferredActionManager,
+    SafeguardQueue,
+    approval_created_at,
+    approval_id_filter,
+    deferred_id_filter,
+    new_approval_id,
+)
+
+
+async def _queue(pg_pool) -> SafeguardQueue:
+    queue = SafeguardQueue()
+    queue._pool = pg_pool
+    await queue.initialize()
+    return queue
+
+
+async def _deferred(pg_pool) -> DeferredActionManager:
+    manager = DeferredActionManager()
+    manager._pool = pg_pool
+    await manager.initialize()
+    return manager
+
+
+def test_approval_id_carries_created_at():
+    approval_id, created_at = new_approval_id()
+
+    assert approval_id.version == 7
+    assert approval_created_at(approval_id) == created_at
+    assert approval_created_at(str(approval_id)) == created_at
+    assert abs(datetime.now(timezone.utc) - created_at) < timedelta(seconds=5)
+
+
+def test_legacy_and_invalid_ids_are_not_restricted():
+    legacy = str(uuid4())
+
+    assert approval_created_at(legacy) is None
+    assert approval_created_at("not-a-uuid") is None
+    assert approval_id_filter(legacy) == ("id = $1", [legacy])
+    assert deferred_id_filter("DEF-XYZ") == ("deferred_id = $1", ["DEF-XYZ"])
+
+
+def test_out_of_range_uuidv7_is_not_restricted():
+    far_future = "ffffffff-ffff-7fff-bfff-ffffffffffff"
+
+    assert approval_created_at(far_future) is None
+    assert approval_id_filter(far_future) == ("id = $1", [far_future])
+
+
+def test_deferred_id_filter_bounds_year():
+    clause, args = deferred_id_filter("DEF-2026-042", first_param=3)
+
+    assert clause == "deferred_id = $3 AND created_at >= $4 AND created_at < $5"
+    assert args[1] < datetime(2026, 1, 1, tzinfo=timezone.utc) < args[2]
+    assert args[1] < datetime(2026, 12, 31, 23, 59, tzinfo=timezone.utc) < args[2]
+
+
+async def test_approval_lookups_find_exactly_one_row(pg_pool):
+    queue = await _queue(pg_pool)
+    created = await queue.create_approval_request("ad_disable_account", {"user": "a"}, "L3")
+    approval_id = created["approval_id"]
+
+    approved = await queue.approve(approval_id, approver="tech")
+    status = await queue.get_approval_status(approval_id)
+    rows = await pg_pool.fetchval(
+        "SELECT COUNT(*) FROM safeguard_approvals WHERE id = $1", approval_id
+    )
+
+    assert approved["success"] is True
+    assert status["status"] == "approved"
+    assert rows == 1
+
+
+async def test_legacy_uuid4_approval_is_still_found(pg_pool):
+    queue = await _queue(pg_pool)
+    legacy = uuid4()
+    await pg_pool.execute(
+        """
+        INSERT INTO safeguard_approvals (id, tool_name, arguments, security_level, expires_at)
+        VALUES ($1, 'ad_disable_account', '{}', 'L3', NOW() + INTERVAL '1 hour')
+        """,
+        legacy,
+    )
+
+    result = await queue.reject(str(legacy), approver="tech")
+
+    assert result["success"] is True
+    assert (await queue.get_approval_status(str(legacy)))["status"] == "rejected"
+
+
+async def test_deferred_lookups_find_exactly_one_row(pg_pool):
+    manager = await _deferred(pg_pool)
+    created = await manager.create_deferred_action(
+        approval_id=str(uuid4()),
+        tool_name="ad_disable_account",
+        parameters={"user": "a"},
+        security_level="L3",
+        approved_by="tech",
+    )
+    deferred_id = created["deferred_id"]
+
+    cancelled = await manager.cancel_action(deferred_id, cancelled_by="tech")
+    detail = await manager.get_action_detail(deferred_id)
+    rows = await pg_pool.fetchval(
+        "SELECT COUNT(*) FROM safeguard_deferred_actions WHERE deferred_id = $1", deferred_id
+    )
+
+    assert cancelled["success"] is True
+    assert detail["status"] == "cancelled"
+    assert rows == 1
+
+
+async def test_old_pending_rows_stay_live(pg_pool):
+    queue = await _queue(pg_pool)
+    manager = await _deferred(pg_pool)
+    old = datetime.now(timezone.utc) - timedelta(days=90)
+
+    await pg_pool.execute(
+        """
+        INSERT INTO safeguard_approvals
+            (id, tool_name, arguments, security_level, expires_at, created_at)
+        VALUES ($1, 'ad_disable_account', '{}', 'L3', $2, $2)
+        """,
+        uuid4(),
+        old,
+    )
+    await pg_pool.execute(
+        """
+        INSERT INTO safeguard_deferred_actions
+            (deferred_id, approval_id, tool_name, parameters, security_level,
+             scheduled_at, approved_by, approved_at, created_at)
+        VALUES ('DEF-OLD-1', $1, 'ad_disable_account', '{}', 'L3', $2, 'tech', $2, $2)
+        """,
+        uuid4(),
+        old,
+    )
+
+    assert await queue.expire_old_requests() == 1
+    due = await manager.get_due_actions()
+    assert [action["deferred_id"] for action in due] == ["DEF-OLD-1"]
+    pending = await manager.get_pending_actions()
+    assert [action["deferred_id"] for action in pending] == ["DEF-OLD-1"]
+
+
+async def test_retention_keeps_partitions_with_live_rows(pg_pool, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "partition_archive_dir", str(tmp_path))
+    manager = await _deferred(pg_pool)
+    retention = RetentionManager()
+    retention._pool = pg_pool
+
+    month = month_start(date.today(), -6)
+    async with pg_pool.acquire() as conn:
+        await retention._create_month_partition(conn, "safeguard_deferred_actions", month)
+    created_at = datetime(month.year, month.month, 15, tzinfo=timezone.utc)
+    await pg_pool.execute(
+        """
+        INSERT INTO safeguard_deferred_actions
+            (deferred_id, approval_id, tool_name, parameters, security_level,
+             scheduled_at, approved_by, approved_at, created_at)
+        VALUES ('DEF-OLD-1', $1, 'ad_disable_account', '{}', 'L3', $2, 'tech', $2, $2)
+        """,
+        uuid4(),
+        created_at,
+    )
+
+    report = await retention.apply_retention(retention_months=3)
+    table_report = report["tables"]["safeguard_deferred_actions"]
+    assert table_report["archived"] == []
+    assert table_report["skipped_live"][0]["live"] == 1
+    assert len(await manager.get_due_actions()) == 1
+
+    await manager.mark_executed("DEF-OLD-1", result={"ok": True})
+    report = await retention.apply_retention(retention_months=3)
+    archived = report["tables"]["safeguard_deferred_actions"]["archived"]
+    assert [entry["rows"] for entry in archived] == [1]
+    assert (await manager.get_stats())["executed"] == 0
+
+
+async def _old_approval(pg_pool, retention: RetentionManager, months_ago: int, status: str):
+    month = month_start(date.today(), -months_ago)
+    async with pg_pool.acquire() as conn:
+        await retention._create_month_partition(conn, "safeguard_approvals", month)
+    created_at = datetime(month.year, month.month, 15, tzinfo=timezone.utc)
+    await pg_pool.execute(
+        """
+        INSERT INTO safeguard_approvals
+            (id, tool_name, arguments, security_level, expires_at, created_at, status)
+        VALUES ($1, 'ad_disable_account', '{}', 'L3', $2, $2, $3)
+        """,
+        uuid4(),
+        created_at,
+        status,
+    )
+
+
+async def test_retention_keeps_approved_and_scheduled_rows(pg_pool, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "partition_archive_dir", str(tmp_path))
+    await _queue(pg_pool)
+    retention = RetentionManager()
+    retention._pool = pg_pool
+    await _old_approval(pg_pool, retention, 6, "approved")
+    await _old_approval(pg_pool, retention, 7, "scheduled")
+    await _old_approval(pg_pool, retention, 8, "rejected")
+
+    report = await retention.apply_retention(retention_months=3)
+
+    table_report = report["tables"]["safeguard_approvals"]
+    assert [entry["live"] for entry in table_report["skipped_live"]] == [1, 1]
+    assert [entry["rows"] for entry in table_report["archived"]] == [1]
+
+
+async def test_archive_error_does_not_stop_retention(pg_pool, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "partition_archive_dir", str(tmp_path))
+    await _queue(pg_pool)
+    retention = RetentionManager()
+    retention._pool = pg_pool
+    await _old_approval(pg_pool, retention, 6, "executed")
+    await _old_approval(pg_pool, retention, 7, "executed")
+
+    archive_partition = retention._archive_partition
+    calls = []
+
+    async def flaky_archive(conn, table, child):
+        calls.append(child)
+        if len(calls) == 1:
+            raise RuntimeError(f"Archive incomplète pour {child}")
+        return await archive_partition(conn, table, child)
+
+    monkeypatch.setattr(retention, "_archive_partition", flaky_archive)
+
+    report = await retention.apply_retention(retention_months=3)
+
+    table_report = report["tables"]["safeguard_approvals"]
+    assert [entry["partition"] for entry in table_report["errors"]] == calls[:1]
+    assert [entry["partition"] for entry in table_report["archived"]] == calls[1:]
+    assert "errors" not in report["tables"]["safeguard_deferred_actions"]